@@ -7,17 +7,15 @@ from loguru import logger
 from fastapi.responses import Response
 
 from backend.api.utils.headers import sanitize_header_value
-from backend.api.handlers.context_preparer import save_memories_from_response
-from backend.api.handlers.parallel_processor import (
-    process_with_parallel_prep,
-    save_memories_parallel
-)
+from backend.api.handlers.parallel_processor import process_with_parallel_prep
 from backend.api.handlers.llm_processor import process_with_llm
-from backend.api.handlers.feedback_collector import collect_conversation_feedback
+from backend.api.handlers.post_turn import enqueue_post_turn
+from backend.services.observability.tracing import span, traced
 from backend.services.response_sanitizer import get_sanitizer
 from backend.scripts.capture_assistant_responses import capture_response
 
 
+@traced("pipeline.audio_http")
 async def process_audio_complete(
     stt_service: Any,
     llm_service: Any,
@@ -93,10 +91,12 @@ async def process_audio_complete(
     # 2.5. Sanitiza resposta (remove tokens de treinamento, números excessivos, etc)
     sanitizer = get_sanitizer()
     resposta_texto_original = resposta_texto
-    resposta_texto = sanitizer.sanitize(resposta_texto)
+    with span("response.sanitize"):
+        resposta_texto = sanitizer.sanitize(resposta_texto)
+        quality_ok = sanitizer.is_quality_response(resposta_texto)
     
     # Verifica qualidade após sanitização
-    if not sanitizer.is_quality_response(resposta_texto):
+    if not quality_ok:
         logger.warning(f"⚠️ Resposta de baixa qualidade após sanitização. Original: '{resposta_texto_original[:100]}...'")
         # Se ficou muito ruim, usa mensagem de contingência
         if len(resposta_texto.strip()) < 20:
@@ -105,11 +105,6 @@ async def process_audio_complete(
     if resposta_texto != resposta_texto_original:
         logger.info(f"🔧 Resposta sanitizada: '{resposta_texto_original[:50]}...' -> '{resposta_texto[:50]}...'")
     
-    # Salva memórias em paralelo (não bloqueia resposta)
-    await save_memories_parallel(
-        memory_service, texto_transcrito, resposta_texto
-    )
-    
     await context_manager.add_message(session_id, "assistant", resposta_texto)
     logger.info(f"Resposta: '{resposta_texto}'")
     
@@ -119,20 +114,19 @@ async def process_audio_complete(
     
     tempo_total = time.time() - start_time
     
-    # Coleta conversa usando handler
-    await collect_conversation_feedback(
-        feedback_service, session_id, texto_transcrito, resposta_texto,
-        tokens, tempo_total, None
-    )
-    
     logger.info(
         f"Processamento completo em {tempo_total:.2f}s: "
         f"STT -> '{texto_transcrito}' -> LLM -> '{resposta_texto}' (apenas texto)"
     )
     
-    # Captura resposta para análise (em background, não bloqueia)
-    try:
-        capture_response(
+    # Memórias, coleta da conversa e captura vão para a fila (não bloqueiam a resposta)
+    enqueue_post_turn(
+        session_id, texto_transcrito, resposta_texto,
+        memory_service=memory_service,
+        feedback_service=feedback_service,
+        tokens_used=tokens,
+        processing_time=tempo_total,
+        capture=lambda: capture_response(
             user_input=texto_transcrito,
             assistant_response=resposta_texto_original,
             session_id=session_id,
@@ -144,8 +138,7 @@ async def process_audio_complete(
             audio_data=None,  # Sem áudio
             audio_duration=None  # Sem duração de áudio
         )
-    except Exception as e:
-        logger.debug(f"Erro ao capturar resposta (não crítico): {e}")
+    )
     
     # Retorna JSON com texto da resposta
     import json
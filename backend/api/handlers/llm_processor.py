@@ -4,6 +4,8 @@ Handler para processamento LLM com suporte a RLHF
 from typing import Optional, Tuple, Any, List, Dict
 from loguru import logger
 
+from backend.services.observability.tracing import span
+
 
 async def process_with_llm(
     llm_service: Any,
@@ -34,14 +36,15 @@ async def process_with_llm(
         Tupla (resposta_texto, tokens_usados)
     """
     # Gera resposta do LLM
-    resposta_texto, tokens = llm_service.generate_response(
-        texto,
-        contexto,
-        memorias_contexto=memoria_contexto,
-        tools=tools,
-        tool_executor=tool_executor,
-        system_prompt_override=system_prompt_override
-    )
+    with span("llm.generate", provider=type(llm_service).__name__):
+        resposta_texto, tokens = llm_service.generate_response(
+            texto,
+            contexto,
+            memorias_contexto=memoria_contexto,
+            tools=tools,
+            tool_executor=tool_executor,
+            system_prompt_override=system_prompt_override
+        )
     
     # RLHF: Se modelo de recompensa disponível, avalia resposta
     if reward_model_service and rlhf_service:
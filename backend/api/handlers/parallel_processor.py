@@ -6,6 +6,9 @@ import asyncio
 from typing import Optional, Tuple, Any, List, Dict
 from loguru import logger
 
+from backend.services.background_queue import get_background_queue
+from backend.services.observability.tracing import span
+
 
 async def prepare_context_parallel(
     context_manager: Any,
@@ -31,8 +34,9 @@ async def prepare_context_parallel(
     
     # Executa em paralelo: adicionar mensagem + buscar memórias
     async def add_message():
-        await context_manager.add_message(session_id, "user", user_input)
-        return await context_manager.get_context(session_id)
+        with span("context.prepare"):
+            await context_manager.add_message(session_id, "user", user_input)
+            return await context_manager.get_context(session_id)
     
     async def get_memories():
         if memory_service:
@@ -79,10 +83,13 @@ async def process_with_parallel_prep(
     Returns:
         Tupla (texto_transcrito, session_id, contexto, memoria_contexto, tools, tool_executor)
     """
-    # Se for áudio, transcreve primeiro (bloqueante, mas necessário)
+    # Se for áudio, transcreve primeiro (fora do event loop, em lote com requisições concorrentes)
     if audio_data:
         logger.info("Etapa 1: Transcrição (STT)")
-        texto_transcrito, confianca, duracao = stt_service.transcribe_audio(audio_data)
+        with span("stt.transcribe", audio_bytes=len(audio_data)):
+            texto_transcrito, confianca, duracao = await stt_service.transcribe_audio_async(
+                audio_data, session_id=session_id
+            )
         
         if not texto_transcrito or not texto_transcrito.strip():
             from fastapi import HTTPException
@@ -134,12 +141,9 @@ async def save_memories_parallel(
         assistant_response: Resposta do assistente
     """
     if memory_service:
-        try:
-            # Executa em background (não aguarda)
-            asyncio.create_task(
-                memory_service.extract_and_save_memory(user_input, assistant_response)
-            )
-            logger.debug("💾 Salvamento de memórias iniciado em background")
-        except Exception as e:
-            logger.warning(f"Erro ao salvar memórias em background: {e}")
+        # Fila limitada com retries (em vez de task solta, sem referência)
+        if get_background_queue().submit(
+            "memory", memory_service.extract_and_save_memory, user_input, assistant_response
+        ):
+            logger.debug("💾 Salvamento de memórias enfileirado em background")
 
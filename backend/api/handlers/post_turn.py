@@ -0,0 +1,66 @@
+"""
+Handler para os efeitos colaterais de um turno (após a resposta)
+
+Memórias, coleta da conversa para feedback, cache e captura da resposta não
+mudam o que o usuário recebe: vão para a fila de background e a resposta
+sai assim que o texto existe.
+"""
+from typing import Any, Callable, Optional
+from loguru import logger
+
+from backend.api.handlers.response_cache_handler import set_cached_response
+from backend.services.background_queue import get_background_queue
+
+
+def enqueue_post_turn(
+    session_id: str,
+    user_input: str,
+    assistant_response: str,
+    memory_service: Optional[Any] = None,
+    feedback_service: Optional[Any] = None,
+    tokens_used: int = 0,
+    processing_time: float = 0.0,
+    used_tool: Optional[str] = None,
+    capture: Optional[Callable[[], Any]] = None,
+    response_cache: Optional[Any] = None
+):
+    """
+    Enfileira os efeitos colaterais de um turno
+
+    Args:
+        session_id: ID da sessão
+        user_input: Entrada do usuário
+        assistant_response: Resposta enviada
+        memory_service: Serviço de memória (extração por padrões + gravação)
+        feedback_service: Serviço de feedback (grava a conversa)
+        tokens_used: Tokens utilizados
+        processing_time: Tempo de processamento
+        used_tool: Ferramenta usada (opcional)
+        capture: Captura da resposta para análise (síncrona, roda numa thread)
+        response_cache: Cache de respostas (armazena a resposta; o embedding
+            da pergunta, se houver, é calculado fora do caminho da resposta)
+    """
+    queue = get_background_queue()
+
+    if memory_service:
+        queue.submit("memory", memory_service.extract_and_save_memory, user_input, assistant_response)
+
+    if feedback_service and user_input and assistant_response:
+        async def _collect():
+            conversation_id = await feedback_service.collect_conversation(
+                session_id=session_id,
+                user_input=user_input,
+                assistant_response=assistant_response,
+                tokens_used=tokens_used,
+                processing_time=processing_time,
+                used_tool=used_tool
+            )
+            logger.debug(f"💾 Conversa coletada: conversation_id={conversation_id}")
+        queue.submit("feedback", _collect)
+
+    if response_cache:
+        queue.submit("response_cache", set_cached_response, response_cache, user_input, assistant_response, tokens_used)
+
+    if capture:
+        # Captura grava em arquivo: sem retry para não duplicar
+        queue.submit("capture", capture, retries=0)
@@ -4,6 +4,7 @@ Handler para integração de cache de respostas
 from typing import Optional, Tuple, Any
 from loguru import logger
 
+from backend.config import settings
 from backend.services.response_cache import ResponseCache
 
 
@@ -21,7 +22,8 @@ def create_response_cache(embedding_service: Optional[Any] = None) -> Optional[R
         cache = ResponseCache(
             max_size=500,
             ttl=7200,  # 2 horas
-            embedding_service=embedding_service
+            embedding_service=embedding_service,
+            semantic_search=settings.response_cache_semantic_enabled
         )
         logger.info("✅ Cache de respostas inicializado")
         return cache
@@ -48,7 +50,13 @@ async def get_cached_response(
         return None
     
     try:
+        # Busca exata primeiro; embedding só é calculado se necessário
         result = cache.get(texto)
+        if not result:
+            embedding = await _embed_question(cache, texto)
+            if embedding is not None:
+                result = cache.get(texto, embedding=embedding)
+        cache.record_lookup(bool(result))
         if result:
             resposta, tokens = result
             logger.info(f"✅ Resposta do cache: '{texto[:50]}...'")
@@ -78,7 +86,31 @@ async def set_cached_response(
         return
     
     try:
-        cache.set(texto, resposta, tokens)
+        embedding = await _embed_question(cache, texto)
+        cache.set(texto, resposta, tokens, embedding=embedding)
     except Exception as e:
         logger.debug(f"Erro ao armazenar no cache: {e}")
 
+
+async def _embed_question(cache: ResponseCache, texto: str) -> Optional[list]:
+    """
+    Calcula embedding da pergunta via micro-batching (não bloqueia o loop)
+    
+    Args:
+        cache: Instância do cache (fornece o embedding_service)
+        texto: Texto da pergunta
+        
+    Returns:
+        Vetor de embedding ou None se indisponível (ou busca semântica desligada)
+    """
+    if not cache.semantic_search:
+        return None
+    embedding_service = cache.embedding_service
+    if not embedding_service.is_available():
+        return None
+    try:
+        return await embedding_service.embed_query_async(texto)
+    except Exception as e:
+        logger.debug(f"Erro ao gerar embedding: {e}")
+        return None
+
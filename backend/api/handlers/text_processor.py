@@ -7,25 +7,20 @@ from loguru import logger
 from fastapi.responses import Response
 
 from backend.api.utils.headers import sanitize_header_value
-from backend.api.handlers.context_preparer import save_memories_from_response
-from backend.api.handlers.parallel_processor import (
-    process_with_parallel_prep,
-    save_memories_parallel
-)
+from backend.api.handlers.parallel_processor import process_with_parallel_prep
 from backend.api.handlers.llm_processor import process_with_llm
 from backend.api.handlers.architecture_handler import (
     handle_architecture_intent,
     format_architecture_plugin_result
 )
-from backend.api.handlers.feedback_collector import collect_conversation_feedback
-from backend.api.handlers.response_cache_handler import (
-    get_cached_response,
-    set_cached_response
-)
+from backend.api.handlers.post_turn import enqueue_post_turn
+from backend.api.handlers.response_cache_handler import get_cached_response
+from backend.services.observability.tracing import span, traced
 from backend.services.response_sanitizer import get_sanitizer
 from backend.scripts.capture_assistant_responses import capture_response
 
 
+@traced("pipeline.text")
 async def process_text_complete(
     llm_service: Any,
     tts_service: Any,
@@ -81,10 +76,11 @@ async def process_text_complete(
             
             tempo_total = time.time() - start_time
             
-            # Coleta conversa
-            await collect_conversation_feedback(
-                feedback_service, session_id, texto, resposta_texto,
-                tokens, tempo_total, "cache"
+            # Coleta conversa (em background)
+            enqueue_post_turn(
+                session_id, texto, resposta_texto,
+                feedback_service=feedback_service,
+                tokens_used=tokens, processing_time=tempo_total, used_tool="cache"
             )
             
             logger.info(
@@ -170,10 +166,11 @@ async def process_text_complete(
                 
                 tempo_total = time.time() - start_time
                 
-                # Coleta conversa usando handler
-                await collect_conversation_feedback(
-                    feedback_service, session_id, texto, resposta_texto,
-                    tokens, tempo_total, "architecture_advisor"
+                # Coleta conversa (em background)
+                enqueue_post_turn(
+                    session_id, texto, resposta_texto,
+                    feedback_service=feedback_service,
+                    tokens_used=tokens, processing_time=tempo_total, used_tool="architecture_advisor"
                 )
                 
                 logger.info(
@@ -231,10 +228,12 @@ async def process_text_complete(
     # 2.5. Sanitiza resposta (remove tokens de treinamento, números excessivos, etc)
     sanitizer = get_sanitizer()
     resposta_texto_original = resposta_texto
-    resposta_texto = sanitizer.sanitize(resposta_texto)
+    with span("response.sanitize"):
+        resposta_texto = sanitizer.sanitize(resposta_texto)
+        quality_ok = sanitizer.is_quality_response(resposta_texto)
     
     # Verifica qualidade após sanitização
-    if not sanitizer.is_quality_response(resposta_texto):
+    if not quality_ok:
         logger.warning(f"⚠️ Resposta de baixa qualidade após sanitização. Original: '{resposta_texto_original[:100]}...'")
         # Se ficou muito ruim, usa mensagem de contingência
         if len(resposta_texto.strip()) < 20:
@@ -243,16 +242,6 @@ async def process_text_complete(
     if resposta_texto != resposta_texto_original:
         logger.info(f"🔧 Resposta sanitizada: '{resposta_texto_original[:50]}...' -> '{resposta_texto[:50]}...'")
     
-    
-    # Salva memórias em paralelo (não bloqueia resposta)
-    await save_memories_parallel(
-        memory_service, texto, resposta_texto
-    )
-    
-    # Armazena no cache (se disponível e não for system_prompt customizado)
-    if response_cache and not system_prompt:
-        await set_cached_response(response_cache, texto, resposta_texto, tokens)
-    
     await context_manager.add_message(session_id, "assistant", resposta_texto)
     logger.info(f"Resposta: '{resposta_texto}'")
     
@@ -266,19 +255,13 @@ async def process_text_complete(
     if tools and tool_executor:
         used_tool = "web_search" if "pesquis" in texto.lower() or "busca" in texto.lower() else None
     
-    # Coleta conversa usando handler
-    await collect_conversation_feedback(
-        feedback_service, session_id, texto, resposta_texto,
-        tokens, tempo_total, used_tool
-    )
-    
     logger.info(
         f"Processamento completo em {tempo_total:.2f}s: "
         f"TEXTO -> '{texto}' -> LLM -> '{resposta_texto}' (apenas texto)"
     )
     
-    # Captura resposta para análise (em background, não bloqueia)
-    try:
+    # Captura resposta para análise (não crítico)
+    def _capture():
         contexto_list = [{"role": msg["role"], "content": msg["content"]} for msg in contexto] if contexto else []
         capture_response(
             user_input=texto,
@@ -292,8 +275,19 @@ async def process_text_complete(
             audio_data=None,  # Sem áudio
             audio_duration=None  # Sem duração de áudio
         )
-    except Exception as e:
-        logger.debug(f"Erro ao capturar resposta (não crítico): {e}")
+    
+    # Memórias, coleta da conversa, cache e captura vão para a fila (não bloqueiam a resposta)
+    enqueue_post_turn(
+        session_id, texto, resposta_texto,
+        memory_service=memory_service,
+        feedback_service=feedback_service,
+        tokens_used=tokens,
+        processing_time=tempo_total,
+        used_tool=used_tool,
+        capture=_capture,
+        # Cache só para o system prompt padrão
+        response_cache=response_cache if not system_prompt else None
+    )
     
     # Retorna JSON com texto da resposta
     import json
@@ -0,0 +1,64 @@
+"""
+Envio de áudio TTS por sentença via WebSocket
+"""
+import time
+from typing import Optional
+from fastapi import WebSocket
+from loguru import logger
+
+from backend.config import settings
+from backend.api.routes.websocket_utils import safe_send_json, safe_send_bytes
+from backend.services.tts_streaming import SentenceTTSStream
+
+
+async def send_sentence_audio(
+    websocket: WebSocket,
+    tts_service,
+    texto: str
+) -> Optional[float]:
+    """
+    Sintetiza o texto sentença a sentença e envia cada áudio assim que pronto
+    
+    Protocolo por sentença: JSON {"type": "audio_chunk", ...} seguido dos
+    bytes WAV; ao final envia {"type": "audio_end"}.
+    
+    Args:
+        websocket: Conexão WebSocket
+        tts_service: Serviço de TTS
+        texto: Resposta completa a ser falada
+        
+    Returns:
+        Tempo total de TTS em ms ou None se conexão fechou
+    """
+    start = time.time()
+    stream = SentenceTTSStream(
+        tts_service,
+        max_workers=settings.tts_stream_workers,
+        min_chars=settings.tts_stream_min_sentence_chars
+    )
+    stream.feed(texto)
+    stream.finish()
+    
+    try:
+        async for segment in stream.drain():
+            header = {
+                "type": "audio_chunk",
+                "index": segment.index,
+                "text": segment.text,
+                "format": "wav",
+                "size": len(segment.audio)
+            }
+            if not await safe_send_json(websocket, header) or not await safe_send_bytes(websocket, segment.audio):
+                logger.warning("Conexão fechada durante envio de áudio")
+                return None
+    finally:
+        stream.cancel()
+    
+    tts_time = (time.time() - start) * 1000
+    await safe_send_json(websocket, {
+        "type": "audio_end",
+        "firstAudioTime": int(stream.first_audio_ms or 0),
+        "ttsTime": int(tts_time)
+    })
+    logger.info(f"🔊 Áudio por sentença enviado (primeiro em {stream.first_audio_ms or 0:.0f}ms, total {tts_time:.0f}ms)")
+    return tts_time
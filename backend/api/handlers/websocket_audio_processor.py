@@ -15,10 +15,15 @@ from backend.services import (
 from backend.api.routes.websocket_utils import safe_send_json, safe_send_bytes
 from backend.api.handlers.websocket_tools_preparer import prepare_tools_for_websocket
 from backend.api.handlers.feedback_collector import collect_conversation_feedback
+from backend.api.handlers.post_turn import enqueue_post_turn
+from backend.api.handlers.tts_stream_sender import send_sentence_audio
+from backend.config import settings
+from backend.services.observability.tracing import span, traced
 from backend.services.response_sanitizer import get_sanitizer
 from backend.scripts.capture_assistant_responses import capture_response
 
 
+@traced("pipeline.audio")
 async def process_audio_complete(
     websocket: WebSocket,
     audio_data: bytes,
@@ -78,7 +83,10 @@ async def process_audio_complete(
         
         stt_start = time.time()
         logger.info("🎙️ Iniciando transcrição de áudio...")
-        texto_transcrito, confianca, duracao = stt_service.transcribe_audio(audio_data)
+        with span("stt.transcribe", audio_bytes=len(audio_data)):
+            texto_transcrito, confianca, duracao = await stt_service.transcribe_audio_async(
+                audio_data, session_id=session_id
+            )
         stt_time = (time.time() - stt_start) * 1000  # em milissegundos
         logger.info(f"✅ Transcrição concluída: '{texto_transcrito}' (confiança: {confianca:.2f}, duração: {duracao:.2f}s)")
         logger.debug(f"⏱️ STT levou {stt_time:.0f}ms")
@@ -106,6 +114,7 @@ async def process_audio_complete(
             resposta_texto = "Não consegui entender o áudio. Pode repetir, por favor?"
             tokens = 0
             llm_time = 0
+            contexto, tools, tool_executor = [], None, None
         else:
             # 2. Gera resposta com LLM
             if not await safe_send_json(websocket, {
@@ -116,16 +125,16 @@ async def process_audio_complete(
                 return session_id
             logger.debug("📤 Status 'generating' enviado")
             
-            await context_manager.add_message(session_id, "user", texto_transcrito)
-            contexto = await context_manager.get_context(session_id)
+            with span("context.prepare"):
+                await context_manager.add_message(session_id, "user", texto_transcrito)
+                contexto = await context_manager.get_context(session_id)
             logger.debug(f"💭 Contexto recuperado: {len(contexto)} mensagens")
             
             # Busca memórias relevantes
             memoria_contexto = ""
             if memory_service:
                 memoria_contexto = await memory_service.get_memories_for_context(texto_transcrito)
-                # Extrai e salva memórias da conversa
-                await memory_service.extract_and_save_memory(texto_transcrito, "")
+                # Extração de memórias fica para depois da resposta (fila de background)
             
             logger.info("🤖 Gerando resposta com LLM...")
             llm_start = time.time()
@@ -140,13 +149,14 @@ async def process_audio_complete(
             tools, tool_executor = prepare_tools_for_websocket(plugin_manager, web_search_tool, privacy_mode_service)
             
             # Gera resposta com LLM ativo (passa memórias e tools)
-            resposta_texto, tokens = active_llm.generate_response(
-                texto_transcrito,
-                contexto,
-                memorias_contexto=memoria_contexto,
-                tools=tools,
-                tool_executor=tool_executor
-            )
+            with span("llm.generate", provider=type(active_llm).__name__):
+                resposta_texto, tokens = active_llm.generate_response(
+                    texto_transcrito,
+                    contexto,
+                    memorias_contexto=memoria_contexto,
+                    tools=tools,
+                    tool_executor=tool_executor
+                )
             llm_time = (time.time() - llm_start) * 1000  # em milissegundos
             logger.info(f"✅ Resposta gerada: '{resposta_texto[:100]}...' ({tokens} tokens)")
             logger.debug(f"⏱️ LLM levou {llm_time:.0f}ms")
@@ -154,10 +164,12 @@ async def process_audio_complete(
         # Sanitiza resposta antes de enviar para TTS e salvar
         sanitizer = get_sanitizer()
         resposta_texto_original = resposta_texto
-        resposta_texto = sanitizer.sanitize(resposta_texto)
+        with span("response.sanitize"):
+            resposta_texto = sanitizer.sanitize(resposta_texto)
+            quality_ok = sanitizer.is_quality_response(resposta_texto)
         
         # Verifica qualidade após sanitização
-        if not sanitizer.is_quality_response(resposta_texto):
+        if not quality_ok:
             logger.warning(f"⚠️ Resposta de baixa qualidade após sanitização. Original: '{resposta_texto_original[:100]}...'")
             # Se ficou muito ruim, usa mensagem de contingência
             if len(resposta_texto.strip()) < 20:
@@ -168,12 +180,6 @@ async def process_audio_complete(
         
         await context_manager.add_message(session_id, "assistant", resposta_texto)
         
-        # Extrai e salva memórias da resposta também
-        if memory_service:
-            await memory_service.extract_and_save_memory(texto_transcrito, resposta_texto)
-        
-        # Coleta conversa para feedback (em background, não bloqueia resposta)
-        conversation_id = None
         processing_time = (time.time() - stt_start) / 1000.0  # Tempo total até agora
         
         # Detecta tool usada (simplificado - baseado em palavras-chave)
@@ -185,23 +191,23 @@ async def process_audio_complete(
             elif "arquitet" in texto_lower or "design" in texto_lower or "sistema" in texto_lower:
                 used_tool = "architecture_advisor"
         
+        # Coleta conversa para feedback (append em memória no ConversationLog: o ID
+        # reservado volta na hora e segue na própria mensagem de resposta)
+        conversation_id = None
         if feedback_service and texto_transcrito and resposta_texto:
-            try:
-                conversation_id = await collect_conversation_feedback(
-                    feedback_service=feedback_service,
-                    session_id=session_id,
-                    user_input=texto_transcrito,
-                    assistant_response=resposta_texto,
-                    tokens_used=tokens,
-                    processing_time=processing_time,
-                    used_tool=used_tool
-                )
-                if conversation_id:
-                    logger.debug(f"💾 Conversa coletada: conversation_id={conversation_id}")
-            except Exception as e:
-                logger.warning(f"Erro ao coletar conversa: {e}")
+            conversation_id = await collect_conversation_feedback(
+                feedback_service=feedback_service,
+                session_id=session_id,
+                user_input=texto_transcrito,
+                assistant_response=resposta_texto,
+                tokens_used=tokens,
+                processing_time=processing_time,
+                used_tool=used_tool
+            )
+            if conversation_id:
+                logger.debug(f"💾 Conversa coletada: conversation_id={conversation_id}")
         
-        # Envia resposta com conversation_id (se disponível)
+        # Envia resposta com conversation_id (se disponível); demais efeitos vão para a fila
         response_data = {
             "type": "response",
             "text": resposta_texto,
@@ -220,54 +226,58 @@ async def process_audio_complete(
             return session_id
         logger.debug("📤 Resposta enviada ao cliente")
         
-        # NOTA: TTS desabilitado - agente responde apenas via texto
-        # O áudio do usuário ainda é processado (STT), mas a resposta é apenas textual
-        logger.info("ℹ️ TTS desabilitado - resposta apenas em texto")
-        tts_time = 0  # TTS não foi executado
+        # Extrai nomes das tools disponíveis (para a captura)
+        tools_names = []
+        if tools:
+            for tool in tools:
+                if isinstance(tool, dict) and 'function' in tool:
+                    func_name = tool.get('function', {}).get('name')
+                    if func_name:
+                        tools_names.append(func_name)
         
-        # Captura resposta para análise (em background, não bloqueia)
-        try:
-            contexto_list = [{"role": msg["role"], "content": msg["content"]} for msg in contexto] if contexto else []
-            
-            # Extrai nomes das tools usadas
-            tools_names = []
-            if tools:
-                for tool in tools:
-                    if isinstance(tool, dict) and 'function' in tool:
-                        func_name = tool.get('function', {}).get('name')
-                        if func_name:
-                            tools_names.append(func_name)
-            
-            # Detecta tool usada pela resposta (simplificado)
-            if not tools_names:
-                texto_lower = texto_transcrito.lower()
-                if "pesquis" in texto_lower or "busca" in texto_lower:
-                    tools_names.append("web_search")
-                elif "arquitet" in texto_lower or "design" in texto_lower:
-                    tools_names.append("architecture_advisor")
-            
-            capture_response(
+        # Detecta tool usada pela resposta (simplificado)
+        if not tools_names:
+            texto_lower = texto_transcrito.lower()
+            if "pesquis" in texto_lower or "busca" in texto_lower:
+                tools_names.append("web_search")
+            elif "arquitet" in texto_lower or "design" in texto_lower:
+                tools_names.append("architecture_advisor")
+        
+        contexto_list = [{"role": msg["role"], "content": msg["content"]} for msg in contexto] if contexto else []
+        total_time = time.time() - stt_start
+        
+        enqueue_post_turn(
+            session_id, texto_transcrito, resposta_texto,
+            memory_service=memory_service if texto_transcrito else None,
+            capture=lambda: capture_response(
                 user_input=texto_transcrito,
                 assistant_response=resposta_texto_original,
                 session_id=session_id,
                 tokens=tokens,
-                processing_time=(time.time() - stt_start),
+                processing_time=total_time,
                 tools_used=tools_names if tools_names else None,
                 sanitized_response=resposta_texto if resposta_texto != resposta_texto_original else None,
                 context_messages=contexto_list,
                 audio_data=None,  # Sem áudio
                 audio_duration=None  # Sem duração de áudio
             )
-        except Exception as e:
-            logger.debug(f"Erro ao capturar resposta (não crítico): {e}")
+        )
+        
+        # NOTA: TTS desabilitado por padrão - agente responde apenas via texto
+        # Com tts_streaming_enabled, o áudio é enviado por sentença assim que sintetizado
+        tts_time = None
+        if settings.tts_streaming_enabled and tts_service:
+            tts_time = await send_sentence_audio(websocket, tts_service, resposta_texto)
+        else:
+            logger.info("ℹ️ TTS desabilitado - resposta apenas em texto")
         
-        # Atualiza métricas (sem TTS)
+        # Atualiza métricas (ttsTime None quando TTS desabilitado)
         await safe_send_json(websocket, {
             "type": "complete",
             "metrics": {
                 "sttTime": int(stt_time),
                 "llmTime": int(llm_time),
-                "ttsTime": None  # TTS desabilitado
+                "ttsTime": int(tts_time) if tts_time is not None else None
             }
         })
         
@@ -14,10 +14,13 @@ from loguru import logger
 from datetime import datetime
 
 from backend.config import settings
-from backend.api.routes import process, websocket, web_interface, feedback, health, analytics, streaming, conversations, location, privacy
-from backend.api.routes.errors import router as errors_router, init_error_services
+from backend.api.routes import process, websocket, web_interface, feedback, health, analytics, streaming, conversations, location, privacy, metrics, debug
+from backend.api.routes.errors import router as errors_router, init_error_services, start_error_services, stop_error_services
 from backend.api.middleware.rate_limit import setup_rate_limiting
 from backend.api.startup.services_initializer import initialize_all_services
+from backend.api.startup.warmup import create_warmup
+from backend.services.embedding_service import EmbeddingService
+from backend.services.background_queue import get_background_queue
 
 
 # Configuração do logger
@@ -58,6 +61,7 @@ context_manager = None
 cleanup_service = None
 feedback_service = None
 conversation_history_service = None
+warmup_manager = None
 
 
 @app.on_event("startup")
@@ -66,7 +70,7 @@ async def startup_event():
     global stt_service, llm_service, tts_service, wake_word_service, context_manager
     global database, memory_service, cleanup_service, feedback_service
     global conversation_history_service, geocoding_service, privacy_mode_service
-    global privacy_mode_service
+    global privacy_mode_service, warmup_manager
     
     logger.info("=" * 60)
     logger.info("Iniciando Jonh Assistant API")
@@ -95,19 +99,33 @@ async def startup_event():
             privacy_mode_service
         ) = await initialize_all_services(base_path)
         
+        # Modelos pesados carregam em background (servidor já atende texto)
+        warmup_manager = create_warmup(stt_service, embedding_service, wake_word_service, tts_service, database, intent_detector)
+        if settings.rlhf_enabled:
+            warmup_manager.register("rlhf", process.load_rlhf_services)
+        
         # Inicializa serviços nas rotas
         process.init_services(stt_service, llm_service, tts_service, context_manager, memory_service, plugin_manager, intent_detector, feedback_service, response_cache, privacy_mode_service)
         process.init_rate_limiter(app_limiter)
         websocket.init_services(stt_service, llm_service, tts_service, wake_word_service, context_manager, memory_service, plugin_manager, feedback_service, privacy_mode_service)
         web_interface.init_services(stt_service, llm_service, tts_service, context_manager, memory_service)
         feedback.init_feedback_service(feedback_service)
-        health.init_health_services(stt_service, llm_service, tts_service, context_manager, plugin_manager, memory_service, response_cache)
+        health.init_health_services(stt_service, llm_service, tts_service, context_manager, plugin_manager, memory_service, response_cache, warmup_manager)
+        await health.start_health_monitor()
         analytics.init_analytics_services(database, embedding_service)
         init_error_services(database)
-        streaming.init_services(llm_service, context_manager, memory_service, plugin_manager, intent_detector, response_cache, privacy_mode_service)
+        await start_error_services()
+        streaming.init_services(llm_service, context_manager, memory_service, plugin_manager, intent_detector, response_cache, privacy_mode_service, tts_service)
         conversations.init_services(conversation_history_service, context_manager)
         location.init_services(context_manager, geocoding_service)
         privacy.init_privacy_service(privacy_mode_service)
+        metrics.init_metrics_services(database, context_manager, response_cache, embedding_service, tts_service, stt_service, feedback_service)
+        await metrics.start_metrics()
+        debug.init_debug_services(metrics.loop_lag_monitor)
+        
+        warmup_manager.start()
+        if not settings.fast_startup_enabled:
+            await warmup_manager.wait()
         
         logger.info("Serviços inicializados com sucesso")
         logger.info(f"Servidor rodando em {settings.host}:{settings.port}")
@@ -123,9 +141,24 @@ async def shutdown_event():
     """Cleanup ao desligar a aplicação"""
     logger.info("Encerrando Jonh Assistant API...")
     
-    # Limpa sessões expiradas
+    # Encerra warmup pendente e probes de health em background
+    if warmup_manager:
+        await warmup_manager.stop()
+    await health.stop_health_monitor()
+    await metrics.stop_metrics()
+    
+    # Drena efeitos colaterais pendentes (memórias, feedback) antes de fechar o banco
+    await get_background_queue().stop()
+    
+    # Grava conversas ainda no buffer do log de treinamento
+    if feedback_service and feedback_service.conversation_log:
+        await feedback_service.conversation_log.stop()
+    
+    # Limpa sessões expiradas e encerra sumarizações em andamento
     if context_manager:
         await context_manager.cleanup_expired_sessions()
+        if context_manager.summarizer:
+            await context_manager.summarizer.close()
     
     # Executa limpeza automática
     if cleanup_service:
@@ -134,6 +167,17 @@ async def shutdown_event():
         except Exception as e:
             logger.warning(f"Erro na limpeza automática: {e}")
     
+    # Encerra micro-batching do STT
+    if stt_service:
+        await stt_service.stop_batcher()
+    
+    # Encerra micro-batching e sincroniza cache persistente de embeddings (singleton)
+    await EmbeddingService().stop_batcher()
+    EmbeddingService().flush_cache()
+    
+    # Grava contadores pendentes de tendências de erros
+    await stop_error_services()
+    
     # Fecha banco de dados
     if database:
         await database.close()
@@ -181,6 +225,8 @@ app.include_router(streaming.router)
 app.include_router(conversations.router)
 app.include_router(location.router)
 app.include_router(privacy.router)
+app.include_router(metrics.router)
+app.include_router(debug.router)
 app.include_router(errors_router)
 
 
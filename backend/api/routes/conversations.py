@@ -6,7 +6,7 @@ from pydantic import BaseModel, Field
 from typing import Optional, List, Dict, Any
 from loguru import logger
 
-from backend.services.conversation_history_service import ConversationHistoryService
+from backend.services.conversation_history_service import ConversationHistoryService, encode_cursor
 from backend.services.context_manager import ContextManager
 
 
@@ -95,14 +95,16 @@ async def save_conversation(request: SaveConversationRequest):
 @router.get("", response_model=Dict[str, Any])
 async def list_conversations(
     limit: int = Query(50, ge=1, le=100, description="Número máximo de resultados"),
-    offset: int = Query(0, ge=0, description="Offset para paginação"),
+    cursor: Optional[str] = Query(None, description="Cursor da próxima página (next_cursor)"),
+    offset: int = Query(0, ge=0, description="Offset para paginação (legado, prefira cursor)"),
     user_id: Optional[str] = Query(None, description="Filtrar por usuário")
 ):
     """
     Lista conversas salvas
     
     - **limit**: Número máximo de resultados (1-100)
-    - **offset**: Offset para paginação
+    - **cursor**: Cursor retornado em next_cursor pela página anterior
+    - **offset**: Offset para paginação (legado)
     - **user_id**: Filtrar por usuário (opcional)
     """
     if not history_service:
@@ -112,34 +114,53 @@ async def list_conversations(
         conversations = await history_service.get_saved_conversations(
             limit=limit,
             offset=offset,
-            user_id=user_id
+            user_id=user_id,
+            cursor=cursor
         )
         
+        next_cursor = None
+        if len(conversations) == limit:
+            last = conversations[-1]
+            next_cursor = encode_cursor(last["created_at"], last["id"])
+        
         return {
             "success": True,
             "conversations": conversations,
             "count": len(conversations),
             "limit": limit,
-            "offset": offset
+            "offset": offset,
+            "next_cursor": next_cursor
         }
         
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Erro ao listar conversas: {e}")
         raise HTTPException(status_code=500, detail="Erro interno ao listar conversas")
 
 
 @router.get("/{conversation_id}", response_model=Dict[str, Any])
-async def get_conversation(conversation_id: int):
+async def get_conversation(
+    conversation_id: int,
+    messages_limit: Optional[int] = Query(None, ge=0, le=500, description="Máximo de mensagens (omitido = todas)"),
+    after_seq: int = Query(-1, ge=-1, description="Carrega mensagens após este seq (next_seq)")
+):
     """
     Recupera uma conversa específica
     
     - **conversation_id**: ID da conversa
+    - **messages_limit**: Máximo de mensagens por página (0 = só metadados)
+    - **after_seq**: Valor de next_seq da página anterior
     """
     if not history_service:
         raise HTTPException(status_code=503, detail="Serviços não inicializados")
     
     try:
-        conversation = await history_service.get_conversation_by_id(conversation_id)
+        conversation = await history_service.get_conversation_by_id(
+            conversation_id,
+            messages_limit=messages_limit,
+            after_seq=after_seq
+        )
         
         if not conversation:
             raise HTTPException(
@@ -0,0 +1,118 @@
+"""
+Rotas de diagnóstico (somente administradores)
+
+/debug/profile roda o profiler por amostragem em todas as threads do
+processo (event loop, pool do STT, threads do aiosqlite) sem reiniciar o
+worker. /debug/loop-blockers lista os pontos de chamada que o watchdog viu
+bloqueando o event loop. Desabilitado enquanto debug_admin_token não estiver
+configurado.
+"""
+import asyncio
+import hmac
+import threading
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException, Query
+from fastapi.responses import JSONResponse, PlainTextResponse
+from loguru import logger
+
+from backend.config import settings
+from backend.services.observability import LoopBlockingWatchdog
+from backend.services.observability.profiler import profile_process
+
+router = APIRouter(prefix="/debug", tags=["debug"])
+
+# Instâncias dos serviços (serão inicializadas no startup)
+loop_watchdog: Optional[LoopBlockingWatchdog] = None
+
+
+def init_debug_services(watchdog=None):
+    """Inicializa serviços de diagnóstico"""
+    global loop_watchdog
+    loop_watchdog = watchdog if isinstance(watchdog, LoopBlockingWatchdog) else None
+
+
+def _require_admin(token: Optional[str]):
+    """Valida o token de administrador (404 se o recurso estiver desabilitado)"""
+    if not settings.debug_admin_token:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not token or not hmac.compare_digest(token, settings.debug_admin_token):
+        raise HTTPException(status_code=403, detail="Token de administrador inválido")
+
+
+@router.get("/profile")
+async def profile(
+    seconds: float = Query(10.0, gt=0, description="Duração da amostragem"),
+    interval_ms: float = Query(5.0, ge=1, le=100, description="Intervalo entre amostras"),
+    threshold_ms: float = Query(50.0, ge=1, description="Bloqueio mínimo do loop reportado"),
+    format: str = Query("collapsed", pattern="^(collapsed|json)$", description="collapsed ou json"),
+    x_admin_token: Optional[str] = Header(None)
+):
+    """
+    Profiling por amostragem de todas as threads por N segundos
+
+    Args:
+        seconds: Duração (limitada por debug_profile_max_seconds)
+        interval_ms: Intervalo entre amostras
+        threshold_ms: Duração mínima de um bloqueio do event loop no relatório
+        format: collapsed (arquivo para flamegraph.pl/speedscope) ou json
+            (pilhas + corrotinas que mais bloquearam o loop)
+
+    Returns:
+        Pilhas no formato collapsed ou JSON com o relatório de bloqueios
+    """
+    _require_admin(x_admin_token)
+    seconds = min(seconds, settings.debug_profile_max_seconds)
+    loop_thread_id = threading.get_ident()
+
+    logger.info(f"🔬 Profiling iniciado: {seconds}s, intervalo {interval_ms}ms")
+    started, result = await asyncio.to_thread(
+        profile_process,
+        seconds,
+        loop_thread_id,
+        interval_ms / 1000,
+        threshold_ms / 1000
+    )
+    if not started:
+        raise HTTPException(status_code=409, detail="Já existe um profiling em andamento")
+
+    logger.info(
+        f"🔬 Profiling concluído: {result.samples} amostras, "
+        f"{len(result.loop_blocking)} corrotinas bloqueando o loop acima de {threshold_ms}ms"
+    )
+    if format == "json":
+        return JSONResponse(result.to_dict())
+    return PlainTextResponse(
+        result.collapsed(),
+        headers={
+            "Content-Disposition": 'attachment; filename="profile.folded"',
+            "X-Profile-Samples": str(result.samples)
+        }
+    )
+
+
+@router.get("/loop-blockers")
+async def loop_blockers(
+    top: int = Query(20, ge=1, le=200, description="Quantidade de pontos de chamada"),
+    x_admin_token: Optional[str] = Header(None)
+):
+    """
+    Pontos de chamada que mais bloquearam o event loop desde o início (ou reset)
+
+    Returns:
+        Ofensores agregados por ponto de chamada, com a pilha do pior episódio
+    """
+    _require_admin(x_admin_token)
+    if not loop_watchdog:
+        raise HTTPException(status_code=503, detail="Watchdog do event loop desabilitado")
+    return loop_watchdog.get_report(top)
+
+
+@router.post("/loop-blockers/reset")
+async def reset_loop_blockers(x_admin_token: Optional[str] = Header(None)):
+    """Zera o relatório de bloqueios (ex.: após um deploy com correções)"""
+    _require_admin(x_admin_token)
+    if not loop_watchdog:
+        raise HTTPException(status_code=503, detail="Watchdog do event loop desabilitado")
+    loop_watchdog.reset()
+    return {"status": "ok"}
@@ -1,5 +1,4 @@
 """Rotas para monitoramento e análise de erros"""
-from .errors import router, init_error_services
-
-__all__ = ["router", "init_error_services"]
+from .errors import router, init_error_services, start_error_services, stop_error_services
 
+__all__ = ["router", "init_error_services", "start_error_services", "stop_error_services"]
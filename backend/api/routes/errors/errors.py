@@ -3,11 +3,18 @@ from fastapi import APIRouter, HTTPException, Query
 from typing import Optional
 from loguru import logger
 
-from backend.services.error_analysis import ErrorAnalysisService
+from backend.services.error_analysis import (
+    ErrorAnalysisService,
+    ErrorTrendEngine,
+    compute_fingerprint,
+    message_template
+)
 from backend.database.database import Database
-from .models import ErrorReportRequest
+from backend.config import settings
+from .models import ErrorReportRequest, ErrorBatchRequest
 from .handlers import (
     handle_report_error,
+    handle_report_errors_batch,
     handle_get_analytics,
     handle_get_error,
     handle_resolve_error,
@@ -20,13 +27,40 @@ router = APIRouter(prefix="/api/errors", tags=["errors"])
 # Instâncias dos serviços (serão inicializadas no main.py)
 database: Optional[Database] = None
 error_analysis_service: Optional[ErrorAnalysisService] = None
+trend_engine: Optional[ErrorTrendEngine] = None
 
 
 def init_error_services(db: Database):
     """Inicializa serviços de erro"""
-    global database, error_analysis_service
+    global database, error_analysis_service, trend_engine
     database = db
     error_analysis_service = ErrorAnalysisService()
+    trend_engine = ErrorTrendEngine(
+        minute_buckets=settings.error_trend_minute_buckets,
+        hour_buckets=settings.error_trend_hour_buckets,
+        alpha=settings.error_trend_alpha,
+        spike_factor=settings.error_trend_spike_factor,
+        spike_min_count=settings.error_trend_spike_min_count,
+        flush_interval=settings.error_trend_flush_interval
+    )
+
+
+async def start_error_services():
+    """Calcula fingerprints pendentes e inicia o motor de tendências (chamar no startup)"""
+    if not database:
+        return
+    try:
+        await database.backfill_error_fingerprints(compute_fingerprint, message_template)
+    except Exception as e:
+        logger.warning(f"⚠️ Erro ao calcular fingerprints de erros antigos: {e}")
+    if trend_engine:
+        await trend_engine.start(database)
+
+
+async def stop_error_services():
+    """Grava contadores pendentes do motor de tendências (chamar no shutdown)"""
+    if trend_engine:
+        await trend_engine.stop()
 
 
 @router.post("/report")
@@ -36,7 +70,7 @@ async def report_error(request: ErrorReportRequest):
         raise HTTPException(status_code=503, detail="Error services não inicializados")
     
     try:
-        return await handle_report_error(request, database, error_analysis_service)
+        return await handle_report_error(request, database, error_analysis_service, trend_engine)
     except HTTPException:
         raise
     except Exception as e:
@@ -44,13 +78,27 @@ async def report_error(request: ErrorReportRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/report/batch")
+async def report_errors_batch(request: ErrorBatchRequest):
+    """Recebe lote de erros do mobile (inseridos em uma única transação)"""
+    if not database or not error_analysis_service:
+        raise HTTPException(status_code=503, detail="Error services não inicializados")
+    
+    try:
+        return await handle_report_errors_batch(request, database, error_analysis_service, trend_engine)
+    except Exception as e:
+        logger.error(f"Erro ao processar lote de erros: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/analytics")
 async def get_error_analytics(
     error_type: Optional[str] = Query(None, description="Filtrar por tipo"),
     level: Optional[str] = Query(None, description="Filtrar por nível"),
     resolved: Optional[bool] = Query(None, description="Filtrar por status"),
     limit: int = Query(100, description="Limite de resultados"),
-    offset: int = Query(0, description="Offset para paginação")
+    offset: int = Query(0, description="Offset para paginação"),
+    window_minutes: int = Query(60, ge=1, le=2880, description="Janela de comparação das tendências")
 ):
     """Obtém analytics e estatísticas de erros"""
     if not database or not error_analysis_service:
@@ -64,7 +112,9 @@ async def get_error_analytics(
             level,
             resolved,
             limit,
-            offset
+            offset,
+            trend_engine,
+            window_minutes * 60
         )
     except Exception as e:
         logger.error(f"Erro ao obter analytics: {e}")
@@ -90,7 +140,8 @@ async def list_errors(
     level: Optional[str] = Query(None, description="Filtrar por nível"),
     resolved: Optional[bool] = Query(None, description="Filtrar por status"),
     limit: int = Query(100, description="Limite de resultados"),
-    offset: int = Query(0, description="Offset para paginação")
+    offset: int = Query(0, description="Offset para paginação"),
+    fingerprint: Optional[str] = Query(None, description="Filtrar por fingerprint (grupo)")
 ):
     """Lista erros com filtros"""
     if not database:
@@ -103,7 +154,8 @@ async def list_errors(
             level,
             resolved,
             limit,
-            offset
+            offset,
+            fingerprint
         )
     except Exception as e:
         logger.error(f"Erro ao listar erros: {e}")
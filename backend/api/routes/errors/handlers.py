@@ -1,19 +1,24 @@
 """Handlers para rotas de erros"""
 from fastapi import HTTPException
 from fastapi.responses import JSONResponse
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
 from loguru import logger
 import uuid
 
-from backend.services.error_analysis import ErrorAnalysisService
+from backend.services.error_analysis import ErrorAnalysisService, ErrorTrendEngine
 from backend.database.database import Database
-from .models import ErrorReportRequest
+from .models import ErrorReportRequest, ErrorBatchRequest
+
+
+VALID_LEVELS = ["error", "warning", "critical"]
+VALID_TYPES = ["network", "audio", "permission", "crash", "other"]
 
 
 async def handle_report_error(
     request: ErrorReportRequest,
     database: Database,
-    error_analysis_service: ErrorAnalysisService
+    error_analysis_service: ErrorAnalysisService,
+    trend_engine: Optional[ErrorTrendEngine] = None
 ) -> JSONResponse:
     """
     Processa reporte de erro
@@ -22,37 +27,18 @@ async def handle_report_error(
         request: Dados do erro
         database: Instância do banco de dados
         error_analysis_service: Serviço de análise
+        trend_engine: Motor de tendências (opcional)
         
     Returns:
         Resposta JSON com error_id e soluções
     """
-    # Valida nível
-    if request.level not in ["error", "warning", "critical"]:
-        raise HTTPException(
-            status_code=400,
-            detail="Level deve ser 'error', 'warning' ou 'critical'"
-        )
-    
-    # Valida tipo
-    valid_types = ["network", "audio", "permission", "crash", "other"]
-    if request.type not in valid_types:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Type deve ser um de: {', '.join(valid_types)}"
-        )
-    
-    # Gera ID único
-    error_id = str(uuid.uuid4())
-    
-    # Analisa erro e gera soluções
-    solutions = error_analysis_service.analyze_error(
-        error_type=request.type,
-        message=request.message,
-        stack_trace=request.stack_trace,
-        context=request.context
-    )
+    # Valida nível e tipo
+    validation_error = _validate_report(request)
+    if validation_error:
+        raise HTTPException(status_code=400, detail=validation_error)
     
-    suggested_solution = "\n".join(solutions) if solutions else None
+    record, solutions = _build_error_record(request, error_analysis_service)
+    error_id = record["error_id"]
     
     # Salva no banco
     error_row_id = await database.save_error(
@@ -63,15 +49,21 @@ async def handle_report_error(
         stack_trace=request.stack_trace,
         device_info=request.device_info,
         context=request.context,
-        suggested_solution=suggested_solution
+        suggested_solution=record["suggested_solution"],
+        fingerprint=record["fingerprint"],
+        template=record["template"]
     )
     
+    if trend_engine:
+        trend_engine.record(record["fingerprint"], request.type)
+    
     logger.info(f"Erro reportado: {error_id} ({request.type}) - {request.message[:50]}")
     
     return JSONResponse({
         "success": True,
         "error_id": error_id,
         "error_row_id": error_row_id,
+        "fingerprint": record["fingerprint"],
         "suggested_solutions": solutions,
         "severity": error_analysis_service.get_error_severity(
             request.type,
@@ -80,6 +72,86 @@ async def handle_report_error(
     })
 
 
+def _validate_report(request: ErrorReportRequest) -> Optional[str]:
+    """Retorna mensagem de validação ou None se o reporte for válido"""
+    if request.level not in VALID_LEVELS:
+        return "Level deve ser 'error', 'warning' ou 'critical'"
+    if request.type not in VALID_TYPES:
+        return f"Type deve ser um de: {', '.join(VALID_TYPES)}"
+    return None
+
+
+def _build_error_record(
+    request: ErrorReportRequest,
+    error_analysis_service: ErrorAnalysisService
+) -> Tuple[Dict[str, Any], List[str]]:
+    """Monta o registro do erro (ID, fingerprint, soluções) para persistência"""
+    solutions = error_analysis_service.analyze_error(
+        error_type=request.type,
+        message=request.message,
+        stack_trace=request.stack_trace,
+        context=request.context
+    )
+    record = {
+        "error_id": str(uuid.uuid4()),
+        "level": request.level,
+        "type": request.type,
+        "message": request.message,
+        "stack_trace": request.stack_trace,
+        "device_info": request.device_info,
+        "context": request.context,
+        "suggested_solution": "\n".join(solutions) if solutions else None,
+        "fingerprint": error_analysis_service.fingerprint(request.type, request.message),
+        "template": error_analysis_service.message_template(request.message)
+    }
+    return record, solutions
+
+
+async def handle_report_errors_batch(
+    request: ErrorBatchRequest,
+    database: Database,
+    error_analysis_service: ErrorAnalysisService,
+    trend_engine: Optional[ErrorTrendEngine] = None
+) -> JSONResponse:
+    """
+    Processa reporte de erros em lote (uma transação para todo o lote)
+    
+    Args:
+        request: Lote de erros
+        database: Instância do banco de dados
+        error_analysis_service: Serviço de análise
+        trend_engine: Motor de tendências (opcional)
+        
+    Returns:
+        Resposta JSON com IDs aceitos e itens rejeitados
+    """
+    records = []
+    accepted = []
+    rejected = []
+    for index, item in enumerate(request.errors):
+        validation_error = _validate_report(item)
+        if validation_error:
+            rejected.append({"index": index, "detail": validation_error})
+            continue
+        record, _ = _build_error_record(item, error_analysis_service)
+        records.append(record)
+        accepted.append({"index": index, "error_id": record["error_id"], "fingerprint": record["fingerprint"]})
+    
+    inserted = await database.save_errors(records)
+    if trend_engine:
+        for record in records:
+            trend_engine.record(record["fingerprint"], record["type"])
+    
+    logger.info(f"Lote de erros reportado: {inserted} aceitos, {len(rejected)} rejeitados")
+    
+    return JSONResponse({
+        "success": True,
+        "accepted": accepted,
+        "rejected": rejected,
+        "inserted": inserted
+    })
+
+
 async def handle_get_analytics(
     database: Database,
     error_analysis_service: ErrorAnalysisService,
@@ -87,7 +159,9 @@ async def handle_get_analytics(
     level: Optional[str] = None,
     resolved: Optional[bool] = None,
     limit: int = 100,
-    offset: int = 0
+    offset: int = 0,
+    trend_engine: Optional[ErrorTrendEngine] = None,
+    window_seconds: int = 3600
 ) -> JSONResponse:
     """
     Obtém analytics de erros
@@ -100,6 +174,8 @@ async def handle_get_analytics(
         resolved: Filtrar por status
         limit: Limite de resultados
         offset: Offset para paginação
+        trend_engine: Motor de tendências (sem ele, tendência da página listada)
+        window_seconds: Janela de comparação das tendências
         
     Returns:
         Resposta JSON com estatísticas e erros
@@ -116,11 +192,14 @@ async def handle_get_analytics(
         offset=offset
     )
     
-    # Agrupa erros similares
-    grouped_errors = error_analysis_service.group_similar_errors(errors)
+    # Grupos por fingerprint (contadores agregados no banco)
+    error_groups = await database.get_error_groups(error_type=error_type)
     
-    # Analisa tendências
-    trends = error_analysis_service.get_error_trends(errors)
+    # Tendências e picos a partir dos contadores em memória (O(buckets))
+    if trend_engine:
+        trends = trend_engine.get_overview(window_seconds=window_seconds)
+    else:
+        trends = error_analysis_service.get_error_trends(errors)
     
     return JSONResponse({
         "success": True,
@@ -128,8 +207,9 @@ async def handle_get_analytics(
         "trends": trends,
         "errors": errors,
         "grouped_errors": {
-            key: len(group) for key, group in grouped_errors.items()
+            group["fingerprint"]: group["count"] for group in error_groups
         },
+        "error_groups": error_groups,
         "total": len(errors)
     })
 
@@ -212,7 +292,8 @@ async def handle_list_errors(
     level: Optional[str] = None,
     resolved: Optional[bool] = None,
     limit: int = 100,
-    offset: int = 0
+    offset: int = 0,
+    fingerprint: Optional[str] = None
 ) -> JSONResponse:
     """
     Lista erros com filtros
@@ -224,6 +305,7 @@ async def handle_list_errors(
         resolved: Filtrar por status
         limit: Limite de resultados
         offset: Offset para paginação
+        fingerprint: Filtrar por fingerprint (grupo)
         
     Returns:
         Resposta JSON com lista de erros
@@ -233,7 +315,8 @@ async def handle_list_errors(
         level=level,
         resolved=resolved,
         limit=limit,
-        offset=offset
+        offset=offset,
+        fingerprint=fingerprint
     )
     
     return JSONResponse({
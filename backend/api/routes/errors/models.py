@@ -1,6 +1,6 @@
 """Modelos Pydantic para rotas de erros"""
-from typing import Optional, Dict, Any
-from pydantic import BaseModel
+from typing import Optional, Dict, Any, List
+from pydantic import BaseModel, Field
 
 
 class ErrorReportRequest(BaseModel):
@@ -12,3 +12,8 @@ class ErrorReportRequest(BaseModel):
     device_info: Optional[Dict[str, Any]] = None
     context: Optional[Dict[str, Any]] = None
 
+
+
+class ErrorBatchRequest(BaseModel):
+    """Modelo de requisição de reporte de erros em lote"""
+    errors: List[ErrorReportRequest] = Field(..., min_length=1, max_length=500)
@@ -1,12 +1,17 @@
 """
 Rotas de health check
+
+Os status das dependências vêm do HealthMonitor (probes em background),
+então /health, /health/live e /health/ready respondem instantaneamente.
+O estado do warmup de cada componente pesado aparece em "componentes".
 """
 from datetime import datetime
 from fastapi import APIRouter
-from loguru import logger
-from typing import Optional, Any
+from fastapi.responses import JSONResponse
+from typing import Optional
 
 from backend.config import settings
+from backend.services.health import HealthMonitor, probe_stt, probe_llm, probe_tts, ONLINE
 
 router = APIRouter(tags=["health"])
 
@@ -18,12 +23,15 @@ context_manager = None
 plugin_manager = None
 memory_service = None
 response_cache = None
+warmup_manager = None
+health_monitor: Optional[HealthMonitor] = None
 
 
-def init_health_services(stt, llm, tts, ctx, plugins=None, memory=None, cache=None):
-    """Inicializa serviços para health check"""
+def init_health_services(stt, llm, tts, ctx, plugins=None, memory=None, cache=None, warmup=None):
+    """Inicializa serviços para health check e registra os probes"""
     global stt_service, llm_service, tts_service, context_manager
-    global plugin_manager, memory_service, response_cache
+    global plugin_manager, memory_service, response_cache, warmup_manager, health_monitor
+    warmup_manager = warmup
     stt_service = stt
     llm_service = llm
     tts_service = tts
@@ -32,56 +40,117 @@ def init_health_services(stt, llm, tts, ctx, plugins=None, memory=None, cache=No
     memory_service = memory
     response_cache = cache
 
+    health_monitor = HealthMonitor(
+        interval=settings.health_probe_interval,
+        timeout=settings.health_probe_timeout
+    )
+    health_monitor.register("stt", lambda: probe_stt(stt_service), critical=True)
+    health_monitor.register(
+        "llm",
+        lambda: probe_llm(llm_service),
+        critical=True,
+        interval=settings.health_probe_llm_interval
+    )
+    health_monitor.register("tts", lambda: probe_tts(tts_service))
+
+
+async def start_health_monitor():
+    """Inicia os probes em background (chamar no startup)"""
+    if health_monitor:
+        await health_monitor.start()
+
+
+async def stop_health_monitor():
+    """Encerra os probes em background (chamar no shutdown)"""
+    if health_monitor:
+        await health_monitor.stop()
+
+
+def _cached_status(name: str) -> str:
+    """Status em cache de uma dependência (offline se monitor não iniciado)"""
+    if not health_monitor:
+        return "offline"
+    status = health_monitor.get_status(name)
+    return "offline" if status == "unknown" else status
+
+
+def _warmup_snapshot() -> dict:
+    """Estado do warmup por componente (vazio se não houver warmup)"""
+    return warmup_manager.snapshot() if warmup_manager else {}
+
+
+@router.get("/health/live")
+async def liveness():
+    """
+    Liveness probe
+
+    Indica apenas que o processo está respondendo (não verifica dependências)
+    """
+    return {
+        "status": "alive",
+        "uptime_seconds": health_monitor.uptime_seconds() if health_monitor else None,
+        "timestamp": datetime.now().isoformat()
+    }
+
+
+@router.get("/health/ready")
+async def readiness():
+    """
+    Readiness probe
+
+    Retorna 200 se as dependências críticas (STT, LLM) estão prontas
+    segundo o último probe em cache, ou 503 caso contrário. Componentes
+    ainda em warmup não impedem o tráfego de texto
+    """
+    ready = bool(health_monitor and health_monitor.is_ready())
+    content = {
+        "ready": ready,
+        "servicos": health_monitor.snapshot(include_histogram=False) if health_monitor else {},
+        "componentes": _warmup_snapshot(),
+        "timestamp": datetime.now().isoformat()
+    }
+    return JSONResponse(status_code=200 if ready else 503, content=content)
+
+
+@router.get("/health/probes")
+async def probes_detail():
+    """
+    Detalhes dos probes em cache com histogramas de latência por dependência
+    """
+    if not health_monitor:
+        return {"servicos": {}}
+    return {
+        "intervalo_segundos": health_monitor.interval,
+        "timeout_segundos": health_monitor.timeout,
+        "servicos": health_monitor.snapshot()
+    }
+
 
 @router.get("/health")
 async def health_check():
     """
     Health check da aplicação
-    
+
     Verifica status de todos os serviços, plugins e componentes
+    (status das dependências lidos do cache dos probes)
     """
     servicos_status = {
-        "stt": "offline",
-        "llm": "offline",
-        "tts": "offline",
-        "context": "offline"
+        "stt": _cached_status("stt"),
+        "llm": _cached_status("llm"),
+        "tts": _cached_status("tts"),
+        "context": "online" if context_manager else "offline"
     }
-    
-    # Verifica STT
-    try:
-        if stt_service and stt_service.is_ready():
-            servicos_status["stt"] = "online"
-    except Exception as e:
-        logger.error(f"STT health check falhou: {e}")
-    
-    # Verifica LLM
-    try:
-        if llm_service and llm_service.is_ready():
-            servicos_status["llm"] = "online"
-            llm_provider = getattr(llm_service, 'provider', 'unknown')
-            llm_model = getattr(llm_service, 'model', 'unknown')
-        else:
-            llm_provider = None
-            llm_model = None
-    except Exception as e:
-        logger.error(f"LLM health check falhou: {e}")
-        llm_provider = None
-        llm_model = None
-    
-    # Verifica TTS
-    try:
-        if tts_service and tts_service.is_ready():
-            servicos_status["tts"] = "online"
-    except Exception as e:
-        logger.error(f"TTS health check falhou: {e}")
-    
-    # Verifica Context Manager
+
+    llm_model = None
+    if servicos_status["llm"] == ONLINE:
+        llm_model = getattr(llm_service, 'model', 'unknown')
+
+    # Sessões ativas
     if context_manager:
-        servicos_status["context"] = "online"
         active_sessions = len(getattr(context_manager, 'sessions', {}))
     else:
         active_sessions = 0
-    
+
     # Verifica Plugins
     plugins_info = {}
     if plugin_manager:
@@ -90,7 +159,7 @@ async def health_check():
             "plugins": plugin_manager.list_plugins(),
             "tools": len(plugin_manager.get_tool_definitions())
         }
-    
+
     # Verifica Memory Service
     memory_info = {}
     if memory_service:
@@ -102,7 +171,7 @@ async def health_check():
             }
         except:
             memory_info = {"enabled": True}
-    
+
     # Verifica Response Cache
     cache_info = {}
     if response_cache:
@@ -115,24 +184,22 @@ async def health_check():
             }
         except:
             cache_info = {"enabled": True}
-    
+
     # Determina status geral (crítico se STT ou LLM offline)
-    critical_services_online = (
-        servicos_status.get("stt") == "online" and
-        servicos_status.get("llm") == "online"
-    )
-    
+    critical_services_online = bool(health_monitor and health_monitor.is_ready())
+
     if critical_services_online and servicos_status.get("tts") == "online":
         status_geral = "healthy"
     elif critical_services_online:
         status_geral = "degraded"  # TTS offline mas críticos online
     else:
         status_geral = "unhealthy"  # STT ou LLM offline
-    
+
     return {
         "status": status_geral,
         "versao": "1.0.0",
         "servicos": servicos_status,
+        "componentes": _warmup_snapshot(),
         "timestamp": datetime.now().isoformat(),
         "configuracao": {
             "llm_provider": settings.llm_provider,
@@ -146,4 +213,3 @@ async def health_check():
         "cache": cache_info,
         "sessoes_ativas": active_sessions
     }
-
@@ -0,0 +1,163 @@
+"""
+Endpoint /metrics no formato texto do Prometheus
+
+Expõe os histogramas por etapa (spans), o atraso do event loop e gauges
+lidos sob demanda dos serviços: profundidade de filas e hit rate dos caches.
+"""
+from typing import Dict, Iterable, Optional, Tuple
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import PlainTextResponse
+from loguru import logger
+
+from backend.config import settings
+from backend.services.background_queue import BACKGROUND_JOB_DURATION, BACKGROUND_JOBS, get_background_queue
+from backend.services.conversation_log import CONVERSATION_LOG_FLUSH_ERRORS, CONVERSATION_LOG_RECORDS
+from backend.services.observability import (
+    EventLoopLagMonitor,
+    LoopBlockingWatchdog,
+    get_metrics_registry,
+    LOOP_BLOCK_DURATION,
+    LOOP_BLOCKS,
+    LOOP_LAG,
+    STAGE_DURATION,
+    STAGE_ERRORS,
+)
+
+router = APIRouter(tags=["metrics"])
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Instâncias dos serviços (serão inicializadas no startup)
+database = None
+context_manager = None
+response_cache = None
+embedding_service = None
+tts_service = None
+stt_service = None
+feedback_service = None
+loop_lag_monitor: Optional[EventLoopLagMonitor] = None
+_collector_registered = False
+
+Gauge = Tuple[str, Dict[str, str], float]
+
+
+def init_metrics_services(db=None, ctx=None, cache=None, embeddings=None, tts=None, stt=None, feedback=None):
+    """Inicializa serviços lidos pelo /metrics e registra os coletores"""
+    global database, context_manager, response_cache, embedding_service, tts_service, stt_service, feedback_service
+    global loop_lag_monitor, _collector_registered
+    database = db
+    context_manager = ctx
+    response_cache = cache
+    embedding_service = embeddings
+    tts_service = tts
+    stt_service = stt
+    feedback_service = feedback
+
+    registry = get_metrics_registry()
+    registry.describe(STAGE_DURATION, "Duração de cada etapa do pipeline (spans)")
+    registry.describe(STAGE_ERRORS, "Etapas que terminaram com exceção")
+    registry.describe(LOOP_LAG, "Atraso do event loop em relação ao intervalo de amostragem")
+    registry.describe(LOOP_BLOCKS, "Bloqueios do event loop acima do limite, por ponto de chamada")
+    registry.describe(LOOP_BLOCK_DURATION, "Duração dos bloqueios do event loop acima do limite")
+    registry.describe("jonh_stt_cascade_total", "Transcrições por rota da cascata Whisper (fast, escalated, direct)")
+    registry.describe("jonh_stt_escalations_total", "Escaladas do modelo rápido para o principal, por motivo")
+    registry.describe("jonh_stt_escalation_ratio", "Fração das transcrições em cascata escaladas para o modelo principal")
+    registry.describe("jonh_stt_batch_avg_size", "Tamanho médio dos lotes de transcrição")
+    registry.describe("jonh_cache_hit_ratio", "Fração de consultas atendidas pelo cache")
+    registry.describe("jonh_cache_entries", "Entradas armazenadas no cache")
+    registry.describe("jonh_queue_depth", "Itens aguardando em filas internas")
+    registry.describe("jonh_db_readers_busy", "Conexões de leitura emprestadas no momento")
+    registry.describe(BACKGROUND_JOBS, "Jobs da fila de background por resultado (ok, retried, failed, dropped)")
+    registry.describe(BACKGROUND_JOB_DURATION, "Duração de cada tentativa dos jobs em background")
+    registry.describe(CONVERSATION_LOG_RECORDS, "Conversas do log de treinamento por resultado (written, dropped)")
+    registry.describe(CONVERSATION_LOG_FLUSH_ERRORS, "Lotes do log de conversas que falharam ao gravar")
+    if not _collector_registered:
+        registry.register_collector(_collect_service_gauges)
+        _collector_registered = True
+
+    if settings.loop_watchdog_enabled:
+        loop_lag_monitor = LoopBlockingWatchdog(
+            interval=settings.loop_watchdog_interval,
+            threshold_ms=settings.loop_watchdog_threshold_ms,
+            registry=registry
+        )
+    else:
+        loop_lag_monitor = EventLoopLagMonitor(interval=settings.event_loop_lag_interval, registry=registry)
+
+
+async def start_metrics():
+    """Inicia o monitor de event loop (chamar no startup)"""
+    if loop_lag_monitor and settings.metrics_enabled:
+        loop_lag_monitor.start()
+
+
+async def stop_metrics():
+    """Encerra o monitor de event loop (chamar no shutdown)"""
+    if loop_lag_monitor:
+        await loop_lag_monitor.stop()
+
+
+def _cache_gauges(name: str, stats: Dict) -> Iterable[Gauge]:
+    if not stats.get("enabled", True):
+        return
+    if "hit_rate" in stats:
+        yield "jonh_cache_hit_ratio", {"cache": name}, stats["hit_rate"]
+    entries = stats.get("entries", stats.get("current_size"))
+    if entries is not None:
+        yield "jonh_cache_entries", {"cache": name}, entries
+
+
+def _collect_service_gauges() -> Iterable[Gauge]:
+    """Gauges de filas e caches lidos dos serviços no momento da exportação"""
+    if response_cache:
+        yield from _cache_gauges("response", response_cache.get_stats())
+
+    if embedding_service:
+        yield from _cache_gauges("embedding", embedding_service.get_cache_stats())
+        batcher = embedding_service.get_batcher_stats()
+        if batcher.get("enabled"):
+            yield "jonh_queue_depth", {"queue": "embedding_batch"}, batcher["queue_depth"]
+
+    if stt_service and hasattr(stt_service, "get_batcher_stats"):
+        batcher = stt_service.get_batcher_stats()
+        if batcher.get("enabled"):
+            yield "jonh_queue_depth", {"queue": "stt_batch"}, batcher["queue_depth"]
+            yield "jonh_stt_batch_avg_size", {}, batcher["avg_batch_size"]
+
+    phrase_store = getattr(tts_service, "phrase_store", None)
+    if phrase_store:
+        yield from _cache_gauges("tts_phrase", phrase_store.get_stats())
+
+    if database:
+        pool = database.get_pool_stats()
+        yield "jonh_queue_depth", {"queue": "db_write"}, pool["write_waiters"]
+        yield "jonh_db_readers_busy", {}, pool["readers_busy"]
+
+    summarizer = getattr(context_manager, "summarizer", None)
+    if summarizer:
+        yield "jonh_queue_depth", {"queue": "summarizer"}, summarizer.get_stats()["active_tasks"]
+
+    yield "jonh_queue_depth", {"queue": "background"}, get_background_queue().get_stats()["queue_depth"]
+
+    conversation_log = getattr(feedback_service, "conversation_log", None)
+    if conversation_log:
+        yield "jonh_queue_depth", {"queue": "conversation_log"}, conversation_log.get_stats()["buffered"]
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """
+    Métricas no formato texto do Prometheus
+
+    Returns:
+        Histogramas por etapa, atraso do event loop, filas e caches
+    """
+    if not settings.metrics_enabled:
+        raise HTTPException(status_code=404, detail="Métricas desabilitadas")
+    try:
+        content = get_metrics_registry().render_prometheus()
+    except Exception as e:
+        logger.error(f"Erro ao exportar métricas: {e}")
+        raise HTTPException(status_code=500, detail="Erro ao exportar métricas")
+    return PlainTextResponse(content, media_type=PROMETHEUS_CONTENT_TYPE)
@@ -34,6 +34,9 @@ class PrivacyStatusResponse(BaseModel):
     ollama_available: bool
     active_service_available: bool
     message: str
+    router: Optional[dict] = None
+    groq_circuit: Optional[dict] = None
+    groq_budget: Optional[dict] = None
 
 
 @router.post("/privacy-mode", response_model=dict)
@@ -108,7 +111,10 @@ async def get_privacy_status():
             groq_available=status["groq_available"],
             ollama_available=status["ollama_available"],
             active_service_available=status["active_service_available"],
-            message=message
+            message=message,
+            router=status.get("router"),
+            groq_circuit=status.get("groq_circuit"),
+            groq_budget=status.get("groq_budget")
         )
     except Exception as e:
         logger.error(f"Erro ao obter status de privacidade: {e}")
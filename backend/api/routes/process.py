@@ -10,7 +10,7 @@ from slowapi import Limiter
 from slowapi.util import get_remote_address
 
 from backend.api.middleware.rate_limit import get_rate_limit
-from backend.api.validators.audio_validator import validate_audio
+from backend.api.utils.audio_upload import read_audio_upload
 
 from backend.services import (
     WhisperSTTService,
@@ -66,7 +66,7 @@ def init_services(stt, llm, tts, ctx, memory=None, web_search=None, intent_detec
         intent_detector_instance: Instância do IntentDetector
         feedback_service_instance: Instância do FeedbackService
     """
-    global stt_service, llm_service, tts_service, context_manager, memory_service, plugin_manager, web_search_tool, intent_detector, feedback_service, reward_model_service, rlhf_service, response_cache, privacy_mode_service
+    global stt_service, llm_service, tts_service, context_manager, memory_service, plugin_manager, web_search_tool, intent_detector, feedback_service, response_cache, privacy_mode_service
     stt_service = stt
     llm_service = llm
     tts_service = tts
@@ -90,31 +90,41 @@ def init_services(stt, llm, tts, ctx, memory=None, web_search=None, intent_detec
         plugin_manager = None
         web_search_tool = web_search
     
-    # Inicializa modelo de recompensa e RLHF (opcional)
-    if settings.rlhf_enabled:
-        try:
-            from backend.services.reward_model_service import RewardModelService
-            from backend.services.rlhf_service import RLHFService
-            from pathlib import Path
-            
-            reward_model_path = settings.reward_model_path
-            if reward_model_path and Path(reward_model_path).exists():
-                logger.info(f"Carregando modelo de recompensa de: {reward_model_path}")
-                reward_model_service = RewardModelService()
-                reward_model_service.load_model(reward_model_path)
-                rlhf_service = RLHFService(reward_model_path=reward_model_path)
-                logger.info("✅ Modelo de recompensa e RLHF inicializados")
-            else:
-                logger.info("Modelo de recompensa não encontrado - RLHF desabilitado até treinamento")
-                reward_model_service = None
-                rlhf_service = None
-        except Exception as e:
-            logger.warning(f"Erro ao inicializar RLHF: {e} - continuando sem RLHF")
-            reward_model_service = None
-            rlhf_service = None
-    else:
-        reward_model_service = None
-        rlhf_service = None
+    # Modelo de recompensa e RLHF (torch/transformers) carregam no warmup:
+    # load_rlhf_services() roda em background após o startup
+
+
+def load_rlhf_services():
+    """
+    Carrega modelo de recompensa e RLHF (opcional; bloqueante, rodar em thread)
+    
+    Returns:
+        False se o RLHF está desabilitado ou sem modelo treinado
+    """
+    global reward_model_service, rlhf_service
+    
+    if not settings.rlhf_enabled:
+        return False
+    try:
+        from backend.services.reward_model_service import RewardModelService
+        from backend.services.rlhf_service import RLHFService
+        from pathlib import Path
+        
+        reward_model_path = settings.reward_model_path
+        if reward_model_path and Path(reward_model_path).exists():
+            logger.info(f"Carregando modelo de recompensa de: {reward_model_path}")
+            reward_model = RewardModelService()
+            reward_model.load_model(reward_model_path)
+            rlhf_service = RLHFService(reward_model_path=reward_model_path)
+            reward_model_service = reward_model
+            logger.info("✅ Modelo de recompensa e RLHF inicializados")
+            return True
+        logger.info("Modelo de recompensa não encontrado - RLHF desabilitado até treinamento")
+    except Exception as e:
+        logger.warning(f"Erro ao inicializar RLHF: {e} - continuando sem RLHF")
+    reward_model_service = None
+    rlhf_service = None
+    return False
 
 
 @router.post("/process_audio")
@@ -136,11 +146,8 @@ async def process_audio(
     try:
         logger.info(f"Processando áudio: {audio.filename}")
         
-        # Lê dados do áudio
-        audio_data = await audio.read()
-        
-        # Valida áudio
-        validate_audio(audio_data, audio.filename)
+        # Lê em streaming, valida e decodifica o áudio
+        audio_data = await read_audio_upload(audio)
         
         # Processa usando handler
         response, session_id, tempo_total = await process_audio_complete(
@@ -183,8 +190,8 @@ async def transcribe_only(
     try:
         logger.info(f"Transcrevendo áudio: {audio.filename}")
         
-        audio_data = await audio.read()
-        texto, confianca, duracao = stt_service.transcribe_audio(audio_data)
+        audio_data = await read_audio_upload(audio)
+        texto, confianca, duracao = await stt_service.transcribe_audio_async(audio_data)
         
         return {
             "texto": texto,
@@ -193,6 +200,8 @@ async def transcribe_only(
             "idioma": "pt"
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Erro na transcrição: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -255,6 +264,8 @@ async def delete_session(session_id: str):
         Confirmação
     """
     await context_manager.delete_session(session_id)
+    if stt_service and hasattr(stt_service, "forget_session"):
+        stt_service.forget_session(session_id)
     return {"message": "Sessão removida com sucesso"}
 
 
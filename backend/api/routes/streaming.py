@@ -5,11 +5,16 @@ from typing import Optional
 from fastapi import APIRouter, Query, HTTPException
 from fastapi.responses import StreamingResponse
 from loguru import logger
+import base64
 import json
+import time
 import asyncio
 
+from backend.config import settings
 from backend.api.handlers.parallel_processor import process_with_parallel_prep
 from backend.api.handlers.response_cache_handler import get_cached_response
+from backend.services.observability.tracing import record_stage
+from backend.services.tts_streaming import SentenceTTSStream, SentenceAudio
 
 router = APIRouter(tags=["streaming"])
 
@@ -22,6 +27,7 @@ web_search_tool = None
 intent_detector = None
 response_cache = None
 privacy_mode_service = None
+tts_service = None
 
 
 def init_services(
@@ -31,10 +37,13 @@ def init_services(
     plugin_mgr=None,
     intent_detector_instance=None,
     response_cache_instance=None,
-    privacy_mode_service_instance=None
+    privacy_mode_service_instance=None,
+    tts_service_instance=None
 ):
     """Inicializa os serviços"""
     global llm_service, context_manager, memory_service, plugin_manager, web_search_tool, intent_detector, response_cache, privacy_mode_service
+    global tts_service
+    tts_service = tts_service_instance
     llm_service = llm
     context_manager = ctx
     memory_service = memory
@@ -56,9 +65,22 @@ def init_services(
         web_search_tool = None
 
 
+def _audio_event(segment: SentenceAudio) -> str:
+    """Formata evento SSE com áudio de uma sentença (WAV em base64)"""
+    payload = {
+        'type': 'audio',
+        'index': segment.index,
+        'text': segment.text,
+        'audio': base64.b64encode(segment.audio).decode('ascii'),
+        'format': 'wav'
+    }
+    return f"data: {json.dumps(payload)}\n\n"
+
+
 async def stream_llm_response(
     texto: str,
-    session_id: Optional[str] = None
+    session_id: Optional[str] = None,
+    with_audio: bool = False
 ):
     """
     Gera stream de resposta do LLM
@@ -66,10 +88,15 @@ async def stream_llm_response(
     Args:
         texto: Texto da pergunta
         session_id: ID da sessão (opcional)
+        with_audio: Se True, sintetiza cada sentença assim que completa
+            e envia eventos 'audio' intercalados com os tokens
         
     Yields:
-        Eventos SSE com tokens de texto
+        Eventos SSE com tokens de texto (e áudio por sentença)
     """
+    tts_stream = None
+    start = time.perf_counter()
+    failed = False
     try:
         # Verifica cache primeiro (não faz streaming de cache)
         if response_cache:
@@ -108,7 +135,16 @@ async def stream_llm_response(
         
         yield f"data: {json.dumps({'type': 'start', 'session_id': session_id})}\n\n"
         
+        if with_audio and tts_service:
+            tts_stream = SentenceTTSStream(
+                tts_service,
+                max_workers=settings.tts_stream_workers,
+                min_chars=settings.tts_stream_min_sentence_chars
+            )
+        
         # Stream de tokens do LLM
+        llm_start = time.perf_counter()
+        first_token = True
         async for token in active_llm.generate_response_stream(
             prompt=texto,
             contexto=contexto,
@@ -117,11 +153,28 @@ async def stream_llm_response(
             tool_executor=None,
             system_prompt_override=None
         ):
+            if first_token:
+                record_stage("llm.first_token", (time.perf_counter() - llm_start) * 1000)
+                first_token = False
             resposta_completa += token
             total_tokens += 1  # Estimativa (não temos contagem exata em streaming)
             
             # Envia token via SSE
             yield f"data: {json.dumps({'type': 'token', 'text': token})}\n\n"
+            
+            # Agenda síntese de sentenças completas e envia as já prontas
+            if tts_stream:
+                tts_stream.feed(token)
+                for segment in tts_stream.pop_ready():
+                    yield _audio_event(segment)
+        
+        record_stage("llm.stream", (time.perf_counter() - llm_start) * 1000)
+        
+        # Sintetiza o restante e aguarda sentenças pendentes
+        if tts_stream:
+            tts_stream.finish()
+            async for segment in tts_stream.drain():
+                yield _audio_event(segment)
         
         # Adiciona resposta completa ao contexto
         await context_manager.add_message(session_id, "assistant", resposta_completa)
@@ -130,14 +183,22 @@ async def stream_llm_response(
         yield f"data: {json.dumps({'type': 'complete', 'text': resposta_completa, 'tokens': total_tokens, 'cached': False})}\n\n"
         
     except Exception as e:
+        failed = True
         logger.error(f"Erro no streaming: {e}")
         yield f"data: {json.dumps({'type': 'error', 'message': str(e)})}\n\n"
+    
+    finally:
+        record_stage("pipeline.stream", (time.perf_counter() - start) * 1000, error=failed)
+        # Cliente desconectou ou erro: não deixa sínteses órfãs
+        if tts_stream:
+            tts_stream.cancel()
 
 
 @router.get("/api/stream_text")
 async def stream_text(
     texto: str = Query(..., description="Texto da pergunta"),
-    session_id: Optional[str] = Query(None, description="ID da sessão")
+    session_id: Optional[str] = Query(None, description="ID da sessão"),
+    tts: bool = Query(False, description="Envia áudio (WAV base64) por sentença")
 ):
     """
     Endpoint para streaming de resposta LLM usando Server-Sent Events (SSE)
@@ -145,6 +206,7 @@ async def stream_text(
     Args:
         texto: Texto da pergunta
         session_id: ID da sessão (opcional)
+        tts: Se True, intercala eventos 'audio' com síntese por sentença
         
     Returns:
         StreamingResponse com eventos SSE
@@ -156,7 +218,7 @@ async def stream_text(
         )
     
     return StreamingResponse(
-        stream_llm_response(texto, session_id),
+        stream_llm_response(texto, session_id, with_audio=tts),
         media_type="text/event-stream",
         headers={
             "Cache-Control": "no-cache",
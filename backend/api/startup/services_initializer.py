@@ -1,5 +1,8 @@
 """
 Inicialização de todos os serviços da aplicação
+
+Só cria os serviços: modelos pesados (Whisper, embeddings, OpenWakeWord) e
+pré-aquecimentos ficam para o warmup em background (api/startup/warmup.py).
 """
 from pathlib import Path
 from typing import Tuple, Optional
@@ -14,8 +17,10 @@ from backend.services import (
 )
 from backend.database.database import Database
 from backend.services.context_manager_db import ContextManagerDB
+from backend.services.conversation_summarizer import ConversationSummarizer
 from backend.services.memory_service import MemoryService
 from backend.services.feedback_service import FeedbackService
+from backend.services.conversation_log import ConversationLog
 from backend.services.cleanup_service import CleanupService
 from backend.core.plugin_manager import PluginManager
 from backend.plugins.web_search_plugin import WebSearchPlugin
@@ -31,6 +36,8 @@ from backend.services.intent_clustering_service import IntentClusteringService
 from backend.api.handlers.response_cache_handler import create_response_cache
 from backend.services.conversation_history_service import ConversationHistoryService
 from backend.services.privacy.privacy_mode_service import PrivacyModeService
+from backend.services.tts_phrase_store import TTSPhraseStore
+from backend.services.stt_session_profile import STTProfileStore
 
 
 async def initialize_all_services(
@@ -68,7 +75,18 @@ async def initialize_all_services(
     stt_service = WhisperSTTService(
         model_size=settings.whisper_model,
         device=settings.whisper_device,
-        compute_type=settings.whisper_compute_type
+        compute_type=settings.whisper_compute_type,
+        fast_model_size=settings.whisper_fast_model if settings.whisper_cascade_enabled else None,
+        cascade_max_duration=settings.whisper_cascade_max_duration,
+        cascade_min_avg_logprob=settings.whisper_cascade_min_avg_logprob,
+        cascade_max_no_speech_prob=settings.whisper_cascade_max_no_speech_prob,
+        batch_max_size=settings.stt_batch_max_size,
+        batch_max_wait_ms=settings.stt_batch_max_wait_ms,
+        profile_store=STTProfileStore(
+            max_sessions=settings.stt_profile_max_sessions,
+            ttl=settings.stt_profile_ttl,
+            prompt_max_chars=settings.stt_profile_prompt_max_chars
+        ) if settings.stt_session_profiles_enabled else None
     )
     
     # 2. LLM Services (cria ambos para PrivacyModeService)
@@ -107,6 +125,10 @@ async def initialize_all_services(
     except Exception as e:
         logger.warning(f"⚠️ Erro ao criar OllamaService: {e}")
     
+    # Fallback de rate limit do Groq reutiliza o cliente Ollama já criado
+    if groq_service and ollama_service:
+        groq_service.set_fallback_service(ollama_service)
+    
     # Cria PrivacyModeService para alternância dinâmica
     privacy_mode_service = PrivacyModeService(
         groq_service=groq_service,
@@ -130,32 +152,32 @@ async def initialize_all_services(
             raise RuntimeError("Nenhum serviço LLM disponível (Groq ou Ollama)")
         logger.warning(f"⚠️ Usando LLM disponível: {type(llm_service).__name__}")
     
+    # Com os dois providers, o roteador escolhe o mais rápido (respeitando o modo privacidade)
+    if privacy_mode_service.router:
+        llm_service = privacy_mode_service.router
+        logger.info("LLM padrão: LLMRouter (Groq/Ollama por latência)")
+    
     # 3. TTS Service (Fase 2 - com processadores profissionais)
+    phrase_store = None
+    if settings.tts_phrase_store_enabled:
+        try:
+            phrase_store = TTSPhraseStore(
+                root_dir=str(base_path / settings.tts_phrase_store_dir),
+                max_bytes=settings.tts_phrase_store_max_mb * 1024 * 1024,
+                model_version=settings.tts_phrase_store_version
+            )
+        except Exception as e:
+            logger.warning(f"⚠️ Phrase store TTS não disponível: {e}")
+    
     tts_service = PiperTTSService(
         enable_cache=True,
         cache_size=100,
-        cache_ttl=3600
+        cache_ttl=3600,
+        phrase_store=phrase_store,
+        phrase_workers=settings.tts_phrase_store_workers
     )
     
-    # Pré-aquece TTS (carrega modelo e cacheia respostas comuns)
-    logger.info("Pré-aquecendo TTS...")
-    try:
-        from backend.services.tts_cache_analyzer import TTSCacheAnalyzer
-        analyzer = TTSCacheAnalyzer()
-        prewarm_phrases = analyzer.get_prewarm_phrases(limit=15)
-        
-        for phrase in prewarm_phrases:
-            try:
-                await tts_service.synthesize(phrase)
-            except Exception as e:
-                logger.debug(f"Erro ao pré-aquecer frase '{phrase[:30]}...': {e}")
-        
-        logger.info(f"✅ TTS pré-aquecido com {len(prewarm_phrases)} frases")
-    except Exception as e:
-        logger.warning(f"Erro ao pré-aquecer TTS: {e}")
-    
-    # 4. Wake Word Service
-    logger.info("Inicializando OpenWakeWord...")
+    # 4. Wake Word Service (modelo carregado no warmup)
     wake_word_service = OpenWakeWordService(
         models=settings.wake_word_models,
         custom_model_paths=settings.wake_word_custom_models,
@@ -163,24 +185,29 @@ async def initialize_all_services(
         threshold=settings.wake_word_threshold
     )
     
-    if wake_word_service.is_ready():
-        loaded_models = wake_word_service.get_loaded_models()
-        logger.info(f"✅ OpenWakeWord inicializado: modelos {loaded_models}")
-    else:
-        logger.warning("⚠️ OpenWakeWord não está pronto (modelo será carregado sob demanda)")
-    
     # 5. Database
     logger.info("Inicializando banco de dados...")
     db_path = str(base_path / "data" / "jonh_assistant.db")
-    database = Database(db_path=db_path)
+    database = Database(db_path=db_path, reader_pool_size=settings.database_reader_pool_size)
     await database.connect()
     logger.info("✅ Banco de dados conectado")
     
+    # Embedding Service (singleton): criado antes do MemoryService, que também
+    # o instancia, para que o modelo fique para o warmup
+    embedding_service = EmbeddingService(load_model=False)
+    
     # 6. Context Manager
+    summarizer = None
+    if settings.summary_enabled:
+        # Resolve o LLM a cada resumo: com o modo privacidade ligado, transcrições não vão ao Groq
+        summarizer = ConversationSummarizer.from_settings(
+            database, llm_service, privacy_mode_service.get_active_llm_service
+        )
     context_manager = ContextManagerDB(
         database=database,
         max_history=10,
-        session_timeout=3600
+        session_timeout=3600,
+        summarizer=summarizer
     )
     
     # 7. Memory Service
@@ -188,7 +215,15 @@ async def initialize_all_services(
     logger.info("✅ Serviço de memória inicializado")
     
     # 8. Feedback Service
-    feedback_service = FeedbackService(database)
+    conversation_log = None
+    if settings.conversation_log_enabled:
+        conversation_log = ConversationLog(
+            database,
+            batch_size=settings.conversation_log_batch_size,
+            flush_interval_ms=settings.conversation_log_flush_interval_ms,
+            max_buffer=settings.conversation_log_max_buffer
+        )
+    feedback_service = FeedbackService(database, conversation_log)
     logger.info("✅ Serviço de feedback inicializado")
     
     # 9. Cleanup Service
@@ -203,11 +238,6 @@ async def initialize_all_services(
     # 11. Plugin Manager (precisa do geocoding_service para LocationPlugin)
     plugin_manager = _initialize_plugins(llm_service, geocoding_service)
     
-    # 11. Embedding Service (para clustering - Fase 4)
-    logger.info("Inicializando serviço de embeddings...")
-    embedding_service = EmbeddingService()
-    logger.info("✅ Serviço de embeddings inicializado")
-    
     # 14. Intent Clustering Service (Fase 4)
     clustering_service = None
     if settings.clustering_enabled:
@@ -223,13 +253,6 @@ async def initialize_all_services(
         clustering_service=clustering_service
     )
     
-    # Carrega cache de clusters se disponível
-    if clustering_service:
-        try:
-            await intent_detector.refresh_clusters_cache()
-        except Exception as e:
-            logger.warning(f"Erro ao carregar cache de clusters: {e}")
-    
     logger.info("✅ Detector de intenção inicializado")
     
     # 14. Conversation History Service
@@ -0,0 +1,195 @@
+"""
+Warmup em background dos componentes pesados
+
+O startup só cria os serviços (sem carregar modelos) e libera o servidor
+para tráfego de texto; Whisper, embeddings, OpenWakeWord, o pré-aquecimento
+do TTS e o cache de clusters carregam em paralelo depois. Cada componente
+expõe seu estado (pending, loading, ready, unavailable, failed) no /health.
+Enquanto um componente não fica pronto, os serviços usam o caminho
+degradado que já existia (ex.: busca por palavras-chave sem embeddings) ou
+carregam sob demanda (Whisper na primeira transcrição).
+"""
+import asyncio
+import inspect
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from loguru import logger
+
+from backend.config import settings
+from backend.services.tts_phrase_store import mine_top_phrases
+
+PENDING = "pending"
+LOADING = "loading"
+READY = "ready"
+UNAVAILABLE = "unavailable"  # Dependência não instalada / recurso desabilitado
+FAILED = "failed"
+
+DONE_STATES = (READY, UNAVAILABLE, FAILED)
+
+
+@dataclass
+class WarmupComponent:
+    """Estado do warmup de um componente"""
+    name: str
+    func: Callable
+    status: str = PENDING
+    started_at: Optional[float] = None
+    duration_ms: Optional[float] = None
+    error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serializa o estado para resposta JSON"""
+        return {
+            "status": self.status,
+            "duration_ms": round(self.duration_ms, 1) if self.duration_ms is not None else None,
+            "error": self.error
+        }
+
+
+class WarmupManager:
+    """Executa o carregamento dos componentes pesados em paralelo, fora do startup"""
+
+    def __init__(self, concurrency: int = 3):
+        """
+        Inicializa o gerenciador
+
+        Args:
+            concurrency: Componentes carregando ao mesmo tempo (cada um numa
+                thread; limitar evita disputar CPU/IO com as requisições)
+        """
+        self.concurrency = max(1, concurrency)
+        self._components: Dict[str, WarmupComponent] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def register(self, name: str, func: Callable):
+        """
+        Registra um componente
+
+        Args:
+            name: Nome exibido no /health
+            func: Função síncrona (roda em thread) ou corrotina. Retornar
+                False marca o componente como indisponível
+        """
+        self._components[name] = WarmupComponent(name=name, func=func)
+
+    def start(self):
+        """Dispara o warmup de todos os componentes (não bloqueia)"""
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        for component in self._components.values():
+            if component.status == PENDING:
+                self._tasks.append(asyncio.create_task(self._run(component)))
+        if self._tasks:
+            logger.info(f"🔥 Warmup em background: {', '.join(self._components)}")
+
+    async def _run(self, component: WarmupComponent):
+        async with self._semaphore:
+            component.status = LOADING
+            component.started_at = time.time()
+            start = time.perf_counter()
+            try:
+                if inspect.iscoroutinefunction(component.func):
+                    result = await component.func()
+                else:
+                    result = await asyncio.to_thread(component.func)
+                component.status = UNAVAILABLE if result is False else READY
+            except asyncio.CancelledError:
+                component.status = FAILED
+                component.error = "cancelado"
+                raise
+            except Exception as e:
+                component.status = FAILED
+                component.error = str(e)
+                logger.warning(f"⚠️ Warmup de {component.name} falhou: {e}")
+            finally:
+                component.duration_ms = (time.perf_counter() - start) * 1000
+
+        if component.status == READY:
+            logger.info(f"✅ {component.name} pronto em {component.duration_ms / 1000:.1f}s (warmup)")
+        elif component.status == UNAVAILABLE:
+            logger.info(f"ℹ️ {component.name} indisponível (warmup ignorado)")
+        if self.is_done():
+            logger.info("🔥 Warmup concluído")
+
+    async def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Aguarda o fim do warmup
+
+        Args:
+            timeout: Tempo máximo em segundos (None = sem limite)
+
+        Returns:
+            True se todos os componentes terminaram (com sucesso ou não)
+        """
+        if self._tasks:
+            await asyncio.wait(self._tasks, timeout=timeout)
+        return self.is_done()
+
+    async def stop(self):
+        """Cancela o warmup pendente (chamar no shutdown)"""
+        for task in self._tasks:
+            task.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def get_status(self, name: str) -> Optional[str]:
+        """Estado de um componente (None se não registrado)"""
+        component = self._components.get(name)
+        return component.status if component else None
+
+    def is_done(self) -> bool:
+        """Indica se todos os componentes terminaram o warmup"""
+        return all(c.status in DONE_STATES for c in self._components.values())
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Estado de todos os componentes"""
+        return {name: c.to_dict() for name, c in self._components.items()}
+
+
+def create_warmup(
+    stt_service=None,
+    embedding_service=None,
+    wake_word_service=None,
+    tts_service=None,
+    database=None,
+    intent_detector=None
+) -> WarmupManager:
+    """
+    Registra o warmup dos componentes pesados criados pelo services_initializer
+
+    Returns:
+        WarmupManager ainda não iniciado
+    """
+    warmup = WarmupManager(concurrency=settings.warmup_concurrency)
+
+    if stt_service and hasattr(stt_service, "load_models"):
+        def _load_stt():
+            if not stt_service.is_available():
+                return False
+            stt_service.load_models()
+        warmup.register("stt", _load_stt)
+
+    if embedding_service:
+        warmup.register("embeddings", embedding_service.load)
+
+    if wake_word_service:
+        warmup.register("wake_word", wake_word_service.load)
+
+    if tts_service and database and getattr(tts_service, "phrase_store", None):
+        async def _prewarm_tts():
+            # Pré-aquece TTS com as frases mais frequentes das respostas
+            responses = await database.get_recent_assistant_responses(limit=2000)
+            phrases = mine_top_phrases(responses, top_n=settings.tts_prewarm_top_n)
+            if not phrases:
+                return False
+            count = await tts_service.prewarm(phrases)
+            logger.info(f"✅ TTS pré-aquecido: {count}/{len(phrases)} frases sintetizadas")
+        warmup.register("tts_prewarm", _prewarm_tts)
+
+    if intent_detector and getattr(intent_detector, "clustering_service", None):
+        warmup.register("intent_clusters", intent_detector.refresh_clusters_cache)
+
+    return warmup
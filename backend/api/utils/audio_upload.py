@@ -0,0 +1,65 @@
+"""
+Leitura de uploads de áudio em streaming
+
+O arquivo é lido em pedaços e o WAV é decodificado enquanto é lido, sem
+montar o upload inteiro em bytes. O Starlette já gravou o multipart (em
+disco, acima de 1 MB) antes desta leitura: validar o tamanho a cada pedaço
+evita decodificar um upload grande, não evita recebê-lo.
+"""
+import asyncio
+
+from fastapi import HTTPException, UploadFile
+from loguru import logger
+
+from backend.api.validators import audio_validator
+from backend.api.validators.audio_validator import validate_audio_format, validate_audio_size
+from backend.services.audio_decoder import DecodedAudio, StreamingWavDecoder, UnsupportedWav, decode_audio_file
+
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+
+async def read_audio_upload(audio: UploadFile, chunk_size: int = UPLOAD_CHUNK_SIZE) -> DecodedAudio:
+    """
+    Lê, valida e decodifica um upload de áudio
+
+    Args:
+        audio: Arquivo recebido no multipart
+        chunk_size: Tamanho de cada leitura
+
+    Returns:
+        Áudio decodificado em float32 mono
+
+    Raises:
+        HTTPException: 400 para tamanho, formato ou conteúdo inválidos
+    """
+    if audio.filename:
+        validate_audio_format(audio.filename)
+
+    decoder = StreamingWavDecoder(max_source_bytes=audio_validator.MAX_AUDIO_SIZE)
+    size = 0
+    streaming = True
+    while True:
+        chunk = await audio.read(chunk_size)
+        if not chunk:
+            break
+        size += len(chunk)
+        validate_audio_size(size, complete=False)
+        if streaming:
+            try:
+                decoder.feed(chunk)
+            except UnsupportedWav as e:
+                # mp3/ogg/flac ou WAV comprimido: decodifica pelo soundfile ao final
+                logger.debug(f"Upload fora do caminho incremental: {e}")
+                streaming = False
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=f"Formato de áudio inválido: {e}")
+    validate_audio_size(size)
+
+    try:
+        if streaming:
+            return decoder.finish()
+        await audio.seek(0)
+        return await asyncio.to_thread(decode_audio_file, audio.file, size)
+    except (ValueError, RuntimeError) as e:
+        # soundfile.LibsndfileError herda de RuntimeError
+        raise HTTPException(status_code=400, detail=f"Formato de áudio inválido: {e}")
@@ -2,6 +2,8 @@
 Validador de áudio
 Validações de tamanho, formato e qualidade de áudio
 """
+from typing import Union
+
 from fastapi import HTTPException
 from loguru import logger
 
@@ -12,19 +14,20 @@ SUPPORTED_FORMATS = ["wav", "mp3", "ogg", "flac"]
 MAX_DURATION_SECONDS = 300  # 5 minutos
 
 
-def validate_audio_size(audio_data: bytes) -> None:
+def validate_audio_size(audio_data: Union[bytes, int], complete: bool = True) -> None:
     """
     Valida tamanho do áudio
     
     Args:
-        audio_data: Bytes do áudio
+        audio_data: Bytes do áudio ou quantidade de bytes já recebida
+        complete: False durante a leitura em streaming (só checa o máximo)
     
     Raises:
         HTTPException: Se tamanho inválido
     """
-    size = len(audio_data)
+    size = audio_data if isinstance(audio_data, int) else len(audio_data)
     
-    if size < MIN_AUDIO_SIZE:
+    if complete and size < MIN_AUDIO_SIZE:
         raise HTTPException(
             status_code=400,
             detail=f"Áudio muito pequeno ({size} bytes). Mínimo: {MIN_AUDIO_SIZE} bytes"
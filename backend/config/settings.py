@@ -24,11 +24,30 @@ class Settings(BaseSettings):
     # Groq
     groq_api_key: Optional[str] = None
     groq_model: str = "llama-3.1-8b-instant"  # Modelo ativo e rápido (llama-3.1-70b-versatile foi descontinuado)
+    groq_circuit_default_cooldown: float = 60.0  # Circuito aberto (s) quando o Groq não informa o reset
+    groq_circuit_max_cooldown: float = 3600.0  # Limite do tempo com circuito aberto (s)
+    groq_fallback_retry_interval: float = 30.0  # Sem tentar o Ollama de fallback após falha (s)
+    groq_budget_enabled: bool = True  # Orçamento de rate limit no cliente (headers x-ratelimit-*)
+    groq_limit_rpm: int = 30  # Limites do plano (corrigidos pelos headers do Groq)
+    groq_limit_tpm: int = 6000
+    groq_limit_rpd: int = 14400
+    groq_limit_tpd: int = 500000
+    groq_budget_background_reserve: float = 0.2  # Fração reservada a turnos interativos
+    groq_budget_max_wait: float = 2.0  # Espera máxima (s) de um turno interativo pelo reset
     
     # Configurações gerais de LLM
     llm_temperature: float = 0.7
     llm_max_tokens: int = 512
     
+    # Roteador de LLM (latência p50/p95 e taxa de erro por provider/modelo)
+    llm_router_enabled: bool = True  # Usa LLMRouter quando Groq e Ollama estão disponíveis
+    llm_router_hedge_enabled: bool = True  # Segunda requisição ao outro provider após o p95
+    llm_router_hedge_min_delay: float = 0.5  # Espera mínima (s) antes do hedge
+    llm_router_min_samples: int = 10  # Amostras para confiar nas estatísticas
+    llm_router_window: int = 200  # Requisições na janela móvel por backend
+    llm_router_max_error_rate: float = 0.5  # Acima disso o backend é considerado degradado
+    llm_router_failure_cooldown: float = 30.0  # Fora de rotação após falhas consecutivas (s)
+    
     # Busca Web (Tool Calling)
     web_search_enabled: bool = True
     tavily_api_key: Optional[str] = None
@@ -52,6 +71,20 @@ class Settings(BaseSettings):
     whisper_model: str = "large-v3"  # Otimizado para 32GB RAM (melhor qualidade PT-BR)
     whisper_device: str = "cpu"
     whisper_compute_type: str = "int8"
+    # Cascata: áudios curtos vão ao modelo rápido e só escalam para whisper_model
+    # quando a confiança é baixa (os dois modelos ficam residentes)
+    whisper_cascade_enabled: bool = True
+    whisper_fast_model: str = "base"
+    whisper_cascade_max_duration: float = 4.0  # Áudios mais longos (s) vão direto ao modelo principal
+    whisper_cascade_min_avg_logprob: float = -0.7  # Abaixo disso, escala
+    whisper_cascade_max_no_speech_prob: float = 0.5  # Acima disso, escala
+    stt_batch_max_size: int = 1  # Áudios concorrentes por forward em lote (1 = sem batching; lote só leva áudios sem VAD)
+    stt_batch_max_wait_ms: float = 20.0  # Espera máxima para completar um lote
+    # Perfil por sessão: transcrição anterior como initial_prompt e VAD ajustado ao ruído medido
+    stt_session_profiles_enabled: bool = True
+    stt_profile_max_sessions: int = 1000
+    stt_profile_ttl: float = 1800.0  # Inatividade (s) após a qual o perfil é descartado
+    stt_profile_prompt_max_chars: int = 200
     
     # Piper TTS (Fase 2 - Nova geração)
     tts_engine: str = "piper"  # "piper" ou "edge" (fallback)
@@ -63,6 +96,19 @@ class Settings(BaseSettings):
     tts_enable_numbers: bool = True
     tts_enable_dates: bool = True
     
+    # TTS em streaming (síntese por sentença)
+    tts_streaming_enabled: bool = False  # WebSocket: envia áudio por sentença após a resposta
+    tts_stream_workers: int = 2  # Sínteses simultâneas por resposta
+    tts_stream_min_sentence_chars: int = 20  # Sentenças menores são agrupadas com a próxima
+    
+    # Phrase store TTS (sínteses por sentença em disco, endereçadas por conteúdo)
+    tts_phrase_store_enabled: bool = True
+    tts_phrase_store_dir: str = "data/tts_phrases"  # Relativo à raiz do projeto
+    tts_phrase_store_max_mb: int = 256  # Orçamento em disco (LRU)
+    tts_phrase_store_version: str = "1"  # Incrementar ao mudar modelo/processadores de texto
+    tts_phrase_store_workers: int = 2  # Sentenças sintetizadas ao mesmo tempo por resposta
+    tts_prewarm_top_n: int = 30  # Frases mais frequentes pré-sintetizadas no startup
+    
     # Piper TTS (legado - manter para compatibilidade)
     piper_voice: str = "pt_BR-faber-medium"
     piper_model_path: str = "./models/piper"
@@ -92,6 +138,51 @@ class Settings(BaseSettings):
     reward_model_path: str = "models/reward_model"
     rlhf_checkpoint_dir: str = "checkpoints/rlhf"
     
+    # Orçamento de tokens do prompt (contagem local com tiktoken ou heurística)
+    prompt_budget_total: int = 6000  # Teto do prompt (system + histórico + pergunta)
+    prompt_budget_memories: int = 600  # Memórias injetadas no system prompt
+    prompt_budget_history: int = 2500  # Histórico da conversa
+    prompt_budget_history_message: int = 600  # Máximo por mensagem do histórico
+    prompt_budget_tool_result: int = 1500  # Máximo por resultado de tool
+    
+    # Sumarização incremental de sessões longas (resumo no metadata da sessão)
+    summary_enabled: bool = True
+    summary_trigger_tokens: int = 1500  # Tokens não resumidos que disparam a sumarização
+    summary_keep_recent_tokens: int = 600  # Mensagens recentes mantidas na íntegra
+    summary_max_tokens: int = 300  # Tamanho máximo do resumo
+    
+    # Cache de embeddings (arena float32 com LRU por orçamento em bytes)
+    embedding_cache_max_mb: int = 32  # ~21k vetores de 384 dimensões
+    embedding_cache_path: Optional[str] = "./data/embedding_cache"  # memmap persistente (None = só memória)
+    embedding_batch_max_size: int = 32  # Máximo de textos por encode (micro-batching)
+    embedding_batch_max_wait_ms: float = 5.0  # Espera máxima para completar um lote
+    
+    # Cache de respostas: busca semântica (similaridade de embeddings) desligada por
+    # padrão; o modelo de embeddings é em inglês e aproxima frases opostas em português
+    response_cache_semantic_enabled: bool = False
+    
+    # Banco de dados (escritor WAL + pool de leitores somente leitura)
+    database_reader_pool_size: int = 4
+    
+    # Fila de trabalho em background (memórias, feedback e captura após a resposta)
+    background_queue_max_size: int = 1000  # Jobs aguardando; acima disso são descartados
+    background_queue_workers: int = 2
+    background_queue_max_retries: int = 2
+    
+    # Log de conversas para treinamento (buffer em memória gravado em lote)
+    conversation_log_enabled: bool = True
+    conversation_log_batch_size: int = 100  # Conversas por lote (atingido, grava)
+    conversation_log_flush_interval_ms: int = 1000  # Intervalo máximo entre gravações
+    conversation_log_max_buffer: int = 10000  # Acima disso, as mais antigas são descartadas
+    
+    # Tendências de erros (ring buffers em memória + rollup no banco)
+    error_trend_minute_buckets: int = 120  # Minutos mantidos em memória
+    error_trend_hour_buckets: int = 48  # Horas mantidas em memória
+    error_trend_alpha: float = 0.3  # Suavização do EWMA (por minuto)
+    error_trend_spike_factor: float = 3.0  # Múltiplo da linha de base para pico
+    error_trend_spike_min_count: int = 5  # Ocorrências mínimas no minuto para pico
+    error_trend_flush_interval: float = 60.0  # Gravação dos rollups (segundos)
+    
     # Clustering
     clustering_enabled: bool = True
     clustering_min_samples: int = 5  # Otimizado para 32GB RAM (permite mais clusters, era 10)
@@ -101,6 +192,24 @@ class Settings(BaseSettings):
     pretraining_enabled: bool = False
     pretraining_corpus_path: str = "data/corpus/pt_br_corpus.txt"
     
+    # Health check (probes em background, endpoints leem cache)
+    health_probe_interval: float = 30.0  # Intervalo entre probes (segundos)
+    health_probe_llm_interval: float = 60.0  # LLM remoto: intervalo maior
+    health_probe_timeout: float = 5.0  # Timeout de cada probe (segundos)
+    
+    # Startup rápido (modelos pesados carregam em background após o startup)
+    fast_startup_enabled: bool = True  # False: startup aguarda o warmup terminar
+    warmup_concurrency: int = 3  # Componentes carregando em paralelo
+    
+    # Observabilidade (spans por etapa e /metrics no formato Prometheus)
+    metrics_enabled: bool = True
+    event_loop_lag_interval: float = 0.5  # Intervalo de amostragem do atraso do loop (segundos)
+    loop_watchdog_enabled: bool = True  # Captura a pilha de callbacks que bloqueiam o loop
+    loop_watchdog_threshold_ms: float = 100.0  # Bloqueio mínimo para capturar a pilha
+    loop_watchdog_interval: float = 0.02  # Heartbeat do watchdog (substitui event_loop_lag_interval)
+    debug_admin_token: Optional[str] = None  # Habilita /debug/* (header X-Admin-Token)
+    debug_profile_max_seconds: float = 60.0  # Duração máxima de /debug/profile
+    
     class Config:
         # Encontra o .env na raiz do projeto (subindo 2 níveis de backend/config/)
         env_file = str(Path(__file__).parent.parent.parent / ".env")
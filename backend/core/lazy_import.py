@@ -0,0 +1,97 @@
+"""
+Importação preguiçosa de bibliotecas pesadas
+
+torch, transformers, sentence_transformers, faster_whisper, openwakeword e
+sklearn levam de centenas de milissegundos a vários segundos só para
+importar. lazy_import() devolve um proxy de módulo que só executa o import
+no primeiro acesso a um atributo (normalmente dentro de uma thread de
+warmup); module_available() verifica se o pacote está instalado sem
+importá-lo.
+"""
+import importlib
+import importlib.util
+import sys
+import threading
+import time
+import types
+from typing import Dict
+
+from loguru import logger
+
+_lock = threading.RLock()
+_proxies: Dict[str, "LazyModule"] = {}
+
+
+class LazyModule(types.ModuleType):
+    """Proxy que importa o módulo real no primeiro acesso a um atributo"""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__["_lazy_module"] = None
+
+    def _load(self) -> types.ModuleType:
+        module = self.__dict__["_lazy_module"]
+        if module is not None:
+            return module
+        with _lock:
+            module = self.__dict__["_lazy_module"]
+            if module is None:
+                name = self.__name__
+                start = time.perf_counter()
+                module = importlib.import_module(name)
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                if elapsed_ms >= 100:
+                    logger.info(f"📦 Módulo {name} importado em {elapsed_ms:.0f}ms")
+                self.__dict__["_lazy_module"] = module
+        return module
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self) -> str:
+        state = "carregado" if self.is_loaded() else "não carregado"
+        return f"<LazyModule '{self.__name__}' ({state})>"
+
+    def is_loaded(self) -> bool:
+        """Indica se o import real já aconteceu"""
+        return self.__dict__["_lazy_module"] is not None
+
+
+def lazy_import(name: str) -> LazyModule:
+    """
+    Proxy preguiçoso para um módulo (o import só acontece no primeiro uso)
+
+    Args:
+        name: Nome completo do módulo (ex.: "sklearn.cluster")
+
+    Returns:
+        LazyModule compartilhado por todos que pedirem o mesmo módulo
+    """
+    with _lock:
+        proxy = _proxies.get(name)
+        if proxy is None:
+            proxy = _proxies[name] = LazyModule(name)
+            if name in sys.modules:
+                proxy.__dict__["_lazy_module"] = sys.modules[name]
+        return proxy
+
+
+def module_available(name: str) -> bool:
+    """
+    Verifica se um módulo está instalado sem importá-lo
+
+    Args:
+        name: Nome do pacote de topo (para "a.b", find_spec importaria "a")
+
+    Returns:
+        True se o módulo pode ser encontrado
+    """
+    if name in sys.modules:
+        return sys.modules[name] is not None
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
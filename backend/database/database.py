@@ -1,9 +1,16 @@
 """
 Gerenciamento de banco de dados SQLite
+
+Uma conexão escritora em modo WAL (transações serializadas por lock) e um
+pool de conexões somente leitura. Em WAL, leitores não bloqueiam o escritor
+nem uns aos outros, e cada conexão aiosqlite roda em sua própria thread:
+consultas pesadas (analytics, listagem de erros) não atrasam add_message.
 """
+import asyncio
 import aiosqlite
+from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, AsyncIterator
 from datetime import datetime
 from loguru import logger
 
@@ -11,34 +18,138 @@ from loguru import logger
 class Database:
     """Gerenciador de banco de dados SQLite"""
     
-    def __init__(self, db_path: str = "data/jonh_assistant.db"):
+    def __init__(self, db_path: str = "data/jonh_assistant.db", reader_pool_size: int = 4):
         """
         Inicializa o banco de dados
         
         Args:
             db_path: Caminho para o arquivo do banco de dados
+            reader_pool_size: Número de conexões somente leitura (0 = lê pelo escritor)
         """
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.reader_pool_size = max(0, reader_pool_size)
+        # Conexão escritora (única que altera dados)
         self._connection: Optional[aiosqlite.Connection] = None
+        self._write_lock = asyncio.Lock()
+        self._readers: List[aiosqlite.Connection] = []
+        self._reader_pool: Optional[asyncio.Queue] = None
+        self._write_waiters = 0
         
         logger.info(f"Database inicializado: {self.db_path}")
     
+    @property
+    def _in_memory(self) -> bool:
+        """Banco em memória não é compartilhável entre conexões"""
+        return str(self.db_path) == ":memory:"
+    
     async def connect(self):
-        """Conecta ao banco de dados"""
+        """Conecta ao banco de dados (escritor WAL + pool de leitores)"""
         if self._connection is None:
             self._connection = await aiosqlite.connect(str(self.db_path))
             self._connection.row_factory = aiosqlite.Row
+            if not self._in_memory:
+                await self._connection.execute("PRAGMA journal_mode=WAL")
+                await self._connection.execute("PRAGMA synchronous=NORMAL")
+            await self._connection.execute("PRAGMA busy_timeout=5000")
             await self._initialize_schema()
-            logger.info("✅ Conectado ao banco de dados")
+            await self._open_readers()
+            logger.info(f"✅ Conectado ao banco de dados ({len(self._readers)} leitores)")
+    
+    async def _open_readers(self):
+        """Abre o pool de conexões somente leitura"""
+        self._reader_pool = asyncio.Queue()
+        if self._in_memory:
+            return
+        uri = f"{self.db_path.resolve().as_uri()}?mode=ro"
+        for _ in range(self.reader_pool_size):
+            conn = await aiosqlite.connect(uri, uri=True)
+            conn.row_factory = aiosqlite.Row
+            await conn.execute("PRAGMA busy_timeout=5000")
+            self._readers.append(conn)
+            self._reader_pool.put_nowait(conn)
     
     async def close(self):
-        """Fecha conexão com banco de dados"""
+        """Fecha conexões com banco de dados"""
+        for conn in self._readers:
+            await conn.close()
+        self._readers = []
+        self._reader_pool = None
         if self._connection:
             await self._connection.close()
             self._connection = None
             logger.info("🔌 Conexão com banco de dados fechada")
     
+    @asynccontextmanager
+    async def reader(self) -> AsyncIterator[aiosqlite.Connection]:
+        """
+        Empresta uma conexão somente leitura do pool
+        
+        Sem pool (banco em memória ou pool_size=0) usa a conexão escritora.
+        
+        Uso:
+            async with db.reader() as conn:
+                async with conn.execute(...) as cursor: ...
+        """
+        if not self._readers:
+            yield self._connection
+            return
+        conn = await self._reader_pool.get()
+        try:
+            yield conn
+        finally:
+            self._reader_pool.put_nowait(conn)
+    
+    @asynccontextmanager
+    async def writer(self) -> AsyncIterator[aiosqlite.Connection]:
+        """
+        Abre uma transação exclusiva na conexão escritora
+        
+        Faz commit ao sair normalmente e rollback se houver exceção.
+        
+        Uso:
+            async with db.writer() as conn:
+                await conn.execute(...)
+        """
+        # Import local: backend.services importa este módulo
+        from backend.services.observability.tracing import span
+        
+        with span("db.write"):
+            self._write_waiters += 1
+            try:
+                await self._write_lock.acquire()
+            finally:
+                self._write_waiters -= 1
+            try:
+                yield self._connection
+                await self._connection.commit()
+            except BaseException:
+                await self._connection.rollback()
+                raise
+            finally:
+                self._write_lock.release()
+    
+    def get_pool_stats(self) -> Dict[str, int]:
+        """Ocupação do pool de leitores e fila de transações de escrita"""
+        idle = self._reader_pool.qsize() if self._reader_pool else 0
+        return {
+            "readers": len(self._readers),
+            "readers_busy": len(self._readers) - idle,
+            "write_waiters": self._write_waiters
+        }
+    
+    @asynccontextmanager
+    async def _read(self, sql: str, params=()) -> AsyncIterator[aiosqlite.Cursor]:
+        """Executa consulta em um leitor do pool"""
+        async with self.reader() as conn:
+            async with conn.execute(sql, params) as cursor:
+                yield cursor
+    
+    async def _write(self, sql: str, params=()) -> aiosqlite.Cursor:
+        """Executa um comando único em transação na conexão escritora"""
+        async with self.writer() as conn:
+            return await conn.execute(sql, params)
+    
     async def _initialize_schema(self):
         """Inicializa schema do banco de dados"""
         async with self._connection.execute("""
@@ -121,6 +232,34 @@ class Database:
         """) as cursor:
             await self._connection.commit()
         
+        # Mensagens das conversas salvas (uma linha por mensagem, append-only)
+        async with self._connection.execute("""
+            CREATE TABLE IF NOT EXISTS saved_conversation_messages (
+                conversation_id INTEGER NOT NULL,
+                seq INTEGER NOT NULL,
+                role TEXT NOT NULL,
+                content TEXT NOT NULL,
+                PRIMARY KEY (conversation_id, seq),
+                FOREIGN KEY (conversation_id) REFERENCES saved_conversations(id) ON DELETE CASCADE
+            ) WITHOUT ROWID
+        """) as cursor:
+            await self._connection.commit()
+        
+        await self._migrate_saved_conversations()
+        
+        # Índices de paginação por cursor (created_at, id)
+        async with self._connection.execute("""
+            CREATE INDEX IF NOT EXISTS idx_saved_conversations_keyset 
+            ON saved_conversations(saved, created_at DESC, id DESC)
+        """) as cursor:
+            await self._connection.commit()
+        
+        async with self._connection.execute("""
+            CREATE INDEX IF NOT EXISTS idx_saved_conversations_user_keyset 
+            ON saved_conversations(user_id, saved, created_at DESC, id DESC)
+        """) as cursor:
+            await self._connection.commit()
+        
         # Tabela de conversas (para coleta de dados de treinamento)
         async with self._connection.execute("""
             CREATE TABLE IF NOT EXISTS conversations (
@@ -245,8 +384,104 @@ class Database:
         """) as cursor:
             await self._connection.commit()
         
+        # Contadores agregados por fingerprint (tipo + template da mensagem)
+        async with self._connection.execute("""
+            CREATE TABLE IF NOT EXISTS error_fingerprints (
+                fingerprint TEXT PRIMARY KEY,
+                type TEXT NOT NULL,
+                level TEXT NOT NULL,
+                template TEXT NOT NULL,
+                sample_message TEXT NOT NULL,
+                count INTEGER NOT NULL DEFAULT 0,
+                first_seen TIMESTAMP NOT NULL,
+                last_seen TIMESTAMP NOT NULL
+            )
+        """) as cursor:
+            await self._connection.commit()
+        
+        async with self._connection.execute("""
+            CREATE INDEX IF NOT EXISTS idx_error_fingerprints_count 
+            ON error_fingerprints(count DESC)
+        """) as cursor:
+            await self._connection.commit()
+        
+        # Rollups de contagem de erros por janela (motor de tendências)
+        async with self._connection.execute("""
+            CREATE TABLE IF NOT EXISTS error_rollups (
+                scope TEXT NOT NULL,
+                key TEXT NOT NULL,
+                resolution INTEGER NOT NULL,
+                bucket_start INTEGER NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (scope, key, resolution, bucket_start)
+            ) WITHOUT ROWID
+        """) as cursor:
+            await self._connection.commit()
+        
+        async with self._connection.execute("""
+            CREATE INDEX IF NOT EXISTS idx_error_rollups_bucket 
+            ON error_rollups(resolution, bucket_start)
+        """) as cursor:
+            await self._connection.commit()
+        
+        await self._migrate_errors()
+        
         logger.info("✅ Schema do banco de dados inicializado")
     
+    async def _migrate_saved_conversations(self):
+        """
+        Migra conversas salvas do blob JSON para saved_conversation_messages
+        
+        Adiciona a coluna message_count e move as mensagens de cada linha
+        legada (coluna messages) para a tabela normalizada.
+        """
+        import json
+        async with self._connection.execute("PRAGMA table_info(saved_conversations)") as cursor:
+            columns = {row["name"] for row in await cursor.fetchall()}
+        if "message_count" not in columns:
+            await self._connection.execute(
+                "ALTER TABLE saved_conversations ADD COLUMN message_count INTEGER NOT NULL DEFAULT 0"
+            )
+        
+        async with self._connection.execute("""
+            SELECT id, messages FROM saved_conversations 
+            WHERE messages != '[]'
+        """) as cursor:
+            legacy = await cursor.fetchall()
+        
+        for row in legacy:
+            try:
+                messages = json.loads(row["messages"]) if row["messages"] else []
+            except ValueError:
+                logger.warning(f"Conversa salva {row['id']} com mensagens inválidas, ignorando")
+                messages = []
+            await self._connection.executemany("""
+                INSERT OR REPLACE INTO saved_conversation_messages (conversation_id, seq, role, content)
+                VALUES (?, ?, ?, ?)
+            """, [
+                (row["id"], seq, msg.get("role", ""), msg.get("content", ""))
+                for seq, msg in enumerate(messages)
+            ])
+            await self._connection.execute("""
+                UPDATE saved_conversations SET messages = '[]', message_count = ? WHERE id = ?
+            """, (len(messages), row["id"]))
+        
+        await self._connection.commit()
+        if legacy:
+            logger.info(f"✅ {len(legacy)} conversa(s) salva(s) migrada(s) para mensagens normalizadas")
+    
+    async def _migrate_errors(self):
+        """Adiciona a coluna fingerprint (e seu índice) à tabela errors"""
+        async with self._connection.execute("PRAGMA table_info(errors)") as cursor:
+            columns = {row["name"] for row in await cursor.fetchall()}
+        if "fingerprint" not in columns:
+            await self._connection.execute("ALTER TABLE errors ADD COLUMN fingerprint TEXT")
+        await self._connection.execute("""
+            CREATE INDEX IF NOT EXISTS idx_errors_fingerprint 
+            ON errors(fingerprint, timestamp DESC)
+        """)
+        await self._connection.commit()
+    
     # ========== SESSÕES ==========
     
     async def create_session(self, session_id: str, metadata: Optional[Dict] = None) -> bool:
@@ -255,12 +490,10 @@ class Database:
             import json
             metadata_json = json.dumps(metadata) if metadata else None
             
-            await self._connection.execute("""
+            await self._write("""
                 INSERT INTO sessions (session_id, created_at, last_activity, metadata)
                 VALUES (?, ?, ?, ?)
             """, (session_id, datetime.now(), datetime.now(), metadata_json))
-            
-            await self._connection.commit()
             logger.debug(f"Sessão criada: {session_id}")
             return True
         except aiosqlite.IntegrityError:
@@ -269,24 +502,57 @@ class Database:
     
     async def update_session_activity(self, session_id: str):
         """Atualiza última atividade da sessão"""
-        await self._connection.execute("""
+        await self._write("""
             UPDATE sessions 
             SET last_activity = ? 
             WHERE session_id = ?
         """, (datetime.now(), session_id))
-        await self._connection.commit()
     
     async def delete_session(self, session_id: str):
         """Remove sessão e todas suas mensagens"""
-        await self._connection.execute("""
+        await self._write("""
             DELETE FROM sessions WHERE session_id = ?
         """, (session_id,))
-        await self._connection.commit()
         logger.info(f"Sessão {session_id} removida")
     
+    async def update_session_metadata(self, session_id: str, updates: Dict) -> Dict:
+        """
+        Mescla chaves no metadata da sessão (leitura e escrita na mesma transação)
+
+        Args:
+            session_id: ID da sessão
+            updates: Chaves a gravar (valor None remove a chave)
+
+        Returns:
+            Metadata resultante
+        """
+        import json
+        async with self.writer() as conn:
+            async with conn.execute(
+                "SELECT metadata FROM sessions WHERE session_id = ?", (session_id,)
+            ) as cursor:
+                row = await cursor.fetchone()
+            if row is None:
+                raise ValueError(f"Sessão {session_id} não encontrada")
+
+            metadata = json.loads(row["metadata"]) if row["metadata"] else {}
+            if not isinstance(metadata, dict):
+                metadata = {}
+            for key, value in updates.items():
+                if value is None:
+                    metadata.pop(key, None)
+                else:
+                    metadata[key] = value
+
+            await conn.execute(
+                "UPDATE sessions SET metadata = ? WHERE session_id = ?",
+                (json.dumps(metadata), session_id)
+            )
+        return metadata
+
     async def get_session(self, session_id: str) -> Optional[Dict]:
         """Obtém informações da sessão"""
-        async with self._connection.execute("""
+        async with self._read("""
             SELECT * FROM sessions WHERE session_id = ?
         """, (session_id,)) as cursor:
             row = await cursor.fetchone()
@@ -302,7 +568,7 @@ class Database:
     
     async def list_sessions(self, limit: int = 100) -> List[Dict]:
         """Lista sessões"""
-        async with self._connection.execute("""
+        async with self._read("""
             SELECT * FROM sessions 
             ORDER BY last_activity DESC 
             LIMIT ?
@@ -333,14 +599,18 @@ class Database:
         if not session:
             await self.create_session(session_id)
         
-        # Adiciona mensagem
-        cursor = await self._connection.execute("""
-            INSERT INTO messages (session_id, role, content, timestamp)
-            VALUES (?, ?, ?, ?)
-        """, (session_id, role, content, datetime.now()))
-        
-        await self._connection.commit()
-        await self.update_session_activity(session_id)
+        # Adiciona mensagem e atualiza atividade na mesma transação
+        now = datetime.now()
+        async with self.writer() as conn:
+            cursor = await conn.execute("""
+                INSERT INTO messages (session_id, role, content, timestamp)
+                VALUES (?, ?, ?, ?)
+            """, (session_id, role, content, now))
+            await conn.execute("""
+                UPDATE sessions 
+                SET last_activity = ? 
+                WHERE session_id = ?
+            """, (now, session_id))
         
         message_id = cursor.lastrowid
         logger.debug(f"Mensagem adicionada: {message_id} (sessão: {session_id})")
@@ -363,7 +633,7 @@ class Database:
             query += " LIMIT ?"
             params.append(limit)
         
-        async with self._connection.execute(query, params) as cursor:
+        async with self._read(query, params) as cursor:
             rows = await cursor.fetchall()
             return [
                 {
@@ -375,12 +645,47 @@ class Database:
                 for row in rows
             ]
     
+    async def get_recent_messages(
+        self,
+        session_id: str,
+        limit: Optional[int] = None,
+        after_id: int = 0
+    ) -> List[Dict]:
+        """
+        Obtém as mensagens mais recentes da sessão (ordem cronológica)
+
+        Args:
+            session_id: ID da sessão
+            limit: Máximo de mensagens (as mais recentes)
+            after_id: Considera apenas mensagens com id maior que este
+        """
+        query = """
+            SELECT id, role, content, timestamp FROM messages
+            WHERE session_id = ? AND id > ?
+            ORDER BY id DESC
+        """
+        params = [session_id, after_id]
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+
+        async with self._read(query, params) as cursor:
+            rows = await cursor.fetchall()
+        return [
+            {
+                "id": row["id"],
+                "role": row["role"],
+                "content": row["content"],
+                "timestamp": row["timestamp"]
+            }
+            for row in reversed(rows)
+        ]
+
     async def clear_messages(self, session_id: str):
         """Limpa mensagens de uma sessão"""
-        await self._connection.execute("""
+        await self._write("""
             DELETE FROM messages WHERE session_id = ?
         """, (session_id,))
-        await self._connection.commit()
         logger.info(f"Mensagens da sessão {session_id} limpas")
     
     # ========== MEMÓRIAS ==========
@@ -405,28 +710,28 @@ class Database:
         metadata_json = json.dumps(metadata) if metadata else None
         now = datetime.now()
         
-        # Tenta atualizar se já existe
-        cursor = await self._connection.execute("""
-            UPDATE memories 
-            SET value = ?, category = ?, updated_at = ?, metadata = ?
-            WHERE key = ?
-        """, (value, category, now, metadata_json, key))
-        
-        if cursor.rowcount == 0:
-            # Se não existe, cria nova
-            cursor = await self._connection.execute("""
-                INSERT INTO memories (key, value, category, created_at, updated_at, metadata)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, (key, value, category, now, now, metadata_json))
+        async with self.writer() as conn:
+            # Tenta atualizar se já existe
+            cursor = await conn.execute("""
+                UPDATE memories 
+                SET value = ?, category = ?, updated_at = ?, metadata = ?
+                WHERE key = ?
+            """, (value, category, now, metadata_json, key))
+            
+            if cursor.rowcount == 0:
+                # Se não existe, cria nova
+                cursor = await conn.execute("""
+                    INSERT INTO memories (key, value, category, created_at, updated_at, metadata)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                """, (key, value, category, now, now, metadata_json))
         
-        await self._connection.commit()
         memory_id = cursor.lastrowid if cursor.rowcount == 0 else None
         logger.info(f"Memória salva: {key} = {value[:50]}...")
         return memory_id or 0
     
     async def get_memory(self, key: str) -> Optional[Dict]:
         """Obtém uma memória por chave"""
-        async with self._connection.execute("""
+        async with self._read("""
             SELECT * FROM memories WHERE key = ?
         """, (key,)) as cursor:
             row = await cursor.fetchone()
@@ -472,7 +777,7 @@ class Database:
         where_clause = " AND ".join(conditions) if conditions else "1=1"
         params.append(limit)
         
-        async with self._connection.execute(f"""
+        async with self._read(f"""
             SELECT * FROM memories 
             WHERE {where_clause}
             ORDER BY updated_at DESC
@@ -495,10 +800,9 @@ class Database:
     
     async def delete_memory(self, key: str) -> bool:
         """Remove uma memória"""
-        cursor = await self._connection.execute("""
+        cursor = await self._write("""
             DELETE FROM memories WHERE key = ?
         """, (key,))
-        await self._connection.commit()
         deleted = cursor.rowcount > 0
         if deleted:
             logger.info(f"Memória removida: {key}")
@@ -521,7 +825,7 @@ class Database:
         Returns:
             Lista de mensagens no formato {role, content}
         """
-        messages = await self.get_messages(session_id, limit=max_messages)
+        messages = await self.get_recent_messages(session_id, limit=max_messages)
         return [
             {
                 "role": msg["role"],
@@ -570,20 +874,62 @@ class Database:
         Returns:
             ID da conversa salva
         """
-        cursor = await self._connection.execute("""
+        cursor = await self._write("""
             INSERT INTO conversations 
             (session_id, user_input, assistant_response, tokens_used, processing_time, used_tool, created_at)
             VALUES (?, ?, ?, ?, ?, ?, ?)
         """, (session_id, user_input, assistant_response, tokens_used, processing_time, used_tool, datetime.now()))
-        
-        await self._connection.commit()
         conversation_id = cursor.lastrowid
         logger.debug(f"Conversa salva: {conversation_id} (sessão: {session_id})")
         return conversation_id
     
+    async def save_conversations(self, conversations: List[Dict[str, Any]]) -> int:
+        """
+        Salva um lote de conversas em uma única transação
+    
+        Usado pelo ConversationLog: os IDs já vêm reservados e o lote é
+        inserido com executemany (um commit por lote, não por turno).
+    
+        Args:
+            conversations: Dicts com id, session_id, user_input,
+                assistant_response, tokens_used, processing_time, used_tool
+                e created_at
+    
+        Returns:
+            Número de conversas inseridas
+        """
+        if not conversations:
+            return 0
+        async with self.writer() as conn:
+            await conn.executemany("""
+                INSERT INTO conversations
+                (id, session_id, user_input, assistant_response, tokens_used, processing_time, used_tool, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, [
+                (
+                    c["id"], c["session_id"], c["user_input"], c["assistant_response"],
+                    c.get("tokens_used"), c.get("processing_time"), c.get("used_tool"),
+                    c.get("created_at") or datetime.now()
+                )
+                for c in conversations
+            ])
+        logger.debug(f"Lote de conversas salvo: {len(conversations)}")
+        return len(conversations)
+    
+    async def get_last_conversation_id(self) -> int:
+        """Maior ID de conversa já usado (inclui removidas, via sqlite_sequence)"""
+        async with self._read("""
+            SELECT MAX(
+                COALESCE((SELECT MAX(id) FROM conversations), 0),
+                COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'conversations'), 0)
+            ) AS last_id
+        """) as cursor:
+            row = await cursor.fetchone()
+        return int(row["last_id"]) if row else 0
+    
     async def get_conversation(self, conversation_id: int) -> Optional[Dict]:
         """Obtém uma conversa por ID"""
-        async with self._connection.execute("""
+        async with self._read("""
             SELECT * FROM conversations WHERE id = ?
         """, (conversation_id,)) as cursor:
             row = await cursor.fetchone()
@@ -623,7 +969,7 @@ class Database:
             """
             params = (limit, offset)
         
-        async with self._connection.execute(query, params) as cursor:
+        async with self._read(query, params) as cursor:
             rows = await cursor.fetchall()
             return [
                 {
@@ -639,6 +985,26 @@ class Database:
                 for row in rows
             ]
     
+    async def get_recent_assistant_responses(self, limit: int = 2000) -> List[str]:
+        """
+        Obtém as respostas mais recentes do assistente (texto apenas)
+        
+        Usado para minerar frases frequentes para pré-aquecimento do TTS.
+        
+        Args:
+            limit: Número máximo de respostas
+            
+        Returns:
+            Lista de respostas (mais recentes primeiro)
+        """
+        async with self._read("""
+            SELECT assistant_response FROM conversations
+            ORDER BY created_at DESC
+            LIMIT ?
+        """, (limit,)) as cursor:
+            rows = await cursor.fetchall()
+            return [row["assistant_response"] for row in rows]
+    
     # ========== FEEDBACK ==========
     
     async def save_feedback(
@@ -658,19 +1024,17 @@ class Database:
         Returns:
             ID do feedback salvo
         """
-        cursor = await self._connection.execute("""
+        cursor = await self._write("""
             INSERT INTO feedback (conversation_id, rating, comment, created_at)
             VALUES (?, ?, ?, ?)
         """, (conversation_id, rating, comment, datetime.now()))
-        
-        await self._connection.commit()
         feedback_id = cursor.lastrowid
         logger.info(f"Feedback salvo: {feedback_id} (rating: {rating})")
         return feedback_id
     
     async def get_feedback(self, feedback_id: int) -> Optional[Dict]:
         """Obtém feedback por ID"""
-        async with self._connection.execute("""
+        async with self._read("""
             SELECT * FROM feedback WHERE id = ?
         """, (feedback_id,)) as cursor:
             row = await cursor.fetchone()
@@ -686,7 +1050,7 @@ class Database:
     
     async def get_feedback_stats(self) -> Dict[str, Any]:
         """Obtém estatísticas de feedback"""
-        async with self._connection.execute("""
+        async with self._read("""
             SELECT 
                 COUNT(*) as total,
                 AVG(rating) as avg_rating,
@@ -726,7 +1090,7 @@ class Database:
             """
             params = (limit,)
         
-        async with self._connection.execute(query, params) as cursor:
+        async with self._read(query, params) as cursor:
             rows = await cursor.fetchall()
             return [
                 {
@@ -762,13 +1126,11 @@ class Database:
         Returns:
             ID do dado de treinamento salvo
         """
-        cursor = await self._connection.execute("""
+        cursor = await self._write("""
             INSERT INTO training_data 
             (instruction, input, output, source, quality_score, created_at)
             VALUES (?, ?, ?, ?, ?, ?)
         """, (instruction, input_text, output, source, quality_score, datetime.now()))
-        
-        await self._connection.commit()
         training_id = cursor.lastrowid
         logger.debug(f"Dado de treinamento salvo: {training_id}")
         return training_id
@@ -794,7 +1156,7 @@ class Database:
         where_clause = " AND ".join(conditions) if conditions else "1=1"
         params.append(limit)
         
-        async with self._connection.execute(f"""
+        async with self._read(f"""
             SELECT * FROM training_data 
             WHERE {where_clause}
             ORDER BY quality_score DESC, created_at DESC
@@ -837,22 +1199,22 @@ class Database:
         examples_json = json.dumps(examples)
         now = datetime.now()
         
-        # Atualiza se já existe
-        cursor = await self._connection.execute("""
-            UPDATE intent_clusters 
-            SET examples = ?, updated_at = ?
-            WHERE cluster_id = ? AND intent_type = ?
-        """, (examples_json, now, cluster_id, intent_type))
-        
-        if cursor.rowcount == 0:
-            # Cria novo se não existe
-            cursor = await self._connection.execute("""
-                INSERT INTO intent_clusters 
-                (cluster_id, intent_type, examples, created_at, updated_at)
-                VALUES (?, ?, ?, ?, ?)
-            """, (cluster_id, intent_type, examples_json, now, now))
+        async with self.writer() as conn:
+            # Atualiza se já existe
+            cursor = await conn.execute("""
+                UPDATE intent_clusters 
+                SET examples = ?, updated_at = ?
+                WHERE cluster_id = ? AND intent_type = ?
+            """, (examples_json, now, cluster_id, intent_type))
+            
+            if cursor.rowcount == 0:
+                # Cria novo se não existe
+                cursor = await conn.execute("""
+                    INSERT INTO intent_clusters 
+                    (cluster_id, intent_type, examples, created_at, updated_at)
+                    VALUES (?, ?, ?, ?, ?)
+                """, (cluster_id, intent_type, examples_json, now, now))
         
-        await self._connection.commit()
         cluster_row_id = cursor.lastrowid if cursor.rowcount == 0 else None
         logger.debug(f"Cluster salvo: {cluster_id} ({intent_type})")
         return cluster_row_id or 0
@@ -876,7 +1238,7 @@ class Database:
             """
             params = ()
         
-        async with self._connection.execute(query, params) as cursor:
+        async with self._read(query, params) as cursor:
             rows = await cursor.fetchall()
             import json
             return [
@@ -902,7 +1264,9 @@ class Database:
         stack_trace: Optional[str] = None,
         device_info: Optional[Dict] = None,
         context: Optional[Dict] = None,
-        suggested_solution: Optional[str] = None
+        suggested_solution: Optional[str] = None,
+        fingerprint: Optional[str] = None,
+        template: Optional[str] = None
     ) -> int:
         """
         Salva erro reportado pelo mobile
@@ -916,39 +1280,252 @@ class Database:
             device_info: Informações do dispositivo
             context: Contexto adicional (session_id, user_action, etc.)
             suggested_solution: Solução sugerida (gerada automaticamente)
+            fingerprint: Fingerprint do erro (tipo + template da mensagem)
+            template: Template da mensagem (para error_fingerprints)
             
         Returns:
             ID do erro salvo
         """
-        import json
-        device_info_json = json.dumps(device_info) if device_info else None
-        context_json = json.dumps(context) if context else None
-        
-        cursor = await self._connection.execute("""
-            INSERT INTO errors 
-            (error_id, timestamp, level, type, message, stack_trace, 
-             device_info, context, suggested_solution, resolved)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 0)
-        """, (
-            error_id,
-            datetime.now(),
-            level,
-            error_type,
-            message,
-            stack_trace,
-            device_info_json,
-            context_json,
-            suggested_solution
-        ))
-        
-        await self._connection.commit()
-        error_row_id = cursor.lastrowid
+        await self.save_errors([{
+            "error_id": error_id,
+            "level": level,
+            "type": error_type,
+            "message": message,
+            "stack_trace": stack_trace,
+            "device_info": device_info,
+            "context": context,
+            "suggested_solution": suggested_solution,
+            "fingerprint": fingerprint,
+            "template": template
+        }])
+        async with self._read("SELECT id FROM errors WHERE error_id = ?", (error_id,)) as cursor:
+            row = await cursor.fetchone()
+        error_row_id = row["id"] if row else 0
         logger.debug(f"Erro salvo: {error_row_id} ({error_type})")
         return error_row_id
     
+    async def save_errors(self, errors: List[Dict[str, Any]]) -> int:
+        """
+        Salva um lote de erros em uma única transação
+        
+        Os erros são inseridos com executemany e os contadores de
+        error_fingerprints são atualizados (upsert agregado por fingerprint)
+        na mesma transação: um commit por lote, não por erro.
+        
+        Args:
+            errors: Dicts com error_id, level, type, message e opcionalmente
+                stack_trace, device_info, context, suggested_solution,
+                fingerprint, template e timestamp
+            
+        Returns:
+            Número de erros inseridos
+        """
+        import json
+        if not errors:
+            return 0
+        
+        now = datetime.now()
+        rows = []
+        counters: Dict[str, Dict[str, Any]] = {}
+        for error in errors:
+            timestamp = error.get("timestamp") or now
+            fingerprint = error.get("fingerprint")
+            rows.append((
+                error["error_id"],
+                timestamp,
+                error["level"],
+                error["type"],
+                error["message"],
+                error.get("stack_trace"),
+                json.dumps(error["device_info"]) if error.get("device_info") else None,
+                json.dumps(error["context"]) if error.get("context") else None,
+                error.get("suggested_solution"),
+                fingerprint
+            ))
+            if not fingerprint:
+                continue
+            counter = counters.get(fingerprint)
+            if counter is None:
+                counters[fingerprint] = {
+                    "type": error["type"],
+                    "level": error["level"],
+                    "template": error.get("template") or error["message"][:200],
+                    "sample": error["message"][:500],
+                    "count": 1,
+                    "first": timestamp,
+                    "last": timestamp
+                }
+            else:
+                counter["count"] += 1
+                counter["first"] = min(counter["first"], timestamp)
+                counter["last"] = max(counter["last"], timestamp)
+        
+        async with self.writer() as conn:
+            await conn.executemany("""
+                INSERT INTO errors 
+                (error_id, timestamp, level, type, message, stack_trace, 
+                 device_info, context, suggested_solution, fingerprint, resolved)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 0)
+            """, rows)
+            if counters:
+                await conn.executemany("""
+                    INSERT INTO error_fingerprints 
+                    (fingerprint, type, level, template, sample_message, count, first_seen, last_seen)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(fingerprint) DO UPDATE SET
+                        count = count + excluded.count,
+                        level = excluded.level,
+                        first_seen = MIN(first_seen, excluded.first_seen),
+                        last_seen = MAX(last_seen, excluded.last_seen)
+                """, [
+                    (fp, c["type"], c["level"], c["template"], c["sample"], c["count"], c["first"], c["last"])
+                    for fp, c in counters.items()
+                ])
+        
+        logger.debug(f"Lote de erros salvo: {len(rows)} erros, {len(counters)} fingerprints")
+        return len(rows)
+    
+    async def backfill_error_fingerprints(self, fingerprint_fn, template_fn, batch_size: int = 500) -> int:
+        """
+        Calcula fingerprints de erros antigos (salvos sem fingerprint)
+        
+        Args:
+            fingerprint_fn: Função (tipo, mensagem) -> fingerprint
+            template_fn: Função mensagem -> template
+            batch_size: Erros processados por transação
+            
+        Returns:
+            Número de erros atualizados
+        """
+        updated = 0
+        while True:
+            async with self._read("""
+                SELECT id, type, level, message, timestamp FROM errors 
+                WHERE fingerprint IS NULL LIMIT ?
+            """, (batch_size,)) as cursor:
+                rows = await cursor.fetchall()
+            if not rows:
+                break
+            
+            counters: Dict[str, List] = {}
+            updates = []
+            for row in rows:
+                fingerprint = fingerprint_fn(row["type"], row["message"])
+                updates.append((fingerprint, row["id"]))
+                counter = counters.setdefault(fingerprint, [
+                    row["type"], row["level"], template_fn(row["message"]), row["message"][:500],
+                    0, row["timestamp"], row["timestamp"]
+                ])
+                counter[4] += 1
+                counter[5] = min(counter[5], row["timestamp"])
+                counter[6] = max(counter[6], row["timestamp"])
+            
+            async with self.writer() as conn:
+                await conn.executemany("UPDATE errors SET fingerprint = ? WHERE id = ?", updates)
+                await conn.executemany("""
+                    INSERT INTO error_fingerprints 
+                    (fingerprint, type, level, template, sample_message, count, first_seen, last_seen)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(fingerprint) DO UPDATE SET
+                        count = count + excluded.count,
+                        first_seen = MIN(first_seen, excluded.first_seen),
+                        last_seen = MAX(last_seen, excluded.last_seen)
+                """, [(fp, *values) for fp, values in counters.items()])
+            updated += len(rows)
+        
+        if updated:
+            logger.info(f"✅ Fingerprint calculado para {updated} erro(s) antigo(s)")
+        return updated
+    
+    async def upsert_error_rollups(self, rows: List[tuple]):
+        """
+        Soma contagens à tabela de rollup de erros
+        
+        Args:
+            rows: Tuplas (scope, key, resolution, bucket_start, count)
+        """
+        if not rows:
+            return
+        async with self.writer() as conn:
+            await conn.executemany("""
+                INSERT INTO error_rollups (scope, key, resolution, bucket_start, count)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(scope, key, resolution, bucket_start) DO UPDATE SET
+                    count = count + excluded.count
+            """, rows)
+    
+    async def get_error_rollups(self, since: float) -> List[tuple]:
+        """
+        Obtém rollups de erros a partir de um instante
+        
+        Args:
+            since: Timestamp epoch inicial
+            
+        Returns:
+            Tuplas (scope, key, resolution, bucket_start, count)
+        """
+        async with self._read("""
+            SELECT scope, key, resolution, bucket_start, count 
+            FROM error_rollups WHERE bucket_start >= ?
+        """, (int(since),)) as cursor:
+            rows = await cursor.fetchall()
+            return [tuple(row) for row in rows]
+    
+    async def prune_error_rollups(self, resolution: int, before: float) -> int:
+        """Remove rollups de uma resolução anteriores a um instante"""
+        cursor = await self._write("""
+            DELETE FROM error_rollups WHERE resolution = ? AND bucket_start < ?
+        """, (resolution, int(before)))
+        return cursor.rowcount
+    
+    async def get_fingerprint_types(self) -> Dict[str, str]:
+        """Mapa fingerprint -> tipo de erro"""
+        async with self._read("SELECT fingerprint, type FROM error_fingerprints") as cursor:
+            rows = await cursor.fetchall()
+            return {row["fingerprint"]: row["type"] for row in rows}
+    
+    async def get_error_groups(
+        self,
+        error_type: Optional[str] = None,
+        limit: int = 50
+    ) -> List[Dict]:
+        """
+        Lista grupos de erros (fingerprints) pelos contadores agregados
+        
+        Args:
+            error_type: Filtrar por tipo
+            limit: Limite de grupos
+            
+        Returns:
+            Grupos ordenados por número de ocorrências
+        """
+        query = "SELECT * FROM error_fingerprints"
+        params: List[Any] = []
+        if error_type:
+            query += " WHERE type = ?"
+            params.append(error_type)
+        query += " ORDER BY count DESC, last_seen DESC LIMIT ?"
+        params.append(limit)
+        
+        async with self._read(query, params) as cursor:
+            rows = await cursor.fetchall()
+            return [
+                {
+                    "fingerprint": row["fingerprint"],
+                    "type": row["type"],
+                    "level": row["level"],
+                    "template": row["template"],
+                    "sample_message": row["sample_message"],
+                    "count": row["count"],
+                    "first_seen": row["first_seen"],
+                    "last_seen": row["last_seen"]
+                }
+                for row in rows
+            ]
+    
     async def get_error(self, error_id: str) -> Optional[Dict]:
         """Obtém erro por ID"""
-        async with self._connection.execute("""
+        async with self._read("""
             SELECT * FROM errors WHERE error_id = ?
         """, (error_id,)) as cursor:
             row = await cursor.fetchone()
@@ -967,6 +1544,7 @@ class Database:
                     "suggested_solution": row["suggested_solution"],
                     "resolved": bool(row["resolved"]),
                     "resolution_notes": row["resolution_notes"],
+                    "fingerprint": row["fingerprint"],
                     "created_at": row["created_at"]
                 }
             return None
@@ -977,7 +1555,8 @@ class Database:
         level: Optional[str] = None,
         resolved: Optional[bool] = None,
         limit: int = 100,
-        offset: int = 0
+        offset: int = 0,
+        fingerprint: Optional[str] = None
     ) -> List[Dict]:
         """
         Lista erros com filtros
@@ -988,10 +1567,15 @@ class Database:
             resolved: Filtrar por status de resolução
             limit: Limite de resultados
             offset: Offset para paginação
+            fingerprint: Filtrar por fingerprint (grupo)
         """
         query = "SELECT * FROM errors WHERE 1=1"
         params = []
         
+        if fingerprint:
+            query += " AND fingerprint = ?"
+            params.append(fingerprint)
+        
         if error_type:
             query += " AND type = ?"
             params.append(error_type)
@@ -1007,7 +1591,7 @@ class Database:
         query += " ORDER BY timestamp DESC LIMIT ? OFFSET ?"
         params.extend([limit, offset])
         
-        async with self._connection.execute(query, params) as cursor:
+        async with self._read(query, params) as cursor:
             rows = await cursor.fetchall()
             import json
             return [
@@ -1024,6 +1608,7 @@ class Database:
                     "suggested_solution": row["suggested_solution"],
                     "resolved": bool(row["resolved"]),
                     "resolution_notes": row["resolution_notes"],
+                    "fingerprint": row["fingerprint"],
                     "created_at": row["created_at"]
                 }
                 for row in rows
@@ -1035,13 +1620,11 @@ class Database:
         resolution_notes: Optional[str] = None
     ) -> bool:
         """Marca erro como resolvido"""
-        cursor = await self._connection.execute("""
+        cursor = await self._write("""
             UPDATE errors 
             SET resolved = 1, resolution_notes = ?
             WHERE error_id = ?
         """, (resolution_notes, error_id))
-        
-        await self._connection.commit()
         return cursor.rowcount > 0
     
     async def get_error_stats(self) -> Dict[str, Any]:
@@ -1049,14 +1632,14 @@ class Database:
         stats = {}
         
         # Total de erros
-        async with self._connection.execute("""
+        async with self._read("""
             SELECT COUNT(*) as total FROM errors
         """) as cursor:
             row = await cursor.fetchone()
             stats["total"] = row["total"] if row else 0
         
         # Por nível
-        async with self._connection.execute("""
+        async with self._read("""
             SELECT level, COUNT(*) as count 
             FROM errors 
             GROUP BY level
@@ -1065,7 +1648,7 @@ class Database:
             stats["by_level"] = {row["level"]: row["count"] for row in rows}
         
         # Por tipo
-        async with self._connection.execute("""
+        async with self._read("""
             SELECT type, COUNT(*) as count 
             FROM errors 
             GROUP BY type
@@ -1074,7 +1657,7 @@ class Database:
             stats["by_type"] = {row["type"]: row["count"] for row in rows}
         
         # Resolvidos vs não resolvidos
-        async with self._connection.execute("""
+        async with self._read("""
             SELECT resolved, COUNT(*) as count 
             FROM errors 
             GROUP BY resolved
@@ -1086,7 +1669,7 @@ class Database:
             }
         
         # Erros recentes (últimas 24h)
-        async with self._connection.execute("""
+        async with self._read("""
             SELECT COUNT(*) as count 
             FROM errors 
             WHERE timestamp > datetime('now', '-1 day')
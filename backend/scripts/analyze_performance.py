@@ -6,7 +6,7 @@ import asyncio
 import time
 import json
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 from dataclasses import dataclass, asdict
 from loguru import logger
 
@@ -33,6 +33,40 @@ class PerformanceMetrics:
     cache_hit: bool = False
 
 
+@dataclass
+class RequestMetrics:
+    """Resultado de uma requisição de um cenário de carga"""
+    scenario: str
+    start: float
+    end: float
+    ok: bool
+    ttfb: Optional[float] = None  # Tempo até o primeiro token/evento útil
+    error: Optional[str] = None
+
+    @property
+    def latency(self) -> float:
+        return self.end - self.start
+
+
+def percentile(data: List[float], p: float) -> float:
+    """Percentil p (0-100) de uma lista não vazia"""
+    sorted_data = sorted(data)
+    index = int(len(sorted_data) * p / 100)
+    return sorted_data[min(index, len(sorted_data) - 1)]
+
+
+def _distribution(data: List[float]) -> Dict[str, float]:
+    """Média, mediana, p95, p99, mínimo e máximo"""
+    return {
+        "mean": sum(data) / len(data),
+        "median": percentile(data, 50),
+        "p95": percentile(data, 95),
+        "p99": percentile(data, 99),
+        "min": min(data),
+        "max": max(data)
+    }
+
+
 class PerformanceAnalyzer:
     """Analisador de performance do pipeline"""
     
@@ -40,6 +74,8 @@ class PerformanceAnalyzer:
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
         self.metrics: List[PerformanceMetrics] = []
+        self.requests: List[RequestMetrics] = []
+        self.loop_lag: Optional[Dict[str, Any]] = None
     
     def record_metrics(self, metrics: PerformanceMetrics):
         """Registra métricas de uma requisição"""
@@ -50,23 +86,57 @@ class PerformanceAnalyzer:
             f"Total={metrics.total_time:.2f}s"
         )
     
+    def record_request(self, request: RequestMetrics):
+        """Registra o resultado de uma requisição de teste de carga"""
+        self.requests.append(request)
+    
+    def record_loop_lag(self, lag: Dict[str, Any]):
+        """Registra estatísticas de atraso do event loop do servidor (ms)"""
+        self.loop_lag = lag
+    
+    def _scenario_report(self) -> Dict[str, Any]:
+        """Latência, throughput e erros por cenário de carga"""
+        scenarios: Dict[str, Any] = {}
+        names = sorted({r.scenario for r in self.requests})
+        for name in names:
+            results = [r for r in self.requests if r.scenario == name]
+            ok = [r for r in results if r.ok]
+            elapsed = max(r.end for r in results) - min(r.start for r in results)
+            entry: Dict[str, Any] = {
+                "requests": len(results),
+                "errors": len(results) - len(ok),
+                "error_rate": (len(results) - len(ok)) / len(results),
+                "throughput_rps": len(ok) / elapsed if elapsed > 0 else 0.0
+            }
+            if ok:
+                entry["latency"] = _distribution([r.latency for r in ok])
+                ttfbs = [r.ttfb for r in ok if r.ttfb is not None]
+                if ttfbs:
+                    entry["ttfb"] = _distribution(ttfbs)
+            errors = [r.error for r in results if r.error]
+            if errors:
+                entry["sample_errors"] = sorted(set(errors))[:5]
+            scenarios[name] = entry
+        return scenarios
+    
     def generate_report(self) -> Dict[str, Any]:
         """Gera relatório de performance"""
-        if not self.metrics:
+        if not self.metrics and not self.requests:
             return {"error": "Nenhuma métrica coletada"}
         
+        if not self.metrics:
+            report: Dict[str, Any] = {"total_requests": len(self.requests)}
+            report["scenarios"] = self._scenario_report()
+            if self.loop_lag is not None:
+                report["event_loop_lag_ms"] = self.loop_lag
+            return report
+        
         # Calcula estatísticas
         stt_times = [m.stt_time for m in self.metrics]
         llm_times = [m.llm_time for m in self.metrics]
         tts_times = [m.tts_time for m in self.metrics]
         total_times = [m.total_time for m in self.metrics]
         
-        # Percentis
-        def percentile(data: List[float], p: float) -> float:
-            sorted_data = sorted(data)
-            index = int(len(sorted_data) * p / 100)
-            return sorted_data[min(index, len(sorted_data) - 1)]
-        
         report = {
             "total_requests": len(self.metrics),
             "stt": {
@@ -106,6 +176,11 @@ class PerformanceAnalyzer:
             "average_response_length": sum(m.tts_text_length for m in self.metrics) / len(self.metrics)
         }
         
+        if self.requests:
+            report["scenarios"] = self._scenario_report()
+        if self.loop_lag is not None:
+            report["event_loop_lag_ms"] = self.loop_lag
+        
         return report
     
     def save_report(self, filename: str = "performance_report.json"):
@@ -123,6 +198,10 @@ class PerformanceAnalyzer:
         """Imprime resumo das métricas"""
         report = self.generate_report()
         
+        if "stt" not in report:
+            self.print_load_summary(report)
+            return
+        
         print("\n" + "=" * 60)
         print("📊 RELATÓRIO DE PERFORMANCE - JONH ASSISTANT")
         print("=" * 60)
@@ -197,6 +276,38 @@ class PerformanceAnalyzer:
             print("   - Otimizar etapa mais lenta primeiro")
         
         print("=" * 60 + "\n")
+    
+    def print_load_summary(self, report: Optional[Dict[str, Any]] = None):
+        """Imprime resumo do teste de carga (cenários e event loop)"""
+        report = report or self.generate_report()
+        
+        print("\n" + "=" * 60)
+        print("📊 TESTE DE CARGA - JONH ASSISTANT")
+        print("=" * 60)
+        for name, scenario in report.get("scenarios", {}).items():
+            print("\n" + "-" * 60)
+            print(f"{name}: {scenario['requests']} requisições, {scenario['errors']} erros, "
+                  f"{scenario['throughput_rps']:.2f} req/s")
+            print("-" * 60)
+            latency = scenario.get("latency")
+            if latency:
+                print(f"  Latência P50/P95/P99: {latency['median']:.3f}s / {latency['p95']:.3f}s / {latency['p99']:.3f}s")
+            ttfb = scenario.get("ttfb")
+            if ttfb:
+                print(f"  TTFB     P50/P95/P99: {ttfb['median']:.3f}s / {ttfb['p95']:.3f}s / {ttfb['p99']:.3f}s")
+            for error in scenario.get("sample_errors", []):
+                print(f"  ❌ {error}")
+        
+        lag = report.get("event_loop_lag_ms")
+        if lag:
+            print("\n" + "-" * 60)
+            print("Event loop do servidor")
+            print("-" * 60)
+            print(f"  Atraso P50/P95/P99: {lag['p50']:.1f}ms / {lag['p95']:.1f}ms / {lag['p99']:.1f}ms "
+                  f"(máx {lag['max']:.1f}ms, {lag['samples']} amostras)")
+            if lag["p99"] > 100:
+                print("⚠️  Event loop bloqueado (P99 > 100ms): procure chamadas síncronas em handlers async")
+        print("=" * 60 + "\n")
 
 
 async def main():
@@ -0,0 +1,82 @@
+"""
+STT simulado para testes de carga
+
+Mesma interface do WhisperSTTService, sem modelo: devolve frases fixas e
+consome tempo proporcional à duração do áudio (real-time factor
+configurável), como o Whisper faria na thread que o chama.
+"""
+import asyncio
+import itertools
+import threading
+import time
+from typing import Optional, Tuple
+
+_PHRASES = (
+    "qual é a previsão do tempo para amanhã",
+    "me lembre de comprar pão",
+    "quanto é doze vezes oito",
+    "conte uma curiosidade sobre o espaço",
+)
+
+# WAV PCM 16 kHz, 16 bits, mono (formato enviado pelo gerador de carga)
+_BYTES_PER_SECOND = 16000 * 2
+_WAV_HEADER = 44
+
+
+class FakeSTTService:
+    """Substituto do WhisperSTTService com latência determinística"""
+
+    def __init__(self, real_time_factor: float = 0.1, min_latency: float = 0.05, **kwargs):
+        """
+        Inicializa o STT simulado
+
+        Args:
+            real_time_factor: Segundos de processamento por segundo de áudio
+            min_latency: Latência mínima (s) por transcrição
+            **kwargs: Ignorados (compatibilidade com WhisperSTTService)
+        """
+        self.real_time_factor = real_time_factor
+        self.min_latency = min_latency
+        self.model_size = "fake"
+        self._phrases = itertools.cycle(_PHRASES)
+        self._lock = threading.Lock()
+        self.calls = 0
+
+    def transcribe_audio(
+        self,
+        audio_data: bytes,
+        language: str = "pt",
+        session_id: Optional[str] = None
+    ) -> Tuple[str, float, float]:
+        """
+        Retorna (texto, confiança, duração) após o tempo simulado
+
+        A espera é síncrona, como a inferência do Whisper.
+        """
+        duration = max(0, len(audio_data) - _WAV_HEADER) / _BYTES_PER_SECOND
+        time.sleep(max(self.min_latency, duration * self.real_time_factor))
+        with self._lock:
+            self.calls += 1
+            text = next(self._phrases)
+        return text, 0.95, duration
+
+    async def transcribe_audio_async(
+        self,
+        audio_data: bytes,
+        language: str = "pt",
+        session_id: Optional[str] = None
+    ) -> Tuple[str, float, float]:
+        """Mesma transcrição simulada, numa thread (como o WhisperSTTService sem batching)"""
+        return await asyncio.to_thread(self.transcribe_audio, audio_data, language, session_id)
+
+    async def stop_batcher(self):
+        """Sem batching no STT simulado"""
+
+    def is_available(self) -> bool:
+        return True
+
+    def is_loaded(self) -> bool:
+        return True
+
+    def is_ready(self) -> bool:
+        return True
@@ -0,0 +1,182 @@
+"""
+Gerador de carga assíncrono para os endpoints do Jonh
+
+Abre N clientes concorrentes por cenário:
+- process_text: POST /api/process_text (resposta completa)
+- stream_text: GET /api/stream_text (SSE, TTFB no primeiro token)
+- ws_listen: WebSocket /ws/listen (áudio WAV, TTFB na transcrição)
+
+Cada requisição vira um RequestMetrics para o PerformanceAnalyzer.
+"""
+import asyncio
+import io
+import json
+import time
+import wave
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List
+
+import httpx
+from loguru import logger
+
+from backend.scripts.analyze_performance import RequestMetrics
+
+SCENARIOS = ("process_text", "stream_text", "ws_listen")
+
+_QUESTIONS = (
+    "Qual é a previsão do tempo para amanhã?",
+    "Me conte uma curiosidade sobre o oceano.",
+    "Quanto é doze vezes oito?",
+    "Sugira um nome para um gato.",
+)
+
+
+@dataclass
+class LoadConfig:
+    """Parâmetros de um teste de carga"""
+    base_url: str = "http://127.0.0.1:8001"
+    concurrency: int = 10  # Clientes simultâneos por cenário
+    requests_per_client: int = 5
+    scenarios: List[str] = field(default_factory=lambda: list(SCENARIOS))
+    timeout: float = 60.0
+    audio_seconds: float = 2.0  # Duração do áudio enviado no /ws/listen
+
+    @property
+    def ws_url(self) -> str:
+        return self.base_url.replace("http://", "ws://").replace("https://", "wss://") + "/ws/listen"
+
+
+def make_wav(seconds: float, sample_rate: int = 16000) -> bytes:
+    """WAV PCM 16 bits mono com silêncio"""
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(b"\x00\x00" * int(seconds * sample_rate))
+    return buffer.getvalue()
+
+
+def _question(client_id: int, index: int) -> str:
+    # Texto único por requisição para não medir o cache de respostas
+    return f"{_QUESTIONS[(client_id + index) % len(_QUESTIONS)]} (cliente {client_id}, pedido {index})"
+
+
+async def process_text_request(http: httpx.AsyncClient, config: LoadConfig, client_id: int, index: int) -> RequestMetrics:
+    """POST /api/process_text"""
+    start = time.perf_counter()
+    try:
+        response = await http.post(
+            f"{config.base_url}/api/process_text",
+            data={"texto": _question(client_id, index), "session_id": f"load-pt-{client_id}"}
+        )
+        end = time.perf_counter()
+        ok = response.status_code == 200
+        return RequestMetrics("process_text", start, end, ok, error=None if ok else f"HTTP {response.status_code}")
+    except Exception as e:
+        return RequestMetrics("process_text", start, time.perf_counter(), False, error=type(e).__name__)
+
+
+async def stream_text_request(http: httpx.AsyncClient, config: LoadConfig, client_id: int, index: int) -> RequestMetrics:
+    """GET /api/stream_text (SSE)"""
+    start = time.perf_counter()
+    ttfb = None
+    try:
+        params = {"texto": _question(client_id, index), "session_id": f"load-st-{client_id}"}
+        async with http.stream("GET", f"{config.base_url}/api/stream_text", params=params) as response:
+            if response.status_code != 200:
+                return RequestMetrics("stream_text", start, time.perf_counter(), False, error=f"HTTP {response.status_code}")
+            async for line in response.aiter_lines():
+                if not line.startswith("data: "):
+                    continue
+                event = json.loads(line[6:])
+                if event.get("type") in ("token", "complete") and ttfb is None:
+                    ttfb = time.perf_counter() - start
+                if event.get("type") == "complete":
+                    return RequestMetrics("stream_text", start, time.perf_counter(), True, ttfb=ttfb)
+                if event.get("type") == "error":
+                    return RequestMetrics("stream_text", start, time.perf_counter(), False, error=event.get("message"))
+        return RequestMetrics("stream_text", start, time.perf_counter(), False, error="stream encerrado sem 'complete'")
+    except Exception as e:
+        return RequestMetrics("stream_text", start, time.perf_counter(), False, error=type(e).__name__)
+
+
+async def ws_listen_client(config: LoadConfig, client_id: int, results: List[RequestMetrics]):
+    """Uma conexão /ws/listen enviando requests_per_client áudios em sequência"""
+    import websockets
+
+    audio = make_wav(config.audio_seconds)
+    try:
+        async with websockets.connect(config.ws_url, max_size=None, open_timeout=config.timeout) as ws:
+            greeting = json.loads(await asyncio.wait_for(ws.recv(), config.timeout))
+            if greeting.get("type") != "connected":
+                raise RuntimeError(greeting.get("message", "conexão recusada"))
+
+            for _ in range(config.requests_per_client):
+                start = time.perf_counter()
+                ttfb = None
+                await ws.send(audio)
+                while True:
+                    message = await asyncio.wait_for(ws.recv(), config.timeout)
+                    if isinstance(message, bytes):
+                        continue
+                    event = json.loads(message)
+                    if event.get("type") == "transcription" and ttfb is None:
+                        ttfb = time.perf_counter() - start
+                    elif event.get("type") == "complete":
+                        results.append(RequestMetrics("ws_listen", start, time.perf_counter(), True, ttfb=ttfb))
+                        break
+                    elif event.get("type") == "error":
+                        results.append(RequestMetrics(
+                            "ws_listen", start, time.perf_counter(), False, error=event.get("message")
+                        ))
+                        break
+    except Exception as e:
+        now = time.perf_counter()
+        results.append(RequestMetrics("ws_listen", now, now, False, error=type(e).__name__))
+
+
+async def _http_client(
+    request: Callable[..., Awaitable[RequestMetrics]],
+    http: httpx.AsyncClient,
+    config: LoadConfig,
+    client_id: int,
+    results: List[RequestMetrics]
+):
+    for index in range(config.requests_per_client):
+        results.append(await request(http, config, client_id, index))
+
+
+async def run_scenario(name: str, config: LoadConfig) -> List[RequestMetrics]:
+    """
+    Executa um cenário com config.concurrency clientes simultâneos
+
+    Args:
+        name: process_text, stream_text ou ws_listen
+        config: Parâmetros do teste
+
+    Returns:
+        Métricas de todas as requisições do cenário
+    """
+    if name not in SCENARIOS:
+        raise ValueError(f"Cenário desconhecido: {name}")
+
+    results: List[RequestMetrics] = []
+    logger.info(f"🚀 Cenário {name}: {config.concurrency} clientes x {config.requests_per_client} requisições")
+
+    if name == "ws_listen":
+        await asyncio.gather(*(ws_listen_client(config, i, results) for i in range(config.concurrency)))
+        return results
+
+    request = process_text_request if name == "process_text" else stream_text_request
+    limits = httpx.Limits(max_connections=config.concurrency, max_keepalive_connections=config.concurrency)
+    async with httpx.AsyncClient(timeout=config.timeout, limits=limits) as http:
+        await asyncio.gather(*(
+            _http_client(request, http, config, i, results) for i in range(config.concurrency)
+        ))
+    return results
+
+
+async def run_load(config: LoadConfig) -> Dict[str, List[RequestMetrics]]:
+    """Executa os cenários configurados, um após o outro"""
+    return {name: await run_scenario(name, config) for name in config.scenarios}
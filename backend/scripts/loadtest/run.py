@@ -0,0 +1,158 @@
+"""
+Executa um teste de carga completo e gera o relatório
+
+Por padrão sobe o stub de LLM (em thread) e o servidor do Jonh com STT
+simulado (em subprocesso), roda os cenários e salva
+performance_reports/loadtest_report.json com p50/p95/p99, throughput e
+atraso do event loop.
+
+Uso:
+    python -m backend.scripts.loadtest.run --concurrency 20 --requests 5
+    python -m backend.scripts.loadtest.run --target http://127.0.0.1:8000 --scenarios stream_text
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+import httpx
+from loguru import logger
+
+ROOT = Path(__file__).parent.parent.parent.parent
+sys.path.insert(0, str(ROOT))
+
+from backend.scripts.analyze_performance import PerformanceAnalyzer
+from backend.scripts.loadtest.load_generator import SCENARIOS, LoadConfig, run_load
+from backend.scripts.loadtest.stub_llm import StubConfig, create_stub_app
+
+
+def start_stub(config: StubConfig, host: str, port: int):
+    """Sobe o stub de LLM em uma thread daemon"""
+    import uvicorn
+
+    server = uvicorn.Server(uvicorn.Config(create_stub_app(config), host=host, port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    return server
+
+
+def start_server(port: int, stub_url: str, stt_rtf: float) -> subprocess.Popen:
+    """Sobe o servidor do Jonh para teste de carga em um subprocesso"""
+    return subprocess.Popen(
+        [
+            sys.executable, "-m", "backend.scripts.loadtest.server",
+            "--port", str(port), "--stub-url", stub_url, "--stt-rtf", str(stt_rtf)
+        ],
+        cwd=str(ROOT),
+        env=os.environ.copy()
+    )
+
+
+async def wait_ready(base_url: str, timeout: float) -> bool:
+    """Aguarda /health/live responder"""
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(timeout=2.0) as http:
+        while time.monotonic() < deadline:
+            try:
+                if (await http.get(f"{base_url}/health/live")).status_code == 200:
+                    return True
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.5)
+    return False
+
+
+async def _fetch_loop_lag(base_url: str, reset: bool = False) -> Optional[dict]:
+    """Lê (ou zera) o atraso do event loop; None se o alvo não expõe o endpoint"""
+    try:
+        async with httpx.AsyncClient(timeout=5.0) as http:
+            if reset:
+                response = await http.post(f"{base_url}/loadtest/loop-lag/reset")
+            else:
+                response = await http.get(f"{base_url}/loadtest/loop-lag")
+        return response.json() if response.status_code == 200 else None
+    except httpx.HTTPError:
+        return None
+
+
+async def run(args) -> PerformanceAnalyzer:
+    stub_server = None
+    process = None
+    base_url = args.target
+    if not base_url:
+        stub_url = f"http://127.0.0.1:{args.stub_port}"
+        stub_server = start_stub(
+            StubConfig(
+                ttft_ms=args.ttft_ms,
+                tokens_per_second=args.tokens_per_second,
+                response_tokens=args.response_tokens
+            ),
+            "127.0.0.1",
+            args.stub_port
+        )
+        process = start_server(args.port, stub_url, args.stt_rtf)
+        base_url = f"http://127.0.0.1:{args.port}"
+
+    try:
+        if not await wait_ready(base_url, args.startup_timeout):
+            raise RuntimeError(f"Servidor não respondeu em {base_url}/health/live")
+
+        analyzer = PerformanceAnalyzer(args.output_dir)
+        await _fetch_loop_lag(base_url, reset=True)
+        config = LoadConfig(
+            base_url=base_url,
+            concurrency=args.concurrency,
+            requests_per_client=args.requests,
+            scenarios=args.scenarios,
+            timeout=args.timeout
+        )
+        results = await run_load(config)
+        for metrics in results.values():
+            for request in metrics:
+                analyzer.record_request(request)
+
+        lag = await _fetch_loop_lag(base_url)
+        if lag:
+            analyzer.record_loop_lag(lag)
+        return analyzer
+    finally:
+        if process:
+            process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        if stub_server:
+            stub_server.should_exit = True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de carga do Jonh com LLM/STT simulados")
+    parser.add_argument("--target", default=None, help="URL de um servidor já rodando (não sobe stub/servidor)")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--stub-port", type=int, default=9100)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--requests", type=int, default=5, help="Requisições por cliente")
+    parser.add_argument("--scenarios", nargs="+", default=list(SCENARIOS), choices=SCENARIOS)
+    parser.add_argument("--ttft-ms", type=float, default=150.0)
+    parser.add_argument("--tokens-per-second", type=float, default=200.0)
+    parser.add_argument("--response-tokens", type=int, default=40)
+    parser.add_argument("--stt-rtf", type=float, default=0.1)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--startup-timeout", type=float, default=120.0)
+    parser.add_argument("--output-dir", default="performance_reports")
+    args = parser.parse_args()
+
+    analyzer = asyncio.run(run(args))
+    analyzer.save_report("loadtest_report.json")
+    analyzer.print_load_summary()
+    logger.info(f"✅ Relatório salvo em {Path(args.output_dir) / 'loadtest_report.json'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Servidor do Jonh configurado para teste de carga
+
+Sobe a aplicação real (backend.api.main) apontando Groq e Ollama para o stub
+local, com o Whisper substituído pelo FakeSTTService e o rate limiting
+desligado. Expõe também /loadtest/loop-lag com o atraso medido do event loop.
+
+Uso:
+    python -m backend.scripts.loadtest.server --port 8001 --stub-url http://127.0.0.1:9100
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+
+class LoopLagMonitor:
+    """Mede o atraso do event loop (quanto um sleep curto demora além do pedido)"""
+
+    def __init__(self, interval: float = 0.05, max_samples: int = 20000):
+        self.interval = interval
+        self.max_samples = max_samples
+        self.samples: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag = time.perf_counter() - start - self.interval
+            self.samples.append(max(0.0, lag) * 1000.0)
+            if len(self.samples) > self.max_samples:
+                del self.samples[:len(self.samples) - self.max_samples]
+
+    def reset(self):
+        self.samples.clear()
+
+    def stats(self) -> Dict:
+        """p50/p95/p99/máx do atraso em ms"""
+        from backend.scripts.analyze_performance import percentile
+        if not self.samples:
+            return {"samples": 0, "p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+        return {
+            "samples": len(self.samples),
+            "p50": percentile(self.samples, 50),
+            "p95": percentile(self.samples, 95),
+            "p99": percentile(self.samples, 99),
+            "max": max(self.samples)
+        }
+
+
+def configure_environment(stub_url: str):
+    """Aponta Groq/Ollama para o stub (antes de importar backend.config)"""
+    os.environ["GROQ_BASE_URL"] = stub_url
+    os.environ["GROQ_API_KEY"] = "loadtest-key"
+    os.environ["OLLAMA_HOST"] = stub_url
+
+
+def create_app(real_time_factor: float = 0.1):
+    """
+    Importa a aplicação real com STT simulado e sem rate limiting
+
+    Args:
+        real_time_factor: Custo do STT simulado por segundo de áudio
+
+    Returns:
+        Aplicação FastAPI
+    """
+    from backend.api.startup import services_initializer
+    from backend.scripts.loadtest.fake_stt import FakeSTTService
+
+    services_initializer.WhisperSTTService = (
+        lambda **kwargs: FakeSTTService(real_time_factor=real_time_factor)
+    )
+
+    from backend.api.main import app, app_limiter
+
+    # Os limites por IP derrubariam qualquer teste com clientes concorrentes
+    app_limiter.enabled = False
+
+    monitor = LoopLagMonitor()
+    app.state.loop_lag_monitor = monitor
+
+    @app.on_event("startup")
+    async def _start_loop_lag_monitor():
+        monitor.start()
+
+    @app.on_event("shutdown")
+    async def _stop_loop_lag_monitor():
+        await monitor.stop()
+
+    @app.get("/loadtest/loop-lag")
+    async def get_loop_lag():
+        return monitor.stats()
+
+    @app.post("/loadtest/loop-lag/reset")
+    async def reset_loop_lag():
+        monitor.reset()
+        return {"status": "ok"}
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor do Jonh para teste de carga")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--stub-url", default="http://127.0.0.1:9100")
+    parser.add_argument("--stt-rtf", type=float, default=0.1, help="Real-time factor do STT simulado")
+    args = parser.parse_args()
+
+    configure_environment(args.stub_url)
+    app = create_app(args.stt_rtf)
+
+    import uvicorn
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+"""
+Servidor stub de LLM (Groq e Ollama) para testes de carga
+
+Implementa o suficiente das APIs do Groq (OpenAI-compatível) e do Ollama para
+os clientes oficiais: respostas normais e em streaming, com tempo até o
+primeiro token e taxa de tokens configuráveis. Nada sai da máquina e os
+resultados são reproduzíveis.
+
+Uso:
+    python -m backend.scripts.loadtest.stub_llm --port 9100 --ttft-ms 150 --tokens-per-second 200
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, List
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+_WORDS = (
+    "Claro", "posso", "ajudar", "com", "isso", "hoje", "a", "previsão", "indica",
+    "tempo", "firme", "e", "temperatura", "agradável", "no", "fim", "da", "tarde",
+)
+
+
+@dataclass
+class StubConfig:
+    """Perfil de latência do LLM simulado"""
+    ttft_ms: float = 150.0  # Tempo até o primeiro token
+    tokens_per_second: float = 200.0  # Taxa de geração
+    response_tokens: int = 40  # Tokens por resposta
+    jitter: float = 0.2  # Variação relativa (0.2 = ±20%)
+    seed: int = 42
+
+    def delays(self, rng: random.Random) -> tuple[float, float]:
+        """(espera até o primeiro token, intervalo entre tokens) em segundos"""
+        factor = 1.0 + rng.uniform(-self.jitter, self.jitter)
+        return self.ttft_ms / 1000.0 * factor, factor / max(self.tokens_per_second, 1e-6)
+
+
+def _tokens(config: StubConfig) -> List[str]:
+    return [_WORDS[i % len(_WORDS)] + " " for i in range(config.response_tokens)]
+
+
+def _rate_limit_headers(stats: Dict) -> Dict[str, str]:
+    """Headers de rate limit no formato do Groq (folgados: o stub não limita)"""
+    return {
+        "x-ratelimit-limit-requests": "1000000",
+        "x-ratelimit-remaining-requests": str(1000000 - stats["groq_requests"]),
+        "x-ratelimit-reset-requests": "1s",
+        "x-ratelimit-limit-tokens": "100000000",
+        "x-ratelimit-remaining-tokens": "100000000",
+        "x-ratelimit-reset-tokens": "1s",
+    }
+
+
+def create_stub_app(config: StubConfig) -> FastAPI:
+    """
+    Cria app com endpoints do Groq e do Ollama
+
+    Args:
+        config: Perfil de latência
+
+    Returns:
+        Aplicação FastAPI
+    """
+    app = FastAPI(title="Stub LLM (Groq/Ollama)")
+    rng = random.Random(config.seed)
+    stats = {"groq_requests": 0, "ollama_requests": 0, "streams": 0, "in_flight": 0, "max_in_flight": 0}
+
+    def _enter():
+        stats["in_flight"] += 1
+        stats["max_in_flight"] = max(stats["max_in_flight"], stats["in_flight"])
+
+    def _leave():
+        stats["in_flight"] -= 1
+
+    async def _generate() -> AsyncIterator[str]:
+        ttft, interval = config.delays(rng)
+        await asyncio.sleep(ttft)
+        for index, token in enumerate(_tokens(config)):
+            if index:
+                await asyncio.sleep(interval)
+            yield token
+
+    # ========== GROQ (OpenAI-compatível) ==========
+
+    @app.post("/openai/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        stats["groq_requests"] += 1
+        model = body.get("model", "stub")
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        created = int(time.time())
+        prompt_tokens = sum(len(str(m.get("content") or "").split()) for m in body.get("messages", []))
+
+        if body.get("stream"):
+            stats["streams"] += 1
+
+            async def sse():
+                _enter()
+                try:
+                    async for token in _generate():
+                        chunk = {
+                            "id": completion_id, "object": "chat.completion.chunk", "created": created,
+                            "model": model,
+                            "choices": [{"index": 0, "delta": {"content": token}, "finish_reason": None}]
+                        }
+                        yield f"data: {json.dumps(chunk)}\n\n"
+                    final = {
+                        "id": completion_id, "object": "chat.completion.chunk", "created": created,
+                        "model": model, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]
+                    }
+                    yield f"data: {json.dumps(final)}\n\n"
+                    yield "data: [DONE]\n\n"
+                finally:
+                    _leave()
+
+            return StreamingResponse(sse(), media_type="text/event-stream", headers=_rate_limit_headers(stats))
+
+        _enter()
+        try:
+            text = "".join([token async for token in _generate()]).strip()
+        finally:
+            _leave()
+        return JSONResponse({
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": created,
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": text},
+                "finish_reason": "stop"
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": config.response_tokens,
+                "total_tokens": prompt_tokens + config.response_tokens
+            }
+        }, headers=_rate_limit_headers(stats))
+
+    @app.get("/openai/v1/models/{model}")
+    async def retrieve_model(model: str):
+        return {"id": model, "object": "model", "created": 0, "owned_by": "stub"}
+
+    # ========== OLLAMA ==========
+
+    @app.post("/api/chat")
+    async def ollama_chat(request: Request):
+        body = await request.json()
+        stats["ollama_requests"] += 1
+        model = body.get("model", "stub")
+
+        def message(content: str, done: bool) -> Dict:
+            data = {
+                "model": model,
+                "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                "message": {"role": "assistant", "content": content},
+                "done": done
+            }
+            if done:
+                data.update({"done_reason": "stop", "eval_count": config.response_tokens})
+            return data
+
+        if body.get("stream", True):
+            stats["streams"] += 1
+
+            async def ndjson():
+                _enter()
+                try:
+                    async for token in _generate():
+                        yield json.dumps(message(token, False)) + "\n"
+                    yield json.dumps(message("", True)) + "\n"
+                finally:
+                    _leave()
+
+            return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+        _enter()
+        try:
+            text = "".join([token async for token in _generate()]).strip()
+        finally:
+            _leave()
+        return message(text, True)
+
+    @app.get("/api/tags")
+    async def ollama_tags():
+        return {"models": [{"name": "llama3:8b-instruct-q4_0", "model": "llama3:8b-instruct-q4_0", "size": 0}]}
+
+    @app.get("/api/version")
+    async def ollama_version():
+        return {"version": "stub"}
+
+    @app.get("/stats")
+    async def get_stats():
+        return stats
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor stub de LLM (Groq/Ollama)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--ttft-ms", type=float, default=150.0)
+    parser.add_argument("--tokens-per-second", type=float, default=200.0)
+    parser.add_argument("--response-tokens", type=int, default=40)
+    parser.add_argument("--jitter", type=float, default=0.2)
+    args = parser.parse_args()
+
+    import uvicorn
+    config = StubConfig(
+        ttft_ms=args.ttft_ms,
+        tokens_per_second=args.tokens_per_second,
+        response_tokens=args.response_tokens,
+        jitter=args.jitter
+    )
+    uvicorn.run(create_stub_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+"""
+Decodificação incremental de áudio para o STT
+
+WAV PCM é decodificado à medida que os bytes chegam, direto num buffer
+float32 mono pré-alocado pelo tamanho declarado no header (limitado ao
+tamanho máximo de upload, já que o header pode mentir): o áudio nunca
+existe inteiro como bytes, nem como float64 ou em vários canais. Outros
+formatos (mp3, ogg, flac) são lidos pelo soundfile direto do arquivo, já
+em float32.
+"""
+import struct
+from dataclasses import dataclass
+from typing import BinaryIO, Optional, Union
+
+import numpy as np
+import soundfile as sf
+
+# Formatos de amostra do chunk "fmt " suportados no caminho incremental
+_WAVE_FORMAT_PCM = 1
+_WAVE_FORMAT_FLOAT = 3
+_WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+_UNKNOWN_SIZE = 0xFFFFFFFF  # Gravadores em streaming não sabem o tamanho final
+_MAX_HEADER_BYTES = 64 * 1024
+DEFAULT_MAX_SOURCE_BYTES = 10 * 1024 * 1024  # Mesmo limite do upload (audio_validator)
+
+
+@dataclass
+class DecodedAudio:
+    """Áudio já decodificado (float32 mono), aceito no lugar dos bytes pelo STT"""
+    samples: np.ndarray
+    sample_rate: int
+    source_bytes: int = 0
+
+    @property
+    def duration(self) -> float:
+        return len(self.samples) / self.sample_rate if self.sample_rate else 0.0
+
+    def __len__(self) -> int:
+        # Tamanho do upload original (usado em logs e spans como len(audio_data))
+        return self.source_bytes
+
+
+AudioInput = Union[bytes, DecodedAudio]
+
+
+class UnsupportedWav(ValueError):
+    """WAV fora do caminho incremental (compressão, bits por amostra)"""
+
+
+class StreamingWavDecoder:
+    """Decodifica WAV PCM em pedaços para um buffer float32 mono"""
+
+    def __init__(self, max_source_bytes: int = DEFAULT_MAX_SOURCE_BYTES):
+        """
+        Args:
+            max_source_bytes: Teto da pré-alocação; um header que declara mais
+                que isso não reserva memória além do que pode chegar
+        """
+        self.max_source_bytes = max_source_bytes
+        self._header = bytearray()
+        self._pending = b""  # Bytes de um frame incompleto entre pedaços
+        self._buffer: Optional[np.ndarray] = None
+        self._written = 0
+        self._remaining: Optional[int] = None  # Bytes restantes do chunk "data"
+        self.sample_rate = 0
+        self.channels = 0
+        self._dtype: Optional[np.dtype] = None
+        self._scale = 1.0
+        self.bytes_fed = 0
+
+    @property
+    def started(self) -> bool:
+        """Header lido e buffer alocado"""
+        return self._buffer is not None
+
+    def feed(self, chunk: bytes):
+        """
+        Consome mais bytes do arquivo
+
+        Raises:
+            UnsupportedWav: Se o header não for de um WAV PCM/float suportado
+            ValueError: Se o header for inválido
+        """
+        self.bytes_fed += len(chunk)
+        if self._buffer is None:
+            self._header += chunk
+            data = self._parse_header()
+            if data is None:
+                if len(self._header) > _MAX_HEADER_BYTES:
+                    raise ValueError("Header WAV sem chunk 'data'")
+                return
+            chunk = data
+        self._decode(chunk)
+
+    def finish(self) -> DecodedAudio:
+        """
+        Encerra a decodificação
+
+        Returns:
+            Áudio decodificado (o buffer é cortado no que foi escrito, sem cópia)
+        """
+        if self._buffer is None:
+            raise ValueError("Arquivo WAV incompleto")
+        return DecodedAudio(self._buffer[:self._written], self.sample_rate, self.bytes_fed)
+
+    def _parse_header(self) -> Optional[bytes]:
+        """Lê RIFF/fmt até o chunk 'data'; retorna os bytes de áudio já recebidos"""
+        header = self._header
+        if len(header) < 12:
+            return None
+        if header[:4] != b"RIFF" or header[8:12] != b"WAVE":
+            raise UnsupportedWav("Não é um arquivo WAV")
+
+        offset = 12
+        fmt = None
+        while offset + 8 <= len(header):
+            chunk_id = bytes(header[offset:offset + 4])
+            chunk_size = struct.unpack_from("<I", header, offset + 4)[0]
+            body = offset + 8
+            if chunk_id == b"data":
+                if fmt is None:
+                    raise ValueError("Chunk 'data' antes de 'fmt '")
+                self._allocate(fmt, chunk_size)
+                data = bytes(header[body:])
+                self._header = bytearray()
+                return data
+            if body + chunk_size > len(header):
+                return None  # Chunk ainda incompleto
+            if chunk_id == b"fmt ":
+                fmt = bytes(header[body:body + chunk_size])
+            offset = body + chunk_size + (chunk_size & 1)  # Chunks têm tamanho par
+        return None
+
+    def _allocate(self, fmt: bytes, data_size: int):
+        if len(fmt) < 16:
+            raise ValueError("Chunk 'fmt ' inválido")
+        audio_format, channels, sample_rate, _, block_align, bits = struct.unpack_from("<HHIIHH", fmt)
+        if audio_format == _WAVE_FORMAT_EXTENSIBLE and len(fmt) >= 26:
+            audio_format = struct.unpack_from("<H", fmt, 24)[0]  # Subformato (GUID)
+
+        if audio_format == _WAVE_FORMAT_PCM and bits in (8, 16, 32):
+            self._dtype = np.dtype({8: "u1", 16: "<i2", 32: "<i4"}[bits])
+            self._scale = 1.0 / (1 << (bits - 1))
+        elif audio_format == _WAVE_FORMAT_FLOAT and bits == 32:
+            self._dtype = np.dtype("<f4")
+        else:
+            raise UnsupportedWav(f"WAV formato={audio_format} com {bits} bits")
+        if channels < 1 or sample_rate < 1 or block_align != channels * bits // 8:
+            raise ValueError("Header WAV inconsistente")
+
+        self.channels = channels
+        self.sample_rate = sample_rate
+        if data_size in (0, _UNKNOWN_SIZE):
+            self._remaining = None
+            frames = sample_rate  # Cresce sob demanda
+        else:
+            self._remaining = data_size
+            # Não confia no tamanho do header: acima do limite, cresce sob demanda
+            frames = min(data_size, self.max_source_bytes) // block_align
+        self._buffer = np.empty(frames, dtype=np.float32)
+
+    def _decode(self, chunk: bytes):
+        if self._remaining is not None:
+            chunk = chunk[:self._remaining]  # Ignora chunks após 'data' (LIST etc.)
+            self._remaining -= len(chunk)
+        if self._pending:
+            chunk = self._pending + chunk
+        frame_bytes = self.channels * self._dtype.itemsize
+        usable = len(chunk) - len(chunk) % frame_bytes
+        self._pending = chunk[usable:]
+        if not usable:
+            return
+
+        samples = np.frombuffer(chunk, dtype=self._dtype, count=usable // self._dtype.itemsize)
+        if self.channels > 1:
+            samples = samples.reshape(-1, self.channels).mean(axis=1, dtype=np.float32)
+        frames = len(samples)
+        end = self._written + frames
+        if end > len(self._buffer):
+            self._buffer = np.resize(self._buffer, max(end, 2 * len(self._buffer)))
+        target = self._buffer[self._written:end]
+        target[:] = samples
+        if self._dtype.kind == "u":
+            target -= 128  # PCM 8 bits é sem sinal
+        if self._dtype.kind != "f":
+            target *= self._scale
+        self._written = end
+
+
+def decode_audio_file(file: BinaryIO, source_bytes: int = 0) -> DecodedAudio:
+    """
+    Decodifica um arquivo de áudio qualquer (formatos do libsndfile) em float32 mono
+
+    Args:
+        file: Arquivo aberto, posicionado no início
+        source_bytes: Tamanho do arquivo (informativo)
+    """
+    samples, sample_rate = sf.read(file, dtype="float32")
+    if samples.ndim > 1:
+        samples = samples.mean(axis=1, dtype=np.float32)
+    return DecodedAudio(samples, sample_rate, source_bytes)
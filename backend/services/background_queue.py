@@ -0,0 +1,210 @@
+"""
+Fila limitada de trabalho em background
+
+Efeitos colaterais que não mudam a resposta (salvar memórias, coletar a
+conversa para feedback, capturar a resposta para análise) são enfileirados
+e executados por workers depois que a resposta já foi enviada. A fila tem
+tamanho máximo (sob pressão, jobs novos são descartados e contabilizados em
+vez de acumular tasks soltas), jobs com falha são repetidos com backoff e o
+shutdown drena o que estiver pendente.
+"""
+import asyncio
+import inspect
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from loguru import logger
+
+from backend.services.observability import get_metrics_registry
+
+BACKGROUND_JOBS = "jonh_background_jobs_total"
+BACKGROUND_JOB_DURATION = "jonh_background_job_duration_seconds"
+
+
+@dataclass
+class BackgroundJob:
+    """Trabalho enfileirado"""
+    name: str
+    func: Callable
+    args: tuple = ()
+    kwargs: Dict[str, Any] = field(default_factory=dict)
+    retries: int = 0
+    attempts: int = 0
+
+
+class BackgroundWorkQueue:
+    """Fila limitada com workers, retries e drenagem no shutdown"""
+
+    def __init__(
+        self,
+        max_size: int = 1000,
+        workers: int = 2,
+        max_retries: int = 2,
+        retry_backoff: float = 0.5,
+        name: str = "background"
+    ):
+        """
+        Inicializa a fila
+
+        Args:
+            max_size: Jobs aguardando no máximo (acima disso, submit descarta)
+            workers: Tasks consumindo a fila
+            max_retries: Novas tentativas de um job que lançou exceção
+            retry_backoff: Espera (s) antes da 1ª nova tentativa (dobra a cada uma)
+            name: Nome da fila nas métricas
+        """
+        self.max_size = max(1, max_size)
+        self.workers = max(1, workers)
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.name = name
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._closed = False
+
+        # Métricas
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.retried = 0
+        self.dropped = 0
+        self.running = 0
+
+    def submit(self, name: str, func: Callable, *args, retries: Optional[int] = None, **kwargs) -> bool:
+        """
+        Enfileira um job sem bloquear (chamar de dentro do event loop)
+
+        Args:
+            name: Nome do job (logs e métricas)
+            func: Corrotina ou função síncrona (roda numa thread)
+            retries: Sobrescreve max_retries para este job
+
+        Returns:
+            False se a fila estiver cheia ou encerrada (job descartado)
+        """
+        if self._closed:
+            logger.warning(f"⚠️ Fila {self.name} encerrada, job {name} descartado")
+            self._count(name, "dropped")
+            return False
+        self._ensure_started()
+        job = BackgroundJob(name, func, args, kwargs, self.max_retries if retries is None else retries)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            logger.warning(f"⚠️ Fila {self.name} cheia ({self.max_size}), job {name} descartado")
+            self._count(name, "dropped")
+            return False
+        self.submitted += 1
+        return True
+
+    async def stop(self, timeout: float = 10.0):
+        """
+        Drena a fila e encerra os workers (chamar no shutdown)
+
+        Args:
+            timeout: Espera máxima (s) pelos jobs pendentes
+        """
+        self._closed = True
+        if self._queue is not None and self._workers:
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout=timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"⚠️ Fila {self.name}: {self._queue.qsize()} jobs não drenados em {timeout:.0f}s")
+        for task in self._workers:
+            task.cancel()
+        if self._workers:
+            await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Retorna profundidade e contadores da fila"""
+        return {
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "running": self.running,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "retried": self.retried,
+            "dropped": self.dropped,
+            "max_size": self.max_size,
+            "workers": self.workers
+        }
+
+    def _ensure_started(self):
+        """Cria fila e workers no loop atual (lazy)"""
+        loop = asyncio.get_running_loop()
+        if self._workers and self._loop is loop:
+            return
+        self._loop = loop
+        self._queue = asyncio.Queue(maxsize=self.max_size)
+        self._workers = [
+            asyncio.create_task(self._worker_loop(), name=f"{self.name}-worker-{i}")
+            for i in range(self.workers)
+        ]
+
+    async def _worker_loop(self):
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: BackgroundJob):
+        registry = get_metrics_registry()
+        while True:
+            job.attempts += 1
+            self.running += 1
+            start = time.perf_counter()
+            error = None
+            try:
+                if inspect.iscoroutinefunction(job.func):
+                    await job.func(*job.args, **job.kwargs)
+                else:
+                    await asyncio.to_thread(job.func, *job.args, **job.kwargs)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                error = e
+            finally:
+                self.running -= 1
+                registry.observe(
+                    BACKGROUND_JOB_DURATION, (time.perf_counter() - start) * 1000, labels={"job": job.name}
+                )
+
+            if error is None:
+                self.completed += 1
+                self._count(job.name, "ok")
+                return
+            if job.attempts <= job.retries:
+                self.retried += 1
+                self._count(job.name, "retried")
+                logger.debug(f"Job {job.name} falhou ({error}), tentativa {job.attempts + 1} em breve")
+                await asyncio.sleep(self.retry_backoff * 2 ** (job.attempts - 1))
+                continue
+            self.failed += 1
+            self._count(job.name, "failed")
+            logger.warning(f"⚠️ Job {job.name} falhou após {job.attempts} tentativa(s): {error}")
+            return
+
+    def _count(self, job: str, status: str):
+        get_metrics_registry().inc(BACKGROUND_JOBS, labels={"job": job, "status": status})
+
+
+_background_queue: Optional[BackgroundWorkQueue] = None
+
+
+def get_background_queue() -> BackgroundWorkQueue:
+    """Retorna a fila de trabalho em background compartilhada (configurada pelo settings)"""
+    global _background_queue
+    if _background_queue is None:
+        from backend.config import settings
+        _background_queue = BackgroundWorkQueue(
+            max_size=settings.background_queue_max_size,
+            workers=settings.background_queue_workers,
+            max_retries=settings.background_queue_max_retries
+        )
+    return _background_queue
@@ -33,7 +33,7 @@ class CleanupService:
             cutoff_date = datetime.now() - timedelta(days=days)
             
             # Busca sessões antigas
-            async with self.db._connection.execute("""
+            async with self.db.reader() as conn, conn.execute("""
                 SELECT session_id FROM sessions 
                 WHERE last_activity < ?
             """, (cutoff_date.isoformat(),)) as cursor:
@@ -66,11 +66,11 @@ class CleanupService:
         try:
             cutoff_date = datetime.now() - timedelta(days=days)
             
-            async with self.db._connection.execute("""
-                DELETE FROM messages 
-                WHERE timestamp < ?
-            """, (cutoff_date.isoformat(),)) as cursor:
-                await self.db._connection.commit()
+            async with self.db.writer() as conn:
+                cursor = await conn.execute("""
+                    DELETE FROM messages 
+                    WHERE timestamp < ?
+                """, (cutoff_date.isoformat(),))
                 removed_count = cursor.rowcount
             
             if removed_count > 0:
@@ -2,12 +2,12 @@
 Gerenciador de contexto de conversação com persistência em banco de dados
 """
 import uuid
-import json
 from typing import Dict, List, Optional
 from datetime import datetime, timedelta
 from loguru import logger
 
 from backend.database.database import Database
+from backend.services.conversation_summarizer import SUMMARY_METADATA_KEY
 
 
 class ContextManagerDB:
@@ -17,7 +17,8 @@ class ContextManagerDB:
         self,
         database: Database,
         max_history: int = 10,
-        session_timeout: int = 3600
+        session_timeout: int = 3600,
+        summarizer=None
     ):
         """
         Inicializa o gerenciador de contexto
@@ -26,10 +27,12 @@ class ContextManagerDB:
             database: Instância do banco de dados
             max_history: Número máximo de mensagens no histórico
             session_timeout: Tempo em segundos para expirar sessão inativa
+            summarizer: ConversationSummarizer (opcional) para resumir mensagens antigas
         """
         self.db = database
         self.max_history = max_history
         self.session_timeout = session_timeout
+        self.summarizer = summarizer
         
         logger.info(
             f"Context Manager DB inicializado: "
@@ -67,6 +70,10 @@ class ContextManagerDB:
             f"Mensagem adicionada à sessão {session_id}: "
             f"{role} - {content[:50]}..."
         )
+        
+        # Fim de turno: verifica em background se há mensagens a resumir
+        if self.summarizer and role == "assistant":
+            self.summarizer.schedule(session_id)
     
     async def get_context(self, session_id: str) -> List[Dict[str, str]]:
         """
@@ -76,9 +83,24 @@ class ContextManagerDB:
             session_id: ID da sessão
             
         Returns:
-            Lista de mensagens formatadas para o LLM
+            Lista de mensagens formatadas para o LLM (resumo das mensagens
+            antigas como mensagem de sistema, seguido das mais recentes)
         """
-        return await self.db.get_context_for_llm(session_id, self.max_history)
+        if not self.summarizer:
+            return await self.db.get_context_for_llm(session_id, self.max_history)
+        
+        summary = await self.summarizer.get_summary(session_id)
+        upto_id = summary["upto_message_id"] if summary else 0
+        messages = await self.db.get_recent_messages(
+            session_id, limit=self.max_history, after_id=upto_id
+        )
+        context = [{"role": msg["role"], "content": msg["content"]} for msg in messages]
+        if summary:
+            context.insert(0, {
+                "role": "system",
+                "content": f"Resumo da conversa até aqui: {summary['text']}"
+            })
+        return context
     
     async def clear_session(self, session_id: str):
         """
@@ -88,6 +110,8 @@ class ContextManagerDB:
             session_id: ID da sessão
         """
         await self.db.clear_messages(session_id)
+        if await self.db.get_session(session_id):
+            await self.db.update_session_metadata(session_id, {SUMMARY_METADATA_KEY: None})
         logger.info(f"Histórico da sessão {session_id} limpo")
     
     async def delete_session(self, session_id: str):
@@ -179,26 +203,15 @@ class ContextManagerDB:
             if not session:
                 raise ValueError(f"Falha ao criar sessão {session_id}")
         
-        # Atualiza metadata com localização
-        metadata = session.get("metadata", {}) if session else {}
-        if not isinstance(metadata, dict):
-            metadata = {}
-        
-        metadata["location"] = {
-            "latitude": latitude,
-            "longitude": longitude,
-            "address_info": address_info,
-            "updated_at": datetime.now().isoformat()
-        }
-        
-        # Atualiza metadata na sessão (usa json importado no topo do arquivo)
-        metadata_json = json.dumps(metadata)
-        await self.db._connection.execute("""
-            UPDATE sessions 
-            SET metadata = ?
-            WHERE session_id = ?
-        """, (metadata_json, session_id))
-        await self.db._connection.commit()
+        # Atualiza metadata com localização (mescla com as demais chaves, ex.: resumo)
+        await self.db.update_session_metadata(session_id, {
+            "location": {
+                "latitude": latitude,
+                "longitude": longitude,
+                "address_info": address_info,
+                "updated_at": datetime.now().isoformat()
+            }
+        })
         
         logger.debug(f"Localização definida para sessão {session_id}: {latitude}, {longitude}")
     
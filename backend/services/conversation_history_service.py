@@ -1,14 +1,86 @@
 """
 Serviço de histórico de conversas salvas
+
+As mensagens ficam em saved_conversation_messages (uma linha por mensagem,
+chave (conversation_id, seq)); salvar de novo a mesma sessão apenas anexa
+as mensagens novas. A listagem usa cursor (created_at, id) em vez de OFFSET.
 """
+import base64
 import json
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Tuple
 from datetime import datetime
 from loguru import logger
 
 from backend.database.database import Database
 
 
+def encode_cursor(created_at: Any, conversation_id: int) -> str:
+    """
+    Gera cursor opaco de paginação a partir da última conversa da página
+    
+    Args:
+        created_at: created_at da última conversa retornada
+        conversation_id: ID da última conversa retornada
+        
+    Returns:
+        Cursor em base64 url-safe
+    """
+    raw = json.dumps([str(created_at), conversation_id])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    """
+    Decodifica cursor de paginação
+    
+    Args:
+        cursor: Cursor gerado por encode_cursor
+        
+    Returns:
+        Tupla (created_at, id)
+        
+    Raises:
+        ValueError: Se o cursor for inválido
+    """
+    try:
+        created_at, conversation_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return str(created_at), int(conversation_id)
+    except Exception:
+        raise ValueError("Cursor de paginação inválido")
+
+
+def _new_messages(messages: List[Dict[str, str]], stored_count: int, last_stored: Optional[Tuple[str, str]]) -> List[Dict[str, str]]:
+    """
+    Determina quais mensagens ainda não foram armazenadas
+    
+    O contexto da sessão pode ter sido truncado (janela de histórico), então
+    a última mensagem armazenada é usada como âncora.
+    
+    Args:
+        messages: Mensagens atuais da sessão
+        stored_count: Quantidade de mensagens já armazenadas
+        last_stored: (role, content) da última mensagem armazenada
+        
+    Returns:
+        Mensagens a anexar
+    """
+    if last_stored is None:
+        return messages
+
+    def key(msg: Dict[str, str]) -> Tuple[str, str]:
+        return msg.get("role", ""), msg.get("content", "")
+
+    # Caminho rápido: contexto completo, alinhado com o que já foi salvo
+    if 0 < stored_count <= len(messages) and key(messages[stored_count - 1]) == last_stored:
+        return messages[stored_count:]
+
+    # Janela deslocada: procura a âncora a partir do fim
+    for index in range(len(messages) - 1, -1, -1):
+        if key(messages[index]) == last_stored:
+            return messages[index + 1:]
+    return messages
+
+
 class ConversationHistoryService:
     """Gerencia histórico de conversas salvas"""
     
@@ -30,7 +102,7 @@ class ConversationHistoryService:
         user_id: Optional[str] = None
     ) -> int:
         """
-        Salva uma conversa no histórico
+        Salva uma conversa no histórico (anexa apenas mensagens novas)
         
         Args:
             session_id: ID da sessão
@@ -53,45 +125,70 @@ class ConversationHistoryService:
         await self.db.connect()
         
         try:
-            messages_json = json.dumps(messages, ensure_ascii=False)
-            
-            # Verifica se já existe conversa para esta sessão
-            async with self.db._connection.execute(
-                "SELECT id FROM saved_conversations WHERE session_id = ?",
-                (session_id,)
-            ) as cursor:
-                existing = await cursor.fetchone()
-            
-            if existing:
-                # Atualiza conversa existente
-                await self.db._connection.execute(
-                    """
-                    UPDATE saved_conversations
-                    SET title = ?, messages = ?, updated_at = CURRENT_TIMESTAMP, saved = 1
-                    WHERE session_id = ?
-                    """,
-                    (title, messages_json, session_id)
-                )
-                conversation_id = existing[0]
-                logger.info(f"Conversa atualizada: {conversation_id} (session: {session_id})")
-            else:
-                # Cria nova conversa
-                cursor = await self.db._connection.execute(
+            # Leitura e escrita na mesma transação do escritor (upsert consistente)
+            async with self.db.writer() as conn:
+                async with conn.execute(
+                    "SELECT id, message_count FROM saved_conversations WHERE session_id = ?",
+                    (session_id,)
+                ) as cursor:
+                    existing = await cursor.fetchone()
+                
+                if existing:
+                    conversation_id, stored_count = existing[0], existing[1]
+                    last_stored = None
+                    if stored_count:
+                        async with conn.execute(
+                            """
+                            SELECT role, content FROM saved_conversation_messages
+                            WHERE conversation_id = ? AND seq = ?
+                            """,
+                            (conversation_id, stored_count - 1)
+                        ) as cursor:
+                            row = await cursor.fetchone()
+                        last_stored = (row[0], row[1]) if row else None
+                    
+                    to_append = _new_messages(messages, stored_count, last_stored)
+                    await conn.execute(
+                        """
+                        UPDATE saved_conversations
+                        SET title = ?, message_count = ?, updated_at = CURRENT_TIMESTAMP, saved = 1
+                        WHERE id = ?
+                        """,
+                        (title, stored_count + len(to_append), conversation_id)
+                    )
+                    logger.info(
+                        f"Conversa atualizada: {conversation_id} (session: {session_id}, "
+                        f"+{len(to_append)} mensagens)"
+                    )
+                else:
+                    # Cria nova conversa (coluna legada messages fica vazia)
+                    cursor = await conn.execute(
+                        """
+                        INSERT INTO saved_conversations 
+                        (session_id, title, messages, message_count, saved, user_id)
+                        VALUES (?, ?, '[]', ?, 1, ?)
+                        """,
+                        (session_id, title, len(messages), user_id)
+                    )
+                    conversation_id = cursor.lastrowid
+                    stored_count = 0
+                    to_append = messages
+                    logger.info(f"Conversa salva: {conversation_id} (session: {session_id})")
+                
+                await conn.executemany(
                     """
-                    INSERT INTO saved_conversations 
-                    (session_id, title, messages, saved, user_id)
-                    VALUES (?, ?, ?, 1, ?)
+                    INSERT INTO saved_conversation_messages (conversation_id, seq, role, content)
+                    VALUES (?, ?, ?, ?)
                     """,
-                    (session_id, title, messages_json, user_id)
+                    [
+                        (conversation_id, stored_count + offset, msg.get("role", ""), msg.get("content", ""))
+                        for offset, msg in enumerate(to_append)
+                    ]
                 )
-                conversation_id = cursor.lastrowid
-                logger.info(f"Conversa salva: {conversation_id} (session: {session_id})")
             
-            await self.db._connection.commit()
             return conversation_id
             
         except Exception as e:
-            await self.db._connection.rollback()
             logger.error(f"Erro ao salvar conversa: {e}")
             raise
     
@@ -99,79 +196,128 @@ class ConversationHistoryService:
         self,
         limit: int = 50,
         offset: int = 0,
-        user_id: Optional[str] = None
+        user_id: Optional[str] = None,
+        cursor: Optional[str] = None
     ) -> List[Dict[str, Any]]:
         """
-        Lista conversas salvas
+        Lista conversas salvas (mais recentes primeiro)
+        
+        Com cursor, a página começa logo após a conversa indicada e o custo
+        é proporcional ao tamanho da página. offset é mantido apenas por
+        compatibilidade com clientes antigos.
         
         Args:
             limit: Número máximo de resultados
-            offset: Offset para paginação
+            offset: Offset para paginação (legado, ignorado se houver cursor)
             user_id: Filtrar por usuário (opcional)
+            cursor: Cursor da página anterior (ver encode_cursor)
             
         Returns:
             Lista de conversas salvas
+            
+        Raises:
+            ValueError: Se o cursor for inválido
         """
         await self.db.connect()
         
+        conditions = ["saved = 1"]
+        params: List[Any] = []
+        if user_id:
+            conditions.append("user_id = ?")
+            params.append(user_id)
+        if cursor:
+            created_at, last_id = decode_cursor(cursor)
+            conditions.append("(created_at, id) < (?, ?)")
+            params.extend([created_at, last_id])
+        
+        query = f"""
+            SELECT id, session_id, title, created_at, updated_at, message_count
+            FROM saved_conversations
+            WHERE {' AND '.join(conditions)}
+            ORDER BY created_at DESC, id DESC
+            LIMIT ?
+        """
+        params.append(limit)
+        if offset and not cursor:
+            query += " OFFSET ?"
+            params.append(offset)
+        
         try:
-            if user_id:
-                async with self.db._connection.execute(
-                    """
-                    SELECT id, session_id, title, created_at, updated_at
-                    FROM saved_conversations
-                    WHERE saved = 1 AND user_id = ?
-                    ORDER BY created_at DESC
-                    LIMIT ? OFFSET ?
-                    """,
-                    (user_id, limit, offset)
-                ) as cursor:
-                    rows = await cursor.fetchall()
-            else:
-                async with self.db._connection.execute(
-                    """
-                    SELECT id, session_id, title, created_at, updated_at
-                    FROM saved_conversations
-                    WHERE saved = 1
-                    ORDER BY created_at DESC
-                    LIMIT ? OFFSET ?
-                    """,
-                    (limit, offset)
-                ) as cursor:
-                    rows = await cursor.fetchall()
+            async with self.db.reader() as conn, conn.execute(query, params) as db_cursor:
+                rows = await db_cursor.fetchall()
             
-            conversations = []
-            for row in rows:
-                conversations.append({
+            return [
+                {
                     "id": row[0],
                     "session_id": row[1],
                     "title": row[2],
                     "created_at": row[3],
-                    "updated_at": row[4]
-                })
-            
-            return conversations
+                    "updated_at": row[4],
+                    "message_count": row[5]
+                }
+                for row in rows
+            ]
             
         except Exception as e:
             logger.error(f"Erro ao listar conversas: {e}")
             raise
     
-    async def get_conversation_by_id(self, conversation_id: int) -> Optional[Dict[str, Any]]:
+    async def get_conversation_messages(
+        self,
+        conversation_id: int,
+        after_seq: int = -1,
+        limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Carrega mensagens de uma conversa por faixa de seq
+        
+        Args:
+            conversation_id: ID da conversa
+            after_seq: Retorna mensagens com seq maior que este valor
+            limit: Número máximo de mensagens (None = todas)
+            
+        Returns:
+            Lista de mensagens [{seq, role, content}]
+        """
+        query = """
+            SELECT seq, role, content FROM saved_conversation_messages
+            WHERE conversation_id = ? AND seq > ?
+            ORDER BY seq
+        """
+        params: List[Any] = [conversation_id, after_seq]
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        
+        async with self.db.reader() as conn, conn.execute(query, params) as cursor:
+            rows = await cursor.fetchall()
+        return [{"seq": row[0], "role": row[1], "content": row[2]} for row in rows]
+    
+    async def get_conversation_by_id(
+        self,
+        conversation_id: int,
+        messages_limit: Optional[int] = None,
+        after_seq: int = -1
+    ) -> Optional[Dict[str, Any]]:
         """
         Recupera uma conversa específica
         
         Args:
             conversation_id: ID da conversa
+            messages_limit: Máximo de mensagens carregadas (None = todas,
+                0 = apenas metadados)
+            after_seq: Carrega mensagens após este seq (paginação)
             
         Returns:
-            Conversa completa ou None se não encontrada
+            Conversa ou None se não encontrada; next_seq indica o after_seq
+            da próxima página de mensagens (None se não houver mais)
         """
         await self.db.connect()
         
         try:
-            async with self.db._connection.execute(
+            async with self.db.reader() as conn, conn.execute(
                 """
-                SELECT id, session_id, title, messages, created_at, updated_at, user_id
+                SELECT id, session_id, title, created_at, updated_at, user_id, message_count
                 FROM saved_conversations
                 WHERE id = ? AND saved = 1
                 """,
@@ -182,16 +328,24 @@ class ConversationHistoryService:
             if not row:
                 return None
             
-            messages = json.loads(row[3]) if row[3] else []
+            message_count = row[6]
+            messages: List[Dict[str, Any]] = []
+            if messages_limit != 0:
+                messages = await self.get_conversation_messages(conversation_id, after_seq, messages_limit)
+            
+            last_seq = messages[-1]["seq"] if messages else after_seq
+            next_seq = last_seq if messages_limit is not None and last_seq + 1 < message_count else None
             
             return {
                 "id": row[0],
                 "session_id": row[1],
                 "title": row[2],
                 "messages": messages,
-                "created_at": row[4],
-                "updated_at": row[5],
-                "user_id": row[6]
+                "message_count": message_count,
+                "next_seq": next_seq,
+                "created_at": row[3],
+                "updated_at": row[4],
+                "user_id": row[5]
             }
             
         except Exception as e:
@@ -211,11 +365,16 @@ class ConversationHistoryService:
         await self.db.connect()
         
         try:
-            cursor = await self.db._connection.execute(
-                "DELETE FROM saved_conversations WHERE id = ?",
-                (conversation_id,)
-            )
-            await self.db._connection.commit()
+            async with self.db.writer() as conn:
+                # Remove mensagens explicitamente (foreign_keys não está habilitado)
+                await conn.execute(
+                    "DELETE FROM saved_conversation_messages WHERE conversation_id = ?",
+                    (conversation_id,)
+                )
+                cursor = await conn.execute(
+                    "DELETE FROM saved_conversations WHERE id = ?",
+                    (conversation_id,)
+                )
             
             deleted = cursor.rowcount > 0
             if deleted:
@@ -224,7 +383,6 @@ class ConversationHistoryService:
             return deleted
             
         except Exception as e:
-            await self.db._connection.rollback()
             logger.error(f"Erro ao deletar conversa: {e}")
             raise
     
@@ -249,15 +407,15 @@ class ConversationHistoryService:
         await self.db.connect()
         
         try:
-            cursor = await self.db._connection.execute(
-                """
-                UPDATE saved_conversations
-                SET title = ?, updated_at = CURRENT_TIMESTAMP
-                WHERE id = ?
-                """,
-                (new_title, conversation_id)
-            )
-            await self.db._connection.commit()
+            async with self.db.writer() as conn:
+                cursor = await conn.execute(
+                    """
+                    UPDATE saved_conversations
+                    SET title = ?, updated_at = CURRENT_TIMESTAMP
+                    WHERE id = ?
+                    """,
+                    (new_title, conversation_id)
+                )
             
             updated = cursor.rowcount > 0
             if updated:
@@ -266,7 +424,6 @@ class ConversationHistoryService:
             return updated
             
         except Exception as e:
-            await self.db._connection.rollback()
             logger.error(f"Erro ao atualizar título: {e}")
             raise
 
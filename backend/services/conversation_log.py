@@ -0,0 +1,193 @@
+"""
+Log bufferizado de conversas (coleta de dados de treinamento)
+
+Cada turno gerava um INSERT e um commit na conexão escritora, disputando o
+lock de escrita com add_message e demais consultas interativas. A tabela
+conversations só é lida pelos jobs offline de treinamento, então os turnos
+vão para um buffer circular em memória e são gravados em lote
+(executemany, um commit por lote) a cada N registros ou T milissegundos.
+
+Os IDs são reservados no append (a partir do maior ID já usado), então o
+conversation_id continua disponível na hora para associar feedback. Por
+isso o log deve ser o único escritor da tabela conversations.
+"""
+import asyncio
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, Optional
+
+from loguru import logger
+
+from backend.services.observability import get_metrics_registry
+
+CONVERSATION_LOG_RECORDS = "jonh_conversation_log_records_total"
+CONVERSATION_LOG_FLUSH_ERRORS = "jonh_conversation_log_flush_errors_total"
+
+
+class ConversationLog:
+    """Buffer circular de conversas gravado em lotes"""
+
+    def __init__(
+        self,
+        database,
+        batch_size: int = 100,
+        flush_interval_ms: float = 1000.0,
+        max_buffer: int = 10000
+    ):
+        """
+        Inicializa o log
+
+        Args:
+            database: Instância de Database
+            batch_size: Registros por lote (atingido, dispara a gravação)
+            flush_interval_ms: Intervalo máximo entre gravações
+            max_buffer: Registros mantidos em memória (acima disso, os mais
+                antigos ainda não gravados são descartados e contabilizados)
+        """
+        self.database = database
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = max(0.001, flush_interval_ms / 1000.0)
+        self.max_buffer = max(self.batch_size, max_buffer)
+        self._buffer: Deque[Dict[str, Any]] = deque()
+        self._next_id: Optional[int] = None
+        self._id_lock = asyncio.Lock()
+        self._flush_lock = asyncio.Lock()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._closed = False
+
+        # Métricas
+        self.appended = 0
+        self.written = 0
+        self.dropped = 0
+        self.batches = 0
+        self.flush_errors = 0
+
+    async def append(
+        self,
+        session_id: str,
+        user_input: str,
+        assistant_response: str,
+        tokens_used: Optional[int] = None,
+        processing_time: Optional[float] = None,
+        used_tool: Optional[str] = None
+    ) -> int:
+        """
+        Adiciona um turno ao buffer (sem tocar no banco, exceto no 1º uso)
+
+        Returns:
+            ID reservado para a conversa
+        """
+        if self._next_id is None:
+            async with self._id_lock:
+                if self._next_id is None:
+                    self._next_id = await self.database.get_last_conversation_id() + 1
+        conversation_id = self._next_id
+        self._next_id += 1
+
+        if len(self._buffer) >= self.max_buffer:
+            lost = self._buffer.popleft()
+            self._drop(1)
+            logger.warning(f"⚠️ Log de conversas cheio ({self.max_buffer}), conversa {lost['id']} descartada")
+        self._buffer.append({
+            "id": conversation_id,
+            "session_id": session_id,
+            "user_input": user_input,
+            "assistant_response": assistant_response,
+            "tokens_used": tokens_used,
+            "processing_time": processing_time,
+            "used_tool": used_tool,
+            "created_at": datetime.now()
+        })
+        self.appended += 1
+
+        if self._closed:
+            # Após o shutdown não há loop de gravação: grava direto
+            await self.flush()
+        else:
+            self._ensure_started()
+            if len(self._buffer) >= self.batch_size:
+                self._wakeup.set()
+        return conversation_id
+
+    async def flush(self) -> int:
+        """
+        Grava tudo o que estiver no buffer, em lotes de batch_size
+
+        Returns:
+            Número de conversas gravadas
+        """
+        written = 0
+        async with self._flush_lock:
+            while self._buffer:
+                count = min(self.batch_size, len(self._buffer))
+                batch = [self._buffer.popleft() for _ in range(count)]
+                try:
+                    await self.database.save_conversations(batch)
+                except Exception as e:
+                    self.flush_errors += 1
+                    get_metrics_registry().inc(CONVERSATION_LOG_FLUSH_ERRORS)
+                    self._requeue(batch)
+                    logger.warning(f"⚠️ Erro ao gravar lote de {count} conversas: {e}")
+                    break
+                written += count
+                self.written += count
+                self.batches += 1
+                get_metrics_registry().inc(CONVERSATION_LOG_RECORDS, count, labels={"status": "written"})
+        if written:
+            logger.debug(f"💾 Log de conversas: {written} gravadas")
+        return written
+
+    async def stop(self):
+        """Interrompe a gravação periódica e grava o que estiver pendente"""
+        self._closed = True
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+        if self._buffer:
+            pending = len(self._buffer)
+            self._buffer.clear()
+            self._drop(pending)
+            logger.error(f"❌ Log de conversas: {pending} conversas perdidas no shutdown")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Retorna ocupação do buffer e contadores de gravação/perda"""
+        return {
+            "buffered": len(self._buffer),
+            "appended": self.appended,
+            "written": self.written,
+            "dropped": self.dropped,
+            "batches": self.batches,
+            "flush_errors": self.flush_errors,
+            "batch_size": self.batch_size,
+            "max_buffer": self.max_buffer
+        }
+
+    def _ensure_started(self):
+        """Cria o loop de gravação no event loop atual (lazy)"""
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._flush_loop())
+
+    async def _flush_loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    def _requeue(self, batch):
+        """Devolve um lote que falhou ao início do buffer (o que não couber é perdido)"""
+        room = self.max_buffer - len(self._buffer)
+        keep = batch[:max(0, room)]
+        self._buffer.extendleft(reversed(keep))
+        if len(batch) > len(keep):
+            self._drop(len(batch) - len(keep))
+
+    def _drop(self, count: int):
+        self.dropped += count
+        get_metrics_registry().inc(CONVERSATION_LOG_RECORDS, count, labels={"status": "dropped"})
@@ -0,0 +1,233 @@
+"""
+Sumarização incremental de conversas longas
+
+Quando as mensagens ainda não resumidas de uma sessão passam de um limite de
+tokens, as mais antigas são incorporadas a um resumo contínuo por uma tarefa
+em background (usando o LLM configurado — modelo local do Ollama ou modelo
+barato do Groq). O resumo fica no metadata da sessão e é enviado no lugar das
+mensagens antigas, mantendo o tamanho do prompt estável ao longo da sessão.
+"""
+import asyncio
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Set
+from loguru import logger
+
+from backend.database.database import Database
+from backend.services.llm.groq_budget import PRIORITY_BACKGROUND, llm_priority
+from backend.services.llm.prompt_builder import TokenCounter, get_token_counter
+
+SUMMARY_METADATA_KEY = "summary"
+
+SUMMARY_SYSTEM_PROMPT = (
+    "Você resume conversas entre um usuário e o assistente Jonh. "
+    "Escreva em português, em terceira pessoa, um resumo curto e factual que "
+    "preserve nomes, preferências, decisões, números e pendências. "
+    "Não invente informações e não responda ao usuário."
+)
+
+_ROLE_LABELS = {"user": "Usuário", "assistant": "Assistente", "system": "Sistema"}
+
+
+class ConversationSummarizer:
+    """Mantém um resumo contínuo das mensagens antigas de cada sessão"""
+
+    def __init__(
+        self,
+        database: Database,
+        llm_service,
+        trigger_tokens: int = 1500,
+        keep_recent_tokens: int = 600,
+        summary_max_tokens: int = 300,
+        counter: Optional[TokenCounter] = None,
+        llm_resolver: Optional[Callable[[], Any]] = None
+    ):
+        """
+        Inicializa o sumarizador
+
+        Args:
+            database: Instância do banco de dados
+            llm_service: Serviço de LLM usado para resumir (BaseLLMService)
+            trigger_tokens: Tokens não resumidos que disparam a sumarização
+            keep_recent_tokens: Tokens das mensagens recentes mantidas na íntegra
+            summary_max_tokens: Tamanho máximo do resumo
+            counter: Contador de tokens (padrão: contador compartilhado)
+            llm_resolver: Retorna o LLM ativo a cada resumo (ex.: respeita o
+                modo privacidade ligado em runtime); sem ele usa llm_service
+        """
+        self.db = database
+        self.llm_service = llm_service
+        self.llm_resolver = llm_resolver
+        self.trigger_tokens = trigger_tokens
+        self.keep_recent_tokens = keep_recent_tokens
+        self.summary_max_tokens = summary_max_tokens
+        self.counter = counter or get_token_counter()
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._pending: Set[str] = set()
+
+        # Métricas
+        self.runs = 0
+        self.folded_messages = 0
+        self.errors = 0
+
+        logger.info(
+            f"Sumarizador de conversas inicializado: "
+            f"gatilho={trigger_tokens} tokens, recentes={keep_recent_tokens} tokens"
+        )
+
+    @classmethod
+    def from_settings(
+        cls,
+        database: Database,
+        llm_service,
+        llm_resolver: Optional[Callable[[], Any]] = None
+    ) -> "ConversationSummarizer":
+        """Cria sumarizador com os parâmetros das configurações"""
+        from backend.config import settings
+        return cls(
+            database,
+            llm_service,
+            trigger_tokens=settings.summary_trigger_tokens,
+            keep_recent_tokens=settings.summary_keep_recent_tokens,
+            summary_max_tokens=settings.summary_max_tokens,
+            llm_resolver=llm_resolver
+        )
+
+    async def get_summary(self, session_id: str) -> Optional[Dict]:
+        """
+        Obtém o resumo armazenado da sessão
+
+        Returns:
+            Dict com text e upto_message_id, ou None
+        """
+        session = await self.db.get_session(session_id)
+        metadata = (session or {}).get("metadata")
+        if not isinstance(metadata, dict):
+            return None
+        summary = metadata.get(SUMMARY_METADATA_KEY)
+        return summary if isinstance(summary, dict) and summary.get("text") else None
+
+    def schedule(self, session_id: str):
+        """
+        Agenda a sumarização da sessão em background (no máximo uma por sessão)
+
+        Se já houver uma tarefa em andamento, ela é reexecutada ao terminar.
+        """
+        task = self._tasks.get(session_id)
+        if task and not task.done():
+            self._pending.add(session_id)
+            return
+        self._tasks[session_id] = asyncio.create_task(self._run(session_id))
+
+    async def _run(self, session_id: str):
+        """Executa a sumarização (e reexecuções pendentes) de uma sessão"""
+        try:
+            while True:
+                self._pending.discard(session_id)
+                try:
+                    await self.summarize(session_id)
+                except Exception as e:
+                    self.errors += 1
+                    logger.warning(f"⚠️ Erro ao resumir sessão {session_id}: {e}")
+                    return
+                if session_id not in self._pending:
+                    return
+        finally:
+            if self._tasks.get(session_id) is asyncio.current_task():
+                del self._tasks[session_id]
+
+    async def summarize(self, session_id: str) -> bool:
+        """
+        Incorpora as mensagens antigas ao resumo se o limite foi excedido
+
+        Args:
+            session_id: ID da sessão
+
+        Returns:
+            True se o resumo foi atualizado
+        """
+        summary = await self.get_summary(session_id)
+        upto_id = summary["upto_message_id"] if summary else 0
+        messages = await self.db.get_recent_messages(session_id, after_id=upto_id)
+
+        sizes = [self.counter.count(m["content"]) for m in messages]
+        if sum(sizes) <= self.trigger_tokens:
+            return False
+
+        # Mantém as mensagens recentes na íntegra (ao menos a última troca)
+        keep = 0
+        recent_tokens = 0
+        for size in reversed(sizes):
+            if keep >= 2 and recent_tokens + size > self.keep_recent_tokens:
+                break
+            keep += 1
+            recent_tokens += size
+        to_fold = messages[:len(messages) - keep]
+        if not to_fold:
+            return False
+
+        text = await asyncio.to_thread(
+            self._generate_summary,
+            summary["text"] if summary else "",
+            to_fold
+        )
+        if not text:
+            return False
+
+        folded_total = (summary.get("folded_messages", 0) if summary else 0) + len(to_fold)
+        await self.db.update_session_metadata(session_id, {
+            SUMMARY_METADATA_KEY: {
+                "text": text,
+                "upto_message_id": to_fold[-1]["id"],
+                "folded_messages": folded_total,
+                "updated_at": datetime.now().isoformat()
+            }
+        })
+
+        self.runs += 1
+        self.folded_messages += len(to_fold)
+        logger.info(
+            f"📝 Sessão {session_id}: {len(to_fold)} mensagens incorporadas ao resumo "
+            f"({self.counter.count(text)} tokens)"
+        )
+        return True
+
+    def _generate_summary(self, previous: str, messages: List[Dict]) -> str:
+        """Chama o LLM (síncrono, executado em thread) para atualizar o resumo"""
+        llm_service = self.llm_resolver() if self.llm_resolver else self.llm_service
+        if llm_service is None:
+            logger.warning("⚠️ Nenhum LLM ativo para resumir a sessão")
+            return ""
+        transcript = "\n".join(
+            f"{_ROLE_LABELS.get(m['role'], m['role'])}: {m['content']}" for m in messages
+        )
+        prompt = (
+            f"Resumo anterior:\n{previous or '(vazio)'}\n\n"
+            f"Novas mensagens:\n{transcript}\n\n"
+            f"Escreva o resumo atualizado, com no máximo {self.summary_max_tokens} tokens."
+        )
+        with llm_priority(PRIORITY_BACKGROUND):
+            response, _ = llm_service.generate_response(
+                prompt,
+                system_prompt_override=SUMMARY_SYSTEM_PROMPT
+            )
+        response = (response or "").strip()
+        return self.counter.truncate(response, self.summary_max_tokens) if response else ""
+
+    async def close(self):
+        """Aguarda/cancela tarefas de sumarização em andamento"""
+        tasks = [t for t in self._tasks.values() if not t.done()]
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks.clear()
+        self._pending.clear()
+
+    def get_stats(self) -> Dict:
+        """Estatísticas do sumarizador"""
+        return {
+            "runs": self.runs,
+            "folded_messages": self.folded_messages,
+            "errors": self.errors,
+            "active_tasks": sum(1 for t in self._tasks.values() if not t.done())
+        }
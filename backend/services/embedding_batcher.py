@@ -0,0 +1,159 @@
+"""
+Micro-batching assíncrono de embeddings
+
+Requisições concorrentes são enfileiradas e agrupadas em lotes por alguns
+milissegundos; cada lote é codificado em uma thread dedicada (uma única
+chamada a encode) e os resultados são devolvidos via futures. O event loop
+nunca executa o modelo e o throughput cresce com o tamanho do lote.
+"""
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from loguru import logger
+
+
+class EmbeddingBatcher:
+    """Servidor de embeddings in-process com coalescência de requisições"""
+
+    def __init__(
+        self,
+        encode_fn: Callable[[List[str]], Sequence],
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5.0
+    ):
+        """
+        Inicializa o batcher
+
+        Args:
+            encode_fn: Função síncrona que codifica uma lista de textos
+                (retorna sequência de vetores na mesma ordem)
+            max_batch_size: Tamanho máximo de um lote
+            max_wait_ms: Tempo máximo de espera para completar um lote
+        """
+        self.encode_fn = encode_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        # Métricas
+        self.batches = 0
+        self.items = 0
+        self.max_batch_seen = 0
+        self.encode_ms_total = 0.0
+        self.wait_ms_total = 0.0
+        self.errors = 0
+
+    async def embed(self, texts: List[str]) -> List:
+        """
+        Enfileira textos e aguarda seus embeddings
+
+        Args:
+            texts: Textos a codificar
+
+        Returns:
+            Vetores na mesma ordem dos textos
+        """
+        if not texts:
+            return []
+        self._ensure_started()
+
+        loop = asyncio.get_running_loop()
+        futures = []
+        for text in texts:
+            future = loop.create_future()
+            self._queue.put_nowait((text, future, time.perf_counter()))
+            futures.append(future)
+        return list(await asyncio.gather(*futures))
+
+    async def stop(self):
+        """Encerra o dispatcher e falha requisições pendentes"""
+        if self._worker:
+            self._worker.cancel()
+            await asyncio.gather(self._worker, return_exceptions=True)
+            self._worker = None
+
+        if self._queue:
+            while not self._queue.empty():
+                _, future, _ = self._queue.get_nowait()
+                if not future.done():
+                    future.set_exception(RuntimeError("Embedding batcher encerrado"))
+
+        if self._executor:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def get_stats(self) -> Dict:
+        """Retorna métricas de batching"""
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+            "max_batch_size_seen": self.max_batch_seen,
+            "avg_encode_ms": round(self.encode_ms_total / self.batches, 2) if self.batches else 0.0,
+            "avg_queue_wait_ms": round(self.wait_ms_total / self.items, 2) if self.items else 0.0,
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "errors": self.errors,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000
+        }
+
+    def _ensure_started(self):
+        """Inicia fila, thread e dispatcher no loop atual (lazy)"""
+        loop = asyncio.get_running_loop()
+        if self._worker and not self._worker.done() and self._loop is loop:
+            return
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="embedding")
+        self._worker = asyncio.create_task(self._dispatch_loop())
+
+    async def _collect_batch(self) -> List[Tuple[str, asyncio.Future, float]]:
+        """Aguarda o primeiro item e agrega outros até encher ou estourar o prazo"""
+        batch = [await self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _dispatch_loop(self):
+        """Loop principal: coleta lotes, codifica na thread dedicada e resolve futures"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect_batch()
+            # Textos repetidos no mesmo lote são codificados uma única vez
+            unique_texts = list(dict.fromkeys(text for text, _, _ in batch))
+
+            start = time.perf_counter()
+            try:
+                vectors = await loop.run_in_executor(self._executor, self.encode_fn, unique_texts)
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"Erro ao codificar lote de embeddings ({len(unique_texts)} textos): {e}")
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            encode_ms = (time.perf_counter() - start) * 1000
+            by_text = dict(zip(unique_texts, vectors))
+            for text, future, enqueued_at in batch:
+                self.wait_ms_total += (start - enqueued_at) * 1000
+                if not future.done():
+                    future.set_result(by_text[text])
+
+            self.batches += 1
+            self.items += len(batch)
+            self.max_batch_seen = max(self.max_batch_seen, len(batch))
+            self.encode_ms_total += encode_ms
+            logger.debug(f"Lote de embeddings: {len(batch)} itens ({len(unique_texts)} únicos) em {encode_ms:.1f}ms")
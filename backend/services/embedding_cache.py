@@ -0,0 +1,187 @@
+"""
+Cache compacto de embeddings em arena NumPy float32
+
+Os vetores ficam em linhas de uma matriz float32 pré-alocada (opcionalmente
+mapeada em disco via memmap), com índice hash -> slot e LRU real sob um
+orçamento em bytes. Um vetor de 384 dimensões ocupa 1.5 KB, contra ~12 KB
+como lista de floats Python.
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional
+from loguru import logger
+import numpy as np
+
+
+KEY_BYTES = 16  # Digest MD5
+
+
+class EmbeddingArenaCache:
+    """Cache LRU de embeddings com armazenamento float32 contíguo"""
+
+    def __init__(self, dim: int, max_bytes: int = 32 * 1024 * 1024, persist_path: Optional[str] = None):
+        """
+        Inicializa a arena
+
+        Args:
+            dim: Dimensão dos embeddings
+            max_bytes: Orçamento da arena em bytes (define a capacidade)
+            persist_path: Prefixo dos arquivos memmap (None = apenas memória)
+        """
+        self.dim = dim
+        self.capacity = max(1, max_bytes // (dim * 4))
+        self.persist_path = Path(persist_path) if persist_path else None
+        self._lock = threading.Lock()
+        self._index: "OrderedDict[bytes, int]" = OrderedDict()
+        self._free_slots: List[int] = []
+        self._tick = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if self.persist_path:
+            self._open_persistent()
+        else:
+            self._arena = np.zeros((self.capacity, dim), dtype=np.float32)
+            self._keys = np.zeros((self.capacity, KEY_BYTES), dtype=np.uint8)
+            self._ticks = np.zeros(self.capacity, dtype=np.uint64)
+            self._free_slots = list(range(self.capacity - 1, -1, -1))
+
+        logger.info(
+            f"Cache de embeddings: capacidade={self.capacity} vetores "
+            f"({self.capacity * dim * 4 / 1024 / 1024:.1f}MB), "
+            f"persistente={'sim' if self.persist_path else 'não'}, carregados={len(self._index)}"
+        )
+
+    @staticmethod
+    def make_key(text: str) -> bytes:
+        """Gera chave binária (MD5) para um texto"""
+        return hashlib.md5(text.encode('utf-8')).digest()
+
+    def get(self, text: str) -> Optional[np.ndarray]:
+        """
+        Obtém o embedding de um texto
+
+        Args:
+            text: Texto original
+
+        Returns:
+            Cópia do vetor float32 ou None se não estiver em cache
+        """
+        key = self.make_key(text)
+        with self._lock:
+            slot = self._index.get(key)
+            if slot is None:
+                self.misses += 1
+                return None
+            self._touch(key, slot)
+            self.hits += 1
+            # Cópia: o slot pode ser reutilizado após eviction
+            return self._arena[slot].copy()
+
+    def put(self, text: str, vector) -> None:
+        """
+        Armazena o embedding de um texto (evicta o LRU se cheio)
+
+        Args:
+            text: Texto original
+            vector: Vetor (lista ou ndarray) com dimensão dim
+        """
+        vector = np.asarray(vector, dtype=np.float32)
+        if vector.shape != (self.dim,):
+            raise ValueError(f"Dimensão inválida: {vector.shape}, esperado ({self.dim},)")
+
+        key = self.make_key(text)
+        with self._lock:
+            slot = self._index.get(key)
+            if slot is None:
+                slot = self._allocate_slot()
+                self._keys[slot] = np.frombuffer(key, dtype=np.uint8)
+            self._arena[slot] = vector
+            self._touch(key, slot)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def clear(self):
+        """Remove todos os embeddings"""
+        with self._lock:
+            self._index.clear()
+            self._keys[:] = 0
+            self._ticks[:] = 0
+            self._free_slots = list(range(self.capacity - 1, -1, -1))
+
+    def flush(self):
+        """Sincroniza arquivos memmap com o disco"""
+        if self.persist_path:
+            with self._lock:
+                self._arena.flush()
+                self._keys.flush()
+                self._ticks.flush()
+
+    def get_stats(self) -> Dict:
+        """Retorna estatísticas do cache"""
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._index),
+            "capacity": self.capacity,
+            "dim": self.dim,
+            "arena_bytes": int(self._arena.nbytes),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            "evictions": self.evictions,
+            "persistent": self.persist_path is not None
+        }
+
+    def _touch(self, key: bytes, slot: int):
+        """Marca slot como mais recente (chamar com lock)"""
+        self._tick += 1
+        self._ticks[slot] = self._tick
+        self._index[key] = slot
+        self._index.move_to_end(key)
+
+    def _allocate_slot(self) -> int:
+        """Obtém slot livre ou evicta o menos usado (chamar com lock)"""
+        if self._free_slots:
+            return self._free_slots.pop()
+        _, slot = self._index.popitem(last=False)
+        self._ticks[slot] = 0
+        self.evictions += 1
+        return slot
+
+    def _open_persistent(self):
+        """Abre (ou recria) os arquivos memmap e reconstrói o índice"""
+        self.persist_path.parent.mkdir(parents=True, exist_ok=True)
+        meta_path = self.persist_path.with_suffix(".json")
+        arena_path = self.persist_path.with_suffix(".f32")
+        keys_path = self.persist_path.with_suffix(".keys")
+        ticks_path = self.persist_path.with_suffix(".ticks")
+
+        meta = {"dim": self.dim, "capacity": self.capacity, "version": 1}
+        reuse = False
+        if meta_path.exists() and arena_path.exists() and keys_path.exists() and ticks_path.exists():
+            try:
+                reuse = json.loads(meta_path.read_text()) == meta
+            except (OSError, ValueError):
+                reuse = False
+            if not reuse:
+                logger.info("Cache de embeddings em disco incompatível (dim/capacidade mudou), recriando")
+
+        mode = "r+" if reuse else "w+"
+        self._arena = np.memmap(arena_path, dtype=np.float32, mode=mode, shape=(self.capacity, self.dim))
+        self._keys = np.memmap(keys_path, dtype=np.uint8, mode=mode, shape=(self.capacity, KEY_BYTES))
+        self._ticks = np.memmap(ticks_path, dtype=np.uint64, mode=mode, shape=(self.capacity,))
+        if not reuse:
+            meta_path.write_text(json.dumps(meta))
+
+        # Slots com tick > 0 estão ocupados; ordem LRU pelo tick
+        used = np.nonzero(self._ticks)[0]
+        for slot in used[np.argsort(self._ticks[used])]:
+            self._index[bytes(self._keys[slot])] = int(slot)
+        used_set = set(int(s) for s in used)
+        self._free_slots = [s for s in range(self.capacity - 1, -1, -1) if s not in used_set]
+        self._tick = int(self._ticks.max()) if len(used) else 0
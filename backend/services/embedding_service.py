@@ -1,17 +1,20 @@
 """
 Serviço de embeddings para busca semântica de memórias
 """
+import threading
 from typing import List, Optional, Dict
 from loguru import logger
 import numpy as np
-import hashlib
 
-# Tenta importar sentence-transformers, mas não falha se não estiver instalado
-try:
-    from sentence_transformers import SentenceTransformer
-    SENTENCE_TRANSFORMERS_AVAILABLE = True
-except ImportError:
-    SENTENCE_TRANSFORMERS_AVAILABLE = False
+from backend.config import settings
+from backend.core.lazy_import import lazy_import, module_available
+from backend.services.embedding_cache import EmbeddingArenaCache
+from backend.services.embedding_batcher import EmbeddingBatcher
+
+# sentence-transformers (e torch) só são importados ao carregar o modelo
+sentence_transformers = lazy_import("sentence_transformers")
+SENTENCE_TRANSFORMERS_AVAILABLE = module_available("sentence_transformers")
+if not SENTENCE_TRANSFORMERS_AVAILABLE:
     logger.warning("sentence-transformers não disponível. Busca semântica será desabilitada.")
 
 
@@ -20,53 +23,110 @@ class EmbeddingService:
     
     _instance: Optional['EmbeddingService'] = None
     
-    def __new__(cls):
+    def __new__(cls, *args, **kwargs):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
             cls._instance._initialized = False
         return cls._instance
     
-    def __init__(self):
+    def __init__(self, load_model: bool = True):
+        """
+        Inicializa o singleton (apenas na primeira chamada)
+        
+        Args:
+            load_model: Carrega o modelo já no construtor; com False o modelo
+                fica para load() (warmup em background) e, até lá, os
+                chamadores usam busca por palavras-chave
+        """
         if self._initialized:
             return
         
         self._initialized = True
         self.model = None
-        self._embedding_cache: Dict[str, List[float]] = {}
-        self._cache_max_size = 1000
+        self._embedding_cache: Optional[EmbeddingArenaCache] = None
+        self._batcher: Optional[EmbeddingBatcher] = None
+        self._load_lock = threading.Lock()
+        self._load_attempted = False
+        
+        if not SENTENCE_TRANSFORMERS_AVAILABLE:
+            logger.warning("sentence-transformers não disponível. Usando busca por palavras-chave.")
+        elif load_model:
+            self.load()
+    
+    def load(self) -> bool:
+        """
+        Carrega o modelo de embeddings (bloqueante; idempotente e thread-safe)
         
-        if SENTENCE_TRANSFORMERS_AVAILABLE:
+        Returns:
+            True se o modelo está disponível
+        """
+        if self.model is not None or not SENTENCE_TRANSFORMERS_AVAILABLE:
+            return self.model is not None
+        with self._load_lock:
+            if self._load_attempted:
+                return self.model is not None
+            self._load_attempted = True
             try:
                 # Modelo leve e rápido, funciona bem em PT-BR
                 logger.info("Carregando modelo de embeddings: all-MiniLM-L6-v2")
-                self.model = SentenceTransformer(
+                model = sentence_transformers.SentenceTransformer(
                     'all-MiniLM-L6-v2',
                     device='cpu',
                     cache_folder='./models'
                 )
+                self._init_cache(model.get_sentence_embedding_dimension())
+                self.model = model  # Publicado por último: is_available() só vira True com o cache pronto
                 logger.info("✅ Modelo de embeddings carregado com sucesso")
             except Exception as e:
                 logger.error(f"Erro ao carregar modelo de embeddings: {e}")
                 self.model = None
-        else:
-            logger.warning("sentence-transformers não disponível. Usando busca por palavras-chave.")
+        return self.model is not None
     
     def is_available(self) -> bool:
         """Verifica se o serviço de embeddings está disponível"""
         return self.model is not None
     
-    def _get_cache_key(self, text: str) -> str:
-        """Gera chave de cache para um texto"""
-        return hashlib.md5(text.encode('utf-8')).hexdigest()
+    def _init_cache(self, dim: int):
+        """
+        Cria o cache de embeddings (arena float32 com LRU por orçamento em bytes)
+        
+        Args:
+            dim: Dimensão dos embeddings do modelo
+        """
+        try:
+            self._embedding_cache = EmbeddingArenaCache(
+                dim=dim,
+                max_bytes=settings.embedding_cache_max_mb * 1024 * 1024,
+                persist_path=settings.embedding_cache_path
+            )
+        except Exception as e:
+            logger.warning(f"Cache persistente de embeddings indisponível ({e}), usando apenas memória")
+            self._embedding_cache = EmbeddingArenaCache(
+                dim=dim,
+                max_bytes=settings.embedding_cache_max_mb * 1024 * 1024
+            )
+    
+    def get_cache_stats(self) -> Dict:
+        """Retorna estatísticas do cache de embeddings (hit rate, ocupação)"""
+        if self._embedding_cache is None:
+            return {"enabled": False}
+        return {"enabled": True, **self._embedding_cache.get_stats()}
+    
+    def get_batcher_stats(self) -> Dict:
+        """Retorna métricas do micro-batching (tamanho médio de lote, fila)"""
+        if self._batcher is None:
+            return {"enabled": False}
+        return {"enabled": True, **self._batcher.get_stats()}
     
-    def _clean_cache(self):
-        """Limpa cache se exceder tamanho máximo"""
-        if len(self._embedding_cache) > self._cache_max_size:
-            items_to_remove = int(self._cache_max_size * 0.2)
-            keys_to_remove = list(self._embedding_cache.keys())[:items_to_remove]
-            for key in keys_to_remove:
-                del self._embedding_cache[key]
-            logger.debug(f"Cache limpo: {items_to_remove} itens removidos")
+    async def stop_batcher(self):
+        """Encerra o servidor de micro-batching (chamar no shutdown)"""
+        if self._batcher is not None:
+            await self._batcher.stop()
+    
+    def flush_cache(self):
+        """Sincroniza o cache persistente com o disco"""
+        if self._embedding_cache is not None:
+            self._embedding_cache.flush()
     
     def embed(self, texts: List[str]) -> List[List[float]]:
         """
@@ -88,9 +148,9 @@ class EmbeddingService:
             indices_to_embed = []
             
             for i, text in enumerate(texts):
-                cache_key = self._get_cache_key(text)
-                if cache_key in self._embedding_cache:
-                    cached_embeddings.append((i, self._embedding_cache[cache_key]))
+                cached = self._embedding_cache.get(text) if self._embedding_cache is not None else None
+                if cached is not None:
+                    cached_embeddings.append((i, cached.tolist()))
                 else:
                     texts_to_embed.append(text)
                     indices_to_embed.append(i)
@@ -99,15 +159,12 @@ class EmbeddingService:
             new_embeddings = []
             if texts_to_embed:
                 embeddings = self.model.encode(texts_to_embed, normalize_embeddings=True)
-                embeddings_list = embeddings.tolist()
-                
-                # Armazena no cache
-                for text, embedding in zip(texts_to_embed, embeddings_list):
-                    cache_key = self._get_cache_key(text)
-                    self._embedding_cache[cache_key] = embedding
-                    new_embeddings.append(embedding)
                 
-                self._clean_cache()
+                # Armazena no cache (linhas float32 da arena)
+                for text, embedding in zip(texts_to_embed, embeddings):
+                    if self._embedding_cache is not None:
+                        self._embedding_cache.put(text, embedding)
+                    new_embeddings.append(embedding.tolist())
             
             # Combina embeddings do cache e novos
             result = [None] * len(texts)
@@ -135,20 +192,68 @@ class EmbeddingService:
         Returns:
             Vetor de embedding
         """
-        # Verifica cache
-        cache_key = self._get_cache_key(text)
-        if cache_key in self._embedding_cache:
-            logger.debug("Query embedding encontrado no cache")
-            return self._embedding_cache[cache_key]
+        # embed() já consulta e alimenta o cache
+        return self.embed([text])[0]
+    
+    async def embed_async(self, texts: List[str]) -> List[List[float]]:
+        """
+        Gera embeddings sem bloquear o event loop (com cache e micro-batching)
+        
+        Textos fora do cache são enfileirados no EmbeddingBatcher, que agrupa
+        requisições concorrentes em um único encode numa thread dedicada.
         
-        # Gera novo embedding
-        embedding = self.embed([text])[0]
+        Args:
+            texts: Lista de textos para embeddar
+            
+        Returns:
+            Lista de vetores de embeddings
+        """
+        if not self.is_available():
+            raise RuntimeError("Serviço de embeddings não está disponível")
         
-        # Armazena no cache
-        self._embedding_cache[cache_key] = embedding
-        self._clean_cache()
+        result: List[Optional[List[float]]] = [None] * len(texts)
+        misses = []
+        for i, text in enumerate(texts):
+            cached = self._embedding_cache.get(text) if self._embedding_cache is not None else None
+            if cached is not None:
+                result[i] = cached.tolist()
+            else:
+                misses.append(i)
         
-        return embedding
+        if misses:
+            if self._batcher is None:
+                self._batcher = EmbeddingBatcher(
+                    encode_fn=self._encode_batch,
+                    max_batch_size=settings.embedding_batch_max_size,
+                    max_wait_ms=settings.embedding_batch_max_wait_ms
+                )
+            vectors = await self._batcher.embed([texts[i] for i in misses])
+            for i, vector in zip(misses, vectors):
+                if self._embedding_cache is not None:
+                    self._embedding_cache.put(texts[i], vector)
+                result[i] = vector.tolist()
+        
+        return result
+    
+    async def embed_query_async(self, text: str) -> List[float]:
+        """
+        Versão assíncrona de embed_query (micro-batching)
+        
+        Args:
+            text: Texto para embeddar
+            
+        Returns:
+            Vetor de embedding
+        """
+        return (await self.embed_async([text]))[0]
+    
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        """Codifica um lote de textos (executado na thread do batcher)"""
+        return self.model.encode(
+            texts,
+            batch_size=len(texts),
+            normalize_embeddings=True
+        )
     
     def cosine_similarity(self, vec1: List[float], vec2: List[float]) -> float:
         """
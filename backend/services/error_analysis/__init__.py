@@ -1,5 +1,6 @@
 """Serviço de análise de erros"""
 from .error_analysis_service import ErrorAnalysisService
+from .fingerprint import compute_fingerprint, message_template
+from .trend_engine import ErrorTrendEngine
 
-__all__ = ["ErrorAnalysisService"]
-
+__all__ = ["ErrorAnalysisService", "compute_fingerprint", "message_template", "ErrorTrendEngine"]
@@ -4,6 +4,7 @@ from loguru import logger
 
 from .solution_analyzer import analyze_error, get_error_severity
 from .trend_analyzer import group_similar_errors, get_error_trends
+from .fingerprint import compute_fingerprint, message_template
 
 
 class ErrorAnalysisService:
@@ -43,6 +44,31 @@ class ErrorAnalysisService:
         """
         return get_error_severity(error_type, level)
     
+    def fingerprint(self, error_type: str, message: str) -> str:
+        """
+        Calcula fingerprint estável do erro (tipo + template da mensagem)
+        
+        Args:
+            error_type: Tipo do erro
+            message: Mensagem do erro
+            
+        Returns:
+            Fingerprint hexadecimal
+        """
+        return compute_fingerprint(error_type, message)
+    
+    def message_template(self, message: str) -> str:
+        """
+        Reduz a mensagem ao template usado no fingerprint
+        
+        Args:
+            message: Mensagem do erro
+            
+        Returns:
+            Template normalizado
+        """
+        return message_template(message)
+    
     def group_similar_errors(
         self,
         errors: List[Dict]
@@ -0,0 +1,51 @@
+"""Fingerprint estável de erros (tipo normalizado + template da mensagem)"""
+import hashlib
+import re
+
+# Partes variáveis da mensagem substituídas por marcadores, na ordem
+_VARIABLE_PARTS = [
+    (re.compile(r"https?://\S+"), "<url>"),
+    (re.compile(r"\b[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\b"), "<uuid>"),
+    (re.compile(r"\b0x[0-9a-f]+\b"), "<hex>"),
+    (re.compile(r"\b[0-9a-f]{12,}\b"), "<hex>"),
+    (re.compile(r"'[^']*'|\"[^\"]*\""), "<str>"),
+    (re.compile(r"(?:/[\w.-]+){2,}"), "<path>"),
+    (re.compile(r"\d+(?:\.\d+)?"), "<n>"),
+]
+_WHITESPACE = re.compile(r"\s+")
+
+TEMPLATE_MAX_CHARS = 200
+
+
+def message_template(message: str) -> str:
+    """
+    Reduz uma mensagem de erro ao seu template
+
+    Remove partes variáveis (URLs, UUIDs, números, caminhos, strings entre
+    aspas) para que ocorrências do mesmo erro tenham o mesmo template.
+
+    Args:
+        message: Mensagem original
+
+    Returns:
+        Template normalizado (minúsculo, espaços colapsados)
+    """
+    template = (message or "").lower()
+    for pattern, placeholder in _VARIABLE_PARTS:
+        template = pattern.sub(placeholder, template)
+    return _WHITESPACE.sub(" ", template).strip()[:TEMPLATE_MAX_CHARS]
+
+
+def compute_fingerprint(error_type: str, message: str) -> str:
+    """
+    Calcula o fingerprint de um erro
+
+    Args:
+        error_type: Tipo do erro (network, audio, ...)
+        message: Mensagem do erro
+
+    Returns:
+        Hash hexadecimal de 16 caracteres
+    """
+    material = f"{(error_type or 'other').strip().lower()}\0{message_template(message)}"
+    return hashlib.sha1(material.encode("utf-8")).hexdigest()[:16]
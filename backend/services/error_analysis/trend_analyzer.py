@@ -1,5 +1,16 @@
 """Analisa tendências e agrupa erros similares"""
-from typing import Dict, List, Any
+from datetime import datetime, timedelta
+from typing import Dict, List, Any, Optional
+
+
+def _parse_timestamp(value: Any) -> Optional[datetime]:
+    """Converte timestamp do banco (str ISO ou datetime) em datetime"""
+    if isinstance(value, datetime):
+        return value
+    try:
+        return datetime.fromisoformat(str(value))
+    except (TypeError, ValueError):
+        return None
 
 
 def group_similar_errors(errors: List[Dict]) -> Dict[str, List[Dict]]:
@@ -61,9 +72,24 @@ def get_error_trends(errors: List[Dict]) -> Dict[str, Any]:
     most_common_type = max(type_counts.items(), key=lambda x: x[1])[0] if type_counts else None
     most_common_message = max(message_counts.items(), key=lambda x: x[1])[0] if message_counts else None
     
-    # Determina tendência (simplificado - compara últimos 7 dias com anteriores)
-    # Em produção, seria mais sofisticado
-    trend = "stable"
+    # Tendência: últimas 24h vs 24h anteriores (para tempo real, ver ErrorTrendEngine)
+    now = datetime.now()
+    recent = previous = 0
+    for error in errors:
+        timestamp = _parse_timestamp(error.get("timestamp"))
+        if timestamp is None:
+            continue
+        age = now - timestamp
+        if age <= timedelta(days=1):
+            recent += 1
+        elif age <= timedelta(days=2):
+            previous += 1
+    
+    if previous == 0:
+        trend = "up" if recent > 0 else "stable"
+    else:
+        ratio = recent / previous
+        trend = "up" if ratio > 1.2 else "down" if ratio < 0.8 else "stable"
     
     return {
         "total": len(errors),
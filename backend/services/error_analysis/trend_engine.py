@@ -0,0 +1,428 @@
+"""
+Motor de tendências de erros com contadores por janela de tempo
+
+Cada fingerprint e cada tipo de erro têm dois ring buffers em memória
+(buckets de minuto e de hora). Os incrementos pendentes são gravados
+periodicamente em uma tabela de rollup e recarregados no startup. Um EWMA
+por série (minutos concluídos) serve de linha de base para detectar picos.
+Consultas custam O(buckets), sem varrer a tabela errors.
+"""
+import asyncio
+import math
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from loguru import logger
+
+
+MINUTE = 60
+HOUR = 3600
+
+SCOPE_TYPE = "type"
+SCOPE_FINGERPRINT = "fingerprint"
+
+
+class _RingSeries:
+    """Contadores em buckets de tamanho fixo (ring buffer)"""
+
+    def __init__(self, bucket_seconds: int, size: int):
+        self.bucket_seconds = bucket_seconds
+        self.size = size
+        self.counts = [0] * size
+        self.head: Optional[int] = None  # Índice absoluto do bucket mais recente
+
+    def bucket_of(self, ts: float) -> int:
+        return int(ts // self.bucket_seconds)
+
+    def advance(self, bucket: int):
+        """Move o head até o bucket, zerando os buckets que saíram da janela"""
+        if self.head is None:
+            self.head = bucket
+            return
+        if bucket <= self.head:
+            return
+        for offset in range(1, min(bucket - self.head, self.size) + 1):
+            self.counts[(self.head + offset) % self.size] = 0
+        self.head = bucket
+
+    def add(self, bucket: int, count: int) -> bool:
+        """Soma count ao bucket (False se o bucket já saiu da janela)"""
+        self.advance(bucket)
+        if bucket <= self.head - self.size:
+            return False
+        self.counts[bucket % self.size] += count
+        return True
+
+    def get(self, bucket: int) -> int:
+        if self.head is None or bucket > self.head or bucket <= self.head - self.size:
+            return 0
+        return self.counts[bucket % self.size]
+
+    def last(self, n: int, end_bucket: int) -> List[int]:
+        """Contagens dos n buckets terminando em end_bucket (mais antigo primeiro)"""
+        return [self.get(end_bucket - i) for i in range(n - 1, -1, -1)]
+
+
+class _SeriesStats:
+    """Séries de minuto/hora e linha de base EWMA de uma chave"""
+
+    def __init__(self, minute_buckets: int, hour_buckets: int):
+        self.minutes = _RingSeries(MINUTE, minute_buckets)
+        self.hours = _RingSeries(HOUR, hour_buckets)
+        self.ewma: Optional[float] = None
+        self.ewm_var = 0.0
+        self._folded_bucket: Optional[int] = None  # Último minuto incorporado ao EWMA
+
+    def fold(self, current_bucket: int, alpha: float):
+        """Incorpora ao EWMA todos os minutos concluídos antes de current_bucket"""
+        if self._folded_bucket is None:
+            if self.minutes.head is None:
+                return
+            self._folded_bucket = self.minutes.head - self.minutes.size
+
+        pending = current_bucket - 1 - self._folded_bucket
+        if pending <= 0:
+            return
+
+        # Minutos além da janela estão zerados: decaimento em forma fechada
+        skipped = max(0, pending - self.minutes.size)
+        if skipped and self.ewma is not None:
+            decay = (1 - alpha) ** skipped
+            self.ewma *= decay
+            self.ewm_var *= decay
+
+        for bucket in range(current_bucket - min(pending, self.minutes.size), current_bucket):
+            value = self.minutes.get(bucket)
+            if self.ewma is None:
+                self.ewma = float(value)
+                continue
+            diff = value - self.ewma
+            increment = alpha * diff
+            self.ewma += increment
+            self.ewm_var = (1 - alpha) * (self.ewm_var + diff * increment)
+        self._folded_bucket = current_bucket - 1
+
+
+class ErrorTrendEngine:
+    """Contadores de erros por fingerprint/tipo com detecção de picos"""
+
+    def __init__(
+        self,
+        minute_buckets: int = 120,
+        hour_buckets: int = 48,
+        alpha: float = 0.3,
+        spike_factor: float = 3.0,
+        spike_min_count: int = 5,
+        flush_interval: float = 60.0
+    ):
+        """
+        Inicializa o motor
+
+        Args:
+            minute_buckets: Minutos mantidos em memória por série
+            hour_buckets: Horas mantidas em memória por série
+            alpha: Fator de suavização do EWMA (por minuto)
+            spike_factor: Múltiplo da linha de base que caracteriza pico
+            spike_min_count: Ocorrências mínimas no minuto para haver pico
+            flush_interval: Intervalo de gravação dos rollups (segundos)
+        """
+        self.minute_buckets = minute_buckets
+        self.hour_buckets = hour_buckets
+        self.alpha = alpha
+        self.spike_factor = spike_factor
+        self.spike_min_count = spike_min_count
+        self.flush_interval = flush_interval
+        self._series: Dict[Tuple[str, str], _SeriesStats] = {}
+        self._meta: Dict[str, str] = {}  # fingerprint -> tipo
+        self._pending: Dict[Tuple[str, str, int, int], int] = {}
+        self._database = None
+        self._task: Optional[asyncio.Task] = None
+
+    # ========== INGESTÃO ==========
+
+    def record(self, fingerprint: Optional[str], error_type: str, count: int = 1, ts: Optional[float] = None):
+        """
+        Registra ocorrências de um erro
+
+        Args:
+            fingerprint: Fingerprint do erro (None = só conta no tipo)
+            error_type: Tipo do erro
+            count: Número de ocorrências
+            ts: Timestamp epoch (padrão: agora)
+        """
+        ts = time.time() if ts is None else ts
+        keys = [(SCOPE_TYPE, error_type)]
+        if fingerprint:
+            keys.append((SCOPE_FINGERPRINT, fingerprint))
+            self._meta[fingerprint] = error_type
+
+        for key in keys:
+            stats = self._stats(key)
+            for series in (stats.minutes, stats.hours):
+                bucket = series.bucket_of(ts)
+                if series.add(bucket, count):
+                    pending_key = (key[0], key[1], series.bucket_seconds, bucket * series.bucket_seconds)
+                    self._pending[pending_key] = self._pending.get(pending_key, 0) + count
+
+    def load(self, rows: Iterable[Tuple[str, str, int, int, int]], fingerprint_types: Optional[Dict[str, str]] = None):
+        """
+        Reidrata os ring buffers a partir da tabela de rollup
+
+        Args:
+            rows: Tuplas (scope, key, resolution, bucket_start, count)
+            fingerprint_types: Mapa fingerprint -> tipo
+        """
+        loaded = 0
+        for scope, key, resolution, bucket_start, count in sorted(rows, key=lambda r: r[3]):
+            stats = self._stats((scope, key))
+            series = stats.minutes if resolution == MINUTE else stats.hours
+            if series.add(int(bucket_start) // resolution, int(count)):
+                loaded += 1
+        if fingerprint_types:
+            self._meta.update(fingerprint_types)
+        if loaded:
+            logger.info(f"Tendências de erros: {loaded} buckets carregados de {len(self._series)} séries")
+
+    # ========== CONSULTA ==========
+
+    def get_trend(
+        self,
+        scope: str,
+        key: str,
+        window_seconds: int = HOUR,
+        now: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        Tendência de uma série: janela atual vs janela anterior
+
+        Args:
+            scope: SCOPE_TYPE ou SCOPE_FINGERPRINT
+            key: Tipo ou fingerprint
+            window_seconds: Tamanho da janela
+            now: Timestamp de referência (padrão: agora)
+
+        Returns:
+            Dicionário com contagens, taxa por minuto, direção e pico
+        """
+        now = time.time() if now is None else now
+        stats = self._series.get((scope, key))
+        if stats is None:
+            stats = _SeriesStats(self.minute_buckets, self.hour_buckets)
+
+        # Usa minutos enquanto duas janelas couberem no ring de minutos
+        series = stats.minutes if window_seconds * 2 <= self.minute_buckets * MINUTE else stats.hours
+        n = max(1, min(math.ceil(window_seconds / series.bucket_seconds), series.size // 2))
+        end = series.bucket_of(now)
+        current = sum(series.last(n, end))
+        previous = sum(series.last(n, end - n))
+
+        if previous == 0:
+            direction = "up" if current > 0 else "stable"
+            change_pct = None
+        else:
+            ratio = current / previous
+            direction = "up" if ratio > 1.2 else "down" if ratio < 0.8 else "stable"
+            change_pct = round((ratio - 1) * 100, 1)
+
+        spike = self._spike(stats, now)
+        return {
+            "scope": scope,
+            "key": key,
+            "window_seconds": n * series.bucket_seconds,
+            "count": current,
+            "previous_count": previous,
+            "rate_per_minute": round(current / (n * series.bucket_seconds / MINUTE), 3),
+            "direction": direction,
+            "change_pct": change_pct,
+            "baseline_per_minute": round(spike["baseline"], 3),
+            "spiking": spike["spiking"]
+        }
+
+    def get_spikes(self, now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Séries em pico no minuto atual
+
+        Args:
+            now: Timestamp de referência (padrão: agora)
+
+        Returns:
+            Lista de picos ordenada pela intensidade
+        """
+        now = time.time() if now is None else now
+        spikes = []
+        for (scope, key), stats in self._series.items():
+            spike = self._spike(stats, now)
+            if spike["spiking"]:
+                spikes.append({
+                    "scope": scope,
+                    "key": key,
+                    "type": key if scope == SCOPE_TYPE else self._meta.get(key),
+                    "count_last_minute": spike["count"],
+                    "baseline_per_minute": round(spike["baseline"], 3),
+                    "score": round(spike["score"], 2)
+                })
+        return sorted(spikes, key=lambda s: s["score"], reverse=True)
+
+    def get_overview(self, window_seconds: int = HOUR, top_n: int = 10, now: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Resumo para /errors/analytics: o que está em pico e tendências
+
+        Args:
+            window_seconds: Janela de comparação
+            top_n: Número de fingerprints mais frequentes na janela
+            now: Timestamp de referência (padrão: agora)
+
+        Returns:
+            Dicionário com direção geral, tendências por tipo e picos
+        """
+        now = time.time() if now is None else now
+        by_type = {
+            key: self.get_trend(SCOPE_TYPE, key, window_seconds, now)
+            for scope, key in self._series if scope == SCOPE_TYPE
+        }
+        fingerprints = [
+            self.get_trend(SCOPE_FINGERPRINT, key, window_seconds, now)
+            for scope, key in self._series if scope == SCOPE_FINGERPRINT
+        ]
+        top = sorted((t for t in fingerprints if t["count"]), key=lambda t: t["count"], reverse=True)[:top_n]
+        for trend in top:
+            trend["type"] = self._meta.get(trend["key"])
+
+        current = sum(t["count"] for t in by_type.values())
+        previous = sum(t["previous_count"] for t in by_type.values())
+        if previous == 0:
+            direction = "up" if current > 0 else "stable"
+        else:
+            ratio = current / previous
+            direction = "up" if ratio > 1.2 else "down" if ratio < 0.8 else "stable"
+
+        return {
+            "trend": direction,
+            "window_seconds": window_seconds,
+            "count": current,
+            "previous_count": previous,
+            "by_type": by_type,
+            "top_fingerprints": top,
+            "spiking": self.get_spikes(now)
+        }
+
+    # ========== PERSISTÊNCIA ==========
+
+    async def start(self, database):
+        """
+        Carrega rollups recentes e inicia a gravação periódica
+
+        Args:
+            database: Instância de Database
+        """
+        self._database = database
+        since = time.time() - max(self.minute_buckets * MINUTE, self.hour_buckets * HOUR)
+        try:
+            rows = await database.get_error_rollups(since)
+            self.load(rows, await database.get_fingerprint_types())
+        except Exception as e:
+            logger.warning(f"⚠️ Erro ao carregar rollups de erros: {e}")
+        if self._task is None:
+            self._task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self):
+        """Interrompe a gravação periódica e grava o que estiver pendente"""
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+
+    async def flush(self) -> int:
+        """
+        Grava os incrementos pendentes na tabela de rollup
+
+        Returns:
+            Número de buckets gravados
+        """
+        if not self._pending or self._database is None:
+            return 0
+        pending, self._pending = self._pending, {}
+        try:
+            await self._database.upsert_error_rollups([
+                (scope, key, resolution, bucket_start, count)
+                for (scope, key, resolution, bucket_start), count in pending.items()
+            ])
+        except Exception as e:
+            # Devolve os incrementos para a próxima tentativa
+            for pending_key, count in pending.items():
+                self._pending[pending_key] = self._pending.get(pending_key, 0) + count
+            logger.warning(f"⚠️ Erro ao gravar rollups de erros: {e}")
+            return 0
+
+        # Buckets fora da janela em memória não são mais necessários
+        now = time.time()
+        try:
+            await self._database.prune_error_rollups(MINUTE, now - self.minute_buckets * MINUTE)
+            await self._database.prune_error_rollups(HOUR, now - self.hour_buckets * HOUR)
+        except Exception as e:
+            logger.debug(f"Erro ao podar rollups de erros: {e}")
+        return len(pending)
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            self.evict_idle()
+            await self.flush()
+
+    def evict_idle(self, now: Optional[float] = None) -> int:
+        """
+        Remove séries sem ocorrências nas janelas de minuto e de hora
+
+        Sem isso, cada fingerprint já visto mantém seus ring buffers para
+        sempre e a memória cresce com a variedade de erros.
+
+        Args:
+            now: Timestamp de referência (padrão: agora)
+
+        Returns:
+            Número de séries removidas
+        """
+        now = time.time() if now is None else now
+        idle = [
+            key for key, stats in self._series.items()
+            if self._is_idle(stats.minutes, now) and self._is_idle(stats.hours, now)
+        ]
+        for key in idle:
+            del self._series[key]
+            if key[0] == SCOPE_FINGERPRINT:
+                self._meta.pop(key[1], None)
+        if idle:
+            logger.debug(f"Tendências de erros: {len(idle)} séries ociosas removidas")
+        return len(idle)
+
+    @staticmethod
+    def _is_idle(series: _RingSeries, now: float) -> bool:
+        """Último bucket com dados já saiu da janela"""
+        return series.head is None or series.head <= series.bucket_of(now) - series.size
+
+    # ========== INTERNOS ==========
+
+    def _stats(self, key: Tuple[str, str]) -> _SeriesStats:
+        stats = self._series.get(key)
+        if stats is None:
+            stats = _SeriesStats(self.minute_buckets, self.hour_buckets)
+            self._series[key] = stats
+        return stats
+
+    def _spike(self, stats: _SeriesStats, now: float) -> Dict[str, Any]:
+        """Compara o minuto atual com a linha de base EWMA dos minutos anteriores"""
+        bucket = stats.minutes.bucket_of(now)
+        stats.fold(bucket, self.alpha)
+        count = stats.minutes.get(bucket)
+        baseline = stats.ewma or 0.0
+        threshold = max(
+            self.spike_min_count,
+            baseline * self.spike_factor,
+            baseline + 3 * math.sqrt(max(stats.ewm_var, 0.0))
+        )
+        return {
+            "count": count,
+            "baseline": baseline,
+            "spiking": count >= threshold,
+            "score": count / max(baseline, 1.0)
+        }
@@ -8,19 +8,22 @@ from pathlib import Path
 from loguru import logger
 
 from backend.database.database import Database
+from backend.services.conversation_log import ConversationLog
 
 
 class FeedbackService:
     """Gerencia coleta de feedback e preparação de datasets"""
     
-    def __init__(self, database: Database):
+    def __init__(self, database: Database, conversation_log: Optional[ConversationLog] = None):
         """
         Inicializa serviço de feedback
         
         Args:
             database: Instância do banco de dados
+            conversation_log: Log bufferizado (grava conversas em lote; None = INSERT por turno)
         """
         self.db = database
+        self.conversation_log = conversation_log
         logger.info("FeedbackService inicializado")
     
     async def collect_conversation(
@@ -44,9 +47,10 @@ class FeedbackService:
             used_tool: Ferramenta usada
             
         Returns:
-            ID da conversa salva
+            ID da conversa salva (com o log bufferizado, gravada no próximo lote)
         """
-        conversation_id = await self.db.save_conversation(
+        save = self.conversation_log.append if self.conversation_log else self.db.save_conversation
+        conversation_id = await save(
             session_id=session_id,
             user_input=user_input,
             assistant_response=assistant_response,
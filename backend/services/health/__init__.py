@@ -0,0 +1,19 @@
+"""
+Módulo de health check - probes em background com estado em cache
+"""
+from .latency_histogram import LatencyHistogram
+from .health_monitor import HealthMonitor, DependencyStatus, ONLINE, STANDBY, OFFLINE, UNKNOWN
+from .probes import probe_stt, probe_llm, probe_tts
+
+__all__ = [
+    "LatencyHistogram",
+    "HealthMonitor",
+    "DependencyStatus",
+    "ONLINE",
+    "STANDBY",
+    "OFFLINE",
+    "UNKNOWN",
+    "probe_stt",
+    "probe_llm",
+    "probe_tts"
+]
@@ -0,0 +1,206 @@
+"""
+Monitor de saúde com probes em background
+
+Cada dependência é verificada periodicamente por uma task própria e o
+resultado fica em cache. Os endpoints de health apenas leem esse cache,
+então o custo de um probe nunca é pago pela requisição (nem multiplicado
+pela frequência do load balancer).
+"""
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Optional, Any
+from loguru import logger
+
+from .latency_histogram import LatencyHistogram
+
+
+# Estados possíveis de uma dependência
+ONLINE = "online"
+STANDBY = "standby"  # Disponível, mas recurso pesado ainda não carregado (lazy)
+OFFLINE = "offline"
+UNKNOWN = "unknown"  # Ainda não verificada
+
+# Estados que contam como "pronto" para readiness
+READY_STATES = (ONLINE, STANDBY)
+
+
+@dataclass
+class DependencyStatus:
+    """Estado em cache de uma dependência"""
+    name: str
+    critical: bool = False
+    status: str = UNKNOWN
+    last_check: Optional[float] = None
+    last_latency_ms: Optional[float] = None
+    last_error: Optional[str] = None
+    consecutive_failures: int = 0
+    histogram: LatencyHistogram = field(default_factory=LatencyHistogram)
+    
+    def to_dict(self, include_histogram: bool = True) -> Dict[str, Any]:
+        """Serializa o estado para resposta JSON"""
+        data = {
+            "status": self.status,
+            "critical": self.critical,
+            "last_check": self.last_check,
+            "age_seconds": round(time.time() - self.last_check, 2) if self.last_check else None,
+            "last_latency_ms": self.last_latency_ms,
+            "last_error": self.last_error,
+            "consecutive_failures": self.consecutive_failures
+        }
+        if include_histogram:
+            data["latency"] = self.histogram.to_dict()
+        return data
+
+
+class HealthMonitor:
+    """Executa probes periódicos e mantém o estado de saúde em cache"""
+    
+    def __init__(self, interval: float = 30.0, timeout: float = 5.0):
+        """
+        Inicializa o monitor
+        
+        Args:
+            interval: Intervalo padrão entre probes (segundos)
+            timeout: Tempo máximo de um probe (segundos)
+        """
+        self.interval = interval
+        self.timeout = timeout
+        self.started_at = time.time()
+        self._probes: Dict[str, Callable[[], str]] = {}
+        self._intervals: Dict[str, float] = {}
+        self._statuses: Dict[str, DependencyStatus] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+    
+    def register(
+        self,
+        name: str,
+        probe: Callable[[], str],
+        critical: bool = False,
+        interval: Optional[float] = None
+    ):
+        """
+        Registra uma dependência a ser monitorada
+        
+        Args:
+            name: Nome da dependência (ex: "stt", "llm")
+            probe: Função síncrona que retorna o status (online/standby/offline)
+            critical: Se True, a dependência participa do readiness
+            interval: Intervalo específico desta dependência (segundos)
+        """
+        self._probes[name] = probe
+        self._intervals[name] = interval or self.interval
+        self._statuses[name] = DependencyStatus(name=name, critical=critical)
+    
+    async def start(self):
+        """Executa uma rodada inicial de probes e inicia as tasks periódicas"""
+        if self._tasks:
+            return
+        
+        await self.refresh()
+        for name in self._probes:
+            self._tasks[name] = asyncio.create_task(self._probe_loop(name))
+        logger.info(f"✅ Health monitor iniciado ({len(self._tasks)} dependências)")
+    
+    async def stop(self):
+        """Cancela as tasks de probe"""
+        tasks = list(self._tasks.values())
+        self._tasks.clear()
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        logger.info("Health monitor encerrado")
+    
+    async def refresh(self, name: Optional[str] = None):
+        """
+        Executa probes imediatamente (todas ou apenas uma dependência)
+        
+        Args:
+            name: Nome da dependência ou None para todas
+        """
+        names = [name] if name else list(self._probes)
+        await asyncio.gather(*(self._run_probe(n) for n in names))
+    
+    async def _probe_loop(self, name: str):
+        """Loop periódico de probe de uma dependência"""
+        while True:
+            await asyncio.sleep(self._intervals[name])
+            await self._run_probe(name)
+    
+    async def _run_probe(self, name: str):
+        """
+        Executa um probe em thread separada e atualiza o cache
+        
+        Args:
+            name: Nome da dependência
+        """
+        state = self._statuses[name]
+        start = time.perf_counter()
+        try:
+            status = await asyncio.wait_for(
+                asyncio.to_thread(self._probes[name]),
+                timeout=self.timeout
+            )
+            error = None
+        except asyncio.TimeoutError:
+            status = OFFLINE
+            error = f"timeout após {self.timeout}s"
+        except Exception as e:
+            status = OFFLINE
+            error = str(e)
+        
+        latency_ms = (time.perf_counter() - start) * 1000
+        state.histogram.observe(latency_ms)
+        state.last_latency_ms = round(latency_ms, 2)
+        state.last_check = time.time()
+        state.last_error = error
+        
+        if status in READY_STATES:
+            state.consecutive_failures = 0
+        else:
+            state.consecutive_failures += 1
+        
+        if status != state.status and state.status != UNKNOWN:
+            logger.warning(f"⚠️ Health: {name} mudou de {state.status} para {status}" + (f" ({error})" if error else ""))
+        state.status = status
+    
+    def get_status(self, name: str) -> str:
+        """
+        Retorna o status em cache de uma dependência
+        
+        Args:
+            name: Nome da dependência
+            
+        Returns:
+            Status (online/standby/offline/unknown)
+        """
+        state = self._statuses.get(name)
+        return state.status if state else UNKNOWN
+    
+    def is_ready(self) -> bool:
+        """Verifica se todas as dependências críticas estão prontas"""
+        return all(
+            state.status in READY_STATES
+            for state in self._statuses.values()
+            if state.critical
+        )
+    
+    def uptime_seconds(self) -> float:
+        """Tempo desde a criação do monitor"""
+        return round(time.time() - self.started_at, 2)
+    
+    def snapshot(self, include_histogram: bool = True) -> Dict[str, Dict[str, Any]]:
+        """
+        Retorna o estado em cache de todas as dependências
+        
+        Args:
+            include_histogram: Inclui histogramas de latência
+            
+        Returns:
+            Dicionário nome -> estado
+        """
+        return {
+            name: state.to_dict(include_histogram)
+            for name, state in self._statuses.items()
+        }
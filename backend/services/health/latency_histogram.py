@@ -0,0 +1,127 @@
+"""
+Histograma de latência com buckets fixos (compatível com formato Prometheus)
+"""
+import threading
+from typing import Dict, List, Optional, Sequence
+
+
+# Buckets padrão em milissegundos (limite superior inclusivo)
+DEFAULT_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class LatencyHistogram:
+    """Histograma de latência thread-safe com buckets cumulativos"""
+    
+    def __init__(self, buckets_ms: Optional[Sequence[float]] = None):
+        """
+        Inicializa o histograma
+        
+        Args:
+            buckets_ms: Limites superiores dos buckets em ms (ordenados)
+        """
+        self.buckets_ms: List[float] = sorted(buckets_ms or DEFAULT_BUCKETS_MS)
+        # Último slot acumula observações acima do maior bucket (+Inf)
+        self._counts: List[int] = [0] * (len(self.buckets_ms) + 1)
+        self._sum_ms = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+    
+    def observe(self, value_ms: float):
+        """
+        Registra uma observação
+        
+        Args:
+            value_ms: Latência em milissegundos
+        """
+        index = len(self.buckets_ms)
+        for i, bound in enumerate(self.buckets_ms):
+            if value_ms <= bound:
+                index = i
+                break
+        
+        with self._lock:
+            self._counts[index] += 1
+            self._sum_ms += value_ms
+            self._count += 1
+    
+    @property
+    def count(self) -> int:
+        """Total de observações"""
+        return self._count
+    
+    @property
+    def sum_ms(self) -> float:
+        """Soma de todas as latências observadas"""
+        return self._sum_ms
+    
+    def percentile(self, q: float) -> Optional[float]:
+        """
+        Estima um percentil a partir dos buckets (interpolação linear)
+        
+        Args:
+            q: Quantil entre 0.0 e 1.0 (ex: 0.95)
+            
+        Returns:
+            Latência estimada em ms ou None se não houver observações
+        """
+        with self._lock:
+            counts = list(self._counts)
+            total = self._count
+        
+        if total == 0:
+            return None
+        
+        target = q * total
+        cumulative = 0
+        lower = 0.0
+        for i, bucket_count in enumerate(counts):
+            if i >= len(self.buckets_ms):
+                # Acima do maior bucket: melhor estimativa é o próprio limite
+                return float(self.buckets_ms[-1])
+            upper = float(self.buckets_ms[i])
+            if bucket_count and cumulative + bucket_count >= target:
+                fraction = (target - cumulative) / bucket_count
+                return lower + (upper - lower) * fraction
+            cumulative += bucket_count
+            lower = upper
+        return float(self.buckets_ms[-1])
+    
+    def cumulative_buckets(self) -> List[tuple]:
+        """
+        Retorna buckets cumulativos no formato Prometheus
+        
+        Returns:
+            Lista de tuplas (limite, contagem_acumulada); último limite é "+Inf"
+        """
+        with self._lock:
+            counts = list(self._counts)
+        
+        result = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets_ms, counts):
+            cumulative += bucket_count
+            result.append((bound, cumulative))
+        result.append(("+Inf", cumulative + counts[-1]))
+        return result
+    
+    def to_dict(self) -> Dict:
+        """
+        Serializa o histograma para resposta JSON
+        
+        Returns:
+            Dicionário com contagem, média, percentis e buckets
+        """
+        count = self._count
+        return {
+            "count": count,
+            "avg_ms": round(self._sum_ms / count, 2) if count else None,
+            "p50_ms": _round(self.percentile(0.50)),
+            "p95_ms": _round(self.percentile(0.95)),
+            "p99_ms": _round(self.percentile(0.99)),
+            "buckets": {str(bound): value for bound, value in self.cumulative_buckets()}
+        }
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    """Arredonda valores opcionais para 2 casas"""
+    return round(value, 2) if value is not None else None
@@ -0,0 +1,55 @@
+"""
+Probes leves de dependências usados pelo HealthMonitor
+
+Nenhum probe carrega modelos nem consome cota de API: o STT apenas
+informa se o modelo já está em memória e o LLM usa a verificação de
+conectividade do provider (listagem/consulta de modelo).
+"""
+from .health_monitor import ONLINE, STANDBY, OFFLINE
+
+
+def probe_stt(stt_service) -> str:
+    """
+    Verifica o STT sem forçar o carregamento do modelo
+    
+    Args:
+        stt_service: Instância de WhisperSTTService
+        
+    Returns:
+        online se o modelo está carregado, standby se pode ser carregado
+    """
+    if stt_service is None:
+        return OFFLINE
+    if stt_service.is_loaded():
+        return ONLINE
+    return STANDBY if stt_service.is_available() else OFFLINE
+
+
+def probe_llm(llm_service) -> str:
+    """
+    Verifica conectividade com o provider de LLM
+    
+    Args:
+        llm_service: Instância de BaseLLMService
+        
+    Returns:
+        online ou offline
+    """
+    if llm_service is None:
+        return OFFLINE
+    return ONLINE if llm_service.check_connectivity() else OFFLINE
+
+
+def probe_tts(tts_service) -> str:
+    """
+    Verifica se há engine de TTS disponível
+    
+    Args:
+        tts_service: Instância de TTSService
+        
+    Returns:
+        online ou offline
+    """
+    if tts_service is None:
+        return OFFLINE
+    return ONLINE if tts_service.is_ready() else OFFLINE
@@ -7,6 +7,7 @@ from typing import Optional, Dict, Tuple, List
 from loguru import logger
 
 from backend.services.embedding_service import EmbeddingService
+from backend.services.llm.groq_budget import PRIORITY_BACKGROUND, llm_priority
 
 # Padrões regex para detecção rápida (fallback)
 INTENT_PATTERNS = {
@@ -201,13 +202,15 @@ Texto do usuário: "{text}"
 Responda APENAS com o nome da categoria (ex: analyze_requirements). Se não for nenhuma das categorias acima, responda "none":"""
         
         try:
-            response, _ = self.llm_service.generate_response(
-                prompt,
-                contexto=None,
-                memorias_contexto="",
-                tools=None,
-                tool_executor=None
-            )
+            # Classificação auxiliar: cede o orçamento do Groq aos turnos interativos
+            with llm_priority(PRIORITY_BACKGROUND):
+                response, _ = self.llm_service.generate_response(
+                    prompt,
+                    contexto=None,
+                    memorias_contexto="",
+                    tools=None,
+                    tool_executor=None
+                )
             
             # Limpa resposta e extrai intenção
             intent = response.strip().lower()
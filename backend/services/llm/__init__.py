@@ -4,6 +4,7 @@ Serviços de LLM - Factory e exports
 from backend.services.llm.base import BaseLLMService
 from backend.services.llm.ollama_service import OllamaLLMService
 from backend.services.llm.groq_service import GroqLLMService
+from backend.services.llm.router import LLMRouter
 
 
 def create_llm_service(
@@ -32,6 +33,7 @@ __all__ = [
     "BaseLLMService",
     "OllamaLLMService",
     "GroqLLMService",
+    "LLMRouter",
     "create_llm_service"
 ]
 
@@ -4,6 +4,8 @@ Classe base para serviços de LLM
 from typing import List, Dict, Optional
 from loguru import logger
 
+from backend.services.llm.prompt_builder import PromptBuilder, PromptReport
+
 
 class BaseLLMService:
     """Classe base para serviços de LLM"""
@@ -11,6 +13,8 @@ class BaseLLMService:
     def __init__(self, temperature: float = 0.7, max_tokens: int = 512):
         self.temperature = temperature
         self.max_tokens = max_tokens
+        self.prompt_builder = PromptBuilder.from_settings()
+        self.last_prompt_report: Optional[PromptReport] = None
     
     def generate_response(
         self,
@@ -53,6 +57,49 @@ class BaseLLMService:
         """Deve ser implementado pelas subclasses"""
         raise NotImplementedError
     
+    def check_connectivity(self) -> bool:
+        """
+        Verificação leve usada pelos probes de health
+        
+        Subclasses cujo is_ready() é caro (ex: gera tokens) devem sobrescrever.
+        """
+        return self.is_ready()
+    
+    def _preparar_mensagens(
+        self,
+        prompt: str,
+        contexto: Optional[List[Dict[str, str]]] = None,
+        memorias_contexto: str = "",
+        system_prompt_override: Optional[str] = None,
+        report: Optional[PromptReport] = None
+    ) -> List[Dict[str, str]]:
+        """
+        Prepara lista de mensagens respeitando o orçamento de tokens
+        
+        Args:
+            prompt: Pergunta atual
+            contexto: Histórico da conversa
+            memorias_contexto: Memórias relevantes formatadas
+            system_prompt_override: System prompt customizado (opcional)
+            report: Relatório de tokens a preencher (opcional)
+            
+        Returns:
+            Lista de mensagens (system, histórico que couber, pergunta)
+        """
+        report = report if report is not None else PromptReport()
+        
+        # Adiciona system prompt com memórias (ou override se fornecido)
+        if system_prompt_override:
+            system_prompt = system_prompt_override
+        else:
+            memorias = self.prompt_builder.fit_memories(memorias_contexto, report)
+            system_prompt = self._get_system_prompt(memorias)
+        
+        mensagens = self.prompt_builder.build(system_prompt, contexto, prompt, report)
+        self.last_prompt_report = report
+        self.prompt_builder.log_report(type(self).__name__, report)
+        return mensagens
+    
     def _get_system_prompt(self, memorias_contexto: str = "") -> str:
         """
         Prompt de sistema para o assistente Jonh
@@ -0,0 +1,304 @@
+"""
+Orçamento de requisições e tokens do Groq (lado do cliente)
+
+Mantém janelas por minuto e por dia (requisições e tokens), corrigidas pelos
+headers x-ratelimit-remaining-* / x-ratelimit-reset-* de cada resposta. Antes
+de chamar o Groq a requisição reserva o orçamento: se não couber, ela espera
+o reset (se for curto) ou é descartada para o fallback, sem gastar um 429.
+A espera só acontece fora do event loop (ex.: asyncio.to_thread); chamada
+síncrona a partir do loop é descartada na hora em vez de travar o servidor.
+Tarefas de background (detecção de intenção, sumarização) só usam o
+orçamento acima de uma reserva; turnos interativos podem usar tudo.
+"""
+import asyncio
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Mapping, Optional
+from loguru import logger
+
+from backend.services.llm.groq_circuit_breaker import parse_duration
+
+PRIORITY_INTERACTIVE = "interactive"
+PRIORITY_BACKGROUND = "background"
+
+_priority: ContextVar[str] = ContextVar("llm_priority", default=PRIORITY_INTERACTIVE)
+
+
+@contextmanager
+def llm_priority(priority: str) -> Iterator[None]:
+    """
+    Define a prioridade das chamadas de LLM feitas dentro do bloco
+
+    Exemplo:
+        with llm_priority(PRIORITY_BACKGROUND):
+            llm_service.generate_response(...)
+    """
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority() -> str:
+    """Prioridade das chamadas de LLM no contexto atual"""
+    return _priority.get()
+
+
+def _on_event_loop() -> bool:
+    """True se a thread atual está executando um event loop (time.sleep travaria todas as conexões)"""
+    try:
+        asyncio.get_running_loop()
+        return True
+    except RuntimeError:
+        return False
+
+
+class GroqBudgetExceeded(RuntimeError):
+    """Requisição descartada antes de chegar ao Groq por falta de orçamento"""
+
+    def __init__(self, retry_in: float, dimension: str):
+        super().__init__(f"Orçamento do Groq esgotado ({dimension}), reset em {retry_in:.1f}s")
+        self.retry_in = retry_in
+        self.dimension = dimension
+
+
+class _Window:
+    """Soma móvel de requisições/tokens em uma janela de tempo"""
+
+    def __init__(self, seconds: float, slot_seconds: float):
+        self.seconds = seconds
+        self.slot_seconds = slot_seconds
+        self._slots: deque = deque()  # [início do slot, requisições, tokens]
+        self.requests = 0
+        self.tokens = 0
+
+    def _expire(self, now: float):
+        while self._slots and self._slots[0][0] + self.slot_seconds <= now - self.seconds:
+            _, requests, tokens = self._slots.popleft()
+            self.requests -= requests
+            self.tokens -= tokens
+
+    def add(self, now: float, requests: int, tokens: int):
+        self._expire(now)
+        start = now - (now % self.slot_seconds)
+        if self._slots and self._slots[-1][0] == start:
+            self._slots[-1][1] += requests
+            self._slots[-1][2] += tokens
+        elif self._slots and start < self._slots[-1][0]:
+            # Ajuste de uma reserva antiga: contabiliza no slot mais recente
+            self._slots[-1][1] += requests
+            self._slots[-1][2] += tokens
+        else:
+            self._slots.append([start, requests, tokens])
+        self.requests += requests
+        self.tokens += tokens
+
+    def usage(self, now: float) -> tuple[int, int]:
+        self._expire(now)
+        return self.requests, self.tokens
+
+    def reset_in(self, now: float) -> float:
+        """Tempo até o slot mais antigo sair da janela"""
+        self._expire(now)
+        if not self._slots:
+            return 0.0
+        return max(0.0, self._slots[0][0] + self.slot_seconds + self.seconds - now)
+
+
+class GroqBudget:
+    """Orçamento de requisições e tokens por minuto e por dia"""
+
+    def __init__(
+        self,
+        requests_per_minute: int = 30,
+        tokens_per_minute: int = 6000,
+        requests_per_day: int = 14400,
+        tokens_per_day: int = 500000,
+        background_reserve: float = 0.2,
+        max_wait: float = 2.0
+    ):
+        """
+        Inicializa o orçamento
+
+        Args:
+            requests_per_minute: Limite RPM do modelo
+            tokens_per_minute: Limite TPM do modelo
+            requests_per_day: Limite RPD do modelo
+            tokens_per_day: Limite TPD do modelo
+            background_reserve: Fração de cada limite reservada a turnos interativos
+            max_wait: Espera máxima (s) de uma requisição interativa pelo reset
+                (só fora do event loop)
+        """
+        self.limits = {
+            "rpm": requests_per_minute,
+            "tpm": tokens_per_minute,
+            "rpd": requests_per_day,
+            "tpd": tokens_per_day
+        }
+        self.background_reserve = background_reserve
+        self.max_wait = max_wait
+        self._minute = _Window(60.0, 1.0)
+        self._day = _Window(86400.0, 60.0)
+        # Correções dos headers: dimensão -> (restante, expira_em, uso local no momento)
+        self._header_state: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+        # Métricas
+        self.allowed = 0
+        self.waited = 0
+        self.shed = {PRIORITY_INTERACTIVE: 0, PRIORITY_BACKGROUND: 0}
+
+    @classmethod
+    def from_settings(cls) -> "GroqBudget":
+        """Cria orçamento com os limites das configurações"""
+        from backend.config import settings
+        return cls(
+            requests_per_minute=settings.groq_limit_rpm,
+            tokens_per_minute=settings.groq_limit_tpm,
+            requests_per_day=settings.groq_limit_rpd,
+            tokens_per_day=settings.groq_limit_tpd,
+            background_reserve=settings.groq_budget_background_reserve,
+            max_wait=settings.groq_budget_max_wait
+        )
+
+    # ========== ESTADO ==========
+
+    def _used(self, dimension: str, now: float) -> int:
+        window = self._minute if dimension in ("rpm", "tpm") else self._day
+        requests, tokens = window.usage(now)
+        return requests if dimension in ("rpm", "rpd") else tokens
+
+    def _remaining(self, dimension: str, now: float) -> tuple[float, float]:
+        """(restante, segundos até liberar) de uma dimensão"""
+        window = self._minute if dimension in ("rpm", "tpm") else self._day
+        used = self._used(dimension, now)
+        remaining = self.limits[dimension] - used
+        reset_in = window.reset_in(now)
+
+        header = self._header_state.get(dimension)
+        if header:
+            header_remaining, expires_at, used_at_header = header
+            if now < expires_at:
+                # O que o Groq informou, menos o que usamos desde então
+                header_remaining -= max(0, used - used_at_header)
+                if header_remaining < remaining:
+                    remaining = header_remaining
+                    reset_in = expires_at - now
+            else:
+                del self._header_state[dimension]
+        return remaining, reset_in
+
+    def _blocked(self, tokens: int, priority: str, now: float) -> Optional[tuple[str, float]]:
+        """Primeira dimensão que não comporta a requisição (nome, espera)"""
+        reserve = self.background_reserve if priority == PRIORITY_BACKGROUND else 0.0
+        for dimension, need in (("rpm", 1), ("tpm", tokens), ("rpd", 1), ("tpd", tokens)):
+            remaining, reset_in = self._remaining(dimension, now)
+            if remaining - need < reserve * self.limits[dimension]:
+                return dimension, reset_in
+        return None
+
+    # ========== RESERVA ==========
+
+    def acquire(self, estimated_tokens: int, priority: Optional[str] = None, force: bool = False) -> int:
+        """
+        Reserva orçamento para uma requisição
+
+        Args:
+            estimated_tokens: Tokens estimados (prompt + max_tokens)
+            priority: PRIORITY_INTERACTIVE ou PRIORITY_BACKGROUND (padrão: do contexto)
+            force: Reserva mesmo sem orçamento (ex.: meio de um loop de tools)
+
+        Returns:
+            Tokens reservados (passar para commit)
+
+        Raises:
+            GroqBudgetExceeded: Sem orçamento e sem tempo para esperar o reset
+        """
+        priority = priority or current_priority()
+        can_wait = priority == PRIORITY_INTERACTIVE and not _on_event_loop()
+        deadline = time.monotonic() + (self.max_wait if can_wait else 0.0)
+        while True:
+            with self._lock:
+                now = time.time()
+                blocked = None if force else self._blocked(estimated_tokens, priority, now)
+                if blocked is None:
+                    self._minute.add(now, 1, estimated_tokens)
+                    self._day.add(now, 1, estimated_tokens)
+                    self.allowed += 1
+                    return estimated_tokens
+                dimension, reset_in = blocked
+
+            wait = min(reset_in, deadline - time.monotonic())
+            if wait <= 0 or reset_in > deadline - time.monotonic():
+                self.shed[priority] = self.shed.get(priority, 0) + 1
+                logger.warning(
+                    f"⏳ [Groq] Requisição {priority} descartada: orçamento {dimension} "
+                    f"esgotado (reset em {reset_in:.1f}s)"
+                )
+                raise GroqBudgetExceeded(reset_in, dimension)
+            self.waited += 1
+            logger.debug(f"[Groq] Aguardando {wait:.2f}s pelo orçamento {dimension}")
+            time.sleep(wait)
+
+    def commit(self, reserved_tokens: int, actual_tokens: Optional[int], headers: Optional[Mapping] = None):
+        """
+        Ajusta a reserva com o uso real e os headers da resposta
+
+        Args:
+            reserved_tokens: Valor retornado por acquire
+            actual_tokens: response.usage.total_tokens (None = mantém estimativa)
+            headers: Headers da resposta do Groq (opcional)
+        """
+        with self._lock:
+            now = time.time()
+            if actual_tokens is not None and actual_tokens != reserved_tokens:
+                delta = actual_tokens - reserved_tokens
+                self._minute.add(now, 0, delta)
+                self._day.add(now, 0, delta)
+            if headers is not None:
+                self._apply_headers(headers, now)
+
+    def _apply_headers(self, headers: Mapping, now: float):
+        """Groq: *-requests refere-se ao limite diário (RPD), *-tokens ao por minuto (TPM)"""
+        for suffix, dimension in (("requests", "rpd"), ("tokens", "tpm")):
+            remaining = headers.get(f"x-ratelimit-remaining-{suffix}")
+            if remaining is None:
+                continue
+            try:
+                remaining = int(float(remaining))
+            except ValueError:
+                continue
+            limit = headers.get(f"x-ratelimit-limit-{suffix}")
+            if limit is not None:
+                try:
+                    self.limits[dimension] = int(float(limit))
+                except ValueError:
+                    pass
+            reset = parse_duration(headers.get(f"x-ratelimit-reset-{suffix}"))
+            default_reset = 60.0 if dimension == "tpm" else 86400.0
+            expires_at = now + (reset if reset is not None else default_reset)
+            self._header_state[dimension] = (remaining, expires_at, self._used(dimension, now))
+
+    def get_status(self) -> Dict:
+        """Uso e restante de cada dimensão"""
+        with self._lock:
+            now = time.time()
+            dimensions: List[Dict] = []
+            for dimension in ("rpm", "tpm", "rpd", "tpd"):
+                remaining, reset_in = self._remaining(dimension, now)
+                dimensions.append({
+                    "dimension": dimension,
+                    "limit": self.limits[dimension],
+                    "remaining": max(0, int(remaining)),
+                    "reset_in_seconds": round(reset_in, 1)
+                })
+        return {
+            "dimensions": dimensions,
+            "allowed": self.allowed,
+            "waited": self.waited,
+            "shed": dict(self.shed)
+        }
@@ -0,0 +1,157 @@
+"""
+Circuit breaker para rate limit do Groq
+
+Abre ao receber 429/TPD e mantém as requisições no fallback (Ollama) até o
+horário de reset informado pelo Groq (headers retry-after /
+x-ratelimit-reset-* ou "try again in ..." na mensagem). Depois do reset, uma
+única requisição real (half-open) decide se o circuito fecha ou reabre.
+"""
+import re
+import threading
+import time
+from typing import Dict, Optional
+from loguru import logger
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+_RESET_HEADERS = ("retry-after", "x-ratelimit-reset-requests", "x-ratelimit-reset-tokens")
+_DURATION_PART = re.compile(r"([\d.]+)\s*(ms|h|m|s)")
+_TRY_AGAIN = re.compile(r"try again in\s+([\dhms.\s]+)", re.IGNORECASE)
+
+
+def parse_duration(value: str) -> Optional[float]:
+    """
+    Converte durações do Groq em segundos
+
+    Aceita "7.66s", "2m59.56s", "1h2m3s", "300ms" ou apenas um número (segundos).
+
+    Returns:
+        Segundos ou None se não reconhecido
+    """
+    if value is None:
+        return None
+    value = str(value).strip()
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+    factors = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+    return sum(float(amount) * factors[unit] for amount, unit in parts)
+
+
+def parse_reset_seconds(error: Exception) -> Optional[float]:
+    """
+    Extrai de uma exceção de rate limit quanto tempo falta para o reset
+
+    Usa o maior valor entre os headers da resposta e a mensagem de erro.
+    """
+    candidates = []
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if headers is not None:
+        for name in _RESET_HEADERS:
+            seconds = parse_duration(headers.get(name))
+            if seconds is not None:
+                candidates.append(seconds)
+    match = _TRY_AGAIN.search(str(error))
+    if match:
+        seconds = parse_duration(match.group(1))
+        if seconds is not None:
+            candidates.append(seconds)
+    return max(candidates) if candidates else None
+
+
+class GroqCircuitBreaker:
+    """Circuit breaker (closed → open → half-open) para rate limit do Groq"""
+
+    def __init__(self, default_cooldown: float = 60.0, max_cooldown: float = 3600.0):
+        """
+        Inicializa o breaker
+
+        Args:
+            default_cooldown: Tempo aberto (s) quando o Groq não informa o reset
+            max_cooldown: Limite do tempo aberto (s), inclusive com backoff
+        """
+        self.default_cooldown = default_cooldown
+        self.max_cooldown = max_cooldown
+        self.state = STATE_CLOSED
+        self.reset_at = 0.0
+        self._cooldown = default_cooldown
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+        # Métricas
+        self.opened = 0
+        self.short_circuited = 0
+
+    @property
+    def is_open(self) -> bool:
+        """True enquanto o Groq não deve receber tráfego (antes do reset)"""
+        return self.state == STATE_OPEN and time.monotonic() < self.reset_at
+
+    def allow_request(self) -> bool:
+        """
+        Decide se a requisição pode ir ao Groq
+
+        No estado aberto, após o reset, libera uma única requisição de teste
+        (half-open); as demais continuam no fallback até ela terminar.
+        """
+        with self._lock:
+            if self.state == STATE_CLOSED:
+                return True
+            if self.state == STATE_OPEN and time.monotonic() >= self.reset_at:
+                self.state = STATE_HALF_OPEN
+                self._probe_in_flight = False
+            if self.state == STATE_HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                logger.info("[Groq] Circuito half-open: testando Groq com uma requisição")
+                return True
+            self.short_circuited += 1
+            return False
+
+    def record_success(self):
+        """Requisição ao Groq concluída: fecha o circuito"""
+        with self._lock:
+            if self.state != STATE_CLOSED:
+                logger.info("✅ [Groq] Circuito fechado, voltando ao Groq")
+            self.state = STATE_CLOSED
+            self._cooldown = self.default_cooldown
+            self._probe_in_flight = False
+
+    def record_rate_limit(self, error: Exception):
+        """429/TPD recebido: abre o circuito até o reset informado pelo Groq"""
+        reset_seconds = parse_reset_seconds(error)
+        with self._lock:
+            if reset_seconds is None:
+                # Sem informação de reset: backoff exponencial a cada reabertura
+                if self.state == STATE_HALF_OPEN:
+                    self._cooldown = min(self._cooldown * 2, self.max_cooldown)
+                reset_seconds = self._cooldown
+            reset_seconds = min(reset_seconds, self.max_cooldown)
+            self.state = STATE_OPEN
+            self.reset_at = time.monotonic() + reset_seconds
+            self._probe_in_flight = False
+            self.opened += 1
+        logger.warning(f"⚡ [Groq] Circuito aberto por {reset_seconds:.1f}s (rate limit), usando fallback")
+
+    def record_error(self):
+        """Erro que não é rate limit: libera o teste half-open sem mudar o estado"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def get_status(self) -> Dict:
+        """Estado atual do circuito"""
+        remaining = max(0.0, self.reset_at - time.monotonic()) if self.state == STATE_OPEN else 0.0
+        return {
+            "state": self.state,
+            "reset_in_seconds": round(remaining, 1),
+            "opened": self.opened,
+            "short_circuited": self.short_circuited
+        }
@@ -1,6 +1,12 @@
 """
 Fallback do Groq para Ollama quando rate limit é atingido
+
+O cliente de fallback é criado uma única vez e reutilizado: não há verificação
+de modelos nem is_ready() por requisição. Se o Ollama falhar, ele fica fora de
+uso por alguns segundos em vez de ser testado a cada chamada.
 """
+import threading
+import time
 from typing import List, Dict, Optional
 from loguru import logger
 
@@ -10,6 +16,117 @@ except ImportError:
     ollama = None
 
 
+class OllamaFallback:
+    """Cliente Ollama de longa duração usado como fallback do Groq"""
+
+    def __init__(
+        self,
+        service=None,
+        model: Optional[str] = None,
+        host: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 512,
+        retry_interval: float = 30.0
+    ):
+        """
+        Inicializa o fallback
+
+        Args:
+            service: OllamaLLMService existente (opcional, reutilizado)
+            model: Modelo Ollama (padrão: settings.ollama_model)
+            host: Host do Ollama (padrão: settings.ollama_host)
+            temperature: Temperatura para geração
+            max_tokens: Número máximo de tokens
+            retry_interval: Tempo (s) sem tentar o Ollama após uma falha
+        """
+        self.service = service
+        self.model = model
+        self.host = host
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+        self.retry_interval = retry_interval
+        self._unavailable_until = 0.0
+        self._lock = threading.Lock()
+
+        # Métricas
+        self.calls = 0
+        self.failures = 0
+
+    def get_service(self):
+        """Retorna o serviço Ollama (criado na primeira chamada) ou None"""
+        if self.service is not None:
+            return self.service
+        if not ollama:
+            return None
+        with self._lock:
+            if self.service is None:
+                from backend.config import settings
+                # Importa aqui para evitar dependência circular
+                from backend.services.llm.ollama_service import OllamaLLMService
+                self.service = OllamaLLMService(
+                    model=self.model or settings.ollama_model,
+                    host=self.host or settings.ollama_host,
+                    temperature=self.temperature,
+                    max_tokens=self.max_tokens
+                )
+                logger.info(f"[Groq→Ollama] Cliente de fallback criado: {self.service.model}")
+        return self.service
+
+    @property
+    def available(self) -> bool:
+        """False durante o intervalo após uma falha do Ollama"""
+        return time.monotonic() >= self._unavailable_until
+
+    def generate(
+        self,
+        prompt: str,
+        contexto: Optional[List[Dict[str, str]]],
+        memorias_contexto: str,
+        tools: Optional[List[Dict]],
+        tool_executor: Optional[callable],
+        system_prompt_override: Optional[str]
+    ) -> Optional[tuple[str, int]]:
+        """
+        Gera resposta no Ollama (uma única chamada)
+
+        Returns:
+            Tupla (resposta, tokens) ou None se o fallback falhar
+        """
+        if not self.available:
+            return None
+        service = self.get_service()
+        if service is None:
+            logger.warning("[Groq→Ollama] Ollama não está disponível")
+            return None
+
+        self.calls += 1
+        try:
+            return service.generate_response(
+                prompt=prompt,
+                contexto=contexto,
+                memorias_contexto=memorias_contexto,
+                tools=tools,
+                tool_executor=tool_executor,
+                system_prompt_override=system_prompt_override
+            )
+        except Exception as e:
+            self.failures += 1
+            self._unavailable_until = time.monotonic() + self.retry_interval
+            logger.error(f"[Groq→Ollama] ❌ Fallback falhou: {e}")
+            return None
+
+
+_default_fallback: Optional[OllamaFallback] = None
+
+
+def get_default_fallback(temperature: float = 0.7, max_tokens: int = 512) -> OllamaFallback:
+    """Fallback compartilhado do processo (criado uma vez)"""
+    global _default_fallback
+    if _default_fallback is None:
+        _default_fallback = OllamaFallback(temperature=temperature, max_tokens=max_tokens)
+    return _default_fallback
+
+
 def try_ollama_fallback(
     prompt: str,
     contexto: Optional[List[Dict[str, str]]],
@@ -22,7 +139,7 @@ def try_ollama_fallback(
 ) -> Optional[tuple[str, int]]:
     """
     Tenta usar Ollama como fallback quando Groq atinge rate limit
-    
+
     Args:
         prompt: Prompt original
         contexto: Contexto da conversa
@@ -32,43 +149,11 @@ def try_ollama_fallback(
         system_prompt_override: System prompt customizado
         temperature: Temperatura para geração
         max_tokens: Número máximo de tokens
-        
+
     Returns:
         Tupla (resposta, tokens) ou None se fallback falhar
     """
-    if not ollama:
-        logger.warning("[Groq→Ollama] Ollama não está disponível")
-        return None
-    
-    try:
-        logger.info("[Groq] Tentando fallback automático para Ollama...")
-        
-        # Importa aqui para evitar dependência circular
-        from backend.services.llm.ollama_service import OllamaLLMService
-        
-        # Tenta usar modelo disponível (llama3:8b-instruct-q4_0 ou llama3.1:8b)
-        fallback_model = "llama3:8b-instruct-q4_0"  # Modelo mais comum
-        ollama_service = OllamaLLMService(
-            model=fallback_model,
-            host="http://localhost:11434",
-            temperature=temperature,
-            max_tokens=max_tokens
-        )
-        
-        if ollama_service.is_ready():
-            logger.info("[Groq→Ollama] ✅ Fallback ativado, usando Ollama")
-            return ollama_service.generate_response(
-                prompt=prompt,
-                contexto=contexto,
-                memorias_contexto=memorias_contexto,
-                tools=tools,
-                tool_executor=tool_executor,
-                system_prompt_override=system_prompt_override
-            )
-        else:
-            logger.warning("[Groq→Ollama] Ollama não está disponível")
-    except Exception as fallback_error:
-        logger.error(f"[Groq→Ollama] ❌ Fallback falhou: {fallback_error}")
-    
-    return None
-
+    logger.info("[Groq] Usando fallback para Ollama...")
+    return get_default_fallback(temperature, max_tokens).generate(
+        prompt, contexto, memorias_contexto, tools, tool_executor, system_prompt_override
+    )
@@ -1,6 +1,7 @@
 """
 Serviço de LLM usando Groq (cloud)
 """
+import asyncio
 import time
 from typing import List, Dict, Optional
 from loguru import logger
@@ -12,8 +13,11 @@ except ImportError:
     Groq = None
 
 from backend.services.llm.base import BaseLLMService
+from backend.services.llm.prompt_builder import PromptReport
 from backend.services.llm.groq_rate_limit import is_rate_limit_error, handle_rate_limit_error
-from backend.services.llm.groq_fallback import try_ollama_fallback
+from backend.services.llm.groq_fallback import OllamaFallback
+from backend.services.llm.groq_circuit_breaker import GroqCircuitBreaker
+from backend.services.llm.groq_budget import GroqBudget, GroqBudgetExceeded
 from backend.services.llm.groq_tool_caller import process_tool_calls
 from backend.services.llm.streaming import stream_groq_response
 
@@ -48,8 +52,26 @@ class GroqLLMService(BaseLLMService):
         
         self.client = Groq(api_key=api_key)
         
+        # Failover: cliente Ollama reutilizado + circuit breaker de rate limit
+        from backend.config import settings
+        self.fallback = OllamaFallback(
+            temperature=temperature,
+            max_tokens=max_tokens,
+            retry_interval=settings.groq_fallback_retry_interval
+        )
+        self.circuit_breaker = GroqCircuitBreaker(
+            default_cooldown=settings.groq_circuit_default_cooldown,
+            max_cooldown=settings.groq_circuit_max_cooldown
+        )
+        # Orçamento RPM/TPM/RPD/TPD no cliente (evita 429 em vez de reagir a ele)
+        self.budget: Optional[GroqBudget] = GroqBudget.from_settings() if settings.groq_budget_enabled else None
+        
         logger.info(f"Inicializando Groq LLM: model={model}")
     
+    def set_fallback_service(self, service: BaseLLMService):
+        """Reutiliza um serviço Ollama já criado como fallback"""
+        self.fallback.service = service
+    
     def generate_response(
         self,
         prompt: str,
@@ -73,15 +95,26 @@ class GroqLLMService(BaseLLMService):
         Returns:
             Tupla (resposta, tokens_usados)
         """
+        # Circuito aberto (cota esgotada): vai direto ao fallback, sem chamar o Groq
+        if not self.circuit_breaker.allow_request():
+            return self._generate_while_open(
+                prompt, contexto, memorias_contexto, tools, tool_executor, system_prompt_override
+            )
+        
         try:
             start_time = time.time()
             total_tokens = 0
             
-            # Prepara mensagens
-            mensagens = self._preparar_mensagens(prompt, contexto, memorias_contexto, system_prompt_override)
+            # Prepara mensagens (orçamento de tokens por parte do prompt)
+            prompt_report = PromptReport()
+            mensagens = self._preparar_mensagens(
+                prompt, contexto, memorias_contexto, system_prompt_override, report=prompt_report
+            )
             
             logger.info(f"[Groq] Gerando resposta para: '{prompt[:50]}...'")
             
+            tools_tokens = self.prompt_builder.counter.count(str(tools)) if tools else 0
+            
             # Loop de tool calling (máximo 3 iterações)
             max_iterations = 3
             for iteration in range(max_iterations):
@@ -99,12 +132,23 @@ class GroqLLMService(BaseLLMService):
                     groq_params["tool_choice"] = "auto"
                 # Não passa tool_choice quando não há tools (Groq pode rejeitar None)
                 
-                # Chama Groq
+                # Chama Groq (reserva orçamento; no meio do loop de tools não descarta)
+                estimated_tokens = prompt_report.total + self.max_tokens + (tools_tokens if iteration == 0 else 0)
                 try:
-                    response = self.client.chat.completions.create(**groq_params)
+                    response = self._create_completion(groq_params, estimated_tokens, force=iteration > 0)
+                except GroqBudgetExceeded as e:
+                    # Sem orçamento: atende pelo fallback sem gastar um 429
+                    self.circuit_breaker.record_error()
+                    result = self._try_ollama_fallback(
+                        prompt, contexto, memorias_contexto, tools, tool_executor, system_prompt_override
+                    )
+                    if result:
+                        return result
+                    raise
                 except Exception as e:
                     # Detecta e trata rate limit
                     if is_rate_limit_error(e):
+                        self.circuit_breaker.record_rate_limit(e)
                         fallback_result = handle_rate_limit_error(
                             error=e,
                             prompt=prompt,
@@ -127,6 +171,7 @@ class GroqLLMService(BaseLLMService):
                     
                     raise
                 
+                self.circuit_breaker.record_success()
                 message = response.choices[0].message
                 tokens_usados = response.usage.total_tokens
                 total_tokens += tokens_usados
@@ -137,7 +182,9 @@ class GroqLLMService(BaseLLMService):
                     tool_executor=tool_executor,
                     mensagens=mensagens,
                     iteration=iteration,
-                    max_iterations=max_iterations
+                    max_iterations=max_iterations,
+                    prompt_builder=self.prompt_builder,
+                    prompt_report=prompt_report
                 )
                 
                 if not continuar:
@@ -162,6 +209,7 @@ class GroqLLMService(BaseLLMService):
         except Exception as e:
             # Detecta e trata rate limit no handler externo
             if is_rate_limit_error(e):
+                self.circuit_breaker.record_rate_limit(e)
                 fallback_result = handle_rate_limit_error(
                     error=e,
                     prompt=prompt,
@@ -177,11 +225,38 @@ class GroqLLMService(BaseLLMService):
                 if fallback_result:
                     return fallback_result
             
+            self.circuit_breaker.record_error()
             logger.error(f"[Groq] Erro ao gerar resposta: {e}")
             import traceback
             logger.error(traceback.format_exc())
             raise
     
+    def _create_completion(self, params: Dict, estimated_tokens: int, force: bool = False):
+        """
+        Chama o Groq dentro do orçamento e atualiza o orçamento com uso e headers
+        
+        Raises:
+            GroqBudgetExceeded: Sem orçamento para a requisição
+        """
+        if self.budget is None:
+            return self.client.chat.completions.create(**params)
+        
+        reserved = self.budget.acquire(estimated_tokens, force=force)
+        raw_api = getattr(self.client.chat.completions, "with_raw_response", None)
+        try:
+            if raw_api is not None:
+                raw = raw_api.create(**params)
+                response, headers = raw.parse(), raw.headers
+            else:
+                response, headers = self.client.chat.completions.create(**params), None
+        except Exception as e:
+            response_headers = getattr(getattr(e, "response", None), "headers", None)
+            self.budget.commit(reserved, 0, response_headers)
+            raise
+        usage = getattr(response, "usage", None)
+        self.budget.commit(reserved, getattr(usage, "total_tokens", None), headers)
+        return response
+    
     def _try_ollama_fallback(
         self,
         prompt: str,
@@ -192,45 +267,30 @@ class GroqLLMService(BaseLLMService):
         system_prompt_override: Optional[str]
     ) -> Optional[tuple[str, int]]:
         """Tenta usar Ollama como fallback quando Groq atinge rate limit"""
-        return try_ollama_fallback(
-            prompt=prompt,
-            contexto=contexto,
-            memorias_contexto=memorias_contexto,
-            tools=tools,
-            tool_executor=tool_executor,
-            system_prompt_override=system_prompt_override,
-            temperature=self.temperature,
-            max_tokens=self.max_tokens
+        return self.fallback.generate(
+            prompt, contexto, memorias_contexto, tools, tool_executor, system_prompt_override
         )
     
-    def _preparar_mensagens(
+    def _generate_while_open(
         self,
         prompt: str,
-        contexto: Optional[List[Dict[str, str]]] = None,
-        memorias_contexto: str = "",
-        system_prompt_override: Optional[str] = None
-    ) -> List[Dict[str, str]]:
-        """Prepara lista de mensagens para o Groq"""
-        mensagens = []
-        
-        # Adiciona system prompt com memórias (ou override se fornecido)
-        system_prompt = system_prompt_override if system_prompt_override else self._get_system_prompt(memorias_contexto)
-        mensagens.append({
-            "role": "system",
-            "content": system_prompt
-        })
-        
-        # Adiciona contexto se existir
-        if contexto:
-            mensagens.extend(contexto)
-        
-        # Adiciona pergunta atual
-        mensagens.append({
-            "role": "user",
-            "content": prompt
-        })
-        
-        return mensagens
+        contexto: Optional[List[Dict[str, str]]],
+        memorias_contexto: str,
+        tools: Optional[List[Dict]],
+        tool_executor: Optional[callable],
+        system_prompt_override: Optional[str]
+    ) -> tuple[str, int]:
+        """Atende pelo fallback enquanto o circuito está aberto"""
+        result = self._try_ollama_fallback(
+            prompt, contexto, memorias_contexto, tools, tool_executor, system_prompt_override
+        )
+        if result:
+            return result
+        status = self.circuit_breaker.get_status()
+        raise RuntimeError(
+            f"Groq rate limit atingido (nova tentativa em {status['reset_in_seconds']}s) "
+            f"e fallback Ollama indisponível"
+        )
     
     async def generate_response_stream(
         self,
@@ -255,10 +315,40 @@ class GroqLLMService(BaseLLMService):
         Yields:
             Tokens de texto conforme são gerados
         """
+        # Circuito aberto ou sem orçamento: streaming direto pelo fallback
+        use_fallback = not self.circuit_breaker.allow_request()
+        prompt_report = PromptReport()
+        mensagens = None
+        if not use_fallback:
+            mensagens = self._preparar_mensagens(
+                prompt, contexto, memorias_contexto, system_prompt_override, report=prompt_report
+            )
+            if self.budget is not None:
+                try:
+                    # Em thread: uma eventual espera pelo reset não bloqueia o event loop
+                    await asyncio.to_thread(self.budget.acquire, prompt_report.total + self.max_tokens)
+                except GroqBudgetExceeded:
+                    self.circuit_breaker.record_error()
+                    use_fallback = True
+        
+        if use_fallback:
+            fallback_service = self.fallback.get_service()
+            if fallback_service is None:
+                raise RuntimeError("Groq rate limit atingido e fallback Ollama indisponível")
+            logger.info("[Groq→Ollama] Circuito aberto ou orçamento esgotado, streaming pelo Ollama")
+            async for token in fallback_service.generate_response_stream(
+                prompt,
+                contexto,
+                memorias_contexto=memorias_contexto,
+                tools=tools,
+                tool_executor=tool_executor,
+                system_prompt_override=system_prompt_override
+            ):
+                yield token
+            return
+        
+        settled = False
         try:
-            # Prepara mensagens
-            mensagens = self._preparar_mensagens(prompt, contexto, memorias_contexto, system_prompt_override)
-            
             logger.info(f"[Groq] Streaming resposta para: '{prompt[:50]}...'")
             
             # Nota: Tool calling não é suportado em streaming ainda
@@ -275,10 +365,23 @@ class GroqLLMService(BaseLLMService):
                 tools=tools_for_stream
             ):
                 yield token
+            
+            settled = True
+            self.circuit_breaker.record_success()
                 
         except Exception as e:
+            settled = True
+            if is_rate_limit_error(e):
+                self.circuit_breaker.record_rate_limit(e)
+            else:
+                self.circuit_breaker.record_error()
             logger.error(f"[Groq] Erro no streaming: {e}")
             raise
+        finally:
+            if not settled:
+                # Cliente fechou o stream (GeneratorExit/CancelledError): libera o
+                # teste half-open, senão o circuito nunca mais deixa passar requisições
+                self.circuit_breaker.record_error()
     
     def is_ready(self) -> bool:
         """Verifica se o serviço Groq está pronto"""
@@ -294,4 +397,13 @@ class GroqLLMService(BaseLLMService):
         except Exception as e:
             logger.error(f"[Groq] Serviço não está pronto: {e}")
             return False
+    
+    def check_connectivity(self) -> bool:
+        """Verifica API e modelo sem gerar tokens (não consome cota)"""
+        try:
+            self.client.models.retrieve(self.model)
+            return True
+        except Exception as e:
+            logger.warning(f"[Groq] Verificação de conectividade falhou: {e}")
+            return False
 
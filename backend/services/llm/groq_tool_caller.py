@@ -4,13 +4,18 @@ Lógica de tool calling para Groq
 from typing import List, Dict, Optional, Tuple
 from loguru import logger
 
+from backend.services.llm.prompt_builder import PromptBuilder, PromptReport
+from backend.services.observability.tracing import span
+
 
 def process_tool_calls(
     message,
     tool_executor: Optional[callable],
     mensagens: List[Dict[str, str]],
     iteration: int,
-    max_iterations: int
+    max_iterations: int,
+    prompt_builder: Optional[PromptBuilder] = None,
+    prompt_report: Optional[PromptReport] = None
 ) -> Tuple[bool, str, int]:
     """
     Processa tool calls retornados pelo Groq
@@ -21,6 +26,8 @@ def process_tool_calls(
         mensagens: Lista de mensagens atual
         iteration: Iteração atual
         max_iterations: Número máximo de iterações
+        prompt_builder: Limita o tamanho dos resultados de tools (opcional)
+        prompt_report: Relatório de tokens da requisição (opcional)
         
     Returns:
         Tupla (continuar_loop, resposta, tokens_usados)
@@ -67,7 +74,8 @@ def process_tool_calls(
         
         if tool_executor:
             try:
-                tool_result = tool_executor(tool_name, tool_args)
+                with span("tool.call", tool=tool_name):
+                    tool_result = tool_executor(tool_name, tool_args)
                 logger.info(f"✅ Tool '{tool_name}' executada com sucesso")
             except Exception as e:
                 logger.error(f"❌ Erro ao executar tool '{tool_name}': {e}")
@@ -76,11 +84,16 @@ def process_tool_calls(
             logger.warning(f"⚠️ Tool '{tool_name}' chamada mas tool_executor não disponível")
             tool_result = "Tool executor não disponível"
         
+        # Limita resultados longos (ex: Markdown de vagas, resultados web)
+        tool_content = str(tool_result)
+        if prompt_builder:
+            tool_content = prompt_builder.fit_tool_result(tool_content, prompt_report)
+        
         # Adiciona resultado da tool
         # IMPORTANTE: Groq exige tool_call_id para mensagens com role:tool
         mensagens.append({
             "role": "tool",
-            "content": str(tool_result),
+            "content": tool_content,
             "tool_call_id": tool_call.id  # ID do tool call original
         })
     
@@ -12,6 +12,7 @@ except ImportError:
     ollama = None
 
 from backend.services.llm.base import BaseLLMService
+from backend.services.llm.prompt_builder import PromptReport
 from backend.services.llm.ollama_tool_caller import process_ollama_tool_calls
 from backend.services.llm.ollama_model_checker import check_finetuned_model, is_ollama_ready
 from backend.services.llm.streaming import stream_ollama_response
@@ -84,8 +85,11 @@ class OllamaLLMService(BaseLLMService):
             if ollama is None:
                 raise RuntimeError("Ollama não está disponível")
             
-            # Prepara mensagens
-            mensagens = self._preparar_mensagens(prompt, contexto, memorias_contexto, system_prompt_override)
+            # Prepara mensagens (orçamento de tokens por parte do prompt)
+            prompt_report = PromptReport()
+            mensagens = self._preparar_mensagens(
+                prompt, contexto, memorias_contexto, system_prompt_override, report=prompt_report
+            )
             
             logger.info(f"[Ollama] Gerando resposta para: '{prompt[:50]}...'")
             
@@ -120,7 +124,9 @@ class OllamaLLMService(BaseLLMService):
                     tool_executor=tool_executor,
                     mensagens=mensagens,
                     iteration=iteration,
-                    max_iterations=max_iterations
+                    max_iterations=max_iterations,
+                    prompt_builder=self.prompt_builder,
+                    prompt_report=prompt_report
                 )
                 
                 if not continuar:
@@ -143,35 +149,6 @@ class OllamaLLMService(BaseLLMService):
             logger.error(f"[Ollama] Erro ao gerar resposta: {e}")
             raise
     
-    def _preparar_mensagens(
-        self,
-        prompt: str,
-        contexto: Optional[List[Dict[str, str]]] = None,
-        memorias_contexto: str = "",
-        system_prompt_override: Optional[str] = None
-    ) -> List[Dict[str, str]]:
-        """Prepara lista de mensagens para o Ollama"""
-        mensagens = []
-        
-        # Adiciona system prompt com memórias (ou override se fornecido)
-        system_prompt = system_prompt_override if system_prompt_override else self._get_system_prompt(memorias_contexto)
-        mensagens.append({
-            "role": "system",
-            "content": system_prompt
-        })
-        
-        # Adiciona contexto se existir
-        if contexto:
-            mensagens.extend(contexto)
-        
-        # Adiciona pergunta atual
-        mensagens.append({
-            "role": "user",
-            "content": prompt
-        })
-        
-        return mensagens
-    
     async def generate_response_stream(
         self,
         prompt: str,
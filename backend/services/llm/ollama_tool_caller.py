@@ -4,13 +4,18 @@ Lógica de tool calling para Ollama
 from typing import List, Dict, Optional, Tuple
 from loguru import logger
 
+from backend.services.llm.prompt_builder import PromptBuilder, PromptReport
+from backend.services.observability.tracing import span
+
 
 def process_ollama_tool_calls(
     message: Dict,
     tool_executor: Optional[callable],
     mensagens: List[Dict[str, str]],
     iteration: int,
-    max_iterations: int
+    max_iterations: int,
+    prompt_builder: Optional[PromptBuilder] = None,
+    prompt_report: Optional[PromptReport] = None
 ) -> Tuple[bool, str, int]:
     """
     Processa tool calls retornados pelo Ollama
@@ -21,6 +26,8 @@ def process_ollama_tool_calls(
         mensagens: Lista de mensagens atual
         iteration: Iteração atual
         max_iterations: Número máximo de iterações
+        prompt_builder: Limita o tamanho dos resultados de tools (opcional)
+        prompt_report: Relatório de tokens da requisição (opcional)
         
     Returns:
         Tupla (continuar_loop, resposta, tokens_usados)
@@ -48,7 +55,8 @@ def process_ollama_tool_calls(
         try:
             import json
             args_dict = json.loads(tool_args) if isinstance(tool_args, str) else tool_args
-            tool_result = tool_executor(tool_name, args_dict)
+            with span("tool.call", tool=tool_name):
+                tool_result = tool_executor(tool_name, args_dict)
             
             # Adiciona mensagem do assistente com tool call
             mensagens.append({
@@ -57,11 +65,14 @@ def process_ollama_tool_calls(
                 "tool_calls": [tool_call]
             })
             
-            # Adiciona resultado do tool às mensagens
+            # Adiciona resultado do tool às mensagens (limitado ao orçamento)
+            tool_content = str(tool_result)
+            if prompt_builder:
+                tool_content = prompt_builder.fit_tool_result(tool_content, prompt_report)
             mensagens.append({
                 "role": "tool",
                 "name": tool_name,
-                "content": str(tool_result)
+                "content": tool_content
             })
             
             logger.info(f"✅ Tool '{tool_name}' executado com sucesso")
@@ -0,0 +1,335 @@
+"""
+Montagem de prompts com orçamento de tokens
+
+Cada parte do prompt (system prompt, memórias, histórico, resultados de
+tools) tem um orçamento próprio. O excedente é cortado por prioridade:
+memórias menos relevantes (fim da lista), mensagens mais antigas do
+histórico e o final de resultados de tools longos. O tamanho do prompt por
+turno fica limitado e cada requisição gera um relatório com os tokens de
+cada parte.
+
+O tiktoken só é usado se o BPE do encoding já estiver no cache local
+(TIKTOKEN_CACHE_DIR): o download na primeira chamada não é cacheado em caso
+de falha e atrasaria o startup offline. Sem o arquivo, a contagem é
+heurística.
+"""
+import hashlib
+import os
+import re
+import tempfile
+from dataclasses import dataclass, field, asdict
+from typing import Dict, List, Optional, Tuple
+from loguru import logger
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+
+# Overhead aproximado por mensagem no formato chat (role, separadores)
+MESSAGE_OVERHEAD = 4
+TRUNCATION_MARK = " [...]"
+
+_HEURISTIC_TOKEN = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+
+TIKTOKEN_BLOB_URL = "https://openaipublic.blob.core.windows.net/encodings/{name}.tiktoken"
+
+
+def tiktoken_cached(encoding_name: str) -> bool:
+    """
+    Verifica se o BPE do encoding está no cache local do tiktoken (sem rede)
+
+    Args:
+        encoding_name: Encoding do tiktoken
+
+    Returns:
+        True se o arquivo já foi baixado
+    """
+    # Mesma resolução de diretório e chave que tiktoken.load usa
+    if "TIKTOKEN_CACHE_DIR" in os.environ:
+        cache_dir = os.environ["TIKTOKEN_CACHE_DIR"]
+    elif "DATA_GYM_CACHE_DIR" in os.environ:
+        cache_dir = os.environ["DATA_GYM_CACHE_DIR"]
+    else:
+        cache_dir = os.path.join(tempfile.gettempdir(), "data-gym-cache")
+    if not cache_dir:
+        return False
+    key = hashlib.sha1(TIKTOKEN_BLOB_URL.format(name=encoding_name).encode()).hexdigest()
+    return os.path.isfile(os.path.join(cache_dir, key))
+
+
+class TokenCounter:
+    """Contador de tokens local (tiktoken se disponível, heurística caso contrário)"""
+
+    def __init__(self, encoding_name: str = "cl100k_base"):
+        """
+        Inicializa o contador
+
+        Args:
+            encoding_name: Encoding do tiktoken (cl100k_base aproxima bem o Llama 3)
+        """
+        self._encoding = None
+        if tiktoken is None:
+            return
+        if not tiktoken_cached(encoding_name):
+            logger.info(f"ℹ️ Encoding tiktoken '{encoding_name}' fora do cache local, usando heurística")
+            return
+        try:
+            self._encoding = tiktoken.get_encoding(encoding_name)
+        except Exception as e:
+            logger.warning(f"⚠️ Encoding tiktoken '{encoding_name}' indisponível, usando heurística: {e}")
+
+    @property
+    def exact(self) -> bool:
+        """True se a contagem usa um tokenizer real"""
+        return self._encoding is not None
+
+    def count(self, text: str) -> int:
+        """
+        Conta tokens de um texto
+
+        Args:
+            text: Texto
+
+        Returns:
+            Número de tokens (estimado se não houver tiktoken)
+        """
+        if not text:
+            return 0
+        if self._encoding is not None:
+            return len(self._encoding.encode(text, disallowed_special=()))
+        # Palavras longas em português costumam virar 2+ tokens
+        return sum(1 + len(piece) // 6 for piece in _HEURISTIC_TOKEN.findall(text))
+
+    def count_message(self, message: Dict) -> int:
+        """Conta tokens de uma mensagem de chat (conteúdo + overhead)"""
+        return self.count(str(message.get("content") or "")) + MESSAGE_OVERHEAD
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """
+        Corta um texto para caber em max_tokens (mantém o início)
+
+        Args:
+            text: Texto original
+            max_tokens: Máximo de tokens
+
+        Returns:
+            Texto original ou truncado com marcador
+        """
+        if max_tokens <= 0:
+            return ""
+        if self.count(text) <= max_tokens:
+            return text
+        budget = max(1, max_tokens - self.count(TRUNCATION_MARK))
+        if self._encoding is not None:
+            tokens = self._encoding.encode(text, disallowed_special=())
+            return self._encoding.decode(tokens[:budget]) + TRUNCATION_MARK
+
+        # Heurística: busca binária no número de caracteres
+        low, high = 0, len(text)
+        while low < high:
+            middle = (low + high + 1) // 2
+            if self.count(text[:middle]) <= budget:
+                low = middle
+            else:
+                high = middle - 1
+        return text[:low].rstrip() + TRUNCATION_MARK
+
+
+_token_counter: Optional[TokenCounter] = None
+
+
+def get_token_counter() -> TokenCounter:
+    """Retorna o contador de tokens compartilhado (encoding carregado uma vez)"""
+    global _token_counter
+    if _token_counter is None:
+        _token_counter = TokenCounter()
+    return _token_counter
+
+
+@dataclass
+class PromptBudget:
+    """Orçamentos de tokens por parte do prompt"""
+    total: int = 6000
+    memories: int = 600
+    history: int = 2500
+    history_message: int = 600
+    tool_result: int = 1500
+
+
+@dataclass
+class PromptReport:
+    """Tokens de cada parte do prompt de uma requisição"""
+    system: int = 0
+    memories: int = 0
+    history: int = 0
+    prompt: int = 0
+    tool_results: int = 0
+    history_kept: int = 0
+    history_dropped: int = 0
+    memories_dropped: int = 0
+    truncated: List[str] = field(default_factory=list)
+    exact: bool = False
+
+    @property
+    def total(self) -> int:
+        # Memórias fazem parte do system prompt
+        return self.system + self.history + self.prompt + self.tool_results
+
+    def to_dict(self) -> Dict:
+        data = asdict(self)
+        data["total"] = self.total
+        return data
+
+
+class PromptBuilder:
+    """Monta a lista de mensagens respeitando os orçamentos de tokens"""
+
+    def __init__(self, budget: Optional[PromptBudget] = None, counter: Optional[TokenCounter] = None):
+        """
+        Inicializa o builder
+
+        Args:
+            budget: Orçamentos por parte (padrão: PromptBudget())
+            counter: Contador de tokens (padrão: contador compartilhado)
+        """
+        self.budget = budget or PromptBudget()
+        self.counter = counter or get_token_counter()
+
+    @classmethod
+    def from_settings(cls) -> "PromptBuilder":
+        """Cria builder com orçamentos das configurações"""
+        from backend.config import settings
+        return cls(PromptBudget(
+            total=settings.prompt_budget_total,
+            memories=settings.prompt_budget_memories,
+            history=settings.prompt_budget_history,
+            history_message=settings.prompt_budget_history_message,
+            tool_result=settings.prompt_budget_tool_result
+        ))
+
+    def fit_memories(self, memorias_contexto: str, report: PromptReport) -> str:
+        """
+        Mantém as memórias (uma por linha, mais relevantes primeiro) no orçamento
+
+        Args:
+            memorias_contexto: Memórias formatadas
+            report: Relatório da requisição
+
+        Returns:
+            Memórias que cabem no orçamento
+        """
+        if not memorias_contexto or not memorias_contexto.strip():
+            return ""
+        kept: List[str] = []
+        used = 0
+        lines = [line for line in memorias_contexto.splitlines() if line.strip()]
+        for line in lines:
+            tokens = self.counter.count(line) + 1
+            if used + tokens > self.budget.memories:
+                if not kept:
+                    # Uma única memória enorme: trunca em vez de descartar
+                    kept.append(self.counter.truncate(line, self.budget.memories))
+                    report.truncated.append("memories")
+                break
+            kept.append(line)
+            used += tokens
+        report.memories_dropped = len(lines) - len(kept)
+        text = "\n".join(kept)
+        report.memories = self.counter.count(text)
+        return text
+
+    def build(
+        self,
+        system_prompt: str,
+        contexto: Optional[List[Dict]],
+        prompt: str,
+        report: PromptReport
+    ) -> List[Dict]:
+        """
+        Monta as mensagens: system + histórico recente que couber + pergunta
+
+        Args:
+            system_prompt: System prompt final (já com memórias)
+            contexto: Histórico da conversa (mais antigo primeiro)
+            prompt: Pergunta atual
+            report: Relatório da requisição (preenchido)
+
+        Returns:
+            Lista de mensagens para o LLM
+        """
+        report.exact = self.counter.exact
+        system_message = {"role": "system", "content": system_prompt}
+        user_message = {"role": "user", "content": prompt}
+        report.system = self.counter.count_message(system_message)
+        report.prompt = self.counter.count_message(user_message)
+
+        # Histórico limitado pelo orçamento próprio e pelo que sobra do total
+        available = min(self.budget.history, self.budget.total - report.system - report.prompt)
+        messages = list(contexto or [])
+
+        # Mensagens de sistema no início do histórico (ex.: resumo da conversa)
+        # são fixas: entram antes das mensagens recentes
+        pinned_count = 0
+        while pinned_count < len(messages) and messages[pinned_count].get("role") == "system":
+            pinned_count += 1
+        pinned, used = self._fit_history(messages[:pinned_count], available, report)
+        recent, used = self._fit_history(list(reversed(messages[pinned_count:])), available, report, used)
+        recent.reverse()
+
+        history = pinned + recent
+        report.history = used
+        report.history_kept = len(history)
+        report.history_dropped = len(messages) - len(history)
+        return [system_message, *history, user_message]
+
+    def _fit_history(
+        self,
+        messages: List[Dict],
+        available: int,
+        report: PromptReport,
+        used: int = 0
+    ) -> Tuple[List[Dict], int]:
+        """Aceita mensagens na ordem dada até esgotar o orçamento disponível"""
+        kept: List[Dict] = []
+        for message in messages:
+            content = str(message.get("content") or "")
+            if self.counter.count(content) > self.budget.history_message:
+                message = {**message, "content": self.counter.truncate(content, self.budget.history_message)}
+                report.truncated.append(f"history:{message.get('role', '?')}")
+            tokens = self.counter.count_message(message)
+            if used + tokens > available:
+                break
+            kept.append(message)
+            used += tokens
+        return kept, used
+
+    def fit_tool_result(self, result: str, report: Optional[PromptReport] = None) -> str:
+        """
+        Limita o resultado de uma tool ao orçamento
+
+        Args:
+            result: Resultado da tool
+            report: Relatório da requisição (opcional)
+
+        Returns:
+            Resultado original ou truncado
+        """
+        fitted = self.counter.truncate(result, self.budget.tool_result)
+        if report is not None:
+            if fitted != result:
+                report.truncated.append("tool_result")
+            report.tool_results += self.counter.count(fitted) + MESSAGE_OVERHEAD
+        return fitted
+
+    def log_report(self, provider: str, report: PromptReport):
+        """Registra o relatório de tokens da requisição"""
+        logger.info(
+            f"[{provider}] Prompt: {report.total} tokens "
+            f"(system={report.system}, memórias={report.memories}, histórico={report.history} "
+            f"[{report.history_kept} msgs, -{report.history_dropped}], pergunta={report.prompt}, "
+            f"tools={report.tool_results}){'' if report.exact else ' ~estimado'}"
+        )
+        if report.truncated:
+            logger.debug(f"[{provider}] Partes truncadas: {report.truncated}")
@@ -0,0 +1,382 @@
+"""
+Roteador de LLM entre Groq e Ollama
+
+Mantém janelas móveis de latência (p50/p95) e taxa de erro por provider e
+modelo, envia cada requisição ao backend saudável mais rápido e, opcionalmente,
+faz hedging: se a primeira requisição passar do p95 do backend, uma segunda é
+enviada ao outro provider e vence a que responder primeiro. Em modo
+privacidade apenas o backend local (Ollama) é usado.
+"""
+import contextvars
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Optional
+from loguru import logger
+
+from backend.services.llm.base import BaseLLMService
+
+PROVIDER_GROQ = "groq"
+PROVIDER_OLLAMA = "ollama"
+
+
+class LatencyTracker:
+    """Janela móvel de latências e resultados de um backend"""
+
+    def __init__(self, window: int = 200):
+        """
+        Inicializa o tracker
+
+        Args:
+            window: Número de requisições mantidas na janela
+        """
+        self._latencies: deque = deque(maxlen=window)
+        self._outcomes: deque = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.consecutive_failures = 0
+        self.unhealthy_until = 0.0
+
+    def record_success(self, latency: float):
+        """Registra requisição bem-sucedida (latência em segundos)"""
+        with self._lock:
+            self._latencies.append(latency)
+            self._outcomes.append(True)
+            self.consecutive_failures = 0
+            self.unhealthy_until = 0.0
+
+    def record_failure(self, cooldown: float = 0.0, max_consecutive: int = 3):
+        """Registra falha; após max_consecutive falhas seguidas entra em cooldown"""
+        with self._lock:
+            self._outcomes.append(False)
+            self.consecutive_failures += 1
+            if cooldown and self.consecutive_failures >= max_consecutive:
+                self.unhealthy_until = time.monotonic() + cooldown
+
+    @property
+    def samples(self) -> int:
+        """Requisições bem-sucedidas na janela"""
+        return len(self._latencies)
+
+    @property
+    def requests(self) -> int:
+        """Requisições (sucesso ou falha) na janela"""
+        return len(self._outcomes)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Percentil q (0-100) das latências da janela, ou None sem amostras"""
+        with self._lock:
+            values = sorted(self._latencies)
+        if not values:
+            return None
+        index = min(len(values) - 1, int(round(q / 100.0 * (len(values) - 1))))
+        return values[index]
+
+    @property
+    def error_rate(self) -> float:
+        with self._lock:
+            if not self._outcomes:
+                return 0.0
+            return self._outcomes.count(False) / len(self._outcomes)
+
+    def in_cooldown(self) -> bool:
+        return time.monotonic() < self.unhealthy_until
+
+
+class _Backend:
+    """Serviço de LLM roteável com suas estatísticas"""
+
+    def __init__(self, provider: str, service: BaseLLMService, window: int):
+        self.provider = provider
+        self.service = service
+        self.tracker = LatencyTracker(window)
+
+    @property
+    def key(self) -> str:
+        return f"{self.provider}:{getattr(self.service, 'model', '?')}"
+
+
+class LLMRouter(BaseLLMService):
+    """Escolhe o backend de LLM mais rápido e saudável para cada requisição"""
+
+    def __init__(
+        self,
+        groq_service: Optional[BaseLLMService] = None,
+        ollama_service: Optional[BaseLLMService] = None,
+        privacy_mode: Optional[Callable[[], bool]] = None,
+        preferred: str = PROVIDER_GROQ,
+        hedge_enabled: bool = True,
+        hedge_min_delay: float = 0.5,
+        min_samples: int = 10,
+        window: int = 200,
+        max_error_rate: float = 0.5,
+        failure_cooldown: float = 30.0
+    ):
+        """
+        Inicializa o roteador
+
+        Args:
+            groq_service: Serviço Groq (cloud)
+            ollama_service: Serviço Ollama (local)
+            privacy_mode: Função que indica se o modo privacidade está ativo
+            preferred: Provider preferido enquanto não há estatísticas
+            hedge_enabled: Envia requisição ao outro provider quando o primeiro passa do p95
+            hedge_min_delay: Espera mínima (s) antes do hedge
+            min_samples: Amostras mínimas para confiar nas estatísticas de um backend
+            window: Tamanho da janela móvel por backend
+            max_error_rate: Taxa de erro acima da qual o backend é considerado degradado
+            failure_cooldown: Tempo (s) fora de rotação após falhas consecutivas
+        """
+        self._backends: List[_Backend] = [
+            _Backend(provider, service, window)
+            for provider, service in ((PROVIDER_GROQ, groq_service), (PROVIDER_OLLAMA, ollama_service))
+            if service is not None
+        ]
+        if not self._backends:
+            raise ValueError("LLMRouter precisa de pelo menos um serviço de LLM")
+
+        reference = self._backends[0].service
+        super().__init__(reference.temperature, reference.max_tokens)
+
+        self._privacy_mode = privacy_mode or (lambda: False)
+        self.preferred = preferred.lower()
+        self.hedge_enabled = hedge_enabled
+        self.hedge_min_delay = hedge_min_delay
+        self.min_samples = min_samples
+        self.max_error_rate = max_error_rate
+        self.failure_cooldown = failure_cooldown
+        self._executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="llm-router")
+
+        # Métricas
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.failovers = 0
+
+        logger.info(
+            f"✅ LLMRouter inicializado: backends={[b.key for b in self._backends]}, "
+            f"preferido={self.preferred}, hedging={'on' if hedge_enabled else 'off'}"
+        )
+
+    @classmethod
+    def from_settings(
+        cls,
+        groq_service: Optional[BaseLLMService],
+        ollama_service: Optional[BaseLLMService],
+        privacy_mode: Optional[Callable[[], bool]] = None
+    ) -> "LLMRouter":
+        """Cria roteador com os parâmetros das configurações"""
+        from backend.config import settings
+        return cls(
+            groq_service,
+            ollama_service,
+            privacy_mode=privacy_mode,
+            preferred=settings.llm_provider,
+            hedge_enabled=settings.llm_router_hedge_enabled,
+            hedge_min_delay=settings.llm_router_hedge_min_delay,
+            min_samples=settings.llm_router_min_samples,
+            window=settings.llm_router_window,
+            max_error_rate=settings.llm_router_max_error_rate,
+            failure_cooldown=settings.llm_router_failure_cooldown
+        )
+
+    # ========== ESCOLHA DE BACKEND ==========
+
+    def _healthy(self, backend: _Backend) -> bool:
+        tracker = backend.tracker
+        if tracker.in_cooldown():
+            return False
+        # Groq com circuito de rate limit aberto responde pelo fallback: fora de rotação
+        breaker = getattr(backend.service, "circuit_breaker", None)
+        if breaker is not None and breaker.is_open:
+            return False
+        return tracker.requests < self.min_samples or tracker.error_rate <= self.max_error_rate
+
+    def _estimated_latency(self, backend: _Backend) -> float:
+        """p50 do backend; sem amostras suficientes, o preferido vai primeiro"""
+        if backend.tracker.samples >= self.min_samples:
+            return backend.tracker.percentile(50)
+        return 0.0 if backend.provider == self.preferred else float("inf")
+
+    def candidates(self) -> List[_Backend]:
+        """
+        Backends em ordem de preferência para a próxima requisição
+
+        Raises:
+            RuntimeError: Modo privacidade ativo sem backend local
+        """
+        backends = self._backends
+        if self._privacy_mode():
+            backends = [b for b in backends if b.provider == PROVIDER_OLLAMA]
+            if not backends:
+                raise RuntimeError("Nenhum LLM local disponível em modo privacidade")
+        return sorted(
+            backends,
+            key=lambda b: (not self._healthy(b), self._estimated_latency(b), b.provider != self.preferred)
+        )
+
+    @property
+    def model(self) -> str:
+        """Modelo do backend que receberia a próxima requisição"""
+        return getattr(self.candidates()[0].service, "model", "")
+
+    # ========== GERAÇÃO ==========
+
+    def _call(self, backend: _Backend, kwargs: Dict) -> tuple[str, int]:
+        start = time.perf_counter()
+        try:
+            result = backend.service.generate_response(**kwargs)
+        except Exception:
+            backend.tracker.record_failure(self.failure_cooldown)
+            raise
+        backend.tracker.record_success(time.perf_counter() - start)
+        return result
+
+    def generate_response(
+        self,
+        prompt: str,
+        contexto: Optional[List[Dict[str, str]]] = None,
+        memorias_contexto: str = "",
+        tools: Optional[List[Dict]] = None,
+        tool_executor: Optional[callable] = None,
+        system_prompt_override: Optional[str] = None
+    ) -> tuple[str, int]:
+        """
+        Gera resposta no backend mais rápido (com hedging e failover)
+
+        Hedging só é feito sem tools, para não executar tools duas vezes.
+
+        Returns:
+            Tupla (resposta, tokens_usados)
+        """
+        kwargs = {
+            "prompt": prompt,
+            "contexto": contexto,
+            "memorias_contexto": memorias_contexto,
+            "tools": tools,
+            "tool_executor": tool_executor,
+            "system_prompt_override": system_prompt_override
+        }
+        candidates = self.candidates()
+        primary = candidates[0]
+        secondary = candidates[1] if len(candidates) > 1 else None
+
+        if (
+            secondary is not None
+            and self.hedge_enabled
+            and not tools
+            and primary.tracker.samples >= self.min_samples
+        ):
+            return self._hedged(primary, secondary, kwargs)
+
+        try:
+            return self._call(primary, kwargs)
+        except Exception as e:
+            if secondary is None:
+                raise
+            self.failovers += 1
+            logger.warning(f"⚠️ [Router] {primary.key} falhou ({e}), usando {secondary.key}")
+            return self._call(secondary, kwargs)
+
+    def _hedged(self, primary: _Backend, secondary: _Backend, kwargs: Dict) -> tuple[str, int]:
+        """Dispara o secundário se o primário passar do seu p95; vence o primeiro a responder"""
+        delay = max(self.hedge_min_delay, primary.tracker.percentile(95) or 0.0)
+        # Copia o contexto (ex.: prioridade do orçamento do Groq) para as threads
+        first = self._executor.submit(contextvars.copy_context().run, self._call, primary, kwargs)
+        done, _ = wait([first], timeout=delay)
+        if done:
+            try:
+                return first.result()
+            except Exception as e:
+                self.failovers += 1
+                logger.warning(f"⚠️ [Router] {primary.key} falhou ({e}), usando {secondary.key}")
+                return self._call(secondary, kwargs)
+
+        self.hedges += 1
+        logger.debug(f"[Router] {primary.key} passou de {delay:.2f}s, hedge para {secondary.key}")
+        hedge = self._executor.submit(contextvars.copy_context().run, self._call, secondary, kwargs)
+        pending = {first, hedge}
+        last_error: Optional[BaseException] = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    result = future.result()
+                except Exception as e:
+                    last_error = e
+                    continue
+                if future is hedge:
+                    self.hedge_wins += 1
+                # A requisição perdedora termina em background e ainda alimenta as estatísticas
+                return result
+        raise last_error
+
+    async def generate_response_stream(
+        self,
+        prompt: str,
+        contexto: Optional[List[Dict[str, str]]] = None,
+        memorias_contexto: str = "",
+        tools: Optional[List[Dict]] = None,
+        tool_executor: Optional[callable] = None,
+        system_prompt_override: Optional[str] = None
+    ):
+        """
+        Streaming no backend preferido; failover só se falhar antes do primeiro token
+
+        Stream concluído registra sucesso com a duração total (mesma medida de
+        generate_response), para que falhas esparsas não dominem a janela.
+
+        Yields:
+            Tokens de texto conforme são gerados
+        """
+        candidates = self.candidates()
+        for index, backend in enumerate(candidates):
+            started = False
+            start = time.perf_counter()
+            try:
+                async for token in backend.service.generate_response_stream(
+                    prompt,
+                    contexto,
+                    memorias_contexto=memorias_contexto,
+                    tools=tools,
+                    tool_executor=tool_executor,
+                    system_prompt_override=system_prompt_override
+                ):
+                    started = True
+                    yield token
+                backend.tracker.record_success(time.perf_counter() - start)
+                return
+            except Exception as e:
+                backend.tracker.record_failure(self.failure_cooldown)
+                if started or index == len(candidates) - 1:
+                    raise
+                self.failovers += 1
+                logger.warning(f"⚠️ [Router] Streaming em {backend.key} falhou ({e}), usando próximo backend")
+
+    def is_ready(self) -> bool:
+        """True se algum backend permitido estiver pronto"""
+        return any(b.service.is_ready() for b in self.candidates())
+
+    def check_connectivity(self) -> bool:
+        """True se algum backend permitido estiver acessível"""
+        return any(b.service.check_connectivity() for b in self.candidates())
+
+    def get_stats(self) -> Dict:
+        """Latência, taxa de erro e saúde de cada backend"""
+        backends = []
+        for backend in self._backends:
+            p50 = backend.tracker.percentile(50)
+            p95 = backend.tracker.percentile(95)
+            backends.append({
+                "backend": backend.key,
+                "samples": backend.tracker.samples,
+                "p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+                "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+                "error_rate": round(backend.tracker.error_rate, 3),
+                "healthy": self._healthy(backend)
+            })
+        return {
+            "backends": backends,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "failovers": self.failovers
+        }
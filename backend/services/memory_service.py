@@ -1,6 +1,7 @@
 """
 Serviço de memória para o assistente Jonh
 """
+import asyncio
 import re
 from typing import List, Dict, Optional
 from datetime import datetime, timedelta
@@ -8,6 +9,7 @@ from loguru import logger
 
 from backend.database.database import Database
 from backend.services.embedding_service import EmbeddingService
+from backend.services.observability.tracing import traced
 
 
 class MemoryService:
@@ -76,6 +78,7 @@ class MemoryService:
         
         return saved_keys
     
+    @traced("memory.search")
     async def get_memories_for_context(self, user_message: str, limit: int = 5) -> str:
         """
         Busca memórias relevantes para o contexto atual usando busca semântica
@@ -151,8 +154,11 @@ class MemoryService:
         
         # 3. Gera embeddings
         try:
-            query_embedding = self.embedder.embed_query(query)
-            memory_embeddings = self.embedder.embed(memory_texts)
+            # Query e memórias entram no mesmo micro-lote (sem bloquear o event loop)
+            query_embedding, memory_embeddings = await asyncio.gather(
+                self.embedder.embed_query_async(query),
+                self.embedder.embed_async(memory_texts)
+            )
         except Exception as e:
             logger.error(f"Erro ao gerar embeddings: {e}")
             return await self._keyword_search(query, limit)
@@ -4,13 +4,15 @@ Algoritmos de clustering para intenções
 from typing import List, Dict, Tuple, Optional
 from loguru import logger
 
-try:
-    from sklearn.cluster import KMeans, DBSCAN
-    from sklearn.metrics import silhouette_score
-    import numpy as np
-    SKLEARN_AVAILABLE = True
-except ImportError:
-    SKLEARN_AVAILABLE = False
+import numpy as np
+
+from backend.core.lazy_import import lazy_import, module_available
+
+# sklearn só é importado quando o clustering roda (fora do caminho de startup)
+sklearn_cluster = lazy_import("sklearn.cluster")
+sklearn_metrics = lazy_import("sklearn.metrics")
+SKLEARN_AVAILABLE = module_available("sklearn")
+if not SKLEARN_AVAILABLE:
     logger.warning("scikit-learn não disponível. Clustering será desabilitado.")
 
 
@@ -53,10 +55,10 @@ def cluster_intents(
     
     # Executa clustering
     if method == "kmeans":
-        clusterer = KMeans(n_clusters=n_clusters, random_state=42, n_init=10)
+        clusterer = sklearn_cluster.KMeans(n_clusters=n_clusters, random_state=42, n_init=10)
         labels = clusterer.fit_predict(embeddings)
     elif method == "dbscan":
-        clusterer = DBSCAN(eps=eps, min_samples=min_samples)
+        clusterer = sklearn_cluster.DBSCAN(eps=eps, min_samples=min_samples)
         labels = clusterer.fit_predict(embeddings)
     else:
         raise ValueError(f"Método de clustering inválido: {method}")
@@ -85,7 +87,7 @@ def cluster_intents(
     # Calcula métricas de qualidade
     if method == "kmeans" and len(cluster_list) > 1:
         try:
-            silhouette = silhouette_score(embeddings, labels)
+            silhouette = sklearn_metrics.silhouette_score(embeddings, labels)
             logger.info(f"Silhouette score: {silhouette:.3f}")
         except Exception as e:
             logger.warning(f"Erro ao calcular silhouette score: {e}")
@@ -116,7 +118,7 @@ def _estimate_optimal_clusters(embeddings: np.ndarray, max_k: int = 10) -> int:
     k_range = range(2, max_k + 1)
     
     for k in k_range:
-        kmeans = KMeans(n_clusters=k, random_state=42, n_init=10)
+        kmeans = sklearn_cluster.KMeans(n_clusters=k, random_state=42, n_init=10)
         kmeans.fit(embeddings)
         inertias.append(kmeans.inertia_)
     
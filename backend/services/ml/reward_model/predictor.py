@@ -1,11 +1,15 @@
 """
 Lógica de predição do modelo de recompensa
 """
-from typing import List, Tuple
-import torch
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
+from typing import Any, List, Tuple
 from loguru import logger
 
+from backend.core.lazy_import import lazy_import
+
+# torch/transformers só são importados ao carregar ou usar o modelo
+torch = lazy_import("torch")
+transformers = lazy_import("transformers")
+
 
 def predict_reward_batch(
     model,
@@ -66,7 +70,7 @@ def predict_reward_batch(
     return scores
 
 
-def load_reward_model(model_path: str) -> Tuple[AutoModelForSequenceClassification, AutoTokenizer]:
+def load_reward_model(model_path: str) -> Tuple[Any, Any]:
     """
     Carrega modelo de recompensa e tokenizer
     
@@ -78,8 +82,8 @@ def load_reward_model(model_path: str) -> Tuple[AutoModelForSequenceClassificati
     """
     try:
         logger.info(f"Carregando modelo de recompensa de: {model_path}")
-        tokenizer = AutoTokenizer.from_pretrained(model_path)
-        model = AutoModelForSequenceClassification.from_pretrained(model_path)
+        tokenizer = transformers.AutoTokenizer.from_pretrained(model_path)
+        model = transformers.AutoModelForSequenceClassification.from_pretrained(model_path)
         model.eval()
         logger.info("✅ Modelo de recompensa carregado com sucesso")
         return model, tokenizer
@@ -2,16 +2,15 @@
 Lógica de treinamento do modelo de recompensa
 """
 from typing import List, Tuple, Dict
-import torch
-from torch.utils.data import DataLoader, TensorDataset
-from transformers import (
-    AutoTokenizer,
-    AutoModelForSequenceClassification,
-    TrainingArguments,
-    Trainer
-)
 from loguru import logger
 
+from backend.core.lazy_import import lazy_import
+
+# torch/transformers só são importados quando o treinamento roda
+torch = lazy_import("torch")
+torch_data = lazy_import("torch.utils.data")
+transformers = lazy_import("transformers")
+
 
 def train_reward_model_core(
     model,
@@ -48,7 +47,7 @@ def train_reward_model_core(
     val_dataset = _prepare_dataset(tokenizer, val_texts, val_scores, max_length=512)
     
     # Configuração de treinamento
-    training_args = TrainingArguments(
+    training_args = transformers.TrainingArguments(
         output_dir=output_dir,
         num_train_epochs=epochs,
         per_device_train_batch_size=batch_size,
@@ -65,7 +64,7 @@ def train_reward_model_core(
     )
     
     # Trainer
-    trainer = Trainer(
+    trainer = transformers.Trainer(
         model=model,
         args=training_args,
         train_dataset=train_dataset,
@@ -112,7 +111,7 @@ def _prepare_dataset(tokenizer, texts: List[str], scores: List[float], max_lengt
     labels = torch.tensor(scores, dtype=torch.float32)
     
     # Cria dataset
-    dataset = TensorDataset(
+    dataset = torch_data.TensorDataset(
         encodings["input_ids"],
         encodings["attention_mask"],
         labels
@@ -0,0 +1,25 @@
+"""
+Módulo de observabilidade - spans por etapa, métricas Prometheus e event loop
+"""
+from .metrics import MetricsRegistry, get_metrics_registry, STAGE_BUCKETS_MS
+from .tracing import Span, span, traced, current_span, record_stage, STAGE_DURATION, STAGE_ERRORS
+from .loop_lag import EventLoopLagMonitor, LOOP_LAG
+from .loop_watchdog import LoopBlockingWatchdog, LOOP_BLOCKS, LOOP_BLOCK_DURATION
+
+__all__ = [
+    "MetricsRegistry",
+    "get_metrics_registry",
+    "STAGE_BUCKETS_MS",
+    "Span",
+    "span",
+    "traced",
+    "current_span",
+    "record_stage",
+    "STAGE_DURATION",
+    "STAGE_ERRORS",
+    "EventLoopLagMonitor",
+    "LOOP_LAG",
+    "LoopBlockingWatchdog",
+    "LOOP_BLOCKS",
+    "LOOP_BLOCK_DURATION"
+]
@@ -0,0 +1,64 @@
+"""
+Monitor de atraso do event loop
+
+Uma task dorme um intervalo curto e mede quanto acordou atrasada: esse
+atraso é o tempo em que o loop ficou ocupado com código síncrono (inferência,
+I/O bloqueante) sem atender outras requisições.
+"""
+import asyncio
+import time
+from typing import Optional
+
+from loguru import logger
+
+from backend.services.observability.metrics import MetricsRegistry, get_metrics_registry
+
+LOOP_LAG = "jonh_event_loop_lag_seconds"
+LOOP_LAG_LAST = "jonh_event_loop_lag_last_seconds"
+
+
+class EventLoopLagMonitor:
+    """Amostra o atraso do event loop e publica no registro de métricas"""
+
+    def __init__(self, interval: float = 0.5, registry: Optional[MetricsRegistry] = None):
+        """
+        Inicializa o monitor
+
+        Args:
+            interval: Intervalo entre amostras (segundos)
+            registry: Registro de métricas (padrão: global)
+        """
+        self.interval = interval
+        self.registry = registry or get_metrics_registry()
+        self.last_lag_ms = 0.0
+        self.max_lag_ms = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Inicia a amostragem no loop atual"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"⏱️ Monitor de event loop iniciado (intervalo: {self.interval}s)")
+
+    async def stop(self):
+        """Encerra a amostragem"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.record(max(0.0, (time.perf_counter() - start - self.interval) * 1000))
+
+    def record(self, lag_ms: float):
+        """Registra uma amostra de atraso (ms)"""
+        self.last_lag_ms = lag_ms
+        self.max_lag_ms = max(self.max_lag_ms, lag_ms)
+        self.registry.observe(LOOP_LAG, lag_ms)
+        self.registry.set_gauge(LOOP_LAG_LAST, lag_ms / 1000.0)
@@ -0,0 +1,202 @@
+"""
+Detector de bloqueios do event loop com atribuição do responsável
+
+Estende o monitor de atraso: além da task que mede o atraso, uma thread
+vigia o horário em que a task deveria ter acordado. Se o loop passar do
+limite sem acordá-la, a thread captura a pilha da thread do loop ainda
+durante o bloqueio, ou seja, a pilha do callback culpado. Quando o loop
+volta, a duração do episódio é somada ao ponto de chamada (primeiro frame do
+código do projeto, de dentro para fora), que vira relatório e métrica.
+"""
+import asyncio
+import os
+import sys
+import threading
+import time
+from typing import Dict, List, Optional
+
+from loguru import logger
+
+from backend.services.observability.loop_lag import EventLoopLagMonitor
+from backend.services.observability.metrics import MetricsRegistry
+from backend.services.observability.profiler import _ROOT, _innermost_coroutine, _short_path, _stack
+
+LOOP_BLOCKS = "jonh_event_loop_blocks_total"
+LOOP_BLOCK_DURATION = "jonh_event_loop_block_seconds"
+
+_PROJECT_DIR = os.path.join(_ROOT, "backend") + os.sep
+_OWN_DIR = os.path.dirname(os.path.abspath(__file__)) + os.sep
+
+
+def _call_site(frames: List) -> str:
+    """Frame mais interno do código do projeto (ou o mais interno de todos)"""
+    for frame in reversed(frames):
+        filename = frame.f_code.co_filename
+        if filename.startswith(_PROJECT_DIR) and not filename.startswith(_OWN_DIR):
+            return f"{_short_path(filename)}:{frame.f_lineno} in {frame.f_code.co_name}"
+    innermost = frames[-1]
+    return f"{_short_path(innermost.f_code.co_filename)}:{innermost.f_lineno} in {innermost.f_code.co_name}"
+
+
+def _format_stack(frames: List, limit: int = 20) -> List[str]:
+    return [
+        f"{_short_path(f.f_code.co_filename)}:{f.f_lineno} in {f.f_code.co_name}"
+        for f in frames[-limit:]
+    ]
+
+
+class LoopBlockingWatchdog(EventLoopLagMonitor):
+    """Mede o atraso do loop e identifica quem o bloqueou"""
+
+    def __init__(
+        self,
+        interval: float = 0.02,
+        threshold_ms: float = 100.0,
+        registry: Optional[MetricsRegistry] = None,
+        log_interval: float = 60.0
+    ):
+        """
+        Inicializa o watchdog
+
+        Args:
+            interval: Intervalo da task de heartbeat (segundos; curto para não
+                perder bloqueios que começam e terminam entre duas amostras)
+            threshold_ms: Bloqueio mínimo (ms) para capturar a pilha
+            registry: Registro de métricas (padrão: global)
+            log_interval: Intervalo mínimo (s) entre avisos no log do mesmo ponto
+        """
+        super().__init__(interval=interval, registry=registry)
+        self.threshold_ms = threshold_ms
+        self.log_interval = log_interval
+        self.offenders: Dict[str, Dict] = {}
+        self.episodes = 0
+        self._expected_wake: Optional[float] = None
+        self._loop_thread_id: Optional[int] = None
+        self._pending: Optional[Dict] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._last_log: Dict[str, float] = {}
+
+    def start(self):
+        """Inicia o heartbeat no loop atual e a thread vigia"""
+        self._loop_thread_id = threading.get_ident()
+        super().start()
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+            self._thread.start()
+            logger.info(f"🐕 Watchdog do event loop iniciado (limite: {self.threshold_ms:.0f}ms)")
+
+    async def stop(self):
+        """Encerra heartbeat e thread vigia"""
+        self._stop.set()
+        await super().stop()
+        if self._thread:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    async def _run(self):
+        while True:
+            start = time.perf_counter()
+            expected = start + self.interval
+            self._expected_wake = expected
+            await asyncio.sleep(self.interval)
+            self._expected_wake = None
+            lag_ms = max(0.0, (time.perf_counter() - expected) * 1000)
+            self.record(lag_ms)
+            self._close_episode(expected, lag_ms)
+
+    def _watch(self):
+        """Thread vigia: captura a pilha do loop quando o heartbeat atrasa"""
+        poll = max(0.005, min(self.interval, self.threshold_ms / 4000))
+        while not self._stop.wait(poll):
+            expected = self._expected_wake
+            if expected is None:
+                continue
+            stalled_ms = (time.perf_counter() - expected) * 1000
+            if stalled_ms < self.threshold_ms:
+                continue
+            with self._lock:
+                if self._pending is not None and self._pending["expected"] == expected:
+                    continue  # Episódio já capturado
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            frames = _stack(frame)
+            with self._lock:
+                if self._expected_wake != expected:
+                    continue  # O loop acordou durante a captura
+                self._pending = {
+                    "expected": expected,
+                    "site": _call_site(frames),
+                    "coroutine": _innermost_coroutine(frames),
+                    "stack": _format_stack(frames)
+                }
+
+    def _close_episode(self, expected: float, blocked_ms: float):
+        """Atribui o atraso deste ciclo à pilha capturada durante ele (se houver)"""
+        with self._lock:
+            pending, self._pending = self._pending, None
+        if pending is not None and pending["expected"] == expected:
+            self._record_offender(pending, blocked_ms)
+
+    def _record_offender(self, capture: Dict, blocked_ms: float):
+        site = capture["site"]
+        self.episodes += 1
+        entry = self.offenders.get(site)
+        if entry is None:
+            entry = self.offenders[site] = {
+                "site": site,
+                "count": 0,
+                "total_ms": 0.0,
+                "max_ms": 0.0,
+                "coroutine": capture["coroutine"],
+                "stack": capture["stack"]
+            }
+        entry["count"] += 1
+        entry["total_ms"] += blocked_ms
+        if blocked_ms >= entry["max_ms"]:
+            entry["max_ms"] = blocked_ms
+            entry["coroutine"] = capture["coroutine"]
+            entry["stack"] = capture["stack"]
+
+        self.registry.inc(LOOP_BLOCKS, labels={"site": site})
+        self.registry.observe(LOOP_BLOCK_DURATION, blocked_ms)
+
+        now = time.monotonic()
+        if now - self._last_log.get(site, 0.0) >= self.log_interval:
+            self._last_log[site] = now
+            logger.warning(
+                f"🐢 Event loop bloqueado por {blocked_ms:.0f}ms em {site} "
+                f"(corrotina: {capture['coroutine'] or 'nenhuma'})"
+            )
+
+    def get_report(self, top: int = 20) -> Dict:
+        """
+        Pontos de chamada que mais bloquearam o loop
+
+        Returns:
+            Dict com limite, total de episódios e ofensores ordenados por tempo total
+        """
+        offenders = sorted(self.offenders.values(), key=lambda e: e["total_ms"], reverse=True)[:top]
+        return {
+            "threshold_ms": self.threshold_ms,
+            "episodes": self.episodes,
+            "max_lag_ms": round(self.max_lag_ms, 1),
+            "offenders": [
+                {
+                    **entry,
+                    "total_ms": round(entry["total_ms"], 1),
+                    "max_ms": round(entry["max_ms"], 1),
+                    "avg_ms": round(entry["total_ms"] / entry["count"], 1)
+                }
+                for entry in offenders
+            ]
+        }
+
+    def reset(self):
+        """Zera o relatório de ofensores"""
+        self.offenders.clear()
+        self.episodes = 0
+        self.max_lag_ms = 0.0
@@ -0,0 +1,169 @@
+"""
+Registro de métricas em memória com exportação no formato Prometheus
+
+Histogramas (reaproveitando LatencyHistogram, em ms, exportados em segundos),
+contadores e gauges. Gauges de outros serviços (filas, caches) são lidos sob
+demanda por coletores registrados, então nada é atualizado no caminho quente.
+"""
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from loguru import logger
+
+from backend.services.health.latency_histogram import LatencyHistogram
+
+# Buckets em ms: granularidade fina até 1s (etapas locais) e cauda até 30s (LLM/STT)
+STAGE_BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+Labels = Tuple[Tuple[str, str], ...]
+# Coletor: devolve (nome, labels, valor) de gauges no momento da exportação
+Collector = Callable[[], Iterable[Tuple[str, Dict[str, str], float]]]
+
+
+def _labels(labels: Optional[Dict[str, str]]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in (labels or {}).items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+    items = list(labels) + ([extra] if extra else [])
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in items) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+class MetricsRegistry:
+    """Histogramas, contadores e gauges com exportação Prometheus"""
+
+    def __init__(self, buckets_ms: Optional[Iterable[float]] = None):
+        """
+        Inicializa o registro
+
+        Args:
+            buckets_ms: Buckets padrão dos histogramas (ms)
+        """
+        self.buckets_ms = tuple(buckets_ms or STAGE_BUCKETS_MS)
+        self._histograms: Dict[str, Dict[Labels, LatencyHistogram]] = {}
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        self._gauges: Dict[str, Dict[Labels, float]] = {}
+        self._help: Dict[str, str] = {}
+        self._collectors: List[Collector] = []
+        self._lock = threading.Lock()
+
+    def describe(self, name: str, help_text: str):
+        """Define o texto de HELP de uma métrica"""
+        self._help[name] = help_text
+
+    def observe(self, name: str, value_ms: float, labels: Optional[Dict[str, str]] = None):
+        """
+        Registra uma duração em um histograma
+
+        Args:
+            name: Nome da métrica (sufixo _seconds; valor em ms)
+            value_ms: Duração em milissegundos
+            labels: Labels da série
+        """
+        key = _labels(labels)
+        series = self._histograms.get(name, {}).get(key)
+        if series is None:
+            with self._lock:
+                series = self._histograms.setdefault(name, {}).setdefault(
+                    key, LatencyHistogram(self.buckets_ms)
+                )
+        series.observe(value_ms)
+
+    def inc(self, name: str, value: float = 1.0, labels: Optional[Dict[str, str]] = None):
+        """Incrementa um contador"""
+        key = _labels(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + value
+
+    def set_gauge(self, name: str, value: float, labels: Optional[Dict[str, str]] = None):
+        """Define o valor atual de um gauge"""
+        with self._lock:
+            self._gauges.setdefault(name, {})[_labels(labels)] = float(value)
+
+    def register_collector(self, collector: Collector):
+        """Registra um coletor de gauges lido a cada exportação"""
+        self._collectors.append(collector)
+
+    def histogram(self, name: str, labels: Optional[Dict[str, str]] = None) -> Optional[LatencyHistogram]:
+        """Histograma de uma série (None se nunca observado)"""
+        return self._histograms.get(name, {}).get(_labels(labels))
+
+    def counter(self, name: str, labels: Optional[Dict[str, str]] = None) -> float:
+        """Valor atual de um contador"""
+        return self._counters.get(name, {}).get(_labels(labels), 0.0)
+
+    def _collect_gauges(self) -> Dict[str, Dict[Labels, float]]:
+        with self._lock:
+            gauges = {name: dict(series) for name, series in self._gauges.items()}
+        for collector in self._collectors:
+            try:
+                for name, labels, value in collector():
+                    if value is not None:
+                        gauges.setdefault(name, {})[_labels(labels)] = float(value)
+            except Exception as e:
+                logger.debug(f"Coletor de métricas falhou: {e}")
+        return gauges
+
+    def render_prometheus(self) -> str:
+        """
+        Exporta todas as métricas no formato texto do Prometheus (0.0.4)
+
+        Returns:
+            Texto pronto para a resposta de /metrics
+        """
+        lines: List[str] = []
+
+        def header(name: str, kind: str):
+            if name in self._help:
+                lines.append(f"# HELP {name} {self._help[name]}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        with self._lock:
+            histograms = {name: dict(series) for name, series in self._histograms.items()}
+            counters = {name: dict(series) for name, series in self._counters.items()}
+
+        for name in sorted(histograms):
+            header(name, "histogram")
+            for labels, histogram in sorted(histograms[name].items()):
+                for bound, count in histogram.cumulative_buckets():
+                    le = "+Inf" if bound == "+Inf" else _format_value(bound / 1000.0)
+                    lines.append(f"{name}_bucket{_format_labels(labels, ('le', le))} {count}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(histogram.sum_ms / 1000.0)}")
+                lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+
+        for name in sorted(counters):
+            header(name, "counter")
+            for labels, value in sorted(counters[name].items()):
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+
+        gauges = self._collect_gauges()
+        for name in sorted(gauges):
+            header(name, "gauge")
+            for labels, value in sorted(gauges[name].items()):
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+
+        return "\n".join(lines) + "\n"
+
+
+_registry: Optional[MetricsRegistry] = None
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    """Registro global de métricas (singleton)"""
+    global _registry
+    if _registry is None:
+        _registry = MetricsRegistry()
+    return _registry
@@ -0,0 +1,226 @@
+"""
+Profiler por amostragem em processo (todas as threads)
+
+Uma thread lê sys._current_frames() em intervalo fixo durante N segundos e
+acumula as pilhas no formato "collapsed" (uma linha por pilha, frames
+separados por ';' e a contagem no fim), aceito por flamegraph.pl e speedscope.
+
+Na thread do event loop, amostras consecutivas em que o loop está executando
+uma corrotina (e não parado no select) formam episódios de bloqueio,
+atribuídos à corrotina mais interna da pilha: é ela que fez a chamada
+síncrona que segurou o loop.
+"""
+import inspect
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+_COROUTINE_FLAGS = inspect.CO_COROUTINE | inspect.CO_ITERABLE_COROUTINE | inspect.CO_ASYNC_GENERATOR
+_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+
+def _short_path(filename: str) -> str:
+    marker = "site-packages" + os.sep
+    if marker in filename:
+        return filename.split(marker, 1)[1]
+    if filename.startswith(_ROOT):
+        return os.path.relpath(filename, _ROOT)
+    return os.path.basename(filename)
+
+
+def _frame_label(code) -> str:
+    return f"{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})".replace(";", ":")
+
+
+def _stack(frame) -> List:
+    """Frames da pilha, do mais externo ao mais interno"""
+    frames = []
+    while frame is not None:
+        frames.append(frame)
+        frame = frame.f_back
+    frames.reverse()
+    return frames
+
+
+def _loop_is_idle(frames: List) -> bool:
+    """Loop parado esperando I/O (selector.select) ou sem corrotina em execução"""
+    innermost = frames[-1].f_code
+    if innermost.co_name in ("select", "poll", "control") and innermost.co_filename.endswith("selectors.py"):
+        return True
+    return not any(f.f_code.co_flags & _COROUTINE_FLAGS for f in frames)
+
+
+def _innermost_coroutine(frames: List) -> Optional[str]:
+    for frame in reversed(frames):
+        if frame.f_code.co_flags & _COROUTINE_FLAGS:
+            return f"{_frame_label(frame.f_code)} linha {frame.f_lineno}"
+    return None
+
+
+@dataclass
+class _Episode:
+    coroutine: str
+    samples: int = 0
+    leaf: Counter = field(default_factory=Counter)
+
+
+@dataclass
+class ProfileResult:
+    """Resultado de uma sessão de profiling"""
+    duration: float
+    interval: float
+    samples: int
+    stacks: Counter
+    loop_blocking: List[Dict]
+    threads: Dict[str, int]
+
+    def collapsed(self) -> str:
+        """Pilhas no formato collapsed (flamegraph.pl / speedscope)"""
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common()) + "\n"
+
+    def to_dict(self) -> Dict:
+        return {
+            "duration_seconds": round(self.duration, 3),
+            "interval_ms": self.interval * 1000,
+            "samples": self.samples,
+            "threads": self.threads,
+            "loop_blocking": self.loop_blocking,
+            "collapsed": self.collapsed()
+        }
+
+
+class SamplingProfiler:
+    """Amostra as pilhas de todas as threads do processo"""
+
+    def __init__(
+        self,
+        interval: float = 0.005,
+        loop_thread_id: Optional[int] = None,
+        blocking_threshold: float = 0.05
+    ):
+        """
+        Inicializa o profiler
+
+        Args:
+            interval: Intervalo entre amostras (segundos)
+            loop_thread_id: Ident da thread do event loop (para o relatório de bloqueios)
+            blocking_threshold: Duração mínima (s) de um episódio de bloqueio reportado
+        """
+        self.interval = interval
+        self.loop_thread_id = loop_thread_id
+        self.blocking_threshold = blocking_threshold
+
+    def run(self, seconds: float) -> ProfileResult:
+        """
+        Amostra por `seconds` segundos (bloqueante: chamar fora do event loop)
+
+        Returns:
+            ProfileResult com pilhas agregadas e episódios de bloqueio do loop
+        """
+        own_id = threading.get_ident()
+        stacks: Counter = Counter()
+        thread_samples: Counter = Counter()
+        episodes: List[_Episode] = []
+        current: Optional[_Episode] = None
+        samples = 0
+
+        start = time.perf_counter()
+        deadline = start + seconds
+        next_tick = start
+        while True:
+            now = time.perf_counter()
+            if now >= deadline:
+                break
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                frames = _stack(frame)
+                is_loop = thread_id == self.loop_thread_id
+                name = "event-loop" if is_loop else names.get(thread_id, f"thread-{thread_id}")
+                stacks[";".join([name] + [_frame_label(f.f_code) for f in frames])] += 1
+                thread_samples[name] += 1
+
+                if is_loop:
+                    coroutine = None if _loop_is_idle(frames) else _innermost_coroutine(frames)
+                    if coroutine is None:
+                        current = None
+                    else:
+                        if current is None or current.coroutine != coroutine:
+                            current = _Episode(coroutine)
+                            episodes.append(current)
+                        current.samples += 1
+                        current.leaf[_frame_label(frames[-1].f_code)] += 1
+            samples += 1
+
+            next_tick += self.interval
+            delay = next_tick - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_tick = time.perf_counter()
+
+        return ProfileResult(
+            duration=time.perf_counter() - start,
+            interval=self.interval,
+            samples=samples,
+            stacks=stacks,
+            loop_blocking=self._blocking_report(episodes),
+            threads=dict(thread_samples)
+        )
+
+    def _blocking_report(self, episodes: List[_Episode], top: int = 10) -> List[Dict]:
+        """Corrotinas com episódios acima do limite, ordenadas pelo tempo bloqueado"""
+        min_samples = max(1, round(self.blocking_threshold / self.interval))
+        by_coroutine: Dict[str, Dict] = {}
+        for episode in episodes:
+            if episode.samples < min_samples:
+                continue
+            entry = by_coroutine.setdefault(episode.coroutine, {
+                "coroutine": episode.coroutine,
+                "episodes": 0,
+                "blocked_ms": 0.0,
+                "max_ms": 0.0,
+                "leaf": Counter()
+            })
+            duration_ms = episode.samples * self.interval * 1000
+            entry["episodes"] += 1
+            entry["blocked_ms"] += duration_ms
+            entry["max_ms"] = max(entry["max_ms"], duration_ms)
+            entry["leaf"].update(episode.leaf)
+
+        report = sorted(by_coroutine.values(), key=lambda e: e["blocked_ms"], reverse=True)[:top]
+        for entry in report:
+            entry["blocked_ms"] = round(entry["blocked_ms"], 1)
+            entry["max_ms"] = round(entry["max_ms"], 1)
+            # Chamada síncrona mais frequente no topo da pilha durante o bloqueio
+            entry["top_call"] = entry.pop("leaf").most_common(1)[0][0]
+        return report
+
+
+_profile_lock = threading.Lock()
+
+
+def profile_process(
+    seconds: float,
+    loop_thread_id: Optional[int] = None,
+    interval: float = 0.005,
+    blocking_threshold: float = 0.05
+) -> Tuple[bool, Optional[ProfileResult]]:
+    """
+    Executa uma sessão de profiling se nenhuma outra estiver em andamento
+
+    Returns:
+        (True, resultado) ou (False, None) se já houver uma sessão ativa
+    """
+    if not _profile_lock.acquire(blocking=False):
+        return False, None
+    try:
+        profiler = SamplingProfiler(interval, loop_thread_id, blocking_threshold)
+        return True, profiler.run(seconds)
+    finally:
+        _profile_lock.release()
@@ -0,0 +1,136 @@
+"""
+Spans leves para medir as etapas do pipeline de voz
+
+O span atual é propagado por ContextVar, então spans abertos dentro de
+tasks e de asyncio.to_thread herdam o pai automaticamente. Cada span ao
+terminar alimenta o histograma jonh_stage_duration_seconds{stage=...}; o span
+raiz registra o detalhamento da requisição inteira no log (debug).
+
+Uso:
+    with span("pipeline.text"):
+        with span("llm.generate", provider="groq"):
+            ...
+"""
+import functools
+import inspect
+import itertools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from loguru import logger
+
+from backend.services.observability.metrics import get_metrics_registry
+
+STAGE_DURATION = "jonh_stage_duration_seconds"
+STAGE_ERRORS = "jonh_stage_errors_total"
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+_ids = itertools.count(1)
+
+
+@dataclass
+class Span:
+    """Etapa medida de uma requisição"""
+    name: str
+    parent: Optional["Span"] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    start: float = field(default_factory=time.perf_counter)
+    end: Optional[float] = None
+    error: Optional[str] = None
+    span_id: int = field(default_factory=lambda: next(_ids))
+    # Spans concluídos da requisição (compartilhado com o raiz)
+    finished: List["Span"] = field(default_factory=list, repr=False)
+
+    @property
+    def root(self) -> "Span":
+        span = self
+        while span.parent is not None:
+            span = span.parent
+        return span
+
+    @property
+    def trace_id(self) -> int:
+        return self.root.span_id
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end or time.perf_counter()) - self.start) * 1000
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+
+def current_span() -> Optional[Span]:
+    """Span ativo no contexto atual (ou None)"""
+    return _current_span.get()
+
+
+def record_stage(name: str, duration_ms: float, error: bool = False):
+    """
+    Registra a duração de uma etapa medida fora de um span
+
+    Para intervalos que atravessam yields de um gerador (ex.: streaming SSE),
+    onde o ContextVar do span não pode ficar aberto.
+    """
+    registry = get_metrics_registry()
+    labels = {"stage": name}
+    registry.observe(STAGE_DURATION, duration_ms, labels)
+    if error:
+        registry.inc(STAGE_ERRORS, labels=labels)
+
+
+def _finish(current: Span):
+    record_stage(current.name, current.duration_ms, error=current.error is not None)
+
+    root = current.root
+    root.finished.append(current)
+    if current is root and len(root.finished) > 1:
+        breakdown = " ".join(
+            f"{s.name}={s.duration_ms:.0f}ms"
+            for s in sorted(root.finished[:-1], key=lambda s: s.start)
+        )
+        logger.debug(f"⏱️ [{root.name}] total={root.duration_ms:.0f}ms | {breakdown}")
+
+
+@contextmanager
+def span(name: str, **attributes) -> Iterator[Span]:
+    """
+    Mede um bloco de código como etapa do pipeline
+
+    Args:
+        name: Nome da etapa (vira o label stage)
+        **attributes: Atributos livres (não viram labels)
+    """
+    parent = _current_span.get()
+    current = Span(name=name, parent=parent, attributes=attributes)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.error = type(e).__name__
+        raise
+    finally:
+        current.end = time.perf_counter()
+        _current_span.reset(token)
+        _finish(current)
+
+
+def traced(name: str) -> Callable:
+    """Decorator que envolve uma função (síncrona ou async) em um span"""
+    def decorator(func: Callable) -> Callable:
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -7,7 +7,7 @@ além de filtrar plugins que requerem internet.
 from typing import Optional
 from loguru import logger
 
-from backend.services.llm import BaseLLMService, GroqLLMService, OllamaLLMService, create_llm_service
+from backend.services.llm import BaseLLMService, GroqLLMService, LLMRouter, OllamaLLMService, create_llm_service
 from backend.config import settings
 
 
@@ -63,6 +63,15 @@ class PrivacyModeService:
         else:
             self.ollama_service = ollama_service
         
+        # Roteador por latência quando os dois providers estão disponíveis
+        self.router: Optional[LLMRouter] = None
+        if settings.llm_router_enabled and self.groq_service and self.ollama_service:
+            self.router = LLMRouter.from_settings(
+                self.groq_service,
+                self.ollama_service,
+                privacy_mode=self.get_privacy_mode
+            )
+        
         logger.info("✅ PrivacyModeService inicializado")
     
     def set_privacy_mode(self, enabled: bool) -> dict:
@@ -114,6 +123,9 @@ class PrivacyModeService:
         Returns:
             Serviço LLM ativo ou None se não disponível
         """
+        # O roteador respeita o modo privacidade (só usa Ollama quando ativo)
+        if self.router is not None:
+            return self.router
         if self._privacy_mode_active:
             if self.ollama_service:
                 return self.ollama_service
@@ -137,6 +149,15 @@ class PrivacyModeService:
             "current_provider": "ollama" if self._privacy_mode_active else "groq",
             "groq_available": self.groq_service is not None,
             "ollama_available": self.ollama_service is not None,
-            "active_service_available": self.get_active_llm_service() is not None
+            "active_service_available": self.get_active_llm_service() is not None,
+            "router": self.router.get_stats() if self.router else None,
+            "groq_circuit": (
+                self.groq_service.circuit_breaker.get_status()
+                if getattr(self.groq_service, "circuit_breaker", None) else None
+            ),
+            "groq_budget": (
+                self.groq_service.budget.get_status()
+                if getattr(self.groq_service, "budget", None) else None
+            )
         }
 
@@ -21,7 +21,8 @@ class ResponseCache:
         self,
         max_size: int = 500,
         ttl: int = 7200,
-        embedding_service: Optional[Any] = None
+        embedding_service: Optional[Any] = None,
+        semantic_search: bool = False
     ):
         """
         Inicializa cache de respostas
@@ -30,11 +31,15 @@ class ResponseCache:
             max_size: Tamanho máximo do cache
             ttl: Time-to-live em segundos (2 horas padrão)
             embedding_service: Serviço de embeddings para busca semântica (opcional)
+            semantic_search: Habilita a busca por similaridade (desligada por padrão)
         """
         self.max_size = max_size
         self.ttl = ttl
         self.embedding_service = embedding_service
+        self.semantic_search = semantic_search and embedding_service is not None
         self.cache: Optional[Dict[str, Dict[str, Any]]] = None
+        self.hits = 0
+        self.misses = 0
         
         if CACHE_TOOLS_AVAILABLE:
             self.cache = TTLCache(maxsize=max_size, ttl=ttl)
@@ -48,12 +53,14 @@ class ResponseCache:
         texto_normalizado = " ".join(texto.lower().split())
         return hashlib.md5(texto_normalizado.encode('utf-8')).hexdigest()
     
-    def get(self, texto: str) -> Optional[Tuple[str, int]]:
+    def get(self, texto: str, embedding: Optional[list] = None) -> Optional[Tuple[str, int]]:
         """
         Obtém resposta do cache
         
         Args:
             texto: Texto da pergunta
+            embedding: Embedding da pergunta (usado só com semantic_search;
+                calculado de forma assíncrona pelo chamador)
             
         Returns:
             Tupla (resposta, tokens) ou None se não encontrado
@@ -69,12 +76,9 @@ class ResponseCache:
             logger.debug(f"✅ Cache hit (exato): '{texto[:50]}...'")
             return cached.get("response"), cached.get("tokens", 0)
         
-        # Busca semântica (se embedding_service disponível)
-        if self.embedding_service:
+        # Busca semântica (se habilitada e o embedding da pergunta foi fornecido)
+        if self.semantic_search and embedding is not None:
             try:
-                # Gera embedding da pergunta
-                embedding = self.embedding_service.generate_embedding(texto)
-                
                 # Busca no cache por similaridade
                 best_match = None
                 best_similarity = 0.85  # Threshold mínimo de similaridade
@@ -113,21 +117,13 @@ class ResponseCache:
             texto: Texto da pergunta
             resposta: Resposta do LLM
             tokens: Número de tokens usados
-            embedding: Embedding da pergunta (opcional, gerado automaticamente se embedding_service disponível)
+            embedding: Embedding da pergunta (opcional, habilita busca semântica)
         """
         if not self.cache:
             return
         
         key = self._get_key(texto)
         
-        # Gera embedding se necessário
-        if embedding is None and self.embedding_service:
-            try:
-                embedding = self.embedding_service.generate_embedding(texto)
-            except Exception as e:
-                logger.debug(f"Erro ao gerar embedding: {e}")
-                embedding = None
-        
         self.cache[key] = {
             "response": resposta,
             "tokens": tokens,
@@ -163,16 +159,27 @@ class ResponseCache:
             self.cache.clear()
             logger.info("Cache de respostas limpo")
     
+    def record_lookup(self, hit: bool):
+        """Contabiliza uma consulta completa (exata + semântica)"""
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+    
     def get_stats(self) -> Dict:
         """Retorna estatísticas do cache"""
-        if not self.cache:
+        if self.cache is None:
             return {"enabled": False}
         
+        total = self.hits + self.misses
         return {
             "enabled": True,
             "max_size": self.max_size,
             "ttl": self.ttl,
             "current_size": len(self.cache),
-            "semantic_search": self.embedding_service is not None
+            "semantic_search": self.semantic_search,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0
         }
 
@@ -0,0 +1,182 @@
+"""
+Micro-batching assíncrono de transcrições
+
+Áudios que chegam juntos (usuários simultâneos) são enfileirados e agrupados
+por alguns milissegundos; cada lote vai para uma thread dedicada numa única
+chamada de transcrição em lote (um forward do Whisper para todos os áudios)
+e os resultados voltam para cada requisição via futures. Com um único
+usuário o lote tem um item e o custo extra é só a janela de espera.
+"""
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+from loguru import logger
+
+TranscriptionResult = Tuple[str, float, float]
+
+
+class STTBatcher:
+    """Agrupa transcrições concorrentes em lotes"""
+
+    def __init__(
+        self,
+        transcribe_batch_fn: Callable[
+            [List[bytes], str, List[Optional[str]]],
+            Sequence[Union[TranscriptionResult, Exception]]
+        ],
+        max_batch_size: int = 8,
+        max_wait_ms: float = 20.0
+    ):
+        """
+        Inicializa o batcher
+
+        Args:
+            transcribe_batch_fn: Função síncrona que transcreve uma lista de
+                áudios de um mesmo idioma com a sessão de cada um (retorna, na
+                mesma ordem, a tupla (texto, confiança, duração) ou a exceção
+                de cada áudio)
+            max_batch_size: Tamanho máximo de um lote
+            max_wait_ms: Tempo máximo de espera para completar um lote
+        """
+        self.transcribe_batch_fn = transcribe_batch_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        # Métricas
+        self.batches = 0
+        self.items = 0
+        self.max_batch_seen = 0
+        self.transcribe_ms_total = 0.0
+        self.wait_ms_total = 0.0
+        self.errors = 0
+
+    async def transcribe(
+        self,
+        audio_data: bytes,
+        language: str = "pt",
+        session_id: Optional[str] = None
+    ) -> TranscriptionResult:
+        """
+        Enfileira um áudio e aguarda sua transcrição
+
+        Args:
+            audio_data: Dados do áudio em bytes
+            language: Código do idioma
+            session_id: Sessão do áudio (perfil acústico no STT)
+
+        Returns:
+            Tupla (texto, confiança, duração)
+        """
+        self._ensure_started()
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((audio_data, language, session_id, future, time.perf_counter()))
+        return await future
+
+    async def stop(self):
+        """Encerra o dispatcher e falha requisições pendentes"""
+        if self._worker:
+            self._worker.cancel()
+            await asyncio.gather(self._worker, return_exceptions=True)
+            self._worker = None
+
+        if self._queue:
+            while not self._queue.empty():
+                _, _, _, future, _ = self._queue.get_nowait()
+                if not future.done():
+                    future.set_exception(RuntimeError("STT batcher encerrado"))
+
+        if self._executor:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def get_stats(self) -> Dict:
+        """Retorna métricas de batching"""
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+            "max_batch_size_seen": self.max_batch_seen,
+            "avg_transcribe_ms": round(self.transcribe_ms_total / self.batches, 2) if self.batches else 0.0,
+            "avg_queue_wait_ms": round(self.wait_ms_total / self.items, 2) if self.items else 0.0,
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "errors": self.errors,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000
+        }
+
+    def _ensure_started(self):
+        """Inicia fila, thread e dispatcher no loop atual (lazy)"""
+        loop = asyncio.get_running_loop()
+        if self._worker and not self._worker.done() and self._loop is loop:
+            return
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="stt-batch")
+        self._worker = asyncio.create_task(self._dispatch_loop())
+
+    async def _collect_batch(self) -> List[Tuple[bytes, str, Optional[str], asyncio.Future, float]]:
+        """Aguarda o primeiro item e agrega outros até encher ou estourar o prazo"""
+        batch = [await self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _dispatch_loop(self):
+        """Loop principal: coleta lotes, transcreve na thread dedicada e resolve futures"""
+        while True:
+            batch = await self._collect_batch()
+            # O prompt do Whisper fixa o idioma: um lote por idioma
+            by_language: Dict[str, List] = {}
+            for item in batch:
+                by_language.setdefault(item[1], []).append(item)
+            for language, items in by_language.items():
+                await self._run_batch(language, items)
+
+    async def _run_batch(self, language: str, items: List[Tuple[bytes, str, Optional[str], asyncio.Future, float]]):
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        try:
+            results = await loop.run_in_executor(
+                self._executor,
+                self.transcribe_batch_fn,
+                [audio for audio, _, _, _, _ in items],
+                language,
+                [session_id for _, _, session_id, _, _ in items]
+            )
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"Erro ao transcrever lote de áudio ({len(items)} itens): {e}")
+            for _, _, _, future, _ in items:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        transcribe_ms = (time.perf_counter() - start) * 1000
+        for (_, _, _, future, enqueued_at), result in zip(items, results):
+            self.wait_ms_total += (start - enqueued_at) * 1000
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                self.errors += 1
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+        self.batches += 1
+        self.items += len(items)
+        self.max_batch_seen = max(self.max_batch_seen, len(items))
+        self.transcribe_ms_total += transcribe_ms
+        logger.debug(f"Lote de transcrição: {len(items)} áudios em {transcribe_ms:.0f}ms")
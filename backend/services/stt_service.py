@@ -1,18 +1,43 @@
 """
 Serviço de Speech-to-Text usando Faster Whisper
 """
+import asyncio
 import io
+import threading
 import time
-from typing import Tuple
+from collections import Counter
+from types import SimpleNamespace
+from typing import Dict, List, Optional, Tuple, Union
 from loguru import logger
 import soundfile as sf
 import numpy as np
 
-try:
-    from faster_whisper import WhisperModel
-except ImportError:
+from backend.core.lazy_import import lazy_import, module_available
+from backend.services.audio_decoder import AudioInput, DecodedAudio
+from backend.services.observability import get_metrics_registry
+from backend.services.stt_batcher import STTBatcher
+from backend.services.stt_session_profile import (
+    DEFAULT_VAD_MIN_DURATION,
+    DEFAULT_VAD_PARAMETERS,
+    STTProfileStore,
+    STTSessionProfile,
+    measure_levels,
+)
+
+STT_CASCADE = "jonh_stt_cascade_total"
+STT_ESCALATIONS = "jonh_stt_escalations_total"
+STT_ESCALATION_RATIO = "jonh_stt_escalation_ratio"
+
+# Janela fixa do encoder do Whisper: áudios até aqui cabem num único forward em lote
+BATCH_MAX_SECONDS = 30.0
+
+# Import adiado para o carregamento do modelo (evita segundos no startup)
+faster_whisper = lazy_import("faster_whisper")
+whisper_audio = lazy_import("faster_whisper.audio")
+whisper_tokenizer = lazy_import("faster_whisper.tokenizer")
+WHISPER_AVAILABLE = module_available("faster_whisper")
+if not WHISPER_AVAILABLE:
     logger.warning("faster-whisper não disponível, usando fallback")
-    WhisperModel = None
 
 
 class WhisperSTTService:
@@ -22,48 +47,106 @@ class WhisperSTTService:
         self,
         model_size: str = "base",
         device: str = "cpu",
-        compute_type: str = "int8"
+        compute_type: str = "int8",
+        fast_model_size: Optional[str] = None,
+        cascade_max_duration: float = 4.0,
+        cascade_min_avg_logprob: float = -0.7,
+        cascade_max_no_speech_prob: float = 0.5,
+        batch_max_size: int = 1,
+        batch_max_wait_ms: float = 20.0,
+        profile_store: Optional[STTProfileStore] = None
     ):
         """
         Inicializa o serviço Whisper
         
+        Com fast_model_size, o serviço opera em cascata: áudios curtos vão
+        primeiro para o modelo rápido e só são retranscritos pelo modelo
+        principal quando o resultado é pouco confiável.
+        
         Args:
             model_size: Tamanho do modelo (tiny, base, small, medium, large, large-v2, large-v3)
             device: Dispositivo (cpu, cuda)
             compute_type: Tipo de computação (int8, float16, float32)
+            fast_model_size: Modelo rápido da cascata (None = sem cascata)
+            cascade_max_duration: Áudios mais longos (s) vão direto ao modelo principal
+            cascade_min_avg_logprob: Log-prob média abaixo disso escala para o principal
+            cascade_max_no_speech_prob: Prob. de "sem fala" acima disso escala para o principal
+            batch_max_size: Áudios por lote em transcribe_audio_async (1 = sem batching)
+            batch_max_wait_ms: Espera máxima para completar um lote
+            profile_store: Perfis acústicos por sessão (None = sem contexto entre turnos)
         """
         self.model_size = model_size
         self.device = device
         self.compute_type = compute_type
         self.model = None
+        self.fast_model_size = fast_model_size if fast_model_size != model_size else None
+        self.fast_model = None
+        self.cascade_max_duration = cascade_max_duration
+        self.cascade_min_avg_logprob = cascade_min_avg_logprob
+        self.cascade_max_no_speech_prob = cascade_max_no_speech_prob
+        self._load_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._routes: Counter = Counter()
+        self._escalation_reasons: Counter = Counter()
+        self.batch_max_size = max(1, batch_max_size)
+        self.batch_max_wait_ms = batch_max_wait_ms
+        self._batcher: Optional[STTBatcher] = None
+        self._batch_supported = True
+        self.profiles = profile_store
         
-        logger.info(f"Inicializando Whisper STT: model={model_size}, device={device}")
+        if self.fast_model_size:
+            logger.info(
+                f"Inicializando Whisper STT em cascata: {self.fast_model_size} -> {model_size}, device={device}"
+            )
+        else:
+            logger.info(f"Inicializando Whisper STT: model={model_size}, device={device}")
         
     def _load_model(self):
         """Carrega o modelo Whisper (lazy loading)"""
         if self.model is None:
-            if WhisperModel is None:
-                raise RuntimeError("faster-whisper não está instalado")
-            
-            logger.info("Carregando modelo Whisper...")
-            self.model = WhisperModel(
-                self.model_size,
+            self._create_model("model", self.model_size)
+    
+    def _load_fast_model(self):
+        """Carrega o modelo rápido da cascata (lazy loading)"""
+        if self.fast_model is None:
+            self._create_model("fast_model", self.fast_model_size)
+    
+    def _create_model(self, attr: str, model_size: str):
+        """Carrega o modelo e o atribui a self.<attr> dentro do lock (um único carregamento)"""
+        if not WHISPER_AVAILABLE:
+            raise RuntimeError("faster-whisper não está instalado")
+        
+        with self._load_lock:  # Warmup e requisição podem chegar juntos
+            if getattr(self, attr) is not None:
+                return
+            logger.info(f"Carregando modelo Whisper {model_size}...")
+            model = faster_whisper.WhisperModel(
+                model_size,
                 device=self.device,
                 compute_type=self.compute_type
             )
-            logger.info("Modelo Whisper carregado com sucesso")
+            setattr(self, attr, model)
+            logger.info(f"Modelo Whisper {model_size} carregado com sucesso")
+    
+    def load_models(self):
+        """Carrega todos os modelos (ambos ficam residentes na cascata)"""
+        if self.fast_model_size:
+            self._load_fast_model()
+        self._load_model()
     
     def transcribe_audio(
         self,
-        audio_data: bytes,
-        language: str = "pt"
+        audio_data: AudioInput,
+        language: str = "pt",
+        session_id: Optional[str] = None
     ) -> Tuple[str, float, float]:
         """
         Transcreve áudio para texto
         
         Args:
-            audio_data: Dados do áudio em bytes
+            audio_data: Dados do áudio em bytes (ou já decodificado)
             language: Código do idioma (pt, en, etc)
+            session_id: Sessão do áudio (usa e atualiza o perfil acústico dela)
             
         Returns:
             Tupla (texto, confiança, duração)
@@ -71,108 +154,462 @@ class WhisperSTTService:
         try:
             start_time = time.time()
             
-            # Carrega modelo se necessário
-            self._load_model()
-            
             # Converte bytes para array numpy
             audio_array, sample_rate = self._bytes_to_audio(audio_data)
             
             # Calcula duração
             duracao = len(audio_array) / sample_rate
             
-            # Transcreve
-            logger.info(f"Transcrevendo áudio ({duracao:.2f}s)...")
-            
-            # Configurações de transcrição
-            # Desabilita VAD filter para áudios curtos (pode estar cortando fala)
-            use_vad = duracao > 1.0
-            
-            # Otimização: reduz beam_size de 5 para 3 (mais rápido, qualidade similar)
-            # Desabilita VAD para áudios < 2s (melhor para comandos curtos)
-            beam_size = 3  # Reduzido de 5 para melhor performance
-            use_vad_optimized = duracao > 2.0  # Aumentado threshold de 1.0s para 2.0s
+            profile = self._get_profile(session_id, language)
+            texto, confianca = self._transcribe_array(audio_array, language, duracao, start_time, profile)
+            self._update_profile(profile, texto, audio_array, sample_rate)
+            return texto, confianca, duracao
             
-            segments, info = self.model.transcribe(
-                audio_array,
-                language=language,
-                beam_size=beam_size,
-                vad_filter=use_vad_optimized,
-                vad_parameters=dict(
-                    min_silence_duration_ms=500,
-                    threshold=0.5
-                ) if use_vad_optimized else None
+        except Exception as e:
+            logger.error(f"Erro na transcrição: {e}")
+            raise
+    
+    def _transcribe_array(
+        self,
+        audio_array: np.ndarray,
+        language: str,
+        duracao: float,
+        start_time: float,
+        profile: Optional[STTSessionProfile] = None
+    ) -> Tuple[str, float]:
+        """Transcreve um áudio já decodificado (com cascata, se habilitada)"""
+        # Transcreve
+        logger.info(f"Transcrevendo áudio ({duracao:.2f}s)...")
+        
+        route = "direct"
+        reason = None
+        if self.fast_model_size and duracao <= self.cascade_max_duration:
+            # Cascata: modelo rápido primeiro, principal só se a confiança for baixa
+            self._load_fast_model()
+            texto_completo, segmentos_lista, info = self._run_model(
+                self.fast_model, audio_array, language, duracao, profile
             )
-            
-            # Extrai texto dos segmentos
-            segmentos_lista = list(segments)
-            logger.debug(f"📊 Segmentos detectados: {len(segmentos_lista)}")
-            
+            route = "fast"
+            reason = self._escalation_reason(texto_completo, segmentos_lista)
+            if reason:
+                logger.info(f"⬆️ Escalando transcrição para {self.model_size} ({reason})")
+                route = "escalated"
+        if route != "fast":
+            self._load_model()
+            texto_completo, segmentos_lista, info = self._run_model(
+                self.model, audio_array, language, duracao, profile
+            )
+        if self.fast_model_size:
+            self._record_route(route, reason)
+        
+        # Calcula confiança média
+        confianca = info.language_probability
+        
+        tempo_processamento = time.time() - start_time
+        
+        # Log detalhado
+        if texto_completo.strip():
+            logger.info(
+                f"✅ Transcrição concluída em {tempo_processamento:.2f}s: '{texto_completo[:100]}' "
+                f"(confiança: {confianca:.2f}, segmentos: {len(segmentos_lista)}, rota: {route})"
+            )
+        else:
+            logger.warning(
+                f"⚠️ Transcrição vazia em {tempo_processamento:.2f}s "
+                f"(confiança: {confianca:.2f}, segmentos: {len(segmentos_lista)}, duração: {duracao:.2f}s)"
+            )
+            # Log informações adicionais para debug
             if len(segmentos_lista) > 0:
-                for i, seg in enumerate(segmentos_lista):
-                    logger.debug(f"  Segmento {i+1}: '{seg.text}' (confiança: {seg.no_speech_prob:.2f}, tempo: {seg.start:.2f}-{seg.end:.2f}s)")
-            
-            texto_completo = " ".join([segment.text for segment in segmentos_lista])
-            
-            # Calcula confiança média
-            confianca = info.language_probability
+                logger.debug(f"   Primeiro segmento: no_speech_prob={segmentos_lista[0].no_speech_prob:.2f}")
+        
+        return texto_completo.strip(), confianca
+    
+    async def transcribe_audio_async(
+        self,
+        audio_data: AudioInput,
+        language: str = "pt",
+        session_id: Optional[str] = None
+    ) -> Tuple[str, float, float]:
+        """
+        Transcreve sem bloquear o event loop (com micro-batching se habilitado)
+        
+        Áudios de requisições concorrentes são agrupados pelo STTBatcher e
+        transcritos num único forward em lote.
+        
+        Args:
+            audio_data: Dados do áudio em bytes (ou já decodificado)
+            language: Código do idioma (pt, en, etc)
+            session_id: Sessão do áudio (perfil acústico)
             
-            tempo_processamento = time.time() - start_time
+        Returns:
+            Tupla (texto, confiança, duração)
+        """
+        if self.batch_max_size <= 1:
+            return await asyncio.to_thread(self.transcribe_audio, audio_data, language, session_id)
+        if self._batcher is None:
+            self._batcher = STTBatcher(
+                self.transcribe_batch,
+                max_batch_size=self.batch_max_size,
+                max_wait_ms=self.batch_max_wait_ms
+            )
+        return await self._batcher.transcribe(audio_data, language, session_id)
+    
+    def get_batcher_stats(self) -> Dict:
+        """Retorna métricas do micro-batching (tamanho médio de lote, fila)"""
+        if self._batcher is None:
+            return {"enabled": False}
+        return {"enabled": True, **self._batcher.get_stats()}
+    
+    async def stop_batcher(self):
+        """Encerra o micro-batching (chamar no shutdown)"""
+        if self._batcher is not None:
+            await self._batcher.stop()
+    
+    def transcribe_batch(
+        self,
+        audios: List[AudioInput],
+        language: str = "pt",
+        session_ids: Optional[List[Optional[str]]] = None
+    ) -> List[Union[Tuple[str, float, float], Exception]]:
+        """
+        Transcreve vários áudios num único forward em lote por modelo
+        
+        Cada áudio é estendido à janela de 30s do encoder e o lote inteiro é
+        decodificado de uma vez (beam search em lote do CTranslate2). Só entram
+        no lote áudios que a transcrição individual rodaria sem VAD (curtos,
+        pelo limite do perfil da sessão): o lote não aplica VAD nem o fallback
+        de temperatura. Os demais, um lote de um item ou versões do
+        faster-whisper sem a API de lote usam a transcrição individual.
+        
+        Args:
+            audios: Dados de cada áudio em bytes (ou já decodificado)
+            language: Código do idioma (o mesmo para todo o lote)
+            session_ids: Sessão de cada áudio (None = sem perfil)
             
-            # Log detalhado
-            if texto_completo.strip():
+        Returns:
+            Lista, na mesma ordem, com (texto, confiança, duração) ou a
+            exceção de cada áudio
+        """
+        session_ids = session_ids or [None] * len(audios)
+        if len(audios) == 1:
+            try:
+                return [self.transcribe_audio(audios[0], language, session_ids[0])]
+            except Exception as e:
+                return [e]
+        
+        start_time = time.time()
+        results: List = [None] * len(audios)
+        decoded: Dict[int, Tuple[np.ndarray, float]] = {}
+        sample_rates: Dict[int, int] = {}
+        for i, audio_data in enumerate(audios):
+            try:
+                audio_array, sample_rate = self._bytes_to_audio(audio_data)
+                decoded[i] = (audio_array, len(audio_array) / sample_rate)
+                sample_rates[i] = sample_rate
+            except Exception as e:
+                results[i] = e
+        profiles = {i: self._get_profile(session_ids[i], language) for i in decoded}
+        
+        batchable = [
+            i for i, (_, duracao) in decoded.items()
+            if duracao <= BATCH_MAX_SECONDS and not self._vad_options(duracao, profiles[i])["vad_filter"]
+        ]
+        if len(batchable) > 1 and self._batch_supported:
+            try:
+                for i, (texto, confianca) in self._transcribe_batched(decoded, batchable, language, profiles).items():
+                    results[i] = (texto, confianca, decoded[i][1])
                 logger.info(
-                    f"✅ Transcrição concluída em {tempo_processamento:.2f}s: '{texto_completo[:100]}' "
-                    f"(confiança: {confianca:.2f}, segmentos: {len(segmentos_lista)})"
-                )
-            else:
-                logger.warning(
-                    f"⚠️ Transcrição vazia em {tempo_processamento:.2f}s "
-                    f"(confiança: {confianca:.2f}, segmentos: {len(segmentos_lista)}, duração: {duracao:.2f}s)"
+                    f"✅ Lote de {len(batchable)} transcrições concluído em {time.time() - start_time:.2f}s"
                 )
-                # Log informações adicionais para debug
-                if len(segmentos_lista) > 0:
-                    logger.debug(f"   Primeiro segmento: no_speech_prob={segmentos_lista[0].no_speech_prob:.2f}")
-            
-            return texto_completo.strip(), confianca, duracao
-            
-        except Exception as e:
-            logger.error(f"Erro na transcrição: {e}")
-            raise
+            except (AttributeError, TypeError) as e:
+                # API interna do faster-whisper mudou: segue com transcrição individual
+                self._batch_supported = False
+                logger.warning(f"⚠️ Transcrição em lote indisponível ({e}), usando transcrição individual")
+        
+        for i, (audio_array, duracao) in decoded.items():
+            if results[i] is not None:
+                continue
+            try:
+                texto, confianca = self._transcribe_array(audio_array, language, duracao, time.time(), profiles[i])
+                results[i] = (texto, confianca, duracao)
+            except Exception as e:
+                logger.error(f"Erro na transcrição: {e}")
+                results[i] = e
+        
+        for i, (audio_array, _) in decoded.items():
+            if not isinstance(results[i], Exception):
+                self._update_profile(profiles[i], results[i][0], audio_array, sample_rates[i])
+        return results
+    
+    def _transcribe_batched(
+        self,
+        decoded: Dict[int, Tuple[np.ndarray, float]],
+        indices: List[int],
+        language: str,
+        profiles: Dict[int, Optional[STTSessionProfile]]
+    ) -> Dict[int, Tuple[str, float]]:
+        """Cascata em lote: lote no modelo rápido, escaladas + diretas num lote do principal"""
+        def items(ids: List[int]) -> List[Tuple[np.ndarray, float, Optional[str]]]:
+            return [
+                (*decoded[i], profiles[i].initial_prompt() if profiles[i] else None)
+                for i in ids
+            ]
+        
+        outputs: Dict[int, Tuple[str, List]] = {}
+        routes: Dict[int, Tuple[str, Optional[str]]] = {}
+        
+        fast_ids = [
+            i for i in indices
+            if self.fast_model_size and decoded[i][1] <= self.cascade_max_duration
+        ]
+        main_ids = [i for i in indices if i not in fast_ids]
+        if fast_ids:
+            self._load_fast_model()
+            batch = self._run_model_batch(self.fast_model, items(fast_ids), language)
+            for i, (texto, segmentos) in zip(fast_ids, batch):
+                reason = self._escalation_reason(texto, segmentos)
+                routes[i] = ("escalated", reason) if reason else ("fast", None)
+                if reason:
+                    main_ids.append(i)
+                else:
+                    outputs[i] = (texto, segmentos)
+        if main_ids:
+            self._load_model()
+            batch = self._run_model_batch(self.model, items(main_ids), language)
+            for i, output in zip(main_ids, batch):
+                outputs[i] = output
+                routes.setdefault(i, ("direct", None))
+        
+        if self.fast_model_size:
+            for route, reason in routes.values():
+                self._record_route(route, reason)
+        # Com o idioma fixo no prompt, a probabilidade do idioma é 1 (como no transcribe)
+        return {i: (texto.strip(), 1.0) for i, (texto, _) in outputs.items()}
+    
+    def _run_model_batch(
+        self,
+        model,
+        items: List[Tuple[np.ndarray, float, Optional[str]]],
+        language: str
+    ) -> List[Tuple[str, List]]:
+        """
+        Decodifica vários áudios (<= 30s) num único encode + generate em lote
+        
+        Args:
+            items: (áudio, duração, initial_prompt) de cada áudio; o prompt
+                entra como tokens anteriores, como no transcribe individual
+        
+        Returns:
+            Lista de (texto, segmentos) com um segmento por áudio contendo
+            avg_logprob e no_speech_prob (usados pela cascata)
+        """
+        extractor = model.feature_extractor
+        features = np.stack([
+            whisper_audio.pad_or_trim(extractor(audio_array)[:, :extractor.nb_max_frames])
+            for audio_array, _, _ in items
+        ])
+        tokenizer = whisper_tokenizer.Tokenizer(
+            model.hf_tokenizer,
+            model.model.is_multilingual,
+            task="transcribe",
+            language=language
+        )
+        prompts = [
+            model.get_prompt(
+                tokenizer,
+                previous_tokens=tokenizer.encode(" " + initial_prompt) if initial_prompt else [],
+                without_timestamps=True
+            )
+            for _, _, initial_prompt in items
+        ]
+        
+        encoder_output = model.encode(features)
+        generated = model.model.generate(
+            encoder_output,
+            prompts,
+            beam_size=3,
+            max_length=getattr(model, "max_length", 448),
+            return_scores=True,
+            return_no_speech_prob=True,
+            suppress_blank=True,
+            suppress_tokens=[-1]
+        )
+        
+        outputs = []
+        for (_, duracao, _), result in zip(items, generated):
+            tokens = [token for token in result.sequences_ids[0] if token < tokenizer.eot]
+            texto = tokenizer.decode(tokens).strip()
+            # Score do CTranslate2 é a log-prob normalizada pelo comprimento (como no faster-whisper)
+            avg_logprob = result.scores[0] * len(tokens) / (len(tokens) + 1)
+            segmentos = [SimpleNamespace(
+                text=texto,
+                start=0.0,
+                end=duracao,
+                avg_logprob=avg_logprob,
+                no_speech_prob=result.no_speech_prob
+            )] if texto else []
+            outputs.append((texto, segmentos))
+        return outputs
     
-    def _bytes_to_audio(self, audio_data: bytes) -> Tuple[np.ndarray, int]:
+    def _run_model(
+        self,
+        model,
+        audio_array: np.ndarray,
+        language: str,
+        duracao: float,
+        profile: Optional[STTSessionProfile] = None
+    ) -> Tuple[str, List, object]:
+        """
+        Executa um modelo Whisper sobre o áudio
+        
+        Returns:
+            Tupla (texto, segmentos, info)
+        """
+        # Otimização: reduz beam_size de 5 para 3 (mais rápido, qualidade similar)
+        beam_size = 3  # Reduzido de 5 para melhor performance
+        segments, info = model.transcribe(
+            audio_array,
+            language=language,
+            beam_size=beam_size,
+            **self._vad_options(duracao, profile)
+        )
+        
+        # Extrai texto dos segmentos
+        segmentos_lista = list(segments)
+        logger.debug(f"📊 Segmentos detectados: {len(segmentos_lista)}")
+        
+        if len(segmentos_lista) > 0:
+            for i, seg in enumerate(segmentos_lista):
+                logger.debug(f"  Segmento {i+1}: '{seg.text}' (confiança: {seg.no_speech_prob:.2f}, tempo: {seg.start:.2f}-{seg.end:.2f}s)")
+        
+        return " ".join([segment.text for segment in segmentos_lista]), segmentos_lista, info
+    
+    def _vad_options(self, duracao: float, profile: Optional[STTSessionProfile]) -> Dict:
+        """Opções de VAD (e prompt da sessão) da transcrição individual"""
+        if profile is not None:
+            # VAD ajustado ao ruído da sessão + transcrição anterior como prompt
+            return profile.decode_options(duracao)
+        # Desabilita VAD para áudios < 2s (melhor para comandos curtos)
+        use_vad_optimized = duracao > DEFAULT_VAD_MIN_DURATION
+        return {
+            "vad_filter": use_vad_optimized,
+            "vad_parameters": DEFAULT_VAD_PARAMETERS if use_vad_optimized else None
+        }
+    
+    def _get_profile(self, session_id: Optional[str], language: str) -> Optional[STTSessionProfile]:
+        """Perfil acústico da sessão (None sem sessão ou com perfis desabilitados)"""
+        if self.profiles is None:
+            return None
+        return self.profiles.get(session_id, language)
+    
+    def _update_profile(
+        self,
+        profile: Optional[STTSessionProfile],
+        texto: str,
+        audio_array: np.ndarray,
+        sample_rate: int
+    ):
+        """Guarda a transcrição e os níveis de ruído do turno no perfil da sessão"""
+        if profile is not None:
+            profile.update(texto, measure_levels(audio_array, sample_rate))
+    
+    def forget_session(self, session_id: str):
+        """Descarta o perfil acústico de uma sessão encerrada"""
+        if self.profiles is not None:
+            self.profiles.discard(session_id)
+    
+    def get_profile_stats(self) -> Dict:
+        """Retorna quantos perfis de sessão estão em memória"""
+        if self.profiles is None:
+            return {"enabled": False}
+        return {"enabled": True, **self.profiles.get_stats()}
+    
+    def _escalation_reason(self, texto: str, segmentos: List) -> Optional[str]:
+        """
+        Decide se a transcrição do modelo rápido precisa do modelo principal
+        
+        Returns:
+            Motivo da escalada (empty, low_logprob, no_speech) ou None
+        """
+        if not segmentos or not texto.strip():
+            return "empty"
+        
+        # Médias ponderadas pela duração de cada segmento
+        weights = [max(seg.end - seg.start, 0.01) for seg in segmentos]
+        total = sum(weights)
+        avg_logprob = sum(seg.avg_logprob * w for seg, w in zip(segmentos, weights)) / total
+        no_speech_prob = sum(seg.no_speech_prob * w for seg, w in zip(segmentos, weights)) / total
+        
+        if avg_logprob < self.cascade_min_avg_logprob:
+            return "low_logprob"
+        if no_speech_prob > self.cascade_max_no_speech_prob:
+            return "no_speech"
+        return None
+    
+    def _record_route(self, route: str, reason: Optional[str]):
+        """Contabiliza a rota da cascata e exporta a taxa de escalada"""
+        with self._stats_lock:
+            self._routes[route] += 1
+            if reason:
+                self._escalation_reasons[reason] += 1
+            cascaded = self._routes["fast"] + self._routes["escalated"]
+            rate = self._routes["escalated"] / cascaded if cascaded else 0.0
+        
+        registry = get_metrics_registry()
+        registry.inc(STT_CASCADE, labels={"route": route})
+        if reason:
+            registry.inc(STT_ESCALATIONS, labels={"reason": reason})
+        registry.set_gauge(STT_ESCALATION_RATIO, rate)
+    
+    def get_cascade_stats(self) -> Dict:
+        """Retorna rotas da cascata e taxa de escalada para o modelo principal"""
+        if not self.fast_model_size:
+            return {"enabled": False}
+        with self._stats_lock:
+            cascaded = self._routes["fast"] + self._routes["escalated"]
+            return {
+                "enabled": True,
+                "fast_model": self.fast_model_size,
+                "model": self.model_size,
+                "routes": dict(self._routes),
+                "escalation_reasons": dict(self._escalation_reasons),
+                "escalation_rate": round(self._routes["escalated"] / cascaded, 3) if cascaded else 0.0
+            }
+    
+    def _bytes_to_audio(self, audio_data: AudioInput) -> Tuple[np.ndarray, int]:
         """
         Converte bytes de áudio para array numpy
         
         Args:
-            audio_data: Dados do áudio em bytes
+            audio_data: Dados do áudio em bytes, ou DecodedAudio (upload já
+                decodificado em streaming, usado sem cópia)
             
         Returns:
-            Tupla (array numpy, sample rate)
+            Tupla (array numpy float32 mono, sample rate)
         """
         try:
-            # Log detalhado do áudio recebido
-            logger.debug(f"📊 Áudio recebido: {len(audio_data)} bytes")
-            
-            # Tenta ler como arquivo de áudio
-            audio_io = io.BytesIO(audio_data)
-            audio_array, sample_rate = sf.read(audio_io)
-            
-            # Log informações do áudio
-            logger.info(f"📊 Áudio decodificado: shape={audio_array.shape}, sample_rate={sample_rate}Hz, dtype={audio_array.dtype}")
-            
-            # Converte para mono se necessário
-            if len(audio_array.shape) > 1:
-                logger.debug(f"📊 Convertendo de {audio_array.shape[1]} canais para mono")
-                audio_array = audio_array.mean(axis=1)
-            
-            # Converte para float32
-            audio_array = audio_array.astype(np.float32)
+            if isinstance(audio_data, DecodedAudio):
+                audio_array, sample_rate = audio_data.samples, audio_data.sample_rate
+                logger.info(f"📊 Áudio pré-decodificado: shape={audio_array.shape}, sample_rate={sample_rate}Hz")
+            else:
+                # Log detalhado do áudio recebido
+                logger.debug(f"📊 Áudio recebido: {len(audio_data)} bytes")
+                
+                # Tenta ler como arquivo de áudio (direto em float32, sem passar por float64)
+                audio_io = io.BytesIO(audio_data)
+                audio_array, sample_rate = sf.read(audio_io, dtype="float32")
+                
+                # Log informações do áudio
+                logger.info(f"📊 Áudio decodificado: shape={audio_array.shape}, sample_rate={sample_rate}Hz, dtype={audio_array.dtype}")
+                
+                # Converte para mono se necessário
+                if len(audio_array.shape) > 1:
+                    logger.debug(f"📊 Convertendo de {audio_array.shape[1]} canais para mono")
+                    audio_array = audio_array.mean(axis=1, dtype=np.float32)
             
             # Calcula estatísticas do áudio
             duration = len(audio_array) / sample_rate
-            max_amplitude = np.abs(audio_array).max()
-            mean_amplitude = np.abs(audio_array).mean()
-            rms = np.sqrt(np.mean(audio_array**2))
+            max_amplitude, mean_amplitude, rms = self._audio_stats(audio_array)
             
             logger.info(
                 f"📊 Estatísticas do áudio: "
@@ -200,10 +637,30 @@ class WhisperSTTService:
             logger.debug(traceback.format_exc())
             raise ValueError(f"Formato de áudio inválido: {e}")
     
+    @staticmethod
+    def _audio_stats(audio_array: np.ndarray, block: int = 1 << 16) -> Tuple[float, float, float]:
+        """Amplitude máxima, média e RMS em blocos (sem cópias do áudio inteiro)"""
+        if len(audio_array) == 0:
+            return 0.0, 0.0, 0.0
+        max_amplitude = max(float(audio_array.max()), -float(audio_array.min()))
+        abs_sum = 0.0
+        for start in range(0, len(audio_array), block):
+            abs_sum += float(np.abs(audio_array[start:start + block]).sum(dtype=np.float64))
+        rms = float(np.linalg.norm(audio_array)) / np.sqrt(len(audio_array))
+        return max_amplitude, abs_sum / len(audio_array), rms
+    
+    def is_available(self) -> bool:
+        """Verifica se o Whisper pode ser carregado (sem carregar o modelo)"""
+        return WHISPER_AVAILABLE
+    
+    def is_loaded(self) -> bool:
+        """Verifica se o modelo já está em memória"""
+        return self.model is not None
+    
     def is_ready(self) -> bool:
         """Verifica se o serviço está pronto"""
         try:
-            if WhisperModel is None:
+            if not WHISPER_AVAILABLE:
                 logger.warning("faster-whisper não está instalado")
                 return False
             self._load_model()
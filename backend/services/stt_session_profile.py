@@ -0,0 +1,193 @@
+"""
+Perfil acústico por sessão para o STT
+
+Turnos seguintes de uma mesma conversa reaproveitam o que já se sabe da
+sessão: o idioma (sem detecção), a transcrição do turno anterior como
+initial_prompt (contexto para o decoder, menos retries por temperatura) e o
+nível de ruído medido nos áudios anteriores, do qual saem os parâmetros do
+VAD. As opções de decodificação ficam em cache e só são recalculadas quando
+o regime de ruído da sessão muda.
+"""
+import math
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+# Parâmetros de VAD padrão (sessão sem histórico ou sem perfil)
+DEFAULT_VAD_PARAMETERS = {"min_silence_duration_ms": 500, "threshold": 0.5}
+DEFAULT_VAD_MIN_DURATION = 2.0
+
+# Regimes de ruído: (SNR mínimo em dB, limiar do VAD, silêncio mínimo, duração mínima para VAD)
+_NOISY = (None, 0.65, 700, 1.0)  # Ruído alto: VAD mais rígido e em áudios mais curtos
+_NORMAL = (10.0, 0.5, 500, DEFAULT_VAD_MIN_DURATION)
+_CLEAN = (25.0, 0.35, 400, 4.0)  # Ambiente limpo: VAD mais sensível e só em áudios longos
+
+_FRAME_SECONDS = 0.03
+_LEVEL_SMOOTHING = 0.3  # Peso da medição nova na média móvel
+
+
+def measure_levels(audio_array: np.ndarray, sample_rate: int) -> Optional[Tuple[float, float]]:
+    """
+    Mede o piso de ruído e o nível de fala de um áudio
+
+    Args:
+        audio_array: Amostras float32 mono
+        sample_rate: Taxa de amostragem
+
+    Returns:
+        (RMS do ruído, RMS da fala) pelos percentis 10 e 90 do RMS por
+        janela de 30ms, ou None se o áudio for curto demais
+    """
+    frame = max(1, int(sample_rate * _FRAME_SECONDS))
+    frames = len(audio_array) // frame
+    if frames < 4:
+        return None
+    windows = audio_array[:frames * frame].reshape(frames, frame)
+    rms = np.sqrt(np.mean(np.square(windows, dtype=np.float64), axis=1))
+    return float(np.percentile(rms, 10)), float(np.percentile(rms, 90))
+
+
+@dataclass
+class STTSessionProfile:
+    """Contexto acústico e opções de decodificação de uma sessão"""
+    session_id: str
+    language: str = "pt"
+    prompt_max_chars: int = 200
+    last_transcript: str = ""
+    noise_floor: Optional[float] = None
+    speech_level: Optional[float] = None
+    turns: int = 0
+    last_used: float = field(default_factory=time.monotonic)
+    _regime: Tuple = field(default=_NORMAL, repr=False)
+    _vad_parameters: Dict[str, Any] = field(default_factory=lambda: dict(DEFAULT_VAD_PARAMETERS), repr=False)
+
+    @property
+    def snr_db(self) -> Optional[float]:
+        """Relação sinal-ruído média da sessão (dB)"""
+        if self.noise_floor is None or self.speech_level is None:
+            return None
+        return 20 * math.log10(max(self.speech_level, 1e-6) / max(self.noise_floor, 1e-6))
+
+    def initial_prompt(self) -> Optional[str]:
+        """Final da transcrição anterior (o Whisper usa só o contexto mais recente)"""
+        if not self.last_transcript:
+            return None
+        text = self.last_transcript[-self.prompt_max_chars:]
+        if len(self.last_transcript) > self.prompt_max_chars and " " in text:
+            text = text.split(" ", 1)[1]  # Não começa no meio de uma palavra
+        return text
+
+    def decode_options(self, duracao: float) -> Dict[str, Any]:
+        """
+        Opções de transcribe para um áudio desta sessão
+
+        Returns:
+            Dict com vad_filter, vad_parameters (dict em cache) e initial_prompt
+        """
+        use_vad = duracao > self._regime[3]
+        return {
+            "vad_filter": use_vad,
+            "vad_parameters": self._vad_parameters if use_vad else None,
+            "initial_prompt": self.initial_prompt()
+        }
+
+    def update(self, transcript: str, levels: Optional[Tuple[float, float]] = None):
+        """
+        Registra um turno transcrito
+
+        Args:
+            transcript: Texto transcrito (vazio não substitui o prompt)
+            levels: (ruído, fala) medidos no áudio do turno
+        """
+        self.turns += 1
+        self.last_used = time.monotonic()
+        if transcript and transcript.strip():
+            self.last_transcript = transcript.strip()
+        if levels is not None:
+            noise, speech = levels
+            if self.noise_floor is None:
+                self.noise_floor, self.speech_level = noise, speech
+            else:
+                self.noise_floor += _LEVEL_SMOOTHING * (noise - self.noise_floor)
+                self.speech_level += _LEVEL_SMOOTHING * (speech - self.speech_level)
+            self._update_regime()
+
+    def _update_regime(self):
+        snr = self.snr_db
+        if snr >= _CLEAN[0]:
+            regime = _CLEAN
+        elif snr >= _NORMAL[0]:
+            regime = _NORMAL
+        else:
+            regime = _NOISY
+        if regime is not self._regime:
+            self._regime = regime
+            self._vad_parameters = {"min_silence_duration_ms": regime[2], "threshold": regime[1]}
+
+    def to_dict(self) -> Dict[str, Any]:
+        snr = self.snr_db
+        return {
+            "session_id": self.session_id,
+            "language": self.language,
+            "turns": self.turns,
+            "has_prompt": bool(self.last_transcript),
+            "noise_floor": round(self.noise_floor, 5) if self.noise_floor is not None else None,
+            "snr_db": round(snr, 1) if snr is not None else None,
+            "vad_parameters": dict(self._vad_parameters),
+            "vad_min_duration": self._regime[3]
+        }
+
+
+class STTProfileStore:
+    """Perfis por sessão com expiração por inatividade e limite de sessões (LRU)"""
+
+    def __init__(self, max_sessions: int = 1000, ttl: float = 3600.0, prompt_max_chars: int = 200):
+        """
+        Inicializa o armazenamento
+
+        Args:
+            max_sessions: Máximo de perfis em memória (remove os menos recentes)
+            ttl: Inatividade (s) após a qual o perfil é descartado
+            prompt_max_chars: Tamanho máximo do initial_prompt
+        """
+        self.max_sessions = max(1, max_sessions)
+        self.ttl = ttl
+        self.prompt_max_chars = prompt_max_chars
+        self._profiles: "OrderedDict[str, STTSessionProfile]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_id: Optional[str], language: str = "pt") -> Optional[STTSessionProfile]:
+        """
+        Perfil da sessão (criado no primeiro uso)
+
+        Returns:
+            None se não houver sessão
+        """
+        if not session_id:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            profile = self._profiles.get(session_id)
+            if profile is not None and (now - profile.last_used > self.ttl or profile.language != language):
+                profile = None  # Expirado ou outro idioma: recomeça
+            if profile is None:
+                profile = STTSessionProfile(session_id, language=language, prompt_max_chars=self.prompt_max_chars)
+                self._profiles[session_id] = profile
+            self._profiles.move_to_end(session_id)
+            profile.last_used = now
+            while len(self._profiles) > self.max_sessions:
+                self._profiles.popitem(last=False)
+            return profile
+
+    def discard(self, session_id: str):
+        """Remove o perfil de uma sessão encerrada"""
+        with self._lock:
+            self._profiles.pop(session_id, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"sessions": len(self._profiles), "max_sessions": self.max_sessions}
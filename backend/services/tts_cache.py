@@ -109,5 +109,5 @@ class TTSCache:
         
         logger.info(f"Pré-aquecendo cache com {len(phrases)} frases...")
         # Nota: Pré-aquecimento real requer síntese, então isso é apenas preparação
-        # O pré-aquecimento real deve ser feito chamando synthesize() para cada frase
+        # O pré-aquecimento real é feito por PiperTTSService.prewarm() (phrase store em disco)
 
@@ -0,0 +1,264 @@
+"""
+Armazenamento em disco de sínteses TTS por frase (endereçado por conteúdo)
+
+Cada sentença sintetizada é salva como um WAV PCM em disco, com chave
+derivada de (sentença normalizada, voz, versão do modelo). Um índice em
+memória mantém a ordem LRU e o total de bytes; ao exceder o orçamento, os
+segmentos menos usados são removidos. Respostas longas são montadas
+concatenando os segmentos PCM de cada sentença.
+"""
+import hashlib
+import io
+import os
+import re
+import threading
+import unicodedata
+import wave
+from collections import Counter, OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+from loguru import logger
+
+from backend.services.tts_streaming import split_sentences
+
+
+def normalize_phrase(texto: str) -> str:
+    """
+    Normaliza uma sentença para uso como chave
+
+    Args:
+        texto: Sentença original
+
+    Returns:
+        Sentença em NFC, minúscula e com espaços colapsados
+    """
+    texto = unicodedata.normalize("NFC", texto)
+    return re.sub(r"\s+", " ", texto).strip().lower()
+
+
+def concat_wav(segments: List[bytes], gap_ms: int = 0) -> bytes:
+    """
+    Concatena segmentos WAV PCM com os mesmos parâmetros em um único WAV
+
+    Args:
+        segments: Lista de WAVs (mesmo sample rate, canais e largura)
+        gap_ms: Silêncio inserido entre segmentos (ms)
+
+    Returns:
+        Bytes do WAV resultante
+
+    Raises:
+        ValueError: Se os segmentos tiverem formatos diferentes
+    """
+    if len(segments) == 1:
+        return segments[0]
+
+    params = None
+    frames = []
+    for segment in segments:
+        with wave.open(io.BytesIO(segment), "rb") as wav:
+            current = (wav.getnchannels(), wav.getsampwidth(), wav.getframerate())
+            if params is None:
+                params = current
+            elif current != params:
+                raise ValueError(f"Formatos WAV incompatíveis: {current} != {params}")
+            frames.append(wav.readframes(wav.getnframes()))
+
+    channels, sampwidth, framerate = params
+    silence = b"\x00" * (int(framerate * gap_ms / 1000) * channels * sampwidth)
+
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as out:
+        out.setnchannels(channels)
+        out.setsampwidth(sampwidth)
+        out.setframerate(framerate)
+        out.writeframes(silence.join(frames))
+    return buffer.getvalue()
+
+
+def mine_top_phrases(
+    responses: Iterable[str],
+    top_n: int = 30,
+    min_count: int = 2,
+    min_chars: int = 20
+) -> List[str]:
+    """
+    Extrai as sentenças mais frequentes de respostas do assistente
+
+    Args:
+        responses: Respostas completas (ex: tabela conversations)
+        top_n: Número de frases a retornar
+        min_count: Ocorrências mínimas para uma frase ser considerada
+        min_chars: Tamanho mínimo de sentença
+
+    Returns:
+        Frases mais frequentes (forma original da primeira ocorrência)
+    """
+    counts: Counter = Counter()
+    originals: Dict[str, str] = {}
+    for response in responses:
+        if not response:
+            continue
+        for sentence in split_sentences(response, min_chars=min_chars):
+            key = normalize_phrase(sentence)
+            counts[key] += 1
+            originals.setdefault(key, sentence)
+
+    return [
+        originals[key]
+        for key, count in counts.most_common(top_n)
+        if count >= min_count
+    ]
+
+
+class TTSPhraseStore:
+    """Store de segmentos WAV por frase com índice LRU e orçamento em bytes"""
+
+    def __init__(self, root_dir: str, max_bytes: int = 256 * 1024 * 1024, model_version: str = "1"):
+        """
+        Inicializa o store e reconstrói o índice a partir do disco
+
+        Args:
+            root_dir: Diretório dos segmentos
+            max_bytes: Orçamento total em bytes
+            model_version: Versão do modelo/processadores (muda a chave)
+        """
+        self.root_dir = Path(root_dir)
+        self.root_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.model_version = model_version
+        self._index: "OrderedDict[str, int]" = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._load_index()
+        logger.info(
+            f"TTS phrase store: {len(self._index)} segmentos, "
+            f"{self._total_bytes / 1024 / 1024:.1f}MB / {max_bytes / 1024 / 1024:.0f}MB"
+        )
+
+    def make_key(self, texto: str, voice: str) -> str:
+        """
+        Gera a chave de conteúdo de uma frase
+
+        Args:
+            texto: Sentença
+            voice: Identificador da voz/engine
+
+        Returns:
+            Hash SHA-256 hexadecimal
+        """
+        material = f"{self.model_version}\0{voice}\0{normalize_phrase(texto)}"
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def get(self, texto: str, voice: str) -> Optional[bytes]:
+        """
+        Obtém o WAV de uma frase
+
+        Args:
+            texto: Sentença
+            voice: Identificador da voz/engine
+
+        Returns:
+            Bytes do WAV ou None se não armazenado
+        """
+        key = self.make_key(texto, voice)
+        with self._lock:
+            if key not in self._index:
+                self.misses += 1
+                return None
+            self._index.move_to_end(key)
+
+        path = self._path(key)
+        try:
+            audio = path.read_bytes()
+            # Atualiza mtime para preservar a ordem LRU entre reinícios
+            os.utime(path)
+        except FileNotFoundError:
+            # Removido externamente: corrige o índice
+            with self._lock:
+                self._total_bytes -= self._index.pop(key, 0)
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        return audio
+
+    def contains(self, texto: str, voice: str) -> bool:
+        """Verifica se a frase está armazenada (sem alterar LRU)"""
+        with self._lock:
+            return self.make_key(texto, voice) in self._index
+
+    def put(self, texto: str, voice: str, audio: bytes):
+        """
+        Armazena o WAV de uma frase (somente WAV PCM)
+
+        Args:
+            texto: Sentença
+            voice: Identificador da voz/engine
+            audio: Bytes do WAV
+        """
+        if not audio.startswith(b"RIFF") or len(audio) > self.max_bytes:
+            return
+
+        key = self.make_key(texto, voice)
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Escrita atômica: arquivo temporário + rename
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_bytes(audio)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self._total_bytes -= self._index.pop(key, 0)
+            self._index[key] = len(audio)
+            self._total_bytes += len(audio)
+            evicted = self._evict_locked()
+
+        for old_key in evicted:
+            self._path(old_key).unlink(missing_ok=True)
+
+    def get_stats(self) -> Dict:
+        """Retorna estatísticas do store"""
+        total = self.hits + self.misses
+        return {
+            "segments": len(self._index),
+            "bytes": self._total_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            "evictions": self.evictions
+        }
+
+    def _evict_locked(self) -> List[str]:
+        """Remove entradas LRU até caber no orçamento (chamar com lock)"""
+        evicted = []
+        while self._total_bytes > self.max_bytes and self._index:
+            key, size = self._index.popitem(last=False)
+            self._total_bytes -= size
+            self.evictions += 1
+            evicted.append(key)
+        return evicted
+
+    def _path(self, key: str) -> Path:
+        """Caminho do segmento (subdiretório pelos 2 primeiros caracteres)"""
+        return self.root_dir / key[:2] / f"{key}.wav"
+
+    def _load_index(self):
+        """Reconstrói o índice a partir do disco (ordem LRU pelo mtime)"""
+        entries = []
+        for path in self.root_dir.glob("*/*.wav"):
+            stat = path.stat()
+            entries.append((stat.st_mtime, path.stem, stat.st_size))
+
+        for _, key, size in sorted(entries):
+            self._index[key] = size
+            self._total_bytes += size
+
+        for key in self._evict_locked():
+            self._path(key).unlink(missing_ok=True)
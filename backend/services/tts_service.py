@@ -2,12 +2,16 @@
 Serviço de Text-to-Speech usando Piper TTS com fallback para edge-tts
 Fase 2: Integração com processadores de texto profissionais
 """
+import asyncio
 import io
 import time
-from typing import Optional
+from pathlib import Path
+from typing import List, Optional, Tuple
 from loguru import logger
 
 from backend.config.settings import settings
+from backend.services.tts_streaming import split_sentences
+from backend.services.tts_phrase_store import TTSPhraseStore, concat_wav
 
 # Tenta importar módulos novos (Fase 2)
 try:
@@ -30,6 +34,8 @@ try:
 except ImportError:
     logger.warning("edge-tts não disponível")
 
+EDGE_TTS_VOICE = "pt-BR-AntonioNeural"
+
 
 class PiperTTSService:
     """
@@ -47,7 +53,9 @@ class PiperTTSService:
         model_path: Optional[str] = None,
         enable_cache: bool = True,
         cache_size: int = 100,
-        cache_ttl: int = 3600
+        cache_ttl: int = 3600,
+        phrase_store: Optional[TTSPhraseStore] = None,
+        phrase_workers: int = 2
     ):
         """
         Inicializa o serviço TTS
@@ -58,7 +66,12 @@ class PiperTTSService:
             enable_cache: Habilita cache de sínteses
             cache_size: Tamanho do cache
             cache_ttl: TTL do cache em segundos
+            phrase_store: Store em disco de sínteses por frase (opcional)
+            phrase_workers: Sentenças sintetizadas ao mesmo tempo por resposta
         """
+        self.phrase_store = phrase_store
+        self.phrase_workers = max(1, phrase_workers)
+        
         # Inicializa cache TTS
         self.cache = None
         if enable_cache:
@@ -110,25 +123,129 @@ class PiperTTSService:
         """
         Sintetiza texto em áudio (método assíncrono)
         
+        Com phrase store habilitado, a resposta é montada concatenando o áudio
+        de cada sentença (sentenças já sintetizadas vêm do disco). O cache em
+        memória do texto completo é consultado antes.
+        
         Args:
             texto: Texto para converter em voz
             
         Returns:
             Bytes do áudio WAV gerado
         """
+        if self.phrase_store:
+            try:
+                return await self._synthesize_by_phrase(texto)
+            except Exception as e:
+                logger.warning(f"⚠️ Síntese por frase falhou, sintetizando texto completo: {e}")
+        return await self._synthesize_text(texto)
+    
+    async def prewarm(self, phrases: List[str]) -> int:
+        """
+        Sintetiza frases frequentes que ainda não estão no phrase store
+        
+        Args:
+            phrases: Frases a pré-sintetizar
+            
+        Returns:
+            Número de frases sintetizadas
+        """
+        voice = self._voice_id()
+        if not self.phrase_store or not voice:
+            return 0
+        
+        synthesized = 0
+        for phrase in phrases:
+            if self.phrase_store.contains(phrase, voice):
+                continue
+            try:
+                await self._get_or_synthesize_phrase(phrase, voice)
+                synthesized += 1
+            except Exception as e:
+                logger.debug(f"Erro ao pré-aquecer frase '{phrase[:30]}...': {e}")
+        return synthesized
+    
+    async def _synthesize_by_phrase(self, texto: str) -> bytes:
+        """Monta o áudio a partir dos segmentos de cada sentença"""
+        voice = self._voice_id()
+        sentences = split_sentences(texto, min_chars=1)
+        if not voice or not sentences:
+            return await self._synthesize_text(texto)
+        
+        texto_processado = self._process_text(texto)
+        if self.cache:
+            cached_audio = self.cache.get(texto_processado)
+            if cached_audio:
+                return cached_audio
+        
+        # Limita as sínteses simultâneas (uma resposta longa não abre N requisições à engine)
+        semaphore = asyncio.Semaphore(self.phrase_workers)
+        
+        async def bounded(sentence: str) -> bytes:
+            async with semaphore:
+                return await self._get_or_synthesize_phrase(sentence, voice)
+        
+        segments = await asyncio.gather(*(bounded(sentence) for sentence in sentences))
+        audio = concat_wav(list(segments))
+        if self.cache:
+            self.cache.set(texto_processado, audio)
+        return audio
+    
+    async def _get_or_synthesize_phrase(self, sentence: str, voice: str) -> bytes:
+        """Busca a sentença no phrase store ou sintetiza e armazena (disco fora do event loop)"""
+        audio = await asyncio.to_thread(self.phrase_store.get, sentence, voice)
+        if audio:
+            return audio
+        
+        audio, engine_voice = await self._synthesize_engine(self._process_text(sentence))
+        # Só armazena se a engine usada é a da chave (evita gravar fallback com voz errada)
+        if engine_voice == voice:
+            await asyncio.to_thread(self.phrase_store.put, sentence, voice, audio)
+        return audio
+    
+    def _voice_id(self) -> Optional[str]:
+        """Identificador da voz/engine ativa (parte da chave do phrase store)"""
+        if self.piper_service and self.piper_service.is_ready():
+            return f"piper:{Path(settings.tts_model_path).stem}"
+        if EdgeTTSAvailable:
+            return f"edge:{EDGE_TTS_VOICE}"
+        return None
+    
+    def _process_text(self, texto: str) -> str:
+        """Aplica normalização, dicionário de pronúncia e SSML (Fase 2)"""
+        texto_processado = texto
+        if self.text_processor:
+            texto_processado = self.text_processor.process(texto_processado)
+        
+        if self.pronunciation_dict:
+            texto_processado = self.pronunciation_dict.apply(texto_processado)
+        
+        if self.ssml_processor:
+            texto_processado = self.ssml_processor.process(texto_processado)
+        return texto_processado
+    
+    async def _synthesize_engine(self, texto_processado: str) -> Tuple[bytes, Optional[str]]:
+        """
+        Sintetiza com a melhor engine disponível
+        
+        Returns:
+            Tupla (áudio, id da voz usada ou None para mock)
+        """
+        if self.piper_service and self.piper_service.is_ready():
+            audio_bytes = await self.piper_service.synthesize(texto_processado)
+            return audio_bytes, f"piper:{Path(settings.tts_model_path).stem}"
+        if EdgeTTSAvailable:
+            audio_bytes = await self._synthesize_edge_tts(texto_processado, fallback_mock=False)
+            return audio_bytes, f"edge:{EDGE_TTS_VOICE}"
+        return self._synthesize_mock(texto_processado), None
+    
+    async def _synthesize_text(self, texto: str) -> bytes:
+        """Sintetiza o texto completo (cache em memória + engine)"""
         try:
             start_time = time.time()
             
             # Processar texto (Fase 2)
-            texto_processado = texto
-            if self.text_processor:
-                texto_processado = self.text_processor.process(texto_processado)
-            
-            if self.pronunciation_dict:
-                texto_processado = self.pronunciation_dict.apply(texto_processado)
-            
-            if self.ssml_processor:
-                texto_processado = self.ssml_processor.process(texto_processado)
+            texto_processado = self._process_text(texto)
             
             # Verifica cache com texto processado
             if self.cache:
@@ -140,15 +257,8 @@ class PiperTTSService:
             
             logger.info(f"Sintetizando texto: '{texto[:50]}...'")
             
-            # Usar Piper TTS se disponível
-            if self.piper_service and self.piper_service.is_ready():
-                audio_bytes = await self.piper_service.synthesize(texto_processado)
-            elif EdgeTTSAvailable:
-                # Fallback para edge-tts
-                audio_bytes = await self._synthesize_edge_tts(texto_processado)
-            else:
-                # Fallback para mock
-                audio_bytes = self._synthesize_mock(texto_processado)
+            # Usar Piper TTS se disponível (fallback edge-tts e mock)
+            audio_bytes, _ = await self._synthesize_engine(texto_processado)
             
             tempo_processamento = time.time() - start_time
             logger.info(f"Síntese concluída em {tempo_processamento:.2f}s ({len(audio_bytes)} bytes)")
@@ -169,35 +279,47 @@ class PiperTTSService:
                     logger.error(f"Erro no edge-tts: {e2}")
             return self._synthesize_mock(texto)
     
-    async def _synthesize_edge_tts(self, texto: str) -> bytes:
-        """Síntese usando edge-tts (fallback)"""
-        import edge_tts
+    async def _synthesize_edge_tts(self, texto: str, fallback_mock: bool = True) -> bytes:
+        """
+        Síntese usando edge-tts (fallback)
         
-        voice = "pt-BR-AntonioNeural"
+        Args:
+            texto: Texto a sintetizar
+            fallback_mock: Se False, propaga erros em vez de retornar silêncio
+        """
+        import edge_tts
         
         try:
-            communicate = edge_tts.Communicate(texto, voice)
-            audio_data = b""
+            communicate = edge_tts.Communicate(texto, EDGE_TTS_VOICE)
+            # Acumula em lista e junta no final (concatenação de bytes é quadrática)
+            chunks = []
             async for chunk in communicate.stream():
                 if chunk["type"] == "audio":
-                    audio_data += chunk["data"]
+                    chunks.append(chunk["data"])
+            audio_data = b"".join(chunks)
             
-            # Converte MP3 para WAV
+            # Converte MP3 para WAV (fora do event loop: pydub chama ffmpeg)
             try:
-                from pydub import AudioSegment
-                audio_segment = AudioSegment.from_mp3(io.BytesIO(audio_data))
-                audio_segment = audio_segment.set_frame_rate(22050).set_channels(1)
-                buffer = io.BytesIO()
-                audio_segment.export(buffer, format="wav")
-                buffer.seek(0)
-                return buffer.read()
+                return await asyncio.to_thread(self._mp3_to_wav, audio_data)
             except ImportError:
                 logger.warning("pydub não disponível, retornando MP3")
                 return audio_data
         except Exception as e:
             logger.error(f"Erro no edge-tts: {e}")
+            if not fallback_mock:
+                raise
             return self._synthesize_mock(texto)
     
+    @staticmethod
+    def _mp3_to_wav(audio_data: bytes) -> bytes:
+        """Converte MP3 para WAV mono 22050Hz"""
+        from pydub import AudioSegment
+        audio_segment = AudioSegment.from_mp3(io.BytesIO(audio_data))
+        audio_segment = audio_segment.set_frame_rate(22050).set_channels(1)
+        buffer = io.BytesIO()
+        audio_segment.export(buffer, format="wav")
+        return buffer.getvalue()
+    
     def _synthesize_mock(self, texto: str) -> bytes:
         """Síntese mock (silêncio)"""
         import wave
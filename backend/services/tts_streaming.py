@@ -0,0 +1,203 @@
+"""
+Síntese TTS em streaming por sentença
+
+Divide o texto do LLM em sentenças conforme os tokens chegam e sintetiza
+cada sentença de forma concorrente (pool limitado), entregando o áudio em
+ordem assim que cada sentença fica pronta. O tempo até o primeiro áudio
+passa a ser a síntese de uma sentença, não da resposta inteira.
+"""
+import asyncio
+import re
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import AsyncIterator, Deque, List, Optional
+from loguru import logger
+
+
+# Fim de sentença: pontuação final seguida de espaço, ou quebra de linha
+_SENTENCE_END = re.compile(r"(?<=[.!?…;])\s+|\n+")
+
+
+@dataclass
+class SentenceAudio:
+    """Áudio sintetizado de uma sentença"""
+    index: int
+    text: str
+    audio: bytes
+    synthesis_ms: float
+
+
+class SentenceSplitter:
+    """Acumula tokens e libera sentenças completas"""
+
+    def __init__(self, min_chars: int = 20):
+        """
+        Inicializa o splitter
+
+        Args:
+            min_chars: Tamanho mínimo de uma sentença; trechos menores são
+                agrupados com a próxima (evita sínteses minúsculas como "Olá.")
+        """
+        self.min_chars = min_chars
+        self._buffer = ""
+
+    def feed(self, token: str) -> List[str]:
+        """
+        Adiciona um token e retorna as sentenças completas
+
+        Args:
+            token: Trecho de texto recebido do LLM
+
+        Returns:
+            Lista de sentenças prontas (pode ser vazia)
+        """
+        self._buffer += token
+        sentences = []
+        start = 0
+        for match in _SENTENCE_END.finditer(self._buffer):
+            candidate = self._buffer[start:match.start()].strip()
+            if len(candidate) >= self.min_chars:
+                sentences.append(candidate)
+                start = match.end()
+        self._buffer = self._buffer[start:]
+        return sentences
+
+    def flush(self) -> Optional[str]:
+        """
+        Libera o texto restante no buffer
+
+        Returns:
+            Última sentença ou None se buffer vazio
+        """
+        remainder = self._buffer.strip()
+        self._buffer = ""
+        return remainder or None
+
+
+def split_sentences(texto: str, min_chars: int = 20) -> List[str]:
+    """
+    Divide um texto completo em sentenças
+
+    Args:
+        texto: Texto completo
+        min_chars: Tamanho mínimo de sentença
+
+    Returns:
+        Lista de sentenças na ordem original
+    """
+    splitter = SentenceSplitter(min_chars=min_chars)
+    sentences = splitter.feed(texto)
+    remainder = splitter.flush()
+    if remainder:
+        sentences.append(remainder)
+    return sentences
+
+
+class SentenceTTSStream:
+    """
+    Pipeline de síntese por sentença com entrega ordenada
+
+    Uso:
+        stream = SentenceTTSStream(tts_service)
+        async for token in llm_stream:
+            stream.feed(token)
+            for segment in stream.pop_ready():
+                ...  # envia áudio
+        stream.finish()
+        async for segment in stream.drain():
+            ...
+    """
+
+    def __init__(self, tts_service, max_workers: int = 2, min_chars: int = 20):
+        """
+        Inicializa o pipeline
+
+        Args:
+            tts_service: Serviço com método assíncrono synthesize(texto) -> bytes
+            max_workers: Máximo de sínteses simultâneas
+            min_chars: Tamanho mínimo de sentença
+        """
+        self.tts_service = tts_service
+        self.splitter = SentenceSplitter(min_chars=min_chars)
+        self._semaphore = asyncio.Semaphore(max(1, max_workers))
+        self._pending: Deque[asyncio.Task] = deque()
+        self._next_index = 0
+        self._started_at = time.perf_counter()
+        self.first_audio_ms: Optional[float] = None
+
+    def feed(self, token: str):
+        """
+        Adiciona texto e agenda síntese das sentenças completas
+
+        Args:
+            token: Trecho de texto do LLM
+        """
+        for sentence in self.splitter.feed(token):
+            self._schedule(sentence)
+
+    def finish(self):
+        """Agenda síntese do texto restante (chamar ao fim do stream do LLM)"""
+        remainder = self.splitter.flush()
+        if remainder:
+            self._schedule(remainder)
+
+    def pop_ready(self) -> List[SentenceAudio]:
+        """
+        Retorna, sem bloquear, os segmentos já prontos em ordem
+
+        Returns:
+            Segmentos concluídos no início da fila
+        """
+        ready = []
+        while self._pending and self._pending[0].done():
+            segment = self._pending.popleft().result()
+            if segment:
+                ready.append(self._mark_delivered(segment))
+        return ready
+
+    async def drain(self) -> AsyncIterator[SentenceAudio]:
+        """
+        Aguarda e entrega todos os segmentos pendentes em ordem
+
+        Yields:
+            Segmentos de áudio na ordem das sentenças
+        """
+        while self._pending:
+            segment = await self._pending.popleft()
+            if segment:
+                yield self._mark_delivered(segment)
+
+    def cancel(self):
+        """Cancela sínteses pendentes (ex: cliente desconectou)"""
+        while self._pending:
+            self._pending.popleft().cancel()
+
+    def _schedule(self, sentence: str):
+        """Cria task de síntese para uma sentença"""
+        index = self._next_index
+        self._next_index += 1
+        self._pending.append(asyncio.create_task(self._synthesize(index, sentence)))
+
+    async def _synthesize(self, index: int, sentence: str) -> Optional[SentenceAudio]:
+        """Sintetiza uma sentença respeitando o limite de workers"""
+        async with self._semaphore:
+            start = time.perf_counter()
+            try:
+                audio = await self.tts_service.synthesize(sentence)
+            except Exception as e:
+                logger.warning(f"⚠️ Falha ao sintetizar sentença {index}: {e}")
+                return None
+            return SentenceAudio(
+                index=index,
+                text=sentence,
+                audio=audio,
+                synthesis_ms=(time.perf_counter() - start) * 1000
+            )
+
+    def _mark_delivered(self, segment: SentenceAudio) -> SentenceAudio:
+        """Registra tempo até o primeiro áudio"""
+        if self.first_audio_ms is None:
+            self.first_audio_ms = (time.perf_counter() - self._started_at) * 1000
+            logger.debug(f"🔊 Primeiro áudio em {self.first_audio_ms:.0f}ms")
+        return segment
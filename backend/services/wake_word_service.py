@@ -7,13 +7,13 @@ from typing import Dict, Optional, List, Tuple
 from loguru import logger
 import threading
 
-try:
-    from openwakeword import Model as OWWModel
-    OWW_AVAILABLE = True
-except ImportError:
+from backend.core.lazy_import import lazy_import, module_available
+
+# Import adiado para o carregamento do modelo (evita segundos no startup)
+openwakeword = lazy_import("openwakeword")
+OWW_AVAILABLE = module_available("openwakeword")
+if not OWW_AVAILABLE:
     logger.warning("openwakeword não disponível, usando fallback")
-    OWWModel = None
-    OWW_AVAILABLE = False
 
 
 class OpenWakeWordService:
@@ -56,10 +56,22 @@ class OpenWakeWordService:
             f"framework={inference_framework}, threshold={threshold}"
         )
     
+    def load(self) -> bool:
+        """
+        Carrega o modelo (bloqueante; idempotente e thread-safe)
+        
+        Returns:
+            True se o modelo está disponível (False sem openwakeword instalado)
+        """
+        if not OWW_AVAILABLE:
+            return False
+        self._load_model()
+        return True
+    
     def _load_model(self):
         """Carrega o modelo OpenWakeWord (lazy loading)"""
         if self.oww_model is None:
-            if not OWW_AVAILABLE or OWWModel is None:
+            if not OWW_AVAILABLE:
                 raise RuntimeError("openwakeword não está instalado. Execute: pip install openwakeword")
             
             with self._lock:
@@ -83,7 +95,7 @@ class OpenWakeWordService:
                         
                         # Inicializa modelo
                         # Se lista vazia, passa None para carregar todos os modelos pré-treinados
-                        self.oww_model = OWWModel(
+                        self.oww_model = openwakeword.Model(
                             wakeword_models=wakeword_models_list if wakeword_models_list else None,
                             inference_framework=self.inference_framework
                         )
@@ -113,7 +125,7 @@ class OpenWakeWordService:
         Returns:
             Dict com {wake_word: (detectado, confianca)}
         """
-        if not OWW_AVAILABLE or OWWModel is None:
+        if not OWW_AVAILABLE:
             raise RuntimeError("openwakeword não está instalado")
         
         self._load_model()
@@ -0,0 +1,25 @@
+"""
+Fixtures compartilhadas dos testes do backend
+"""
+import sys
+from pathlib import Path
+
+import pytest_asyncio
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.database.database import Database
+
+
+@pytest_asyncio.fixture
+async def db(request, tmp_path):
+    """
+    Banco SQLite em arquivo temporário (escritor WAL + pool de leitores)
+
+    O tamanho do pool vem de DB_READER_POOL_SIZE no módulo de teste (padrão: 1).
+    """
+    reader_pool_size = getattr(request.module, "DB_READER_POOL_SIZE", 1)
+    database = Database(str(tmp_path / "test.db"), reader_pool_size=reader_pool_size)
+    await database.connect()
+    yield database
+    await database.close()
@@ -0,0 +1,154 @@
+"""
+Testes da leitura de uploads de áudio em streaming
+"""
+import io
+import struct
+import sys
+import tracemalloc
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+import soundfile as sf
+from fastapi import HTTPException, UploadFile
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.api.utils.audio_upload import read_audio_upload
+from backend.api.validators import audio_validator
+from backend.services.audio_decoder import DecodedAudio, StreamingWavDecoder
+from backend.services.stt_service import WhisperSTTService
+
+
+def _signal(seconds: float, channels: int = 1, sample_rate: int = 16000) -> np.ndarray:
+    t = np.arange(int(sample_rate * seconds)) / sample_rate
+    mono = 0.5 * np.sin(2 * np.pi * 220 * t)
+    return np.stack([mono * (c + 1) / channels for c in range(channels)], axis=1)
+
+
+def _encode(samples: np.ndarray, subtype: str = "PCM_16", fmt: str = "WAV") -> bytes:
+    buffer = io.BytesIO()
+    sf.write(buffer, samples, 16000, subtype=subtype, format=fmt)
+    return buffer.getvalue()
+
+
+def _feed(data: bytes, chunk: int) -> DecodedAudio:
+    decoder = StreamingWavDecoder()
+    for start in range(0, len(data), chunk):
+        decoder.feed(data[start:start + chunk])
+    return decoder.finish()
+
+
+@pytest.mark.parametrize("subtype, channels", [("PCM_16", 1), ("PCM_16", 2), ("PCM_U8", 1), ("PCM_32", 2), ("FLOAT", 1)])
+def test_streaming_decoder_matches_soundfile(subtype, channels):
+    """Pedaços de tamanho ímpar (frames partidos) dão o mesmo áudio que o soundfile"""
+    data = _encode(_signal(1.0, channels), subtype)
+    expected, _ = sf.read(io.BytesIO(data), dtype="float32")
+    if expected.ndim > 1:
+        expected = expected.mean(axis=1)
+
+    decoded = _feed(data, chunk=1001)
+
+    assert decoded.sample_rate == 16000
+    assert decoded.samples.dtype == np.float32
+    assert len(decoded) == len(data)
+    np.testing.assert_allclose(decoded.samples, expected, atol=1e-4)
+
+
+def test_streaming_decoder_handles_unknown_size_and_trailing_chunks():
+    """Tamanho 0xFFFFFFFF (gravação em streaming) cresce o buffer; chunk LIST após 'data' é ignorado"""
+    pcm = (_signal(2.0)[:, 0] * 32767).astype("<i2").tobytes()
+    fmt = struct.pack("<HHIIHH", 1, 1, 16000, 32000, 2, 16)
+    data = b"RIFF" + struct.pack("<I", 0) + b"WAVE" + b"fmt " + struct.pack("<I", 16) + fmt
+    streaming = data + b"data" + struct.pack("<I", 0xFFFFFFFF) + pcm
+    assert len(_feed(streaming, 4096).samples) == 32000
+
+    sized = data + b"data" + struct.pack("<I", len(pcm)) + pcm + b"LIST" + struct.pack("<I", 4) + b"INFO"
+    assert len(_feed(sized, 4096).samples) == 32000
+
+
+def test_forged_data_size_does_not_preallocate_beyond_limit():
+    """Header declarando ~4 GB num upload de 2 KB não reserva gigabytes"""
+    fmt = struct.pack("<HHIIHH", 1, 1, 16000, 16000, 1, 8)
+    data = (
+        b"RIFF" + struct.pack("<I", 0) + b"WAVE" + b"fmt " + struct.pack("<I", 16) + fmt
+        + b"data" + struct.pack("<I", 0xFFFFFFFE) + bytes([128]) * 2048
+    )
+    decoder = StreamingWavDecoder(max_source_bytes=64 * 1024)
+    decoder.feed(data)
+
+    assert decoder._buffer.nbytes <= 4 * 64 * 1024
+    assert len(decoder.finish().samples) == 2048
+
+
+def _upload(data: bytes, filename: str) -> UploadFile:
+    return UploadFile(file=io.BytesIO(data), filename=filename)
+
+
+@pytest.mark.asyncio
+async def test_upload_is_decoded_without_full_copies():
+    """Pico de memória fica perto de 1x o áudio decodificado (sem bytes inteiros nem float64)"""
+    data = _encode(_signal(20.0))
+    upload = _upload(data, "fala.wav")
+
+    tracemalloc.start()
+    decoded = await read_audio_upload(upload)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert decoded.duration == pytest.approx(20.0)
+    assert peak < 1.3 * decoded.samples.nbytes
+
+
+@pytest.mark.asyncio
+async def test_size_limit_is_enforced_while_reading(monkeypatch):
+    """Upload grande é rejeitado no pedaço que estoura o limite, sem ler o resto"""
+    monkeypatch.setattr(audio_validator, "MAX_AUDIO_SIZE", 200 * 1024)
+    upload = _upload(_encode(_signal(30.0)), "longo.wav")
+    reads = 0
+    original_read = upload.read
+
+    async def counting_read(size=-1):
+        nonlocal reads
+        reads += 1
+        return await original_read(size)
+
+    monkeypatch.setattr(upload, "read", counting_read)
+    with pytest.raises(HTTPException) as exc:
+        await read_audio_upload(upload)
+    assert exc.value.status_code == 400
+    assert reads == 4  # 4 x 64KB > 200KB
+
+    with pytest.raises(HTTPException):
+        await read_audio_upload(_upload(b"RIFF", "curto.wav"))
+
+
+@pytest.mark.asyncio
+async def test_other_formats_fall_back_to_soundfile():
+    """FLAC (ou WAV comprimido) é decodificado pelo soundfile direto do arquivo"""
+    decoded = await read_audio_upload(_upload(_encode(_signal(1.0, 2), "PCM_16", "FLAC"), "fala.flac"))
+    assert decoded.samples.ndim == 1 and decoded.samples.dtype == np.float32
+    assert decoded.duration == pytest.approx(1.0)
+
+    with pytest.raises(HTTPException) as exc:
+        await read_audio_upload(_upload(b"x" * 500, "lixo.mp3"))
+    assert exc.value.status_code == 400
+
+
+def test_stt_uses_decoded_audio_directly():
+    """O STT aceita o áudio já decodificado no lugar dos bytes"""
+    decoded = _feed(_encode(_signal(1.0)), chunk=65536)
+    received = []
+
+    class Model:
+        def transcribe(self, audio, **kwargs):
+            received.append(audio)
+            segment = SimpleNamespace(text="olá", start=0.0, end=1.0, avg_logprob=-0.1, no_speech_prob=0.01)
+            return iter([segment]), SimpleNamespace(language_probability=0.9)
+
+    service = WhisperSTTService(model_size="base")
+    service.model = Model()
+
+    assert service.transcribe_audio(decoded) == ("olá", 0.9, 1.0)
+    assert received[0] is decoded.samples
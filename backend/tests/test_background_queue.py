@@ -0,0 +1,168 @@
+"""
+Testes da fila de trabalho em background e dos efeitos colaterais pós-resposta
+"""
+import asyncio
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.api.handlers.post_turn import enqueue_post_turn
+from backend.services import background_queue
+from backend.services.background_queue import BACKGROUND_JOBS, BackgroundWorkQueue
+from backend.services.observability import get_metrics_registry
+
+
+@pytest.mark.asyncio
+async def test_runs_coroutines_and_sync_functions_off_the_caller():
+    """submit não bloqueia; corrotinas rodam nos workers e funções síncronas numa thread"""
+    queue = BackgroundWorkQueue(workers=2)
+    done = []
+    main_thread = threading.get_ident()
+
+    async def job(value):
+        done.append(value)
+
+    def sync_job():
+        done.append(threading.get_ident() != main_thread)
+
+    assert queue.submit("a", job, 1)
+    assert queue.submit("b", sync_job)
+    assert done == []  # Nada executa antes de devolver o controle ao loop
+    await queue.stop()
+
+    assert sorted(map(str, done)) == ["1", "True"]
+    assert queue.get_stats()["completed"] == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_jobs_are_retried_with_backoff_then_given_up():
+    """Falha transitória é repetida; falha persistente desiste após max_retries"""
+    registry = get_metrics_registry()
+    failed_before = registry.counter(BACKGROUND_JOBS, {"job": "sempre_falha", "status": "failed"})
+    queue = BackgroundWorkQueue(max_retries=2, retry_backoff=0.001)
+    attempts = {"flaky": 0, "broken": 0}
+
+    async def flaky():
+        attempts["flaky"] += 1
+        if attempts["flaky"] < 3:
+            raise ConnectionError("banco ocupado")
+
+    async def broken():
+        attempts["broken"] += 1
+        raise ValueError("sempre")
+
+    queue.submit("instavel", flaky)
+    queue.submit("sempre_falha", broken)
+    queue.submit("sem_retry", broken, retries=0)
+    await queue.stop()
+
+    assert attempts == {"flaky": 3, "broken": 4}
+    stats = queue.get_stats()
+    assert (stats["completed"], stats["failed"], stats["retried"]) == (1, 2, 4)
+    assert registry.counter(BACKGROUND_JOBS, {"job": "sempre_falha", "status": "failed"}) == failed_before + 1
+
+
+@pytest.mark.asyncio
+async def test_full_queue_drops_instead_of_growing():
+    """Com a fila cheia, jobs novos são descartados e contabilizados"""
+    queue = BackgroundWorkQueue(max_size=2, workers=1)
+    release = asyncio.Event()
+
+    async def blocker():
+        await release.wait()
+
+    async def noop():
+        pass
+
+    assert queue.submit("bloqueia", blocker)
+    await asyncio.sleep(0)  # Worker pega o primeiro job
+    assert queue.submit("x", noop) and queue.submit("y", noop)
+    assert not queue.submit("z", noop)
+    assert queue.get_stats()["queue_depth"] == 2 and queue.get_stats()["dropped"] == 1
+
+    release.set()
+    await queue.stop()
+    assert queue.get_stats()["completed"] == 3
+
+
+@pytest.mark.asyncio
+async def test_stop_drains_pending_jobs_and_rejects_new_ones():
+    """Shutdown espera os jobs pendentes; depois disso submit é recusado"""
+    queue = BackgroundWorkQueue(workers=1)
+    done = []
+
+    async def slow(i):
+        await asyncio.sleep(0.01)
+        done.append(i)
+
+    for i in range(5):
+        queue.submit("lento", slow, i)
+    await queue.stop()
+
+    assert done == [0, 1, 2, 3, 4]
+    assert not queue.submit("tarde", slow, 5)
+
+
+class FakeMemory:
+    def __init__(self):
+        self.calls = []
+
+    async def extract_and_save_memory(self, user_message, assistant_response):
+        self.calls.append((user_message, assistant_response))
+        return []
+
+
+class FlakyFeedback:
+    def __init__(self):
+        self.attempts = 0
+
+    async def collect_conversation(self, **kwargs):
+        self.attempts += 1
+        if self.attempts == 1:
+            raise ConnectionError("database is locked")
+        return 42
+
+
+class FakeCache:
+    semantic_search = False
+
+    def __init__(self):
+        self.entries = []
+
+    def set(self, texto, resposta, tokens=0, embedding=None):
+        self.entries.append((texto, resposta, tokens))
+
+
+@pytest.mark.asyncio
+async def test_post_turn_side_effects_run_after_response(monkeypatch):
+    """Memórias, feedback (com retry) e captura saem do caminho da resposta"""
+    queue = BackgroundWorkQueue(retry_backoff=0.001)
+    monkeypatch.setattr(background_queue, "_background_queue", queue)
+    memory, feedback, cache = FakeMemory(), FlakyFeedback(), FakeCache()
+    captured = []
+
+    def capture():
+        captured.append(True)
+        raise IOError("disco cheio")
+
+    enqueue_post_turn(
+        "s1", "meu nome é João", "Prazer, João!",
+        memory_service=memory,
+        feedback_service=feedback,
+        tokens_used=10,
+        processing_time=0.5,
+        capture=capture,
+        response_cache=cache
+    )
+    assert memory.calls == [] and feedback.attempts == 0 and cache.entries == []
+    await queue.stop()
+
+    assert memory.calls == [("meu nome é João", "Prazer, João!")]
+    assert feedback.attempts == 2
+    assert cache.entries == [("meu nome é João", "Prazer, João!", 10)]
+    assert captured == [True]  # Captura não é repetida
+    assert queue.get_stats()["failed"] == 1
@@ -228,3 +228,100 @@ async def test_get_conversations_pagination(history_service, temp_db):
     # Verifica que são diferentes
     assert page1[0]["id"] != page2[0]["id"]
 
+
+
+@pytest.mark.asyncio
+async def test_save_conversation_appends_only_new_messages(history_service, temp_db):
+    """Salvar novamente anexa apenas as mensagens novas"""
+    await temp_db.connect()
+    
+    messages = [{"role": "user", "content": "M1"}, {"role": "assistant", "content": "R1"}]
+    conversation_id = await history_service.save_conversation("session-append", "T", messages)
+    
+    messages += [{"role": "user", "content": "M2"}, {"role": "assistant", "content": "R2"}]
+    await history_service.save_conversation("session-append", "T", messages)
+    
+    # Janela de contexto truncada: só as duas últimas + uma nova
+    await history_service.save_conversation(
+        "session-append", "T", messages[-2:] + [{"role": "user", "content": "M3"}]
+    )
+    
+    conversation = await history_service.get_conversation_by_id(conversation_id)
+    assert [m["content"] for m in conversation["messages"]] == ["M1", "R1", "M2", "R2", "M3"]
+    assert conversation["message_count"] == 5
+
+
+@pytest.mark.asyncio
+async def test_get_conversation_paged_messages(history_service, temp_db):
+    """Mensagens podem ser carregadas em páginas por seq"""
+    await temp_db.connect()
+    
+    messages = [{"role": "user", "content": f"M{i}"} for i in range(5)]
+    conversation_id = await history_service.save_conversation("session-paged", "T", messages)
+    
+    page1 = await history_service.get_conversation_by_id(conversation_id, messages_limit=2)
+    assert [m["content"] for m in page1["messages"]] == ["M0", "M1"]
+    assert page1["next_seq"] == 1
+    
+    page3 = await history_service.get_conversation_by_id(conversation_id, messages_limit=2, after_seq=3)
+    assert [m["content"] for m in page3["messages"]] == ["M4"]
+    assert page3["next_seq"] is None
+    
+    meta = await history_service.get_conversation_by_id(conversation_id, messages_limit=0)
+    assert meta["messages"] == [] and meta["message_count"] == 5
+
+
+@pytest.mark.asyncio
+async def test_get_saved_conversations_keyset_cursor(history_service, temp_db):
+    """Paginação por cursor percorre todas as conversas sem repetir"""
+    from backend.services.conversation_history_service import encode_cursor
+    await temp_db.connect()
+    
+    for i in range(5):
+        await history_service.save_conversation(f"session-k{i}", f"C{i}", [{"role": "user", "content": "x"}])
+    
+    seen = []
+    cursor = None
+    while True:
+        page = await history_service.get_saved_conversations(limit=2, cursor=cursor)
+        seen.extend(conv["id"] for conv in page)
+        if len(page) < 2:
+            break
+        cursor = encode_cursor(page[-1]["created_at"], page[-1]["id"])
+    
+    assert len(seen) == 5
+    assert seen == sorted(seen, reverse=True)
+    
+    with pytest.raises(ValueError):
+        await history_service.get_saved_conversations(cursor="invalido")
+
+
+@pytest.mark.asyncio
+async def test_legacy_json_messages_are_migrated(temp_db):
+    """Conversas com blob JSON legado são migradas ao conectar"""
+    import aiosqlite
+    import json
+    async with aiosqlite.connect(str(temp_db.db_path)) as conn:
+        await conn.execute("""
+            CREATE TABLE saved_conversations (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                session_id TEXT NOT NULL UNIQUE,
+                title TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                messages TEXT NOT NULL,
+                saved BOOLEAN DEFAULT 1,
+                user_id TEXT
+            )
+        """)
+        await conn.execute(
+            "INSERT INTO saved_conversations (session_id, title, messages) VALUES (?, ?, ?)",
+            ("legacy", "Antiga", json.dumps([{"role": "user", "content": "a"}, {"role": "assistant", "content": "b"}]))
+        )
+        await conn.commit()
+    
+    await temp_db.connect()
+    service = ConversationHistoryService(temp_db)
+    conversation = await service.get_conversation_by_id(1)
+    assert [m["content"] for m in conversation["messages"]] == ["a", "b"]
+    assert conversation["message_count"] == 2
@@ -0,0 +1,96 @@
+"""
+Testes do log bufferizado de conversas (gravação em lote)
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.services.conversation_log import ConversationLog
+from backend.services.feedback_service import FeedbackService
+
+
+async def _count(db) -> int:
+    async with db.reader() as conn:
+        async with conn.execute("SELECT COUNT(*) FROM conversations") as cursor:
+            return (await cursor.fetchone())[0]
+
+
+@pytest.mark.asyncio
+async def test_ids_are_reserved_and_rows_written_in_batches(db, monkeypatch):
+    """IDs continuam a sequência existente; N registros disparam um único executemany"""
+    existing = await db.save_conversation("s0", "oi", "olá")
+    log = ConversationLog(db, batch_size=3, flush_interval_ms=60000)
+    service = FeedbackService(db, log)
+    batches = []
+    original = db.save_conversations
+
+    async def recording(rows):
+        batches.append(len(rows))
+        return await original(rows)
+
+    monkeypatch.setattr(db, "save_conversations", recording)
+
+    ids = [await service.collect_conversation("s1", f"pergunta {i}", f"resposta {i}") for i in range(3)]
+    assert ids == [existing + 1, existing + 2, existing + 3]
+    await asyncio.sleep(0.05)
+
+    assert batches == [3]
+    assert await _count(db) == 4
+    conversation = await db.get_conversation(ids[1])
+    assert conversation["user_input"] == "pergunta 1"
+    await log.stop()
+
+
+@pytest.mark.asyncio
+async def test_interval_flushes_partial_batch(db):
+    """Lote incompleto é gravado após flush_interval_ms"""
+    log = ConversationLog(db, batch_size=100, flush_interval_ms=20)
+    await log.append("s1", "oi", "olá")
+    assert await _count(db) == 0
+    await asyncio.sleep(0.1)
+    assert await _count(db) == 1
+    await log.stop()
+
+
+@pytest.mark.asyncio
+async def test_stop_flushes_pending_and_late_appends_write_through(db):
+    """Shutdown grava o buffer; appends depois disso vão direto ao banco"""
+    log = ConversationLog(db, batch_size=100, flush_interval_ms=60000)
+    for i in range(5):
+        await log.append("s1", f"p{i}", f"r{i}")
+    await log.stop()
+    assert await _count(db) == 5
+
+    await log.append("s1", "tarde", "ainda gravado")
+    assert await _count(db) == 6
+    assert log.get_stats()["dropped"] == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_is_retried_and_overflow_is_counted(db, monkeypatch):
+    """Lote com erro volta ao buffer; buffer cheio descarta os mais antigos"""
+    log = ConversationLog(db, batch_size=2, flush_interval_ms=60000, max_buffer=3)
+    original = db.save_conversations
+    fail = True
+
+    async def flaky(rows):
+        if fail:
+            raise ConnectionError("database is locked")
+        return await original(rows)
+
+    monkeypatch.setattr(db, "save_conversations", flaky)
+    ids = [await log.append("s1", f"p{i}", f"r{i}") for i in range(4)]
+    await asyncio.sleep(0.05)
+
+    stats = log.get_stats()
+    assert stats["flush_errors"] >= 1 and stats["buffered"] == 3 and stats["dropped"] == 1
+
+    fail = False
+    await log.stop()
+    assert await _count(db) == 3
+    assert await db.get_conversation(ids[0]) is None
+    assert (await db.get_conversation(ids[3]))["user_input"] == "p3"
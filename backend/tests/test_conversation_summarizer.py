@@ -0,0 +1,144 @@
+"""
+Testes da sumarização incremental de conversas
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.services.context_manager_db import ContextManagerDB
+from backend.services.conversation_summarizer import ConversationSummarizer
+from backend.services.llm.prompt_builder import PromptBuilder, PromptBudget, PromptReport
+from backend.services.privacy.privacy_mode_service import PrivacyModeService
+
+
+class FakeSummaryLLM:
+    """LLM de teste: devolve um resumo curto e registra os prompts recebidos"""
+
+    def __init__(self):
+        self.prompts = []
+
+    def generate_response(self, prompt, contexto=None, system_prompt_override=None, **kwargs):
+        self.prompts.append(prompt)
+        return f"resumo {len(self.prompts)}", 10
+
+
+async def _talk(manager: ContextManagerDB, session_id: str, turns: int, start: int = 0):
+    for i in range(start, start + turns):
+        await manager.add_message(session_id, "user", f"pergunta {i} " + "detalhe " * 30)
+        await manager.add_message(session_id, "assistant", f"resposta {i} " + "explicação " * 30)
+
+
+@pytest.mark.asyncio
+async def test_old_turns_folded_into_summary(db):
+    """Mensagens antigas viram resumo e o contexto fica limitado"""
+    llm = FakeSummaryLLM()
+    summarizer = ConversationSummarizer(db, llm, trigger_tokens=300, keep_recent_tokens=150)
+    manager = ContextManagerDB(db, max_history=10, summarizer=summarizer)
+    writer = ContextManagerDB(db)  # grava sem agendar sumarização (teste determinístico)
+    session_id = await manager.create_session()
+
+    await _talk(writer, session_id, 8)
+    assert await summarizer.summarize(session_id)
+
+    summary = await summarizer.get_summary(session_id)
+    assert summary["text"] == "resumo 1"
+    assert "pergunta 0" in llm.prompts[0]
+
+    context = await manager.get_context(session_id)
+    assert context[0] == {"role": "system", "content": "Resumo da conversa até aqui: resumo 1"}
+    assert context[-1]["content"].startswith("resposta 7")
+    assert all("pergunta 0 " not in m["content"] for m in context[1:])
+
+    # Segunda rodada parte do resumo anterior e só das mensagens novas
+    await _talk(writer, session_id, 8, start=8)
+    assert await summarizer.summarize(session_id)
+    assert "resumo 1" in llm.prompts[1]
+    assert "pergunta 0 " not in llm.prompts[1]
+    assert (await summarizer.get_summary(session_id))["folded_messages"] > summary["folded_messages"]
+
+
+@pytest.mark.asyncio
+async def test_privacy_mode_switched_at_runtime_keeps_summaries_local(db, monkeypatch):
+    """O LLM do resumo é resolvido a cada execução pelo modo privacidade"""
+    from backend.config import settings
+    monkeypatch.setattr(settings, "llm_router_enabled", False)
+    cloud, local = FakeSummaryLLM(), FakeSummaryLLM()
+    privacy = PrivacyModeService(groq_service=cloud, ollama_service=local)
+    summarizer = ConversationSummarizer(
+        db, cloud, trigger_tokens=300, keep_recent_tokens=150,
+        llm_resolver=privacy.get_active_llm_service
+    )
+    writer = ContextManagerDB(db)
+    session_id = await writer.create_session()
+    await _talk(writer, session_id, 8)
+
+    privacy.set_privacy_mode(True)
+    assert await summarizer.summarize(session_id)
+    assert cloud.prompts == [] and len(local.prompts) == 1
+
+
+@pytest.mark.asyncio
+async def test_below_threshold_keeps_raw_history(db):
+    """Sessões curtas não são resumidas"""
+    llm = FakeSummaryLLM()
+    summarizer = ConversationSummarizer(db, llm, trigger_tokens=5000)
+    manager = ContextManagerDB(db, summarizer=summarizer)
+    session_id = await manager.create_session()
+    await _talk(manager, session_id, 2)
+
+    assert not await summarizer.summarize(session_id)
+    assert llm.prompts == []
+    assert len(await manager.get_context(session_id)) == 4
+
+
+@pytest.mark.asyncio
+async def test_background_schedule_and_metadata_merge(db):
+    """Tarefa em background grava o resumo sem apagar outras chaves do metadata"""
+    summarizer = ConversationSummarizer(db, FakeSummaryLLM(), trigger_tokens=300, keep_recent_tokens=150)
+    manager = ContextManagerDB(db, summarizer=summarizer)
+    session_id = await manager.create_session()
+    await manager.set_location(session_id, -23.5, -46.6)
+
+    await _talk(manager, session_id, 8)
+    for _ in range(100):
+        if not summarizer.get_stats()["active_tasks"]:
+            break
+        await asyncio.sleep(0.01)
+    assert summarizer.get_stats()["runs"] >= 1
+
+    session = await db.get_session(session_id)
+    assert session["metadata"]["location"]["latitude"] == -23.5
+    assert session["metadata"]["summary"]["text"]
+
+    await manager.clear_session(session_id)
+    assert await summarizer.get_summary(session_id) is None
+    assert (await db.get_session(session_id))["metadata"]["location"]
+
+
+@pytest.mark.asyncio
+async def test_recent_context_without_summarizer(db):
+    """Sem sumarizador, o contexto traz as mensagens mais recentes"""
+    manager = ContextManagerDB(db, max_history=4)
+    session_id = await manager.create_session()
+    await _talk(manager, session_id, 5)
+
+    context = await manager.get_context(session_id)
+    assert len(context) == 4
+    assert context[-1]["content"].startswith("resposta 4")
+
+
+def test_prompt_builder_keeps_summary_message():
+    """Resumo (mensagem de sistema inicial) não é descartado antes do histórico recente"""
+    builder = PromptBuilder(PromptBudget(history=120, history_message=100))
+    contexto = [{"role": "system", "content": "Resumo da conversa até aqui: usuário se chama Ana"}]
+    contexto += [{"role": "user", "content": f"mensagem {i} " + "texto " * 20} for i in range(10)]
+    report = PromptReport()
+
+    mensagens = builder.build("system", contexto, "pergunta", report)
+    assert mensagens[1]["content"].startswith("Resumo da conversa")
+    assert mensagens[-2]["content"].startswith("mensagem 9")
+    assert report.history <= 120
@@ -0,0 +1,99 @@
+"""
+Testes do escritor WAL e do pool de leitores do Database
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+import aiosqlite
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.database.database import Database
+from backend.services.cleanup_service import CleanupService
+from backend.services.conversation_history_service import ConversationHistoryService
+
+
+DB_READER_POOL_SIZE = 3  # Fixture db em conftest.py
+
+
+@pytest.mark.asyncio
+async def test_wal_mode_and_reader_pool(db):
+    """Escritor em WAL e leitores abertos em modo somente leitura"""
+    async with db.reader() as conn:
+        async with conn.execute("PRAGMA journal_mode") as cursor:
+            row = await cursor.fetchone()
+    assert row[0].lower() == "wal"
+    assert len(db._readers) == 3
+
+    async with db.reader() as conn:
+        with pytest.raises(aiosqlite.OperationalError):
+            await conn.execute("INSERT INTO sessions (session_id, created_at, last_activity) VALUES ('x', 0, 0)")
+
+
+@pytest.mark.asyncio
+async def test_writes_visible_to_readers(db):
+    """Dados commitados pelo escritor aparecem nos leitores"""
+    await db.add_message("s1", "user", "olá")
+    messages = await db.get_messages("s1")
+    assert [m["content"] for m in messages] == ["olá"]
+    assert (await db.get_session("s1")) is not None
+
+
+@pytest.mark.asyncio
+async def test_writer_rolls_back_on_error(db):
+    """Exceção dentro do writer() desfaz a transação"""
+    with pytest.raises(RuntimeError):
+        async with db.writer() as conn:
+            await conn.execute(
+                "INSERT INTO sessions (session_id, created_at, last_activity) VALUES (?, 0, 0)",
+                ("rollback",)
+            )
+            raise RuntimeError("falha")
+    assert await db.get_session("rollback") is None
+
+
+@pytest.mark.asyncio
+async def test_concurrent_reads_and_writes(db):
+    """Leituras concorrentes não bloqueiam nem corrompem escritas"""
+    await db.create_session("s2")
+
+    async def write(i):
+        await db.add_message("s2", "user", f"m{i}")
+
+    async def read():
+        return await db.list_sessions()
+
+    results = await asyncio.gather(*[write(i) for i in range(20)], *[read() for _ in range(20)])
+    assert all(isinstance(r, list) for r in results[20:])
+    assert len(await db.get_messages("s2")) == 20
+    assert db._reader_pool.qsize() == 3
+
+
+@pytest.mark.asyncio
+async def test_services_use_context_api(db):
+    """Serviços usam writer()/reader() em vez da conexão interna"""
+    history = ConversationHistoryService(db)
+    conv_id = await history.save_conversation("s3", "Título", [{"role": "user", "content": "oi"}])
+    assert await history.save_conversation("s3", "Novo", [{"role": "user", "content": "oi"}]) == conv_id
+    conversation = await history.get_conversation_by_id(conv_id)
+    assert conversation["title"] == "Novo"
+    assert await history.delete_conversation(conv_id)
+
+    await db.add_message("s4", "user", "antiga")
+    cleanup = CleanupService(db)
+    assert await cleanup.cleanup_old_messages(days=-1) == 1
+
+
+@pytest.mark.asyncio
+async def test_memory_database_falls_back_to_writer():
+    """Banco em memória não tem pool: leituras usam o escritor"""
+    database = Database(":memory:")
+    await database.connect()
+    try:
+        assert database._readers == []
+        await database.create_session("m1")
+        assert await database.get_session("m1") is not None
+    finally:
+        await database.close()
@@ -0,0 +1,74 @@
+"""
+Testes para o micro-batching de embeddings
+"""
+import asyncio
+import threading
+import pytest
+import numpy as np
+
+from backend.services.embedding_batcher import EmbeddingBatcher
+
+
+class FakeEncoder:
+    """Encoder falso que registra os lotes recebidos"""
+    
+    def __init__(self, fail: bool = False):
+        self.batches = []
+        self.threads = set()
+        self.fail = fail
+    
+    def __call__(self, texts):
+        self.batches.append(list(texts))
+        self.threads.add(threading.current_thread().name)
+        if self.fail:
+            raise RuntimeError("modelo indisponível")
+        return np.array([[float(len(t)), 1.0] for t in texts], dtype=np.float32)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_are_coalesced():
+    """Requisições concorrentes viram um único encode"""
+    encoder = FakeEncoder()
+    batcher = EmbeddingBatcher(encoder, max_batch_size=32, max_wait_ms=20)
+    
+    results = await asyncio.gather(*(batcher.embed([f"texto {i}" * (i + 1)]) for i in range(10)))
+    
+    assert len(encoder.batches) == 1
+    assert len(encoder.batches[0]) == 10
+    assert results[2][0][0] == len("texto 2" * 3)
+    assert all(name.startswith("embedding") for name in encoder.threads)
+    
+    stats = batcher.get_stats()
+    assert stats["batches"] == 1
+    assert stats["avg_batch_size"] == 10
+    await batcher.stop()
+
+
+@pytest.mark.asyncio
+async def test_max_batch_size_and_dedup():
+    """Lotes respeitam o tamanho máximo e textos repetidos são codificados uma vez"""
+    encoder = FakeEncoder()
+    batcher = EmbeddingBatcher(encoder, max_batch_size=4, max_wait_ms=20)
+    
+    texts = ["a", "b", "a", "c", "d", "e"]
+    vectors = await batcher.embed(texts)
+    
+    assert [v[0] for v in vectors] == [1.0] * 6
+    assert all(len(batch) <= 4 for batch in encoder.batches)
+    assert encoder.batches[0] == ["a", "b", "c"]  # "a" duplicado no mesmo lote
+    assert batcher.get_stats()["max_batch_size_seen"] == 4
+    await batcher.stop()
+
+
+@pytest.mark.asyncio
+async def test_encode_error_propagates_to_callers():
+    """Erro de encode é repassado a todas as requisições do lote"""
+    batcher = EmbeddingBatcher(FakeEncoder(fail=True), max_wait_ms=5)
+    with pytest.raises(RuntimeError):
+        await batcher.embed(["x"])
+    assert batcher.get_stats()["errors"] == 1
+    
+    # Dispatcher continua atendendo após erro
+    batcher.encode_fn = FakeEncoder()
+    assert len(await batcher.embed(["y"])) == 1
+    await batcher.stop()
@@ -0,0 +1,80 @@
+"""
+Testes para o cache de embeddings em arena float32
+"""
+import numpy as np
+import pytest
+
+from backend.services.embedding_cache import EmbeddingArenaCache
+
+
+DIM = 8
+
+
+def vec(value: float) -> np.ndarray:
+    return np.full(DIM, value, dtype=np.float32)
+
+
+def test_put_get_roundtrip():
+    """Vetores são armazenados como float32 e retornados como cópia"""
+    cache = EmbeddingArenaCache(dim=DIM, max_bytes=DIM * 4 * 10)
+    cache.put("olá", [0.5] * DIM)
+    result = cache.get("olá")
+    assert result.dtype == np.float32
+    assert np.allclose(result, 0.5)
+    result[:] = 0  # Cópia não altera a arena
+    assert np.allclose(cache.get("olá"), 0.5)
+    assert cache.get("inexistente") is None
+    
+    stats = cache.get_stats()
+    assert stats["hits"] == 2
+    assert stats["misses"] == 1
+    assert stats["arena_bytes"] == DIM * 4 * 10
+
+
+def test_true_lru_eviction():
+    """Eviction remove o menos recentemente usado, não o mais antigo inserido"""
+    cache = EmbeddingArenaCache(dim=DIM, max_bytes=DIM * 4 * 3)
+    assert cache.capacity == 3
+    cache.put("a", vec(1))
+    cache.put("b", vec(2))
+    cache.put("c", vec(3))
+    cache.get("a")  # "a" vira o mais recente
+    cache.put("d", vec(4))
+    
+    assert cache.get("b") is None
+    assert np.allclose(cache.get("a"), 1)
+    assert np.allclose(cache.get("d"), 4)
+    assert cache.get_stats()["evictions"] == 1
+    assert len(cache) == 3
+
+
+def test_rejects_wrong_dimension():
+    """Vetor com dimensão errada é rejeitado"""
+    cache = EmbeddingArenaCache(dim=DIM, max_bytes=1024)
+    with pytest.raises(ValueError):
+        cache.put("x", [1.0] * (DIM + 1))
+
+
+def test_persistence_across_restarts(tmp_path):
+    """Com memmap, entradas e ordem LRU sobrevivem a reinício"""
+    path = str(tmp_path / "emb")
+    cache = EmbeddingArenaCache(dim=DIM, max_bytes=DIM * 4 * 2, persist_path=path)
+    cache.put("a", vec(1))
+    cache.put("b", vec(2))
+    cache.get("a")
+    cache.flush()
+    del cache
+    
+    reopened = EmbeddingArenaCache(dim=DIM, max_bytes=DIM * 4 * 2, persist_path=path)
+    assert len(reopened) == 2
+    reopened.put("c", vec(3))  # Evicta "b" (LRU persistido)
+    assert reopened.get("b") is None
+    assert np.allclose(reopened.get("a"), 1)
+
+
+def test_persistence_recreated_on_dim_change(tmp_path):
+    """Arquivos incompatíveis (dimensão diferente) são recriados"""
+    path = str(tmp_path / "emb")
+    EmbeddingArenaCache(dim=DIM, max_bytes=1024, persist_path=path).put("a", vec(1))
+    other = EmbeddingArenaCache(dim=DIM * 2, max_bytes=1024, persist_path=path)
+    assert len(other) == 0
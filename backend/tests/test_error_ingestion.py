@@ -0,0 +1,72 @@
+"""
+Testes de ingestão de erros em lote e fingerprints
+"""
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.services.error_analysis import ErrorAnalysisService, compute_fingerprint, message_template
+from backend.api.routes.errors.handlers import handle_report_errors_batch
+from backend.api.routes.errors.models import ErrorBatchRequest
+
+
+DB_READER_POOL_SIZE = 2  # Fixture db em conftest.py
+
+
+def test_fingerprint_ignores_variable_parts():
+    """Mensagens que diferem só em valores variáveis têm o mesmo fingerprint"""
+    a = compute_fingerprint("network", "Timeout after 3000 ms connecting to https://api.x.com/v1")
+    b = compute_fingerprint("network", "Timeout after 5000 ms connecting to https://api.y.com/v2")
+    c = compute_fingerprint("audio", "Timeout after 3000 ms connecting to https://api.x.com/v1")
+    assert a == b
+    assert a != c
+    assert message_template("Falha no arquivo '/tmp/a.wav' (id 42)") == "falha no arquivo <str> (id <n>)"
+
+
+@pytest.mark.asyncio
+async def test_batch_ingestion_updates_fingerprint_counters(db):
+    """Lote é inserido numa transação e agregado por fingerprint"""
+    service = ErrorAnalysisService()
+    request = ErrorBatchRequest(errors=[
+        {"level": "error", "type": "network", "message": f"Timeout after {i} ms"} for i in range(10)
+    ] + [
+        {"level": "critical", "type": "crash", "message": "NullPointerException at line 12"},
+        {"level": "fatal", "type": "crash", "message": "nível inválido"},
+    ])
+
+    response = await handle_report_errors_batch(request, db, service)
+    body = json.loads(response.body)
+    assert body["inserted"] == 11
+    assert body["rejected"] == [{"index": 11, "detail": "Level deve ser 'error', 'warning' ou 'critical'"}]
+
+    groups = await db.get_error_groups()
+    assert groups[0]["count"] == 10
+    assert groups[0]["template"] == "timeout after <n> ms"
+    assert len(groups) == 2
+
+    fingerprint = groups[0]["fingerprint"]
+    errors = await db.list_errors(fingerprint=fingerprint, limit=100)
+    assert len(errors) == 10
+    assert all(e["fingerprint"] == fingerprint for e in errors)
+
+
+@pytest.mark.asyncio
+async def test_save_error_and_backfill(db):
+    """save_error individual usa o mesmo caminho; erros antigos recebem fingerprint"""
+    row_id = await db.save_error("e1", "error", "audio", "Mic busy 1", fingerprint=compute_fingerprint("audio", "Mic busy 1"))
+    assert row_id > 0
+
+    # Erro legado sem fingerprint
+    await db.save_error("e2", "error", "audio", "Mic busy 2")
+    assert (await db.get_error("e2"))["fingerprint"] is None
+
+    updated = await db.backfill_error_fingerprints(compute_fingerprint, message_template)
+    assert updated == 1
+    assert (await db.get_error("e2"))["fingerprint"] == (await db.get_error("e1"))["fingerprint"]
+
+    groups = await db.get_error_groups(error_type="audio")
+    assert len(groups) == 1 and groups[0]["count"] == 2
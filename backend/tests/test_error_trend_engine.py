@@ -0,0 +1,115 @@
+"""
+Testes do motor de tendências de erros
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.services.error_analysis import ErrorTrendEngine
+from backend.services.error_analysis.trend_engine import SCOPE_FINGERPRINT, SCOPE_TYPE
+
+T0 = 1_700_000_000.0 - (1_700_000_000.0 % 3600)  # Início de hora
+
+
+def test_trend_direction_and_rate():
+    """Janela atual maior que a anterior indica tendência de alta"""
+    engine = ErrorTrendEngine()
+    for minute in range(10):
+        engine.record("fp1", "network", count=1, ts=T0 + minute * 60)
+    for minute in range(10, 20):
+        engine.record("fp1", "network", count=3, ts=T0 + minute * 60)
+
+    trend = engine.get_trend(SCOPE_FINGERPRINT, "fp1", window_seconds=600, now=T0 + 19 * 60 + 30)
+    assert trend["count"] == 30
+    assert trend["previous_count"] == 10
+    assert trend["direction"] == "up"
+    assert trend["rate_per_minute"] == 3.0
+
+    down = engine.get_trend(SCOPE_TYPE, "network", window_seconds=300, now=T0 + 24 * 60)
+    assert down["count"] == 0 and down["direction"] == "down"
+
+
+def test_spike_detection_against_ewma_baseline():
+    """Pico no minuto atual é detectado contra a linha de base EWMA"""
+    engine = ErrorTrendEngine(spike_factor=3.0, spike_min_count=5)
+    for minute in range(30):
+        engine.record("steady", "audio", count=2, ts=T0 + minute * 60)
+    engine.record("steady", "audio", count=2, ts=T0 + 30 * 60)
+    engine.record("storm", "crash", count=50, ts=T0 + 30 * 60)
+
+    spikes = engine.get_spikes(now=T0 + 30 * 60 + 10)
+    keys = {(s["scope"], s["key"]) for s in spikes}
+    assert (SCOPE_FINGERPRINT, "storm") in keys
+    assert (SCOPE_TYPE, "crash") in keys
+    assert (SCOPE_FINGERPRINT, "steady") not in keys
+
+    overview = engine.get_overview(window_seconds=600, now=T0 + 30 * 60 + 10)
+    assert overview["spiking"][0]["key"] in ("storm", "crash")
+    assert overview["top_fingerprints"][0]["key"] == "storm"
+    assert overview["top_fingerprints"][0]["type"] == "crash"
+
+
+def test_long_windows_use_hour_buckets():
+    """Janelas longas usam os buckets de hora"""
+    engine = ErrorTrendEngine(minute_buckets=60, hour_buckets=48)
+    for hour in range(6):
+        engine.record("fp", "network", count=hour + 1, ts=T0 + hour * 3600)
+    trend = engine.get_trend(SCOPE_FINGERPRINT, "fp", window_seconds=3 * 3600, now=T0 + 5 * 3600 + 10)
+    assert trend["window_seconds"] == 3 * 3600
+    assert trend["count"] == 4 + 5 + 6
+    assert trend["previous_count"] == 1 + 2 + 3
+
+
+def test_idle_series_are_evicted():
+    """Séries sem ocorrências nas duas janelas saem da memória"""
+    engine = ErrorTrendEngine(minute_buckets=60, hour_buckets=3)
+    engine.record("antigo", "network", ts=T0)
+    engine.record("recente", "network", ts=T0 + 2 * 3600)
+
+    assert engine.evict_idle(now=T0 + 2 * 3600 + 10) == 0
+    assert engine.evict_idle(now=T0 + 3 * 3600 + 10) == 1
+    assert (SCOPE_FINGERPRINT, "antigo") not in engine._series
+    assert "antigo" not in engine._meta
+    assert engine.get_trend(SCOPE_TYPE, "network", window_seconds=3600, now=T0 + 3 * 3600 + 10)["previous_count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_flush_prunes_rollups_outside_both_windows(db):
+    """Rollups de hora além de hour_buckets também são removidos do banco"""
+    import time
+    now = time.time()
+    engine = ErrorTrendEngine(minute_buckets=60, hour_buckets=3)
+    engine._database = db
+    await db.upsert_error_rollups([
+        ("type", "network", 3600, int(now - 10 * 3600), 7),
+        ("type", "network", 60, int(now - 2 * 3600), 2)
+    ])
+    engine.record("fp", "network", ts=now)
+    await engine.flush()
+
+    rows = await db.get_error_rollups(0)
+    assert sorted((r[2], r[4]) for r in rows) == [(60, 1), (60, 1), (3600, 1), (3600, 1)]
+
+
+@pytest.mark.asyncio
+async def test_rollups_flush_and_reload(db):
+    """Contadores pendentes são gravados e recarregados por outra instância"""
+    import time
+    now = time.time()
+    engine = ErrorTrendEngine()
+    await engine.start(db)
+    engine.record("fp-db", "network", count=4, ts=now)
+    engine.record("fp-db", "network", count=1, ts=now)
+    await engine.stop()
+
+    reloaded = ErrorTrendEngine()
+    await reloaded.start(db)
+    try:
+        trend = reloaded.get_trend(SCOPE_FINGERPRINT, "fp-db", window_seconds=600, now=now)
+        assert trend["count"] == 5
+        assert reloaded.get_trend(SCOPE_TYPE, "network", window_seconds=600, now=now)["count"] == 5
+    finally:
+        await reloaded.stop()
@@ -0,0 +1,146 @@
+"""
+Testes do startup rápido: imports preguiçosos e warmup em background
+"""
+import asyncio
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.api.startup.warmup import FAILED, READY, UNAVAILABLE, WarmupManager
+from backend.core.lazy_import import lazy_import, module_available
+from backend.services import embedding_service as embedding_module
+from backend.services.embedding_service import EmbeddingService
+
+
+def test_lazy_import_defers_until_first_attribute(tmp_path, monkeypatch):
+    """O módulo só é executado no primeiro acesso a um atributo"""
+    (tmp_path / "modulo_pesado_teste.py").write_text("CARREGADO = True\nVALOR = 42\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(sys.modules, "modulo_pesado_teste", raising=False)
+
+    proxy = lazy_import("modulo_pesado_teste")
+    assert "modulo_pesado_teste" not in sys.modules
+    assert not proxy.is_loaded()
+    assert module_available("modulo_pesado_teste")
+
+    assert proxy.VALOR == 42
+    assert proxy.is_loaded() and "modulo_pesado_teste" in sys.modules
+    assert lazy_import("modulo_pesado_teste") is proxy
+
+
+def test_module_available_for_missing_packages():
+    """Pacotes ausentes são detectados sem ImportError"""
+    assert not module_available("pacote_que_nao_existe_xyz")
+    assert not module_available("pacote_que_nao_existe_xyz.sub")
+    assert module_available("json")
+
+
+@pytest.mark.asyncio
+async def test_warmup_runs_components_in_background():
+    """start() não bloqueia; componentes terminam com o estado correto"""
+    def slow_model():
+        time.sleep(0.2)
+
+    async def async_cache():
+        await asyncio.sleep(0.05)
+
+    def broken():
+        raise RuntimeError("modelo corrompido")
+
+    warmup = WarmupManager(concurrency=4)
+    warmup.register("modelo", slow_model)
+    warmup.register("cache", async_cache)
+    warmup.register("quebrado", broken)
+    warmup.register("opcional", lambda: False)
+
+    start = time.perf_counter()
+    warmup.start()
+    assert time.perf_counter() - start < 0.05
+    assert not warmup.is_done()
+
+    assert await warmup.wait(timeout=2.0)
+    snapshot = warmup.snapshot()
+    assert snapshot["modelo"]["status"] == READY
+    assert snapshot["modelo"]["duration_ms"] >= 150
+    assert snapshot["cache"]["status"] == READY
+    assert snapshot["quebrado"] == {
+        "status": FAILED,
+        "duration_ms": snapshot["quebrado"]["duration_ms"],
+        "error": "modelo corrompido"
+    }
+    assert warmup.get_status("opcional") == UNAVAILABLE
+
+
+@pytest.mark.asyncio
+async def test_warmup_components_load_in_parallel():
+    """Dois carregamentos de 0.2s terminam juntos, não em sequência"""
+    warmup = WarmupManager(concurrency=2)
+    warmup.register("a", lambda: time.sleep(0.2))
+    warmup.register("b", lambda: time.sleep(0.2))
+
+    start = time.perf_counter()
+    warmup.start()
+    await warmup.wait()
+    assert time.perf_counter() - start < 0.35
+
+
+def test_embedding_service_defers_model_until_load(monkeypatch):
+    """Sem o modelo, is_available() é False (busca por palavras-chave) até load()"""
+    loaded = []
+
+    class FakeModel:
+        def __init__(self, *args, **kwargs):
+            loaded.append(args)
+
+        def get_sentence_embedding_dimension(self):
+            return 4
+
+        def encode(self, texts, normalize_embeddings=True):
+            return np.ones((len(texts), 4), dtype=np.float32)
+
+    monkeypatch.setattr(EmbeddingService, "_instance", None)
+    monkeypatch.setattr(embedding_module, "SENTENCE_TRANSFORMERS_AVAILABLE", True)
+    monkeypatch.setattr(embedding_module, "sentence_transformers", SimpleNamespace(SentenceTransformer=FakeModel))
+    monkeypatch.setattr(embedding_module.settings, "embedding_cache_path", None)
+
+    service = EmbeddingService(load_model=False)
+    assert not service.is_available() and loaded == []
+    assert EmbeddingService() is service and loaded == []
+
+    assert service.load() is True
+    assert service.load() is True
+    assert len(loaded) == 1
+    assert service.embed_query("olá") == [1.0, 1.0, 1.0, 1.0]
+
+
+@pytest.mark.asyncio
+async def test_health_reports_warmup_components(monkeypatch):
+    """Readiness não espera o warmup, mas expõe o estado de cada componente"""
+    from backend.api.routes import health
+
+    for name in ("stt_service", "llm_service", "tts_service", "context_manager", "plugin_manager",
+                 "memory_service", "response_cache", "warmup_manager", "health_monitor"):
+        monkeypatch.setattr(health, name, getattr(health, name))
+
+    warmup = WarmupManager()
+    warmup.register("embeddings", lambda: time.sleep(0.3))
+    warmup.start()
+    health.init_health_services(None, None, None, None, warmup=warmup)
+
+    app = FastAPI()
+    app.include_router(health.router)
+    data = TestClient(app).get("/health").json()
+    assert data["componentes"]["embeddings"]["status"] in ("pending", "loading")
+
+    await warmup.wait()
+    data = TestClient(app).get("/health/ready").json()
+    assert data["componentes"]["embeddings"]["status"] == READY
@@ -0,0 +1,142 @@
+"""
+Testes do orçamento de rate limit do Groq no cliente
+"""
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+pytest.importorskip("groq")
+
+from backend.services.llm import BaseLLMService, GroqLLMService
+from backend.services.llm.groq_budget import (
+    PRIORITY_BACKGROUND,
+    PRIORITY_INTERACTIVE,
+    GroqBudget,
+    GroqBudgetExceeded,
+    current_priority,
+    llm_priority,
+)
+
+
+class RawCompletions:
+    """Cliente falso com with_raw_response (como o SDK do Groq)"""
+
+    def __init__(self, headers):
+        self.headers = headers
+        self.calls = 0
+        self.with_raw_response = self
+
+    def create(self, **kwargs):
+        self.calls += 1
+        message = SimpleNamespace(content="groq ok", tool_calls=None)
+        response = SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=SimpleNamespace(total_tokens=50))
+        return SimpleNamespace(headers=self.headers, parse=lambda: response)
+
+
+class FakeOllama(BaseLLMService):
+    def __init__(self):
+        super().__init__()
+        self.model = "llama3"
+        self.calls = 0
+
+    def generate_response(self, prompt, contexto=None, memorias_contexto="", tools=None,
+                          tool_executor=None, system_prompt_override=None):
+        self.calls += 1
+        return "ollama ok", 2
+
+
+def test_background_keeps_reserve_for_interactive():
+    """Background para na reserva; interativo ainda usa o restante"""
+    budget = GroqBudget(requests_per_minute=10, tokens_per_minute=100000, background_reserve=0.2, max_wait=0)
+    for _ in range(8):
+        budget.acquire(10, PRIORITY_BACKGROUND)
+    with pytest.raises(GroqBudgetExceeded) as exc:
+        budget.acquire(10, PRIORITY_BACKGROUND)
+    assert exc.value.dimension == "rpm"
+
+    budget.acquire(10, PRIORITY_INTERACTIVE)
+    budget.acquire(10, PRIORITY_INTERACTIVE)
+    with pytest.raises(GroqBudgetExceeded):
+        budget.acquire(10, PRIORITY_INTERACTIVE)
+    assert budget.get_status()["shed"] == {PRIORITY_INTERACTIVE: 1, PRIORITY_BACKGROUND: 1}
+
+
+def test_headers_correct_local_estimate_and_commit_adjusts_tokens():
+    """Headers do Groq prevalecem sobre a contagem local"""
+    budget = GroqBudget(tokens_per_minute=6000, max_wait=0)
+    reserved = budget.acquire(1000)
+    budget.commit(reserved, 300, {
+        "x-ratelimit-limit-tokens": "6000",
+        "x-ratelimit-remaining-tokens": "400",
+        "x-ratelimit-reset-tokens": "30s",
+    })
+    tpm = next(d for d in budget.get_status()["dimensions"] if d["dimension"] == "tpm")
+    assert tpm["remaining"] == 400
+    assert tpm["reset_in_seconds"] == pytest.approx(30, abs=1)
+
+    budget.acquire(350)
+    with pytest.raises(GroqBudgetExceeded):
+        budget.acquire(100)
+
+
+def test_interactive_waits_for_short_reset():
+    """Turno interativo espera um reset curto em vez de ser descartado"""
+    budget = GroqBudget(max_wait=1.0)
+    budget.commit(0, None, {"x-ratelimit-remaining-tokens": "0", "x-ratelimit-reset-tokens": "200ms"})
+
+    start = time.monotonic()
+    budget.acquire(100, PRIORITY_INTERACTIVE)
+    assert 0.15 <= time.monotonic() - start < 1.0
+    assert budget.waited == 1
+
+    budget.commit(0, None, {"x-ratelimit-remaining-tokens": "0", "x-ratelimit-reset-tokens": "200ms"})
+    with pytest.raises(GroqBudgetExceeded):
+        budget.acquire(100, PRIORITY_BACKGROUND)
+
+
+@pytest.mark.asyncio
+async def test_sync_acquire_on_event_loop_sheds_instead_of_sleeping():
+    """No event loop não há espera (travaria todas as conexões); em thread, espera"""
+    import asyncio
+    budget = GroqBudget(max_wait=1.0)
+    budget.commit(0, None, {"x-ratelimit-remaining-tokens": "0", "x-ratelimit-reset-tokens": "200ms"})
+
+    start = time.monotonic()
+    with pytest.raises(GroqBudgetExceeded):
+        budget.acquire(100, PRIORITY_INTERACTIVE)
+    assert time.monotonic() - start < 0.1
+
+    await asyncio.to_thread(budget.acquire, 100, PRIORITY_INTERACTIVE)
+    assert budget.waited == 1
+
+
+def test_priority_context():
+    """Prioridade padrão é interativa e pode ser trocada por bloco"""
+    assert current_priority() == PRIORITY_INTERACTIVE
+    with llm_priority(PRIORITY_BACKGROUND):
+        assert current_priority() == PRIORITY_BACKGROUND
+    assert current_priority() == PRIORITY_INTERACTIVE
+
+
+def test_service_sheds_to_fallback_without_calling_groq():
+    """Perto da cota, a requisição vai ao fallback sem gastar um 429"""
+    service = GroqLLMService(api_key="test-key")
+    completions = RawCompletions({
+        "x-ratelimit-remaining-tokens": "100",
+        "x-ratelimit-reset-tokens": "45s",
+        "x-ratelimit-remaining-requests": "9000",
+        "x-ratelimit-reset-requests": "2h",
+    })
+    service.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    service.set_fallback_service(FakeOllama())
+    service.budget.max_wait = 0.1
+
+    assert service.generate_response("oi")[0] == "groq ok"
+    assert service.generate_response("oi de novo")[0] == "ollama ok"
+    assert completions.calls == 1
+    assert service.budget.get_status()["shed"][PRIORITY_INTERACTIVE] == 1
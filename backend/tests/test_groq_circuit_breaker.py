@@ -0,0 +1,147 @@
+"""
+Testes do circuit breaker de rate limit do Groq e do fallback reutilizável
+"""
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+groq = pytest.importorskip("groq")
+httpx = pytest.importorskip("httpx")
+
+from backend.services.llm import BaseLLMService, GroqLLMService
+from backend.services.llm.groq_circuit_breaker import (
+    STATE_CLOSED,
+    STATE_HALF_OPEN,
+    STATE_OPEN,
+    GroqCircuitBreaker,
+    parse_duration,
+    parse_reset_seconds,
+)
+
+
+def _rate_limit_error(headers=None, message="Rate limit reached for model"):
+    request = httpx.Request("POST", "https://api.groq.com/openai/v1/chat/completions")
+    response = httpx.Response(429, headers=headers or {}, request=request)
+    return groq.RateLimitError(message, response=response, body=None)
+
+
+class FakeCompletions:
+    def __init__(self):
+        self.calls = 0
+        self.error = None
+
+    def create(self, **kwargs):
+        self.calls += 1
+        if self.error:
+            raise self.error
+        message = SimpleNamespace(content="groq ok", tool_calls=None)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=SimpleNamespace(total_tokens=3))
+
+
+class FakeOllama(BaseLLMService):
+    def __init__(self):
+        super().__init__()
+        self.model = "llama3"
+        self.calls = 0
+
+    def generate_response(self, prompt, contexto=None, memorias_contexto="", tools=None,
+                          tool_executor=None, system_prompt_override=None):
+        self.calls += 1
+        return "ollama ok", 2
+
+
+@pytest.fixture
+def service():
+    groq_service = GroqLLMService(api_key="test-key")
+    completions = FakeCompletions()
+    groq_service.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    groq_service.set_fallback_service(FakeOllama())
+    return groq_service, completions
+
+
+def test_parse_reset_from_headers_and_message():
+    """Reset vem do maior valor entre headers e mensagem"""
+    assert parse_duration("2m59.5s") == pytest.approx(179.5)
+    assert parse_duration("1h2m3s") == 3723
+    assert parse_duration("300ms") == pytest.approx(0.3)
+    assert parse_duration("12") == 12
+
+    error = _rate_limit_error(
+        headers={"retry-after": "7", "x-ratelimit-reset-tokens": "1m30s"},
+        message="Limit tokens per day (TPD). Please try again in 14m24s."
+    )
+    assert parse_reset_seconds(error) == pytest.approx(864)
+    assert parse_reset_seconds(RuntimeError("sem info")) is None
+
+
+def test_open_circuit_skips_groq(service):
+    """Com o circuito aberto cada requisição custa só uma chamada ao Ollama"""
+    groq_service, completions = service
+    completions.error = _rate_limit_error(headers={"retry-after": "120"})
+
+    assert groq_service.generate_response("oi")[0] == "ollama ok"
+    assert completions.calls == 1
+    assert groq_service.circuit_breaker.state == STATE_OPEN
+
+    for _ in range(5):
+        assert groq_service.generate_response("oi")[0] == "ollama ok"
+    assert completions.calls == 1
+    assert groq_service.fallback.service.calls == 6
+    assert groq_service.circuit_breaker.get_status()["reset_in_seconds"] > 100
+
+
+def test_half_open_probe_closes_circuit(service):
+    """Após o reset, uma requisição de teste ao Groq fecha o circuito"""
+    groq_service, completions = service
+    completions.error = _rate_limit_error(headers={"retry-after": "120"})
+    groq_service.generate_response("oi")
+
+    completions.error = None
+    groq_service.circuit_breaker.reset_at = time.monotonic() - 1
+    assert groq_service.generate_response("oi")[0] == "groq ok"
+    assert groq_service.circuit_breaker.state == STATE_CLOSED
+    assert completions.calls == 2
+
+
+def test_half_open_allows_single_probe_and_backs_off():
+    """Apenas uma requisição de teste por vez; nova falha reabre com backoff"""
+    breaker = GroqCircuitBreaker(default_cooldown=10.0)
+    breaker.record_rate_limit(RuntimeError("429"))
+    assert not breaker.allow_request()
+
+    breaker.reset_at = time.monotonic() - 1
+    assert breaker.allow_request()
+    assert breaker.state == STATE_HALF_OPEN
+    assert not breaker.allow_request()
+
+    breaker.record_rate_limit(RuntimeError("429"))
+    assert breaker.state == STATE_OPEN
+    assert breaker.get_status()["reset_in_seconds"] == pytest.approx(20.0, abs=0.5)
+
+
+@pytest.mark.asyncio
+async def test_abandoned_stream_probe_releases_half_open(service, monkeypatch):
+    """Stream de teste fechado pelo cliente não deixa o circuito preso em half-open"""
+    from backend.services.llm import groq_service as groq_module
+
+    async def fake_stream(**kwargs):
+        for token in ("olá", " mundo"):
+            yield token
+
+    monkeypatch.setattr(groq_module, "stream_groq_response", fake_stream)
+    groq_service, _ = service
+    breaker = groq_service.circuit_breaker
+    breaker.record_rate_limit(RuntimeError("429"))
+    breaker.reset_at = time.monotonic() - 1
+
+    stream = groq_service.generate_response_stream("oi")
+    assert await stream.__anext__() == "olá"
+    assert breaker.state == STATE_HALF_OPEN
+    await stream.aclose()
+
+    assert breaker.allow_request()
@@ -0,0 +1,119 @@
+"""
+Testes para HealthMonitor (probes em background com estado em cache)
+"""
+import pytest
+
+from backend.services.health import (
+    HealthMonitor,
+    LatencyHistogram,
+    probe_stt,
+    ONLINE,
+    STANDBY,
+    OFFLINE,
+    UNKNOWN
+)
+
+
+class FakeSTT:
+    """STT falso para testar probe sem carregar modelo"""
+    
+    def __init__(self, loaded=False, available=True):
+        self.loaded = loaded
+        self.available = available
+    
+    def is_loaded(self):
+        return self.loaded
+    
+    def is_available(self):
+        return self.available
+
+
+def test_histogram_percentiles():
+    """Testa contagem e percentis do histograma"""
+    hist = LatencyHistogram(buckets_ms=[10, 100, 1000])
+    for _ in range(90):
+        hist.observe(5)
+    for _ in range(10):
+        hist.observe(500)
+    
+    assert hist.count == 100
+    assert hist.percentile(0.5) <= 10
+    assert 100 < hist.percentile(0.95) <= 1000
+    buckets = dict(hist.cumulative_buckets())
+    assert buckets[10] == 90
+    assert buckets["+Inf"] == 100
+
+
+def test_histogram_empty():
+    """Histograma vazio não tem percentis"""
+    hist = LatencyHistogram()
+    assert hist.percentile(0.95) is None
+    assert hist.to_dict()["count"] == 0
+
+
+def test_probe_stt_does_not_load_model():
+    """Probe de STT reporta standby sem forçar carregamento"""
+    assert probe_stt(FakeSTT(loaded=True)) == ONLINE
+    assert probe_stt(FakeSTT(loaded=False)) == STANDBY
+    assert probe_stt(FakeSTT(loaded=False, available=False)) == OFFLINE
+    assert probe_stt(None) == OFFLINE
+
+
+@pytest.mark.asyncio
+async def test_monitor_caches_status():
+    """Status fica em cache e probes não rodam a cada leitura"""
+    calls = {"count": 0}
+    
+    def probe():
+        calls["count"] += 1
+        return ONLINE
+    
+    monitor = HealthMonitor(interval=60, timeout=1)
+    monitor.register("llm", probe, critical=True)
+    assert monitor.get_status("llm") == UNKNOWN
+    assert not monitor.is_ready()
+    
+    await monitor.start()
+    try:
+        for _ in range(10):
+            assert monitor.get_status("llm") == ONLINE
+        assert calls["count"] == 1
+        assert monitor.is_ready()
+        assert monitor.snapshot()["llm"]["latency"]["count"] == 1
+    finally:
+        await monitor.stop()
+
+
+@pytest.mark.asyncio
+async def test_monitor_failures_and_timeout():
+    """Exceções e timeouts marcam dependência como offline"""
+    import time
+    
+    def failing():
+        raise RuntimeError("conexão recusada")
+    
+    def slow():
+        time.sleep(0.5)
+        return ONLINE
+    
+    monitor = HealthMonitor(interval=60, timeout=0.1)
+    monitor.register("db", failing, critical=True)
+    monitor.register("tts", slow)
+    await monitor.refresh()
+    
+    snapshot = monitor.snapshot()
+    assert snapshot["db"]["status"] == OFFLINE
+    assert snapshot["db"]["last_error"] == "conexão recusada"
+    assert snapshot["db"]["consecutive_failures"] == 1
+    assert snapshot["tts"]["status"] == OFFLINE
+    assert not monitor.is_ready()
+
+
+@pytest.mark.asyncio
+async def test_standby_counts_as_ready():
+    """Dependência em standby (lazy) não bloqueia readiness"""
+    monitor = HealthMonitor(interval=60, timeout=1)
+    monitor.register("stt", lambda: STANDBY, critical=True)
+    monitor.register("tts", lambda: OFFLINE, critical=False)
+    await monitor.refresh()
+    assert monitor.is_ready()
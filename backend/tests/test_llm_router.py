@@ -0,0 +1,142 @@
+"""
+Testes do roteador de LLM (latência, privacidade, hedging e failover)
+"""
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.services.llm import BaseLLMService, LLMRouter
+
+
+class FakeLLM(BaseLLMService):
+    """Serviço de teste com latência configurável"""
+
+    def __init__(self, name: str, delay: float = 0.0, fail: bool = False):
+        super().__init__()
+        self.model = f"{name}-model"
+        self.name = name
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+
+    def generate_response(self, prompt, contexto=None, memorias_contexto="", tools=None,
+                          tool_executor=None, system_prompt_override=None):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError(f"{self.name} indisponível")
+        return f"{self.name}: {prompt}", 1
+
+    async def generate_response_stream(self, prompt, contexto=None, memorias_contexto="", tools=None,
+                                       tool_executor=None, system_prompt_override=None):
+        self.calls += 1
+        if self.fail:
+            raise RuntimeError(f"{self.name} indisponível")
+        for token in (f"{self.name}:", f" {prompt}"):
+            yield token
+
+    def is_ready(self):
+        return not self.fail
+
+
+def _warm(router: LLMRouter, backend_index: int, latency: float, count: int = 20):
+    for _ in range(count):
+        router._backends[backend_index].tracker.record_success(latency)
+
+
+def test_routes_to_fastest_backend():
+    """Com estatísticas suficientes, o backend de menor p50 é escolhido"""
+    groq, ollama = FakeLLM("groq"), FakeLLM("ollama")
+    router = LLMRouter(groq, ollama, hedge_enabled=False, min_samples=5)
+
+    # Sem estatísticas: usa o preferido
+    assert router.generate_response("oi")[0].startswith("groq")
+
+    _warm(router, 0, 2.0)
+    _warm(router, 1, 0.3)
+    assert router.model == "ollama-model"
+    assert router.generate_response("oi")[0].startswith("ollama")
+
+    stats = router.get_stats()
+    assert {b["backend"] for b in stats["backends"]} == {"groq:groq-model", "ollama:ollama-model"}
+
+
+def test_privacy_mode_only_uses_local_backend():
+    """Em modo privacidade o Groq nunca é chamado, mesmo sendo mais rápido"""
+    groq, ollama = FakeLLM("groq"), FakeLLM("ollama")
+    router = LLMRouter(groq, ollama, privacy_mode=lambda: True, min_samples=5)
+    _warm(router, 0, 0.01)
+    _warm(router, 1, 5.0)
+
+    assert router.generate_response("segredo")[0].startswith("ollama")
+    assert groq.calls == 0
+
+    with pytest.raises(RuntimeError):
+        LLMRouter(groq, None, privacy_mode=lambda: True).generate_response("segredo")
+
+
+def test_failover_and_cooldown():
+    """Falha no primário usa o secundário; falhas seguidas tiram o backend de rotação"""
+    groq, ollama = FakeLLM("groq", fail=True), FakeLLM("ollama")
+    router = LLMRouter(groq, ollama, hedge_enabled=False, failure_cooldown=60.0)
+
+    for _ in range(3):
+        assert router.generate_response("oi")[0].startswith("ollama")
+    assert router.failovers == 3
+
+    # Groq em cooldown: não é mais tentado
+    router.generate_response("oi")
+    assert groq.calls == 3
+    assert not router.get_stats()["backends"][0]["healthy"]
+
+
+def test_hedged_request_returns_faster_backend():
+    """Primário acima do seu p95 dispara hedge e a resposta mais rápida vence"""
+    groq, ollama = FakeLLM("groq", delay=0.5), FakeLLM("ollama", delay=0.01)
+    router = LLMRouter(groq, ollama, min_samples=5, hedge_min_delay=0.05)
+    _warm(router, 0, 0.05)  # histórico diz que o Groq é rápido...
+    _warm(router, 1, 0.2)
+
+    start = time.perf_counter()
+    resposta, _ = router.generate_response("oi")
+    elapsed = time.perf_counter() - start
+
+    assert resposta.startswith("ollama")
+    assert elapsed < 0.4
+    assert router.hedges == 1 and router.hedge_wins == 1
+
+
+def test_no_hedge_with_tools():
+    """Com tools a requisição não é duplicada"""
+    groq, ollama = FakeLLM("groq", delay=0.2), FakeLLM("ollama")
+    router = LLMRouter(groq, ollama, min_samples=5, hedge_min_delay=0.01)
+    _warm(router, 0, 0.01)
+    _warm(router, 1, 0.5)
+
+    resposta, _ = router.generate_response("oi", tools=[{"type": "function"}])
+    assert resposta.startswith("groq")
+    assert ollama.calls == 0 and router.hedges == 0
+
+
+def test_stream_successes_keep_backend_healthy():
+    """Falhas esparsas no streaming não tiram o backend de rotação"""
+    groq, ollama = FakeLLM("groq"), FakeLLM("ollama")
+    router = LLMRouter(groq, ollama, hedge_enabled=False, min_samples=3, failure_cooldown=60.0)
+
+    async def stream():
+        return "".join([token async for token in router.generate_response_stream("oi")])
+
+    for fail in (True, False, False, True, False, False, True):
+        groq.fail = fail
+        resposta = asyncio.run(stream())
+        assert resposta.startswith("ollama" if fail else "groq")
+
+    groq_stats = router._backends[0].tracker
+    assert groq_stats.consecutive_failures == 1 and groq_stats.samples == 4
+    assert router.get_stats()["backends"][0]["healthy"]
+    assert router.failovers == 3
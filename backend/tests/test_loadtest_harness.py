@@ -0,0 +1,85 @@
+"""
+Testes do harness de teste de carga (stub de LLM, STT simulado e relatório)
+"""
+import json
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from fastapi.testclient import TestClient
+
+from backend.scripts.analyze_performance import PerformanceAnalyzer, RequestMetrics
+from backend.scripts.loadtest.fake_stt import FakeSTTService
+from backend.scripts.loadtest.load_generator import make_wav
+from backend.scripts.loadtest.stub_llm import StubConfig, create_stub_app
+
+
+@pytest.fixture
+def stub_client():
+    config = StubConfig(ttft_ms=5, tokens_per_second=10000, response_tokens=6, jitter=0)
+    return TestClient(create_stub_app(config))
+
+
+def test_stub_groq_completion_and_stream(stub_client):
+    """Stub responde no formato OpenAI/Groq, com e sem streaming"""
+    body = {"model": "llama-3.1-8b-instant", "messages": [{"role": "user", "content": "oi tudo bem"}]}
+    response = stub_client.post("/openai/v1/chat/completions", json=body)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["choices"][0]["message"]["content"]
+    assert data["usage"]["completion_tokens"] == 6
+    assert "x-ratelimit-remaining-tokens" in response.headers
+
+    with stub_client.stream("POST", "/openai/v1/chat/completions", json={**body, "stream": True}) as stream:
+        lines = [line for line in stream.iter_lines() if line.startswith("data: ")]
+    assert lines[-1] == "data: [DONE]"
+    tokens = [json.loads(line[6:])["choices"][0]["delta"].get("content") for line in lines[:-1]]
+    assert len([t for t in tokens if t]) == 6
+
+
+def test_stub_ollama_chat(stub_client):
+    """Stub responde no formato NDJSON do Ollama"""
+    with stub_client.stream("POST", "/api/chat", json={"model": "llama3", "messages": []}) as stream:
+        chunks = [json.loads(line) for line in stream.iter_lines() if line]
+    assert chunks[-1]["done"] is True
+    assert sum(1 for c in chunks if c["message"]["content"]) == 6
+
+    single = stub_client.post("/api/chat", json={"model": "llama3", "messages": [], "stream": False}).json()
+    assert single["done"] and single["eval_count"] == 6
+    assert stub_client.get("/stats").json()["ollama_requests"] == 2
+
+
+def test_fake_stt_cost_scales_with_audio():
+    """STT simulado gasta tempo proporcional à duração do áudio"""
+    stt = FakeSTTService(real_time_factor=0.1, min_latency=0)
+    start = time.perf_counter()
+    text, confidence, duration = stt.transcribe_audio(make_wav(2.0))
+    elapsed = time.perf_counter() - start
+    assert text and confidence > 0
+    assert duration == pytest.approx(2.0, abs=0.01)
+    assert 0.15 <= elapsed < 1.0
+
+
+def test_analyzer_reports_scenario_percentiles(tmp_path):
+    """Relatório de carga traz percentis, throughput, erros e atraso do loop"""
+    analyzer = PerformanceAnalyzer(str(tmp_path))
+    for i in range(100):
+        analyzer.record_request(RequestMetrics("stream_text", i * 0.1, i * 0.1 + (i + 1) / 100, True, ttfb=0.01))
+    analyzer.record_request(RequestMetrics("stream_text", 0.0, 0.5, False, error="HTTP 503"))
+    analyzer.record_loop_lag({"samples": 10, "p50": 1.0, "p95": 4.0, "p99": 9.0, "max": 12.0})
+
+    report = analyzer.generate_report()
+    scenario = report["scenarios"]["stream_text"]
+    assert scenario["requests"] == 101 and scenario["errors"] == 1
+    assert scenario["latency"]["median"] == pytest.approx(0.51)
+    assert scenario["latency"]["p99"] == pytest.approx(1.0)
+    assert scenario["throughput_rps"] == pytest.approx(100 / 10.9, rel=0.01)
+    assert scenario["sample_errors"] == ["HTTP 503"]
+    assert report["event_loop_lag_ms"]["p99"] == 9.0
+
+    analyzer.save_report("loadtest_report.json")
+    assert (tmp_path / "loadtest_report.json").exists()
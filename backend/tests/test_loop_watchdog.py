@@ -0,0 +1,99 @@
+"""
+Testes do watchdog de bloqueios do event loop e da rota /debug/loop-blockers
+"""
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.config import settings
+from backend.services.observability import LOOP_BLOCKS, LoopBlockingWatchdog, MetricsRegistry
+
+
+async def _handler_sincrono():
+    await asyncio.sleep(0.05)
+    time.sleep(0.25)  # Chamada síncrona segurando o loop
+
+
+@pytest.mark.asyncio
+async def test_watchdog_attributes_block_to_call_site():
+    """Bloqueio acima do limite vira ofensor com a pilha do culpado"""
+    registry = MetricsRegistry()
+    watchdog = LoopBlockingWatchdog(interval=0.01, threshold_ms=50, registry=registry)
+    watchdog.start()
+    try:
+        await _handler_sincrono()
+        await asyncio.sleep(0.1)
+    finally:
+        await watchdog.stop()
+
+    report = watchdog.get_report()
+    assert report["episodes"] >= 1
+    top = report["offenders"][0]
+    assert "test_loop_watchdog.py" in top["site"] and "_handler_sincrono" in top["site"]
+    assert "_handler_sincrono" in top["coroutine"]
+    assert top["max_ms"] >= 150
+    assert any("_handler_sincrono" in line for line in top["stack"])
+
+    counter = registry.counter(LOOP_BLOCKS, {"site": top["site"]})
+    assert counter >= 1
+    assert 'jonh_event_loop_blocks_total{site="' in registry.render_prometheus()
+
+    watchdog.reset()
+    assert watchdog.get_report() == {"threshold_ms": 50, "episodes": 0, "max_lag_ms": 0.0, "offenders": []}
+
+
+@pytest.mark.asyncio
+async def test_watchdog_ignores_short_stalls():
+    """Atrasos abaixo do limite não geram ofensores"""
+    watchdog = LoopBlockingWatchdog(interval=0.01, threshold_ms=200, registry=MetricsRegistry())
+    watchdog.start()
+    try:
+        for _ in range(3):
+            time.sleep(0.03)
+            await asyncio.sleep(0.02)
+    finally:
+        await watchdog.stop()
+
+    assert watchdog.get_report()["offenders"] == []
+
+
+def test_loop_blockers_endpoint(monkeypatch):
+    """Relatório exige token de administrador e watchdog ativo"""
+    from backend.api.routes import debug
+
+    app = FastAPI()
+    app.include_router(debug.router)
+    client = TestClient(app)
+    headers = {"X-Admin-Token": "segredo"}
+
+    monkeypatch.setattr(settings, "debug_admin_token", None)
+    assert client.get("/debug/loop-blockers").status_code == 404
+
+    monkeypatch.setattr(settings, "debug_admin_token", "segredo")
+    monkeypatch.setattr(debug, "loop_watchdog", None)
+    assert client.get("/debug/loop-blockers", headers=headers).status_code == 503
+
+    watchdog = LoopBlockingWatchdog(threshold_ms=100, registry=MetricsRegistry())
+    watchdog._record_offender(
+        {"site": "backend/x.py:10 in f", "coroutine": "f", "stack": ["backend/x.py:10 in f"]},
+        120.0
+    )
+    debug.init_debug_services(watchdog)
+    monkeypatch.setattr(debug, "loop_watchdog", watchdog)
+
+    assert client.get("/debug/loop-blockers", headers={"X-Admin-Token": "x"}).status_code == 403
+    data = client.get("/debug/loop-blockers", headers=headers).json()
+    assert data["episodes"] == 1
+    assert data["offenders"][0]["site"] == "backend/x.py:10 in f"
+    assert data["offenders"][0]["avg_ms"] == 120.0
+
+    assert client.post("/debug/loop-blockers/reset", headers=headers).json() == {"status": "ok"}
+    assert client.get("/debug/loop-blockers", headers=headers).json()["offenders"] == []
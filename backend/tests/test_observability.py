@@ -0,0 +1,137 @@
+"""
+Testes de spans por etapa e exportação de métricas Prometheus
+"""
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import pytest
+import pytest_asyncio
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.database.database import Database
+from backend.services.observability import (
+    EventLoopLagMonitor,
+    MetricsRegistry,
+    STAGE_DURATION,
+    STAGE_ERRORS,
+    current_span,
+    get_metrics_registry,
+    span,
+    traced,
+)
+
+
+@pytest_asyncio.fixture
+async def database(tmp_path):
+    db = Database(db_path=str(tmp_path / "metrics.db"), reader_pool_size=2)
+    await db.connect()
+    yield db
+    await db.close()
+
+
+@pytest.mark.asyncio
+async def test_spans_nest_across_tasks_and_threads():
+    """Span pai é herdado por tasks e por asyncio.to_thread"""
+    seen = {}
+
+    def in_thread():
+        with span("test.thread_child") as child:
+            seen["thread_parent"] = child.parent.name
+
+    @traced("test.traced_child")
+    async def in_task():
+        seen["task_parent"] = current_span().parent.name
+
+    with span("test.root") as root:
+        await asyncio.gather(in_task(), asyncio.to_thread(in_thread))
+
+    assert seen == {"thread_parent": "test.root", "task_parent": "test.root"}
+    assert current_span() is None
+    assert {s.name for s in root.finished} == {"test.root", "test.traced_child", "test.thread_child"}
+
+    registry = get_metrics_registry()
+    assert registry.histogram(STAGE_DURATION, {"stage": "test.root"}).count >= 1
+
+
+def test_span_records_errors():
+    """Exceção dentro do span incrementa o contador de erros da etapa"""
+    registry = get_metrics_registry()
+    before = registry.counter(STAGE_ERRORS, {"stage": "test.failing"})
+    with pytest.raises(ValueError):
+        with span("test.failing"):
+            raise ValueError("falhou")
+    assert registry.counter(STAGE_ERRORS, {"stage": "test.failing"}) == before + 1
+
+
+def test_prometheus_text_format():
+    """Histogramas em segundos, buckets cumulativos, contadores e gauges de coletores"""
+    registry = MetricsRegistry(buckets_ms=(10, 100))
+    registry.describe("jonh_stage_duration_seconds", "Duração por etapa")
+    registry.observe("jonh_stage_duration_seconds", 5, {"stage": "llm.generate"})
+    registry.observe("jonh_stage_duration_seconds", 50, {"stage": "llm.generate"})
+    registry.observe("jonh_stage_duration_seconds", 500, {"stage": "llm.generate"})
+    registry.inc("jonh_stage_errors_total", labels={"stage": "llm.generate"})
+    registry.register_collector(lambda: [("jonh_queue_depth", {"queue": "db_write"}, 3)])
+
+    text = registry.render_prometheus()
+    assert "# HELP jonh_stage_duration_seconds Duração por etapa" in text
+    assert "# TYPE jonh_stage_duration_seconds histogram" in text
+    assert 'jonh_stage_duration_seconds_bucket{stage="llm.generate",le="0.01"} 1' in text
+    assert 'jonh_stage_duration_seconds_bucket{stage="llm.generate",le="0.1"} 2' in text
+    assert 'jonh_stage_duration_seconds_bucket{stage="llm.generate",le="+Inf"} 3' in text
+    assert 'jonh_stage_duration_seconds_sum{stage="llm.generate"} 0.555' in text
+    assert 'jonh_stage_duration_seconds_count{stage="llm.generate"} 3' in text
+    assert 'jonh_stage_errors_total{stage="llm.generate"} 1' in text
+    assert 'jonh_queue_depth{queue="db_write"} 3' in text
+
+
+@pytest.mark.asyncio
+async def test_database_writes_are_traced(database):
+    """Transações de escrita viram spans db.write e o pool expõe ocupação"""
+    registry = get_metrics_registry()
+    histogram = registry.histogram(STAGE_DURATION, {"stage": "db.write"})
+    before = histogram.count if histogram else 0
+
+    await database.create_session("sessao-metricas")
+    assert registry.histogram(STAGE_DURATION, {"stage": "db.write"}).count == before + 1
+
+    stats = database.get_pool_stats()
+    assert stats == {"readers": 2, "readers_busy": 0, "write_waiters": 0}
+
+
+@pytest.mark.asyncio
+async def test_loop_lag_monitor_detects_blocking():
+    """Bloqueio síncrono no loop aparece como atraso"""
+    registry = MetricsRegistry()
+    monitor = EventLoopLagMonitor(interval=0.01, registry=registry)
+    monitor.start()
+    await asyncio.sleep(0.05)
+    time.sleep(0.15)  # Simula inferência bloqueando o loop
+    await asyncio.sleep(0.05)
+    await monitor.stop()
+
+    assert monitor.max_lag_ms >= 100
+    assert registry.histogram("jonh_event_loop_lag_seconds").count > 0
+
+
+def test_metrics_endpoint(database):
+    """GET /metrics responde no content-type do Prometheus com gauges dos serviços"""
+    from backend.api.routes import metrics
+
+    metrics.init_metrics_services(db=database)
+    app = FastAPI()
+    app.include_router(metrics.router)
+    with span("test.endpoint"):
+        pass
+
+    response = TestClient(app).get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'jonh_stage_duration_seconds_count{stage="test.endpoint"}' in response.text
+    assert 'jonh_queue_depth{queue="db_write"} 0' in response.text
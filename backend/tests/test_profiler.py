@@ -0,0 +1,98 @@
+"""
+Testes do profiler por amostragem e da rota /debug/profile
+"""
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.config import settings
+from backend.services.observability.profiler import SamplingProfiler, profile_process
+
+
+def _busy_worker(stop: threading.Event):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+async def _blocking_handler():
+    await asyncio.sleep(0.05)
+    time.sleep(0.2)  # Chamada síncrona segurando o loop
+
+
+@pytest.mark.asyncio
+async def test_profiler_samples_threads_and_reports_loop_blocking():
+    """Pilhas de todas as threads e a corrotina que bloqueou o loop"""
+    stop = threading.Event()
+    worker = threading.Thread(target=_busy_worker, args=(stop,), name="stt-worker")
+    worker.start()
+    try:
+        profiler = SamplingProfiler(interval=0.005, loop_thread_id=threading.get_ident(), blocking_threshold=0.1)
+        profiling = asyncio.create_task(asyncio.to_thread(profiler.run, 0.5))
+        await _blocking_handler()
+        result = await profiling
+    finally:
+        stop.set()
+        worker.join()
+
+    assert result.samples > 20
+    assert "stt-worker" in result.threads and "event-loop" in result.threads
+    assert any(line.startswith("stt-worker;") and "_busy_worker" in line for line in result.collapsed().splitlines())
+
+    assert result.loop_blocking, "bloqueio de 200ms não detectado"
+    top = result.loop_blocking[0]
+    assert "_blocking_handler" in top["coroutine"]
+    assert top["max_ms"] >= 100
+    assert "sleep" in top["top_call"] or "_blocking_handler" in top["top_call"]
+
+
+def test_only_one_profile_at_a_time():
+    """Segunda sessão simultânea é recusada"""
+    results = []
+    first = threading.Thread(target=lambda: results.append(profile_process(0.3)))
+    first.start()
+    time.sleep(0.05)
+    started, result = profile_process(0.1)
+    first.join()
+    assert (started, result) == (False, None)
+    assert results[0][0] is True
+
+
+def test_profile_endpoint_requires_admin_token(monkeypatch):
+    """Sem token configurado a rota some; com token, exige o header"""
+    from backend.api.routes import debug
+
+    app = FastAPI()
+    app.include_router(debug.router)
+    client = TestClient(app)
+
+    monkeypatch.setattr(settings, "debug_admin_token", None)
+    assert client.get("/debug/profile", params={"seconds": 0.1}).status_code == 404
+
+    monkeypatch.setattr(settings, "debug_admin_token", "segredo")
+    assert client.get("/debug/profile", params={"seconds": 0.1}, headers={"X-Admin-Token": "x"}).status_code == 403
+
+    response = client.get(
+        "/debug/profile",
+        params={"seconds": 0.1, "interval_ms": 5},
+        headers={"X-Admin-Token": "segredo"}
+    )
+    assert response.status_code == 200
+    assert response.headers["x-profile-samples"]
+    lines = [line for line in response.text.splitlines() if line]
+    assert lines and all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+
+    data = client.get(
+        "/debug/profile",
+        params={"seconds": 0.1, "format": "json"},
+        headers={"X-Admin-Token": "segredo"}
+    ).json()
+    assert {"samples", "loop_blocking", "collapsed", "threads"} <= set(data)
@@ -0,0 +1,116 @@
+"""
+Testes da montagem de prompts com orçamento de tokens
+"""
+import hashlib
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.services.llm import prompt_builder
+from backend.services.llm.prompt_builder import PromptBuilder, PromptBudget, PromptReport, TokenCounter
+from backend.services.llm.groq_tool_caller import process_tool_calls
+
+
+def _builder(**budget) -> PromptBuilder:
+    return PromptBuilder(PromptBudget(**budget), TokenCounter())
+
+
+def test_truncate_respects_budget():
+    """Texto truncado cabe no orçamento e recebe marcador"""
+    counter = TokenCounter()
+    text = "palavra " * 500
+    truncated = counter.truncate(text, 50)
+    assert counter.count(truncated) <= 50
+    assert truncated.endswith("[...]")
+    assert counter.truncate("curto", 50) == "curto"
+
+
+def test_history_keeps_most_recent_messages_within_budget():
+    """Mensagens antigas são descartadas primeiro"""
+    builder = _builder(total=10_000, history=200, history_message=150)
+    contexto = [{"role": "user" if i % 2 == 0 else "assistant", "content": f"mensagem {i} " + "texto " * 20} for i in range(30)]
+    report = PromptReport()
+
+    mensagens = builder.build("system", contexto, "pergunta", report)
+
+    assert mensagens[0]["role"] == "system"
+    assert mensagens[-1] == {"role": "user", "content": "pergunta"}
+    history = mensagens[1:-1]
+    assert history[-1]["content"].startswith("mensagem 29")
+    assert report.history <= 200
+    assert report.history_kept == len(history)
+    assert report.history_dropped == 30 - len(history)
+
+
+def test_total_budget_bounds_prompt_regardless_of_history_length():
+    """Prompt total fica limitado mesmo com históricos muito longos"""
+    builder = _builder(total=800, history=5000, history_message=300)
+    totals = []
+    for size in (10, 100, 1000):
+        contexto = [{"role": "user", "content": "conteúdo " * 40} for _ in range(size)]
+        report = PromptReport()
+        builder.build("system " * 100, contexto, "pergunta", report)
+        totals.append(report.total)
+    assert max(totals) <= 800
+    assert totals[1] == totals[2]
+
+
+def test_memories_trimmed_by_priority():
+    """Memórias do fim da lista (menos relevantes) são descartadas"""
+    builder = _builder(memories=30)
+    memorias = "\n".join(f"- Memória {i}: valor importante número {i}" for i in range(10))
+    report = PromptReport()
+    fitted = builder.fit_memories(memorias, report)
+    assert fitted.startswith("- Memória 0")
+    assert report.memories <= 30
+    assert report.memories_dropped > 0
+
+
+def test_tool_results_truncated_in_tool_loop():
+    """Resultados longos de tools são truncados e contabilizados"""
+    builder = _builder(tool_result=100)
+    report = PromptReport()
+    tool_call = SimpleNamespace(
+        id="call_1",
+        function=SimpleNamespace(name="job_search", arguments="{}")
+    )
+    message = SimpleNamespace(content="", tool_calls=[tool_call])
+    mensagens = []
+
+    continuar, _, _ = process_tool_calls(
+        message=message,
+        tool_executor=lambda name, args: "| vaga | empresa |\n" * 2000,
+        mensagens=mensagens,
+        iteration=0,
+        max_iterations=3,
+        prompt_builder=builder,
+        prompt_report=report
+    )
+
+    assert continuar
+    assert builder.counter.count(mensagens[-1]["content"]) <= 100
+    assert "tool_result" in report.truncated
+    assert 0 < report.tool_results <= 104
+
+
+def test_tiktoken_only_loads_from_local_cache(tmp_path, monkeypatch):
+    """Sem o BPE no cache local o tiktoken não é chamado (nada de rede no startup)"""
+    calls = []
+    fake_tiktoken = SimpleNamespace(get_encoding=lambda name: calls.append(name) or SimpleNamespace())
+    monkeypatch.setattr(prompt_builder, "tiktoken", fake_tiktoken)
+    monkeypatch.setenv("TIKTOKEN_CACHE_DIR", str(tmp_path))
+
+    assert not TokenCounter().exact
+    assert calls == []
+
+    url = prompt_builder.TIKTOKEN_BLOB_URL.format(name="cl100k_base")
+    (tmp_path / hashlib.sha1(url.encode()).hexdigest()).write_bytes(b"")
+    assert TokenCounter().exact
+    assert calls == ["cl100k_base"]
+
+
+def test_builders_share_one_token_counter():
+    """O contador padrão é criado uma vez e compartilhado"""
+    assert PromptBuilder().counter is PromptBuilder().counter is prompt_builder.get_token_counter()
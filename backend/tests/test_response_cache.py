@@ -0,0 +1,62 @@
+"""
+Testes do cache de respostas
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.api.handlers.response_cache_handler import (
+    create_response_cache,
+    get_cached_response,
+    set_cached_response
+)
+from backend.services.response_cache import ResponseCache
+
+
+class FakeEmbeddings:
+    def __init__(self):
+        self.calls = []
+
+    def is_available(self):
+        return True
+
+    async def embed_query_async(self, texto):
+        self.calls.append(texto)
+        return [1.0, 0.0]
+
+
+@pytest.mark.asyncio
+async def test_semantic_lookup_is_off_by_default():
+    """Sem response_cache_semantic_enabled, nenhum embedding é calculado"""
+    embeddings = FakeEmbeddings()
+    cache = create_response_cache(embeddings)
+
+    await set_cached_response(cache, "liga a luz", "Luz ligada.")
+    assert await get_cached_response(cache, "desliga a luz") is None
+    assert embeddings.calls == []
+    assert cache.get_stats()["semantic_search"] is False
+
+
+def test_semantic_match_requires_flag():
+    """Embedding fornecido só é comparado com semantic_search habilitado"""
+    cache = ResponseCache(embedding_service=FakeEmbeddings())
+    cache.cache["x"] = {"response": "Luz ligada.", "tokens": 0, "embedding": [1.0, 0.0]}
+
+    assert cache.get("desliga a luz", embedding=[1.0, 0.0]) is None
+    cache.semantic_search = True
+    assert cache.get("desliga a luz", embedding=[1.0, 0.0]) == ("Luz ligada.", 0)
+
+
+@pytest.mark.asyncio
+async def test_lookups_are_counted_without_storing_answers():
+    """Respostas não são compartilhadas entre sessões; hits/misses são contados"""
+    cache = create_response_cache()
+
+    await set_cached_response(cache, "Qual é o meu nome?", "Seu nome é Ana.")
+    assert await get_cached_response(cache, "qual é o  meu nome?") is None
+
+    stats = cache.get_stats()
+    assert (stats["current_size"], stats["hits"], stats["misses"]) == (0, 0, 1)
@@ -0,0 +1,287 @@
+"""
+Testes do micro-batching de transcrições (STTBatcher + transcribe_batch)
+"""
+import asyncio
+import io
+import sys
+import time
+import wave
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.services import stt_service as stt_module
+from backend.services.stt_batcher import STTBatcher
+from backend.services.stt_service import WhisperSTTService
+
+
+def _wav(seconds: float, freq: float = 440.0) -> bytes:
+    samples = (np.sin(np.linspace(0, freq * seconds, int(16000 * seconds))) * 8000).astype(np.int16)
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(16000)
+        wav.writeframes(samples.tobytes())
+    return buffer.getvalue()
+
+
+@pytest.mark.asyncio
+async def test_batcher_coalesces_concurrent_requests():
+    """Requisições simultâneas viram um único lote; erros voltam só para o dono"""
+    calls = []
+
+    def transcribe_batch(audios, language, session_ids):
+        calls.append((len(audios), language))
+        return [ValueError("áudio inválido") if audio == b"ruim" else (audio.decode(), 1.0, 1.0) for audio in audios]
+
+    batcher = STTBatcher(transcribe_batch, max_batch_size=8, max_wait_ms=30)
+    try:
+        results = await asyncio.gather(
+            *(batcher.transcribe(f"a{i}".encode()) for i in range(4)),
+            batcher.transcribe(b"ruim"),
+            return_exceptions=True
+        )
+    finally:
+        await batcher.stop()
+
+    assert calls == [(5, "pt")]
+    assert [r[0] for r in results[:4]] == ["a0", "a1", "a2", "a3"]
+    assert isinstance(results[4], ValueError)
+    stats = batcher.get_stats()
+    assert stats["batches"] == 1 and stats["avg_batch_size"] == 5.0 and stats["errors"] == 1
+
+
+@pytest.mark.asyncio
+async def test_batcher_splits_batches_by_language_and_size():
+    """Idiomas diferentes não compartilham prompt; lote respeita o tamanho máximo"""
+    calls = []
+
+    def transcribe_batch(audios, language, session_ids):
+        calls.append((len(audios), language))
+        return [("ok", 1.0, 1.0)] * len(audios)
+
+    batcher = STTBatcher(transcribe_batch, max_batch_size=3, max_wait_ms=30)
+    try:
+        await asyncio.gather(
+            *(batcher.transcribe(b"x", "pt") for _ in range(4)),
+            batcher.transcribe(b"y", "en")
+        )
+    finally:
+        await batcher.stop()
+
+    assert calls == [(3, "pt"), (1, "pt"), (1, "en")]
+
+
+class FakeTokenizer:
+    """Tokenizer simulado: token i corresponde à palavra i do vocabulário"""
+    eot = 1000
+
+    def __init__(self, hf_tokenizer, multilingual, task, language):
+        self.vocab = hf_tokenizer
+
+    def decode(self, tokens):
+        return " ".join(self.vocab[t] for t in tokens)
+
+    def encode(self, text):
+        return [len(word) for word in text.split()]
+
+
+class FakeExtractor:
+    """Mel simulado: 100 frames por segundo de áudio, valor constante não nulo"""
+    nb_max_frames = 3000
+
+    def __call__(self, audio):
+        return np.full((80, len(audio) // 160), np.float32(audio.std()))
+
+
+class FakeBatchedWhisper:
+    """Modelo com a API em lote do faster-whisper/CTranslate2 (sem rede neural)"""
+
+    def __init__(self, name: str, avg_logprob: float = -0.2):
+        self.hf_tokenizer = {0: name, 1: "curto", 2: "longo"}
+        self.avg_logprob = avg_logprob
+        self.feature_extractor = FakeExtractor()
+        self.model = SimpleNamespace(is_multilingual=True, generate=self._generate)
+        self.generate_batches = []
+        self.sequential_calls = 0
+        self.previous_tokens = []
+
+    def get_prompt(self, tokenizer, previous_tokens, without_timestamps):
+        self.previous_tokens.append(list(previous_tokens))
+        return [50258]
+
+    def encode(self, features):
+        assert features.shape[1:] == (80, 3000)
+        return features
+
+    def _generate(self, encoder_output, prompts, **kwargs):
+        self.generate_batches.append(len(prompts))
+        results = []
+        for features in encoder_output:
+            frames = int(np.count_nonzero(features[0]))  # Áudio real antes do padding
+            word = 1 if frames < 300 else 2
+            results.append(SimpleNamespace(
+                sequences_ids=[[0, word, FakeTokenizer.eot]],
+                scores=[self.avg_logprob * 3 / 2],
+                no_speech_prob=0.01
+            ))
+        return results
+
+    def transcribe(self, audio, **kwargs):
+        self.sequential_calls += 1
+        segment = SimpleNamespace(text="sequencial", start=0.0, end=len(audio) / 16000,
+                                  avg_logprob=-0.1, no_speech_prob=0.01)
+        return iter([segment]), SimpleNamespace(language_probability=0.97)
+
+
+@pytest.fixture
+def batch_api(monkeypatch):
+    def pad_or_trim(array, length=3000):
+        if array.shape[-1] >= length:
+            return array[:, :length]
+        return np.pad(array, ((0, 0), (0, length - array.shape[-1])))
+
+    monkeypatch.setattr(stt_module, "whisper_audio", SimpleNamespace(pad_or_trim=pad_or_trim))
+    monkeypatch.setattr(stt_module, "whisper_tokenizer", SimpleNamespace(Tokenizer=FakeTokenizer))
+
+
+def _service(main, fast=None) -> WhisperSTTService:
+    service = WhisperSTTService(
+        model_size="large-v3",
+        fast_model_size="base" if fast else None,
+        batch_max_size=8
+    )
+    service.model = main
+    service.fast_model = fast
+    return service
+
+
+def test_transcribe_batch_runs_one_forward_for_all_clips(batch_api):
+    """Vários áudios curtos saem de um único generate; áudio longo e inválido seguem à parte"""
+    main = FakeBatchedWhisper("principal")
+    service = _service(main)
+
+    results = service.transcribe_batch([_wav(1.0), _wav(2.0), b"nao-e-audio", _wav(31.0)])
+
+    assert main.generate_batches == [2]
+    assert results[0][0] == "principal curto" and results[0][2] == pytest.approx(1.0)
+    assert results[1][0] == "principal curto"
+    assert isinstance(results[2], ValueError)
+    assert results[3][0] == "sequencial" and main.sequential_calls == 1
+
+
+def test_transcribe_batch_cascades_per_clip(batch_api):
+    """Lote no modelo rápido; só os pouco confiáveis vão num lote do principal"""
+    fast = FakeBatchedWhisper("rapido")
+    main = FakeBatchedWhisper("principal")
+    service = _service(main, fast)
+
+    results = service.transcribe_batch([_wav(1.0), _wav(1.5), _wav(6.0)])
+    assert fast.generate_batches == [2]
+    assert main.generate_batches == []  # Áudio de 6s usa VAD: transcrição individual
+    assert results[0][0] == "rapido curto" and results[2][0] == "sequencial"
+
+    fast.avg_logprob = -2.0
+    service.transcribe_batch([_wav(1.0), _wav(1.5)])
+    assert fast.generate_batches == [2, 2]
+    assert main.generate_batches == [2]
+    assert service.get_cascade_stats()["routes"] == {"fast": 2, "direct": 1, "escalated": 2}
+
+
+def test_single_clip_uses_regular_transcription(batch_api):
+    """Lote de um item mantém VAD e fallback de temperatura do transcribe normal"""
+    main = FakeBatchedWhisper("principal")
+    service = _service(main)
+
+    assert service.transcribe_batch([_wav(1.0)]) == [("sequencial", 0.97, pytest.approx(1.0))]
+    assert main.generate_batches == [] and main.sequential_calls == 1
+
+
+def test_falls_back_when_batch_api_is_missing(batch_api):
+    """Sem a API de lote (versão diferente do faster-whisper) transcreve individualmente"""
+    main = FakeBatchedWhisper("principal")
+    del main.feature_extractor
+    service = _service(main)
+
+    results = service.transcribe_batch([_wav(1.0), _wav(1.0)])
+    assert [r[0] for r in results] == ["sequencial", "sequencial"]
+    assert service._batch_supported is False
+
+
+@pytest.mark.asyncio
+async def test_transcribe_audio_async_batches_concurrent_calls(batch_api):
+    """Chamadas concorrentes de transcribe_audio_async compartilham o forward"""
+    main = FakeBatchedWhisper("principal")
+    service = _service(main)
+    service.batch_max_wait_ms = 50
+    try:
+        results = await asyncio.gather(*(service.transcribe_audio_async(_wav(1.0)) for _ in range(3)))
+    finally:
+        await service.stop_batcher()
+
+    assert main.generate_batches == [3]
+    assert all(text.startswith("principal") for text, _, _ in results)
+    assert service.get_batcher_stats()["avg_batch_size"] == 3.0
+
+
+@pytest.mark.asyncio
+async def test_transcribe_audio_async_without_batching_runs_in_thread():
+    """Com batch_max_size=1 a transcrição sai do event loop, sem batcher"""
+    class SlowModel(FakeBatchedWhisper):
+        def transcribe(self, audio, **kwargs):
+            time.sleep(0.2)
+            return super().transcribe(audio, **kwargs)
+
+    service = WhisperSTTService(model_size="base")
+    service.model = SlowModel("x")
+
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.02)
+            ticks += 1
+
+    task = asyncio.create_task(ticker())
+    text, _, _ = await service.transcribe_audio_async(_wav(1.0))
+    task.cancel()
+
+    assert text == "sequencial"
+    assert ticks >= 5
+    assert service.get_batcher_stats() == {"enabled": False}
+
+
+def test_transcribe_batch_passes_session_prompts(batch_api):
+    """No lote, cada áudio leva o prompt da própria sessão"""
+    from backend.services.stt_session_profile import STTProfileStore
+
+    main = FakeBatchedWhisper("principal")
+    service = _service(main)
+    service.profiles = STTProfileStore()
+    service.profiles.get("s1").update("acende a luz")
+
+    service.transcribe_batch([_wav(1.0), _wav(1.0)], session_ids=["s1", None])
+
+    assert main.previous_tokens == [[6, 1, 3], []]
+    assert service.profiles.get("s1").last_transcript == "principal curto"
+
+
+def test_clips_that_need_session_vad_skip_the_batch(batch_api):
+    """Sessão ruidosa aplica VAD a partir de 1s: esse áudio não entra no lote (sem VAD)"""
+    from backend.services.stt_session_profile import STTProfileStore
+
+    main = FakeBatchedWhisper("principal")
+    service = _service(main)
+    service.profiles = STTProfileStore()
+    service.profiles.get("ruidosa").update("", levels=(0.1, 0.1))
+
+    results = service.transcribe_batch([_wav(1.5), _wav(1.5), _wav(1.5)], session_ids=["ruidosa", None, None])
+
+    assert main.generate_batches == [2]
+    assert results[0][0] == "sequencial" and main.sequential_calls == 1
@@ -0,0 +1,164 @@
+"""
+Testes da cascata de modelos Whisper (modelo rápido -> modelo principal)
+"""
+import io
+import sys
+import threading
+import time
+import wave
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.services import stt_service
+from backend.services.observability import get_metrics_registry
+from backend.services.stt_service import STT_CASCADE, STT_ESCALATION_RATIO, WhisperSTTService
+
+
+def _wav(seconds: float) -> bytes:
+    samples = (np.sin(np.linspace(0, 440 * seconds, int(16000 * seconds))) * 8000).astype(np.int16)
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(16000)
+        wav.writeframes(samples.tobytes())
+    return buffer.getvalue()
+
+
+class FakeWhisper:
+    """Modelo simulado que devolve segmentos com a confiança configurada"""
+
+    def __init__(self, text: str, avg_logprob: float = -0.2, no_speech_prob: float = 0.05):
+        self.text = text
+        self.avg_logprob = avg_logprob
+        self.no_speech_prob = no_speech_prob
+        self.calls = 0
+
+    def transcribe(self, audio, **kwargs):
+        self.calls += 1
+        segments = [] if not self.text else [SimpleNamespace(
+            text=self.text,
+            start=0.0,
+            end=len(audio) / 16000,
+            avg_logprob=self.avg_logprob,
+            no_speech_prob=self.no_speech_prob
+        )]
+        return iter(segments), SimpleNamespace(language_probability=0.99)
+
+
+def _service(fast: FakeWhisper, main: FakeWhisper) -> WhisperSTTService:
+    service = WhisperSTTService(model_size="large-v3", fast_model_size="base", cascade_max_duration=4.0)
+    service.fast_model = fast
+    service.model = main
+    return service
+
+
+def test_confident_short_clip_stays_on_fast_model():
+    """Comando curto com boa confiança não chega ao modelo principal"""
+    fast, main = FakeWhisper("acende a luz"), FakeWhisper("acende a luz da sala")
+    service = _service(fast, main)
+
+    text, confidence, duration = service.transcribe_audio(_wav(1.5))
+
+    assert text == "acende a luz"
+    assert duration == pytest.approx(1.5)
+    assert (fast.calls, main.calls) == (1, 0)
+    assert service.get_cascade_stats()["routes"] == {"fast": 1}
+
+
+@pytest.mark.parametrize("fast, reason", [
+    (FakeWhisper("acende luz", avg_logprob=-1.2), "low_logprob"),
+    (FakeWhisper("obrigado", no_speech_prob=0.8), "no_speech"),
+    (FakeWhisper(""), "empty"),
+])
+def test_low_confidence_escalates_to_main_model(fast, reason):
+    """Log-prob baixa, provável silêncio ou texto vazio escalam para o principal"""
+    main = FakeWhisper("acende a luz da sala")
+    service = _service(fast, main)
+
+    text, _, _ = service.transcribe_audio(_wav(1.0))
+
+    assert text == "acende a luz da sala"
+    assert (fast.calls, main.calls) == (1, 1)
+    stats = service.get_cascade_stats()
+    assert stats["escalation_reasons"] == {reason: 1}
+    assert stats["escalation_rate"] == 1.0
+
+
+def test_long_clip_goes_directly_to_main_model():
+    """Áudio longo pula o modelo rápido"""
+    fast, main = FakeWhisper("curto"), FakeWhisper("frase longa com vários detalhes")
+    service = _service(fast, main)
+
+    service.transcribe_audio(_wav(5.0))
+
+    assert (fast.calls, main.calls) == (0, 1)
+    assert service.get_cascade_stats()["routes"] == {"direct": 1}
+
+
+def test_escalation_rate_is_exported():
+    """Taxa de escalada e rotas aparecem no registro de métricas"""
+    registry = get_metrics_registry()
+    before = registry.counter(STT_CASCADE, {"route": "fast"})
+    service = _service(FakeWhisper("ok"), FakeWhisper("ok"))
+    service.transcribe_audio(_wav(1.0))
+    service.fast_model = FakeWhisper("ok", avg_logprob=-2.0)
+    service.transcribe_audio(_wav(1.0))
+
+    assert registry.counter(STT_CASCADE, {"route": "fast"}) == before + 1
+    assert service.get_cascade_stats()["escalation_rate"] == 0.5
+    assert f"{STT_ESCALATION_RATIO} 0.5" in registry.render_prometheus()
+
+
+def test_cascade_disabled_when_fast_model_equals_main():
+    """Sem modelo rápido distinto, o serviço se comporta como antes"""
+    service = WhisperSTTService(model_size="base", fast_model_size="base")
+    main = FakeWhisper("olá")
+    service.model = main
+
+    assert service.transcribe_audio(_wav(1.0))[0] == "olá"
+    assert main.calls == 1
+    assert service.get_cascade_stats() == {"enabled": False}
+
+
+class YieldingLock:
+    """Lock que cede a vez logo após liberar (abre a janela entre o carregamento e a atribuição)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        self._lock.acquire()
+
+    def __exit__(self, *exc):
+        self._lock.release()
+        time.sleep(0.02)
+
+
+def test_concurrent_loads_create_each_model_once(monkeypatch):
+    """Warmup e primeira requisição juntos não carregam o mesmo modelo duas vezes"""
+    created = []
+
+    def whisper_model(model_size, **kwargs):
+        time.sleep(0.05)
+        created.append(model_size)
+        return FakeWhisper(model_size)
+
+    monkeypatch.setattr(stt_service, "WHISPER_AVAILABLE", True)
+    monkeypatch.setattr(stt_service, "faster_whisper", SimpleNamespace(WhisperModel=whisper_model))
+    service = WhisperSTTService(model_size="large-v3", fast_model_size="base")
+    service._load_lock = YieldingLock()
+
+    threads = [threading.Thread(target=service.load_models) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(created) == ["base", "large-v3"]
+    assert service.model.text == "large-v3" and service.fast_model.text == "base"
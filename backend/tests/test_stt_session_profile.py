@@ -0,0 +1,170 @@
+"""
+Testes do perfil acústico por sessão do STT
+"""
+import io
+import sys
+import wave
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.services.stt_service import WhisperSTTService
+from backend.services.stt_session_profile import (
+    DEFAULT_VAD_PARAMETERS,
+    STTProfileStore,
+    measure_levels,
+)
+
+
+def _wav(samples: np.ndarray) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(16000)
+        wav.writeframes((np.clip(samples, -1, 1) * 32767).astype(np.int16).tobytes())
+    return buffer.getvalue()
+
+
+def _clean(seconds: float) -> np.ndarray:
+    """Fala no meio, silêncio nas pontas"""
+    samples = np.zeros(int(16000 * seconds), dtype=np.float32)
+    middle = slice(len(samples) // 4, 3 * len(samples) // 4)
+    samples[middle] = 0.3 * np.sin(np.linspace(0, 2000, middle.stop - middle.start))
+    return samples
+
+
+def _noisy(seconds: float) -> np.ndarray:
+    """Fala sob ruído forte e contínuo"""
+    rng = np.random.default_rng(0)
+    n = int(16000 * seconds)
+    return (0.2 * np.sin(np.linspace(0, 2000, n)) + rng.normal(0, 0.15, n)).astype(np.float32)
+
+
+class RecordingWhisper:
+    """Modelo simulado que guarda as opções de cada transcribe"""
+
+    def __init__(self, texts):
+        self.texts = iter(texts)
+        self.calls = []
+
+    def transcribe(self, audio, **kwargs):
+        self.calls.append(kwargs)
+        segment = SimpleNamespace(text=next(self.texts), start=0.0, end=len(audio) / 16000,
+                                  avg_logprob=-0.1, no_speech_prob=0.01)
+        return iter([segment]), SimpleNamespace(language_probability=0.98)
+
+
+def _service(model) -> WhisperSTTService:
+    service = WhisperSTTService(model_size="base", profile_store=STTProfileStore())
+    service.model = model
+    return service
+
+
+def test_follow_up_turn_uses_previous_transcript_as_prompt():
+    """O turno seguinte da mesma sessão recebe o texto anterior como initial_prompt"""
+    model = RecordingWhisper(["qual a previsão do tempo", "e amanhã", "oi"])
+    service = _service(model)
+
+    service.transcribe_audio(_wav(_clean(1.0)), session_id="s1")
+    service.transcribe_audio(_wav(_clean(1.0)), session_id="s1")
+    service.transcribe_audio(_wav(_clean(1.0)), session_id="s2")
+
+    assert model.calls[0]["initial_prompt"] is None
+    assert model.calls[1]["initial_prompt"] == "qual a previsão do tempo"
+    assert model.calls[2]["initial_prompt"] is None  # Outra sessão não herda contexto
+    assert service.get_profile_stats() == {"enabled": True, "sessions": 2, "max_sessions": 1000}
+
+
+def test_without_session_keeps_default_decode_options():
+    """Sem sessão (ex.: /transcribe) as opções são as de sempre, sem prompt"""
+    model = RecordingWhisper(["um", "dois"])
+    service = _service(model)
+
+    service.transcribe_audio(_wav(_clean(1.0)))
+    service.transcribe_audio(_wav(_clean(3.0)))
+
+    assert "initial_prompt" not in model.calls[0]
+    assert model.calls[0]["vad_filter"] is False
+    assert model.calls[1]["vad_filter"] is True
+    assert model.calls[1]["vad_parameters"] is DEFAULT_VAD_PARAMETERS
+
+
+def test_noise_floor_adapts_vad_and_options_are_cached():
+    """Sessão ruidosa endurece o VAD e o aplica a áudios curtos; o dict é reaproveitado"""
+    model = RecordingWhisper(["a", "b", "c"])
+    service = _service(model)
+
+    service.transcribe_audio(_wav(_noisy(1.5)), session_id="ruido")
+    service.transcribe_audio(_wav(_noisy(1.5)), session_id="ruido")
+    service.transcribe_audio(_wav(_noisy(1.5)), session_id="ruido")
+
+    assert model.calls[0]["vad_filter"] is False  # Sem histórico: regra padrão (> 2s)
+    assert model.calls[1]["vad_filter"] is True
+    assert model.calls[1]["vad_parameters"]["threshold"] > DEFAULT_VAD_PARAMETERS["threshold"]
+    assert model.calls[2]["vad_parameters"] is model.calls[1]["vad_parameters"]
+    assert service.profiles.get("ruido").snr_db < 10
+
+
+def test_clean_session_relaxes_vad():
+    """Ambiente silencioso: VAD mais sensível e só para áudios longos"""
+    model = RecordingWhisper(["a", "b"])
+    service = _service(model)
+
+    service.transcribe_audio(_wav(_clean(3.0)), session_id="limpo")
+    service.transcribe_audio(_wav(_clean(3.0)), session_id="limpo")
+
+    assert model.calls[0]["vad_filter"] is True
+    assert model.calls[1]["vad_filter"] is False
+    profile = service.profiles.get("limpo").to_dict()
+    assert profile["vad_parameters"]["threshold"] < DEFAULT_VAD_PARAMETERS["threshold"]
+    assert profile["turns"] == 2
+
+
+def test_empty_transcript_does_not_replace_prompt_and_long_prompt_is_trimmed():
+    """Turno vazio mantém o contexto; prompt longo fica só com o final, sem cortar palavra"""
+    store = STTProfileStore(prompt_max_chars=20)
+    profile = store.get("s")
+    profile.update("liga o ar condicionado da sala de estar")
+    profile.update("")
+
+    assert profile.initial_prompt() == "da sala de estar"
+    assert measure_levels(np.zeros(100, dtype=np.float32), 16000) is None
+
+
+def test_store_evicts_least_recent_and_expires(monkeypatch):
+    """Limite de sessões (LRU), expiração por inatividade e troca de idioma"""
+    store = STTProfileStore(max_sessions=2, ttl=60)
+    store.get("a").update("primeiro")
+    store.get("b")
+    store.get("a")
+    store.get("c")  # Remove "b", o menos recente
+
+    assert store.get_stats()["sessions"] == 2
+    assert store.get("a").last_transcript == "primeiro"
+    assert store.get("a", language="en").last_transcript == ""
+    assert store.get(None) is None
+
+    store.get("c").update("texto")
+    clock = store.get("c").last_used
+    monkeypatch.setattr("backend.services.stt_session_profile.time.monotonic", lambda: clock + 120)
+    assert store.get("c").last_transcript == ""
+
+
+def test_forget_session_discards_profile():
+    """Sessão removida não deixa perfil para trás"""
+    service = _service(RecordingWhisper(["ok"]))
+    service.transcribe_audio(_wav(_clean(1.0)), session_id="s1")
+    service.forget_session("s1")
+    assert service.get_profile_stats()["sessions"] == 0
+    assert WhisperSTTService().get_profile_stats() == {"enabled": False}
+
+
+@pytest.mark.parametrize("samples", [_clean(2.0), _noisy(2.0)])
+def test_measure_levels_orders_noise_below_speech(samples):
+    noise, speech = measure_levels(samples, 16000)
+    assert 0 <= noise <= speech
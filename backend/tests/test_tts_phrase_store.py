@@ -0,0 +1,144 @@
+"""
+Testes para o phrase store TTS (cache em disco por sentença)
+"""
+import asyncio
+import io
+import wave
+import pytest
+
+from backend.services.tts_service import PiperTTSService
+from backend.services.tts_phrase_store import (
+    TTSPhraseStore,
+    concat_wav,
+    mine_top_phrases,
+    normalize_phrase
+)
+
+
+def make_wav(n_frames: int, value: int = 1, rate: int = 22050) -> bytes:
+    """Gera WAV PCM mono 16-bit com amostras constantes"""
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(value.to_bytes(2, "little", signed=True) * n_frames)
+    return buffer.getvalue()
+
+
+def test_normalize_phrase():
+    """Normalização ignora caixa e espaços extras"""
+    assert normalize_phrase("  Olá,   tudo  BEM? ") == "olá, tudo bem?"
+
+
+def test_key_depends_on_voice_and_version(tmp_path):
+    """Chave muda com voz e versão do modelo"""
+    store_v1 = TTSPhraseStore(str(tmp_path), model_version="1")
+    store_v2 = TTSPhraseStore(str(tmp_path), model_version="2")
+    key = store_v1.make_key("Olá mundo.", "piper:jeff")
+    assert key == store_v1.make_key("olá  MUNDO.", "piper:jeff")
+    assert key != store_v1.make_key("Olá mundo.", "edge:antonio")
+    assert key != store_v2.make_key("Olá mundo.", "piper:jeff")
+
+
+def test_put_get_and_persistence(tmp_path):
+    """Segmentos sobrevivem a reinício (índice reconstruído do disco)"""
+    store = TTSPhraseStore(str(tmp_path))
+    audio = make_wav(100)
+    store.put("Bom dia!", "piper:jeff", audio)
+    assert store.get("bom dia!", "piper:jeff") == audio
+    assert store.get("Boa noite!", "piper:jeff") is None
+    
+    reopened = TTSPhraseStore(str(tmp_path))
+    assert reopened.contains("Bom dia!", "piper:jeff")
+    assert reopened.get_stats()["segments"] == 1
+
+
+def test_rejects_non_wav(tmp_path):
+    """Somente WAV PCM é armazenado (ex: MP3 do edge-tts sem pydub)"""
+    store = TTSPhraseStore(str(tmp_path))
+    store.put("Frase.", "edge:antonio", b"ID3mp3data")
+    assert not store.contains("Frase.", "edge:antonio")
+
+
+def test_lru_byte_budget_eviction(tmp_path):
+    """Excedendo o orçamento, remove o segmento menos usado"""
+    audio = make_wav(1000)
+    store = TTSPhraseStore(str(tmp_path), max_bytes=len(audio) * 2)
+    store.put("Primeira.", "v", audio)
+    store.put("Segunda.", "v", audio)
+    store.get("Primeira.", "v")  # Primeira vira a mais recente
+    store.put("Terceira.", "v", audio)
+    
+    assert store.contains("Primeira.", "v")
+    assert not store.contains("Segunda.", "v")
+    assert store.contains("Terceira.", "v")
+    assert store.get_stats()["evictions"] == 1
+    assert len(list(tmp_path.glob("*/*.wav"))) == 2
+
+
+def test_concat_wav():
+    """Concatenação soma os frames dos segmentos"""
+    result = concat_wav([make_wav(100, 1), make_wav(50, 2)])
+    with wave.open(io.BytesIO(result), "rb") as wav:
+        assert wav.getnframes() == 150
+    
+    with pytest.raises(ValueError):
+        concat_wav([make_wav(10, rate=22050), make_wav(10, rate=16000)])
+
+
+def test_mine_top_phrases():
+    """Frases recorrentes nas respostas são mineradas por frequência"""
+    responses = [
+        "Desculpe, tive um probleminha técnico. Pode repetir a pergunta?",
+        "Claro! Desculpe, tive um probleminha técnico. Tente de novo.",
+        "desculpe, tive um probleminha técnico. Pode repetir a pergunta?",
+        "Resposta única sem repetição nenhuma aqui.",
+    ]
+    phrases = mine_top_phrases(responses, top_n=5, min_chars=10)
+    assert phrases[0] == "Desculpe, tive um probleminha técnico."
+    assert "Pode repetir a pergunta?" in phrases
+    assert all("única" not in p for p in phrases)
+
+
+class FakeCache:
+    def __init__(self):
+        self.entries = {}
+
+    def get(self, texto):
+        return self.entries.get(texto)
+
+    def set(self, texto, audio):
+        self.entries[texto] = audio
+
+
+@pytest.mark.asyncio
+async def test_phrase_synthesis_is_bounded_and_cached(tmp_path, monkeypatch):
+    """Sínteses por frase respeitam phrase_workers; texto repetido vem do cache em memória"""
+    store = TTSPhraseStore(str(tmp_path))
+    service = PiperTTSService(enable_cache=False, phrase_store=store, phrase_workers=2)
+    service.cache = FakeCache()
+    active, peak, calls = 0, 0, []
+
+    async def engine(texto):
+        nonlocal active, peak
+        calls.append(texto)
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        return make_wav(10), "v"
+
+    monkeypatch.setattr(service, "_voice_id", lambda: "v")
+    monkeypatch.setattr(service, "_process_text", lambda texto: texto)
+    monkeypatch.setattr(service, "_synthesize_engine", engine)
+
+    texto = " ".join(f"Frase número {i}." for i in range(6))
+    audio = await service.synthesize(texto)
+    with wave.open(io.BytesIO(audio), "rb") as wav:
+        assert wav.getnframes() == 60
+    assert len(calls) == 6 and peak == 2
+    assert store.get_stats()["segments"] == 6
+
+    assert await service.synthesize(texto) == audio
+    assert len(calls) == 6 and store.get_stats()["hits"] == 0
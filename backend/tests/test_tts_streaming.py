@@ -0,0 +1,83 @@
+"""
+Testes para síntese TTS em streaming por sentença
+"""
+import asyncio
+import pytest
+
+from backend.services.tts_streaming import SentenceSplitter, SentenceTTSStream
+
+
+class FakeTTS:
+    """TTS falso: sentenças longas demoram mais para sintetizar"""
+    
+    def __init__(self):
+        self.calls = []
+    
+    async def synthesize(self, texto: str) -> bytes:
+        self.calls.append(texto)
+        await asyncio.sleep(0.001 * len(texto))
+        return texto.encode("utf-8")
+
+
+def test_splitter_emits_complete_sentences():
+    """Sentenças são liberadas conforme a pontuação chega"""
+    splitter = SentenceSplitter(min_chars=5)
+    assert splitter.feed("Olá, tudo bem") == []
+    assert splitter.feed("? Hoje vai ") == ["Olá, tudo bem?"]
+    assert splitter.feed("chover bastante.") == []
+    assert splitter.flush() == "Hoje vai chover bastante."
+    assert splitter.flush() is None
+
+
+def test_splitter_merges_short_sentences():
+    """Trechos curtos são agrupados com a próxima sentença"""
+    splitter = SentenceSplitter(min_chars=15)
+    sentences = splitter.feed("Oi. Eu sou o Jonh, seu assistente. Tchau ")
+    assert sentences == ["Oi. Eu sou o Jonh, seu assistente."]
+    assert splitter.flush() == "Tchau"
+
+
+@pytest.mark.asyncio
+async def test_stream_preserves_order():
+    """Áudio é entregue na ordem das sentenças mesmo com sínteses concorrentes"""
+    tts = FakeTTS()
+    stream = SentenceTTSStream(tts, max_workers=3, min_chars=5)
+    tokens = ["Uma sentença bem mais longa que a outra. ", "Curta aqui. ", "Final"]
+    for token in tokens:
+        stream.feed(token)
+    stream.finish()
+    
+    segments = [segment async for segment in stream.drain()]
+    assert [s.index for s in segments] == [0, 1, 2]
+    assert segments[1].audio == b"Curta aqui."
+    assert segments[2].text == "Final"
+    assert stream.first_audio_ms is not None
+
+
+@pytest.mark.asyncio
+async def test_pop_ready_is_non_blocking():
+    """pop_ready só retorna segmentos já concluídos"""
+    stream = SentenceTTSStream(FakeTTS(), min_chars=5)
+    stream.feed("Primeira sentença. ")
+    assert stream.pop_ready() == []
+    await asyncio.sleep(0.1)
+    ready = stream.pop_ready()
+    assert len(ready) == 1
+    assert ready[0].text == "Primeira sentença."
+
+
+@pytest.mark.asyncio
+async def test_stream_skips_failed_sentence():
+    """Falha de uma sentença não interrompe as demais"""
+    
+    class FlakyTTS(FakeTTS):
+        async def synthesize(self, texto):
+            if "erro" in texto:
+                raise RuntimeError("falha")
+            return await super().synthesize(texto)
+    
+    stream = SentenceTTSStream(FlakyTTS(), min_chars=3)
+    stream.feed("Vai dar erro. Mas esta funciona. ")
+    stream.finish()
+    texts = [segment.text async for segment in stream.drain()]
+    assert texts == ["Mas esta funciona."]